@@ -0,0 +1,620 @@
+import bisect
+import sys
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import numpy as np
+
+from trading_automation.core.Utils import binance_intervals_to_seconds, input_to_percentage
+from trading_automation.data.KlineArchive import KlineArchive, candles_to_array, kline_archive, read_candles
+
+DAY_MS = 86400000
+# the same limits as FuturesManager
+RANGE_LIMIT_DAYS = 21
+VOLATILITY_LIMIT = 25  # percentage of change within 1 hour to stop orders
+DEFAULT_MAKER_FEE = 0.0002
+DEFAULT_TAKER_FEE = 0.0004
+# candles after the entries the exits of all entries are searched for together in, in stages as most positions close
+# within the first, before searching for the exits of positions still open one by one
+SCAN_BARS = (16, 64)
+# entries closer than this to their exit lookback hit are checked for a limit exit with range reductions first
+LOOKBACK_RANGE = 256
+SCAN_BATCH = 16384
+
+EXIT_LIMIT = 0
+EXIT_STOP_LOSS = 1
+EXIT_SOFT_STOP_LOSS = 2
+EXIT_END_OF_DATA = 3
+EXIT_REASONS = ["limit", "stop_loss", "soft_stop_loss", "end_of_data"]
+
+TRADE_DTYPE = np.dtype([
+    ('side', 'i1'),  # 1 long, -1 short
+    ('entry_time', '<i8'),  # open time of the candle the entry filled in
+    ('exit_time', '<i8'),  # open time of the candle the exit filled in (close time for soft stop losses)
+    ('entry_price', '<f8'),
+    ('exit_price', '<f8'),
+    ('bars', '<i8'),
+    ('pnl_percentage', '<f8'),  # after fees, 1.0 = 100%
+    ('exit_reason', 'i1'),
+    ('entry_taker', '?'),
+    ('exit_taker', '?'),
+])
+
+
+def _rolling(a, window, op):
+    out = np.array(a, dtype=np.float64)
+    if window <= 1:
+        return out
+    size = 1
+    while size * 2 <= window:
+        out[size:] = op(out[size:], out[:-size])
+        size *= 2
+    if size < window:
+        shift = window - size
+        out[shift:] = op(out[shift:], out[:-shift].copy())
+    return out
+
+
+def rolling_max(a, window) -> np.ndarray:
+    """
+    out[i] = max(a[i - window + 1:i + 1]), over the values there are for i < window - 1. O(n log(window)) as two
+    overlapping power of two blocks are combined
+    """
+    return _rolling(a, window, np.maximum)
+
+
+def rolling_min(a, window) -> np.ndarray:
+    return _rolling(a, window, np.minimum)
+
+
+def daily_range(open_times, highs, lows, days):
+    """
+    The high and low of the last days daily (UTC) candles at each candle's close, including the current day up to the
+    candle, as FuturesManager gets them with futures_klines(interval='1d', limit=RANGE_LIMIT_DAYS)
+    """
+    new_day = np.concatenate(([True], open_times[1:] // DAY_MS != open_times[:-1] // DAY_MS))
+    starts = np.flatnonzero(new_day)
+    day_index = np.cumsum(new_day) - 1
+    running_high = np.empty_like(highs)
+    running_low = np.empty_like(lows)
+    for start, end in zip(starts, np.append(starts[1:], len(highs))):
+        running_high[start:end] = np.maximum.accumulate(highs[start:end])
+        running_low[start:end] = np.minimum.accumulate(lows[start:end])
+    # the range of the days - 1 days before each day
+    previous_high = np.full(len(starts), -np.inf)
+    previous_low = np.full(len(starts), np.inf)
+    if days > 1:
+        previous_high[1:] = rolling_max(np.maximum.reduceat(highs, starts), days - 1)[:-1]
+        previous_low[1:] = rolling_min(np.minimum.reduceat(lows, starts), days - 1)[:-1]
+    return np.maximum(running_high, previous_high[day_index]), np.minimum(running_low, previous_low[day_index])
+
+
+# the 20 parameters of an args_*.txt file in order
+ARG_FILE_FIELDS = ["exchange", "interval", "symbol", "flushPercent", "squeezePercent", "numberOfFlushBars",
+                   "exitLookbackBars", "stopLossPercentageLong", "stopLossPercentageShort", "softSLPercentage", "softSLN",
+                   "takeProfitPercentage", "quantity", "fixedBalance", "balancePercent", "minBalance",
+                   "maxDrawdownPercentage", "maxSingleTradeLossPercentage", "maxNumOfPositions",
+                   "shortsPositionMultiplier"]
+
+
+def _format_arg(value) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+@dataclass
+class FlushStrategyParams:
+    """
+    The parameters of a FuturesFlushBuyManager as given in an args_*.txt file, percentages as inputs (1.8 = 1.8%)
+    """
+    exchange: str
+    interval: str
+    symbol: str
+    flushPercent: float
+    squeezePercent: float
+    numberOfFlushBars: int
+    exitLookbackBars: int
+    stopLossPercentageLong: float = 0
+    stopLossPercentageShort: float = 0
+    softSLPercentage: float = 0
+    softSLN: int = 0
+    takeProfitPercentage: float = 0
+    quantity: float = 0
+    fixedBalance: float = 0
+    balancePercent: float = 0
+    minBalance: float = 0
+    maxDrawdownPercentage: float = 100
+    maxSingleTradeLossPercentage: float = 0
+    maxNumOfPositions: int = 0
+    shortsPositionMultiplier: float = 1.0
+    shorts: bool = False
+    postOnly: bool = False
+    avoidMarketEntries: bool = False
+    stopLossTermination: bool = False
+    reverse_mode: bool = False
+
+    @classmethod
+    def from_lines(cls, lines: List[str]) -> "FlushStrategyParams":
+        """
+        :param lines: lines of an args_*.txt file, 20 parameters then the optionals as read by AggFuturesMain
+        """
+        lines = [line.strip() for line in lines]
+        params = lines[0:20]
+        optionals = lines[20:]
+        return cls(exchange=params[0], interval=params[1], symbol=params[2], flushPercent=float(params[3]),
+                   squeezePercent=float(params[4]), numberOfFlushBars=int(params[5]), exitLookbackBars=int(params[6]),
+                   stopLossPercentageLong=float(params[7]), stopLossPercentageShort=float(params[8]),
+                   softSLPercentage=float(params[9]), softSLN=int(params[10]), takeProfitPercentage=float(params[11]),
+                   quantity=float(params[12]), fixedBalance=float(params[13]), balancePercent=float(params[14]),
+                   minBalance=float(params[15]), maxDrawdownPercentage=float(params[16]),
+                   maxSingleTradeLossPercentage=float(params[17]), maxNumOfPositions=int(params[18]),
+                   shortsPositionMultiplier=float(params[19]), shorts='-s' in optionals, postOnly='-p' in optionals,
+                   # postOnly and avoidMarketEntries are mutually exclusive as in FuturesFlushBuyManager
+                   avoidMarketEntries='-a' in optionals and '-p' not in optionals,
+                   stopLossTermination='-t' in optionals, reverse_mode="CAPITAL" in params[0])
+
+    def to_lines(self, optionals: Optional[List[str]] = None) -> List[str]:
+        """
+        :param optionals: optional lines to keep, e.g. from the arg file the params were read from, -s -p -a and -t
+        are set from the params
+        :return: the lines of an args_*.txt file of the params
+        """
+        params = [self.exchange, self.interval, self.symbol] + \
+            [_format_arg(getattr(self, name)) for name in ARG_FILE_FIELDS[3:]]
+        flags = {'-s': self.shorts, '-p': self.postOnly, '-a': self.avoidMarketEntries, '-t': self.stopLossTermination}
+        kept = [line.strip() for line in optionals or [] if line.strip() and line.strip() not in flags]
+        return params + [flag for flag, on in flags.items() if on] + kept
+
+    @classmethod
+    def from_args_file(cls, path) -> "FlushStrategyParams":
+        with open(path, 'r') as file:
+            return cls.from_lines(file.readlines())
+
+
+@dataclass
+class BacktestResult:
+    params: FlushStrategyParams
+    trades: np.ndarray
+    wallet: np.ndarray  # internal wallet after each trade, starting at 100 as FuturesFlushBuyManager
+    stats: dict = field(default_factory=dict)
+    stopped_reason: Optional[str] = None
+
+    def report(self) -> str:
+        s = self.stats
+        lines = [f"{self.params.exchange} {self.params.symbol} {self.params.interval}: {s['trades']} trades, "
+                 f"win rate {s['win_rate'] * 100:.1f}%, return {s['total_return'] * 100:.2f}%, "
+                 f"max drawdown {s['max_drawdown'] * 100:.2f}%",
+                 f"average pnl {s['average_pnl'] * 100:.3f}%, average bars held {s['average_bars']:.1f}, "
+                 f"long/short {s['long_trades']}/{s['short_trades']}",
+                 f"entries filled {s['entry_fills']}/{s['entry_orders']} candles with orders "
+                 f"({s['entry_fill_rate'] * 100:.2f}%), taker entries {s['taker_entries']}, taker exits {s['taker_exits']}",
+                 "exits " + ", ".join(f"{reason} {s['exits'][reason]}" for reason in EXIT_REASONS)]
+        if self.stopped_reason:
+            lines.append(f"stopped: {self.stopped_reason}")
+        return "\n".join(lines)
+
+
+class FlushBacktest:
+    """
+    Replays the FuturesFlushBuyManager.set_orders rules over a candle history. At each candle close while flat a buy
+    limit is placed numberOfFlushBars highest high - flushPercent (and with shorts a sell limit squeezePercent above the
+    lowest low) for the next candle, subject to the range limit, avoidMarketEntries/postOnly and the volatility stop.
+    In a position the exit limit is the exitLookbackBars highest high (lowest low for shorts) capped by the take
+    profit, with the stop loss and soft stop loss checked as live.
+    The entry orders of every candle are computed up front with rolling max/min over the whole history and the exits
+    of every entry that would fill are then searched for together, so only chaining the entries and exits into trades
+    and the internal wallet loops over trades.
+    Fills are taken from the candles: a limit fills if the price trades through it, at the open if the candle opened
+    past it. When a stop loss and exit limit are both hit in one candle the stop loss is assumed first unless the
+    candle opened past the limit.
+    Not modelled: bid/ask (CAPITAL) candles, order quantities, partial fills and exits in the candle of the entry.
+    """
+
+    def __init__(self, params: FlushStrategyParams, klines: np.ndarray, maker_fee=DEFAULT_MAKER_FEE,
+                 taker_fee=DEFAULT_TAKER_FEE, range_limit_days=RANGE_LIMIT_DAYS, volatility_limit=VOLATILITY_LIMIT,
+                 cache: Optional[dict] = None):
+        """
+        :param klines: KLINE_DTYPE array sorted by open time
+        :param volatility_limit: percentage, 0 or None to turn the volatility stop off
+        :param cache: dict to keep the arrays that only depend on klines in (rolling highs and lows, the daily
+        range...), pass the same dict to backtests of other params over the same klines to reuse them
+        """
+        self.params = params
+        self.klines = klines
+        self.cache = {} if cache is None else cache
+        self.maker_fee = maker_fee
+        self.taker_fee = taker_fee
+        self.range_limit_days = 0 if params.reverse_mode else range_limit_days
+        self.volatility_limit = volatility_limit
+        self.flush = input_to_percentage(params.flushPercent)
+        self.squeeze = input_to_percentage(params.squeezePercent) if params.shorts else 0
+        self.stop_loss_long = input_to_percentage(params.stopLossPercentageLong)
+        self.stop_loss_short = input_to_percentage(params.stopLossPercentageShort)
+        self.soft_stop_loss = input_to_percentage(params.softSLPercentage)
+        self.take_profit = input_to_percentage(params.takeProfitPercentage)
+        self.max_drawdown = min(input_to_percentage(params.maxDrawdownPercentage), 1.0)
+        self.max_single_trade_loss = input_to_percentage(params.maxSingleTradeLossPercentage)
+        # soft stop loss as FuturesFlushBuyManager.soft_stop_loss_check, off unless 0 < softSLPercentage < 100
+        self.soft_stop_loss_bars = params.softSLN if 0.0 < self.soft_stop_loss < 1.0 and params.softSLN > 0 else 0
+
+    def _cached(self, key, compute):
+        if key not in self.cache:
+            self.cache[key] = compute()
+        return self.cache[key]
+
+    def _column(self, name) -> np.ndarray:
+        return self._cached(name, lambda: np.asarray(self.klines[name], dtype=np.float64))
+
+    def _rolling_high(self, window):
+        return self._cached(("rolling_high", window), lambda: rolling_max(self._column('high'), window))
+
+    def _rolling_low(self, window):
+        return self._cached(("rolling_low", window), lambda: rolling_min(self._column('low'), window))
+
+    def _entry_orders(self, o, h, l, c):
+        p = self.params
+        interval = binance_intervals_to_seconds(p.interval)
+        # candles FuturesFlushBuyManager looks back over for the volatility check, an hour
+        volatility_bars = max(1, 3600 // interval)
+        lookback = max(p.numberOfFlushBars, p.exitLookbackBars, volatility_bars)
+        # numberOfFlushBars 0 takes candles[-0:], all the candles set_orders got
+        entry_bars = p.numberOfFlushBars or lookback
+        highest_entry = self._rolling_high(entry_bars)
+        lowest_entry = self._rolling_low(entry_bars)
+        if p.numberOfFlushBars == 0:
+            buy_level = c * (1 - self.flush)
+            sell_level = c * (1 + self.squeeze)
+        else:
+            buy_level = highest_entry * (1 - self.flush)
+            sell_level = lowest_entry * (1 + self.squeeze)
+        if p.reverse_mode:
+            buy_level, sell_level = sell_level, buy_level
+        buy_ok = np.ones(len(c), dtype=bool)
+        sell_ok = np.full(len(c), p.shorts)
+        if self.range_limit_days > 0:
+            upper, lower = self._cached(("daily_range", self.range_limit_days), lambda: daily_range(
+                self.klines['open_time'], h, l, self.range_limit_days))
+            upper = np.maximum(upper, highest_entry)
+            lower = np.minimum(lower, lowest_entry)
+            buy_ok &= (buy_level >= lower) & (c >= lower)
+            sell_ok &= (sell_level <= upper) & (c <= upper)
+        if not p.reverse_mode:
+            if p.postOnly or p.avoidMarketEntries:
+                # a post only order at a price the market is already past expires, avoidMarketEntries skips it
+                buy_ok &= c >= buy_level
+                sell_ok &= c <= sell_level
+            # both orders would be valid so only the long is placed
+            sell_ok &= ~((buy_level > sell_level) & (buy_level > c) & (c > sell_level))
+        volatility = np.zeros(len(c), dtype=bool)
+        if self.volatility_limit:
+            highest, lowest = self._rolling_high(lookback), self._rolling_low(lookback)
+            volatility = (highest / lowest - 1) * 100 > self.volatility_limit
+        # orders placed at close i fill in candle i + 1
+        next_o, next_h, next_l = (np.append(x[1:], np.nan) for x in (o, h, l))
+        if p.reverse_mode:
+            # stop entries on the breakout
+            buy_fill = buy_ok & (next_h >= buy_level)
+            sell_fill = sell_ok & (next_l <= sell_level)
+            buy_price, sell_price = np.maximum(buy_level, next_o), np.minimum(sell_level, next_o)
+            buy_taker = sell_taker = np.ones(len(c), dtype=bool)
+        else:
+            buy_fill = buy_ok & (next_l <= buy_level)
+            sell_fill = sell_ok & (next_h >= sell_level)
+            buy_price, sell_price = np.minimum(buy_level, next_o), np.maximum(sell_level, next_o)
+            buy_taker, sell_taker = next_o < buy_level, next_o > sell_level
+        # when both fill in one candle the one closer to the open is taken
+        both = buy_fill & sell_fill
+        sell_first = both & (np.abs(next_o - sell_level) < np.abs(next_o - buy_level))
+        buy_fill &= ~sell_first
+        sell_fill &= ~(both & ~sell_first)
+        side = np.where(buy_fill, 1, np.where(sell_fill, -1, 0)).astype(np.int8)
+        price = np.where(buy_fill, buy_price, sell_price)
+        taker = np.where(buy_fill, buy_taker, sell_taker)
+        start = max(lookback, p.softSLN, 1) - 1
+        return side, price, taker, buy_ok | sell_ok, volatility, start
+
+    def _lookback_exits(self, entry_bars, rows, stops, caps, soft_thresholds, prices, close_exits, lookback_hits):
+        """
+        The exits of positions entered in each of entry_bars that are closed by the exit lookback limit. A position
+        is closed at the limit after the first close after which the next candle trades through it (lookback_hits)
+        unless its stop loss, take profit or soft stop loss is hit first, which is ruled out with the lowest low, the
+        highest high and the lowest soft_n close high over the candles up to there.
+        Rows as _scan_exits.
+        :return: exit bar, exit price and taker arrays, exit bar -1 for positions that have to be scanned
+        """
+        n = prices[0].shape[1]
+        o, h, l, c = (np.append(x.ravel(), np.nan) for x in prices)
+        exit_bars = np.full(len(entry_bars), -1, dtype=np.int64)
+        hit_closes = np.full(len(entry_bars), n, dtype=np.int64)
+        for row in (0, 1):
+            in_row = np.flatnonzero(rows == row)
+            hits = np.append(lookback_hits[row], n)
+            hit_closes[in_row] = hits[np.searchsorted(hits, entry_bars[in_row])]
+        candidates = np.flatnonzero((hit_closes < n) & (hit_closes - entry_bars < LOOKBACK_RANGE))
+        # sorted as each reduceat segment between two positions is reduced as well
+        candidates = candidates[np.argsort(entry_bars[candidates] + rows[candidates] * n, kind='stable')]
+        first = entry_bars[candidates] + rows[candidates] * n
+        last = hit_closes[candidates] + rows[candidates] * n
+
+        def reduce(ufunc, values, begin, end):
+            return ufunc.reduceat(values, np.column_stack((begin, end)).ravel())[::2]
+
+        # the candles from the one after the entry to the one after the hit
+        clear = (reduce(np.minimum, l, first + 1, last + 2) > stops[candidates]) & \
+            (reduce(np.maximum, h, first + 1, last + 2) < caps[candidates])
+        soft_n = self.soft_stop_loss_bars
+        if soft_n:
+            # closes from the entry to the hit
+            soft_highs = self._cached(("soft_highs", soft_n), lambda: np.append(
+                np.vstack([rolling_max(x, soft_n) for x in prices[3]]).ravel(), np.nan))
+            clear &= reduce(np.minimum, soft_highs, first, last + 1) > soft_thresholds[candidates]
+        candidates, last = candidates[clear], last[clear]
+        exit_bars[candidates] = hit_closes[candidates] + 1
+        limit, exit_open = close_exits.ravel()[last], o[last + 1]
+        exit_prices = np.zeros(len(entry_bars))
+        takers = np.ones(len(entry_bars), dtype=bool)
+        exit_prices[candidates] = np.maximum(limit, exit_open)
+        takers[candidates] = exit_open > limit
+        return exit_bars, exit_prices, takers
+
+    def _scan_exits(self, entry_bars, first, bars, rows, stops, caps, soft_thresholds, prices, close_exits):
+        """
+        The exits of positions entered in each of entry_bars searched for together over candles first to first + bars
+        after the entries. The candles of each entry are gathered into a row of a matrix (SCAN_BATCH entries at a
+        time) and the exit is at the first column with an exit.
+        Row 0 of prices and close_exits is for longs and row 1 the negated prices for shorts, so shorts are found as
+        longs (as are their stops, caps and soft_thresholds).
+        :return: exit bar, exit price, exit reason and taker arrays, exit bar -1 for positions still open
+        """
+        n = prices[0].shape[1]
+        o, h, l, c = (x.ravel() for x in prices)
+        close_exits = close_exits.ravel()
+        exit_bars = np.full(len(entry_bars), -1, dtype=np.int64)
+        exit_prices = np.zeros(len(entry_bars))
+        reasons = np.full(len(entry_bars), EXIT_END_OF_DATA, dtype=np.int8)
+        takers = np.ones(len(entry_bars), dtype=bool)
+        soft_n = self.soft_stop_loss_bars
+        # closes from soft_n - 1 before the first to check the soft stop loss, and the candle after the last close
+        offsets = np.arange(first - max(soft_n - 1, 0), first + bars + 1)
+        head = len(offsets) - bars - 1
+        for begin in range(0, len(entry_bars), SCAN_BATCH):
+            batch = slice(begin, begin + SCAN_BATCH)
+            candles = entry_bars[batch, None] + offsets
+            index = np.minimum(candles, n - 1) + rows[batch, None] * n
+            closes = candles[:, head:-1]
+            # the stop loss is assumed to be hit first unless the candle opened past the limit
+            limit = np.minimum(close_exits.take(index[:, head:-1]), caps[batch, None])
+            stop = stops[batch, None]
+            bar_o, bar_l = o.take(index[:, head + 1:]), l.take(index[:, head + 1:])
+            limit_hit = (h.take(index[:, head + 1:]) >= limit) & ((bar_l > stop) | (bar_o >= limit))
+            stop_hit = bar_l <= stop
+            # closed at the candle close before the next orders are placed, or open at the end of the candles
+            at_close = closes >= n - 1
+            if soft_n:
+                past = np.cumsum(c.take(index[:, :-1]) <= soft_thresholds[batch, None], axis=1)
+                past = np.pad(past, ((0, 0), (1, 0)))
+                at_close |= past[:, soft_n:] - past[:, :-soft_n] == soft_n
+            events = at_close | limit_hit | stop_hit
+            found = np.flatnonzero(events.any(axis=1))
+            column = events[found].argmax(axis=1)
+            exits = begin + found
+            is_limit, is_close = limit_hit[found, column], at_close[found, column]
+            exit_open, exit_limit, exit_close = bar_o[found, column], limit[found, column], closes[found, column]
+            exit_bars[exits] = np.where(is_close, np.minimum(exit_close, n - 1), exit_close + 1)
+            exit_prices[exits] = np.where(is_close, c.take(index[found, head + column]),
+                                          np.where(is_limit, np.maximum(exit_limit, exit_open),
+                                                   np.minimum(stop[found, 0], exit_open)))
+            reasons[exits] = np.where(is_close, np.where(exit_close >= n - 1, EXIT_END_OF_DATA, EXIT_SOFT_STOP_LOSS),
+                                      np.where(is_limit, EXIT_LIMIT, EXIT_STOP_LOSS))
+            takers[exits] = ~is_limit | is_close | (exit_open > exit_limit)
+        return exit_bars, exit_prices, reasons, takers
+
+    def _search_exit(self, close, prices, close_exits, lookback_hits, stop, cap, soft_threshold):
+        """
+        The exit of a long (or short on negated prices) still open at close, searched for in growing chunks.
+        :param lookback_hits: closes after which the next candle trades through close_exits, the exit limit is hit
+        there at the latest so no chunk has to go further
+        :return: (exit bar, exit price, exit reason, taker)
+        """
+        o, h, l, c = prices
+        n = len(c)
+        soft_n = self.soft_stop_loss_bars
+        chunk = SCAN_BARS[-1] * 2
+        while close < n - 1:
+            next_hit = int(np.searchsorted(lookback_hits, close))
+            end = min(n - 1, close + chunk, int(lookback_hits[next_hit]) + 1 if next_hit < len(lookback_hits) else n)
+            limit = np.minimum(close_exits[close:end], cap)
+            bar_o, bar_h, bar_l = o[close + 1:end + 1], h[close + 1:end + 1], l[close + 1:end + 1]
+            limit_hit = (bar_h >= limit) & ((bar_l > stop) | (bar_o >= limit))
+            stop_hit = bar_l <= stop
+            soft_hit = np.zeros(end - close, dtype=bool)
+            if soft_n:
+                past = np.concatenate(([0], np.cumsum(c[close - soft_n + 1:end] <= soft_threshold)))
+                soft_hit = past[soft_n:] - past[:-soft_n] == soft_n
+            events = limit_hit | stop_hit | soft_hit
+            if events.any():
+                i = int(np.argmax(events))
+                if soft_hit[i]:
+                    return close + i, float(c[close + i]), EXIT_SOFT_STOP_LOSS, True
+                if limit_hit[i]:
+                    return close + 1 + i, float(max(limit[i], bar_o[i])), EXIT_LIMIT, bool(bar_o[i] > limit[i])
+                return close + 1 + i, float(min(stop, bar_o[i])), EXIT_STOP_LOSS, True
+            close = end
+            chunk *= 2
+        return n - 1, float(c[n - 1]), EXIT_END_OF_DATA, True
+
+    def run(self) -> BacktestResult:
+        p = self.params
+        k = self.klines
+        n = len(k)
+        o, h, l, c = (self._column(name) for name in ('open', 'high', 'low', 'close'))
+        side, price, taker, orders, volatility, start = self._entry_orders(o, h, l, c)
+        # row 0 longs, row 1 shorts as longs on the negated prices
+        prices = self._cached("prices", lambda: tuple(np.vstack(pair) for pair in ((o, -o), (h, -l), (l, -h), (c, -c))))
+        close_exits = self._cached(("close_exits", p.exitLookbackBars), lambda: np.vstack(
+            (self._rolling_high(p.exitLookbackBars), -self._rolling_low(p.exitLookbackBars))))
+        lookback_hits = self._cached(("lookback_hits", p.exitLookbackBars), lambda: [
+            np.flatnonzero(prices[1][row, 1:] >= close_exits[row, :-1]) for row in (0, 1)])
+
+        # every candle an entry would fill in or the volatility stop trips, and the exit of each of the entries
+        events = np.flatnonzero((side != 0) | volatility)
+        events = events[(events >= start) & (events < n - 1)]
+        entry_sides = side[events].astype(np.int64)
+        entry_prices = price[events]
+        entry_takers = taker[events]
+        rows = (entry_sides == -1).astype(np.intp)
+        sign = np.where(rows == 1, -1.0, 1.0)
+        stop_loss = np.where(rows == 1, -self.stop_loss_short, self.stop_loss_long)
+        stops = np.where(stop_loss != 0, entry_prices * sign * (1 - stop_loss), -np.inf)
+        caps = entry_prices * sign * (1 + sign * self.take_profit) if self.take_profit else np.full(len(events), np.inf)
+        soft_thresholds = entry_prices * sign * (1 - sign * self.soft_stop_loss)
+        exit_bars = np.full(len(events), -1, dtype=np.int64)
+        exit_prices = np.zeros(len(events))
+        reasons = np.zeros(len(events), dtype=np.int8)
+        exit_takers = np.ones(len(events), dtype=bool)
+        # most positions close at the exit lookback limit, which range reductions confirm for all entries at once
+        entries = np.flatnonzero(entry_sides != 0)
+        exit_bars[entries], exit_prices[entries], exit_takers[entries] = self._lookback_exits(
+            events[entries] + 1, rows[entries], stops[entries], caps[entries], soft_thresholds[entries], prices,
+            close_exits, lookback_hits)
+        reasons[entries] = EXIT_LIMIT
+        # the rest are scanned for, over the candles most of them close in first then longer for those still open
+        searched = 0
+        for bars in SCAN_BARS:
+            entries = entries[exit_bars[entries] < 0]
+            exit_bars[entries], exit_prices[entries], reasons[entries], exit_takers[entries] = self._scan_exits(
+                events[entries] + 1, searched, bars, rows[entries], stops[entries], caps[entries],
+                soft_thresholds[entries], prices, close_exits)
+            searched += bars
+        events_list = events.tolist()
+        exit_bars_list, exit_prices_list, reasons_list, exit_takers_list = (
+            x.tolist() for x in (exit_bars, exit_prices, reasons, exit_takers))
+        sides_list, entry_prices_list, entry_takers_list, volatility_list = (
+            x.tolist() for x in (entry_sides, entry_prices, entry_takers, volatility[events]))
+        orders_before = np.concatenate(([0], np.cumsum(orders)))
+        volatility_before = np.concatenate(([0], np.cumsum(volatility)))
+
+        traded = []
+        wallets = []
+        wallet = 100.0
+        max_drawdown_value = wallet * (1 - self.max_drawdown)
+        stopped_reason = None
+        entry_orders = 0
+        i = start
+        while i < n - 1:
+            e = bisect.bisect_left(events_list, i)
+            if e == len(events_list):
+                entry_orders += int(orders_before[n - 1] - orders_before[i])
+                break
+            j = events_list[e]
+            entry_orders += int(orders_before[j] - orders_before[i]) + (1 if sides_list[e] != 0 else 0)
+            if volatility_list[e]:
+                stopped_reason = "volatility"
+                break
+            if exit_bars_list[e] < 0:
+                row = rows[e]
+                exit_bars[e], exit_prices[e], reasons[e], exit_takers[e] = self._search_exit(
+                    j + 1 + searched, tuple(x[row] for x in prices), close_exits[row], lookback_hits[row], stops[e],
+                    caps[e], soft_thresholds[e])
+                exit_bars_list[e], exit_prices_list[e], reasons_list[e], exit_takers_list[e] = (
+                    int(exit_bars[e]), float(exit_prices[e]), int(reasons[e]), bool(exit_takers[e]))
+            traded.append(e)
+            exit_bar = exit_bars_list[e]
+            reason = reasons_list[e]
+            if reason == EXIT_END_OF_DATA:
+                break
+            entry_price = entry_prices_list[e]
+            exit_price = exit_prices_list[e] * sides_list[e]
+            pnl = sides_list[e] * (exit_price / entry_price - 1) - self._fee(entry_takers_list[e]) - \
+                self._fee(exit_takers_list[e]) * exit_price / entry_price
+            wallet *= 1 + pnl
+            wallets.append(wallet)
+            max_drawdown_value = max(max_drawdown_value, wallet * (1 - self.max_drawdown))
+            if wallet < max_drawdown_value:
+                stopped_reason = "max drawdown"
+            elif self.max_single_trade_loss and pnl < -self.max_single_trade_loss:
+                stopped_reason = "max single trade loss"
+            elif p.stopLossTermination and reason in (EXIT_STOP_LOSS, EXIT_SOFT_STOP_LOSS):
+                stopped_reason = "stop loss termination"
+            elif volatility_before[exit_bar] - volatility_before[j + 1] > 0:
+                # close position only after the volatility check, stopped once the position is closed
+                stopped_reason = "volatility"
+            if stopped_reason:
+                break
+            # set_orders places the next entry orders at the close of the exit candle, after a soft stop loss at
+            # the close after
+            i = exit_bar + 1 if reason == EXIT_SOFT_STOP_LOSS else exit_bar
+
+        traded = np.array(traded, dtype=np.int64)
+        trades = np.zeros(len(traded), dtype=TRADE_DTYPE)
+        trades['side'] = entry_sides[traded]
+        trades['entry_time'] = k['open_time'][events[traded] + 1]
+        trades['exit_time'] = np.where(reasons[traded] == EXIT_SOFT_STOP_LOSS, k['close_time'][exit_bars[traded]],
+                                       k['open_time'][exit_bars[traded]])
+        trades['entry_price'] = entry_prices[traded]
+        trades['exit_price'] = exit_prices[traded] * sign[traded]
+        trades['bars'] = exit_bars[traded] - events[traded] - 1
+        fees = np.where(entry_takers[traded], self.taker_fee, self.maker_fee) + \
+            np.where(exit_takers[traded], self.taker_fee, self.maker_fee) * trades['exit_price'] / trades['entry_price']
+        trades['pnl_percentage'] = sign[traded] * (trades['exit_price'] / trades['entry_price'] - 1) - fees
+        trades['exit_reason'] = reasons[traded]
+        trades['entry_taker'] = entry_takers[traded]
+        trades['exit_taker'] = exit_takers[traded]
+        result = BacktestResult(params=p, trades=trades, wallet=np.array(wallets), stopped_reason=stopped_reason)
+        result.stats = self._stats(trades, np.array(wallets), entry_orders)
+        return result
+
+    def _fee(self, taker):
+        return self.taker_fee if taker else self.maker_fee
+
+    def _stats(self, trades, wallets, entry_orders):
+        closed = trades[trades['exit_reason'] != EXIT_END_OF_DATA]
+        curve = np.concatenate(([100.0], wallets))
+        peaks = np.maximum.accumulate(curve)
+        return {
+            'trades': len(closed),
+            'long_trades': int((closed['side'] == 1).sum()),
+            'short_trades': int((closed['side'] == -1).sum()),
+            'open_trade': len(trades) > len(closed),
+            'win_rate': float((closed['pnl_percentage'] > 0).mean()) if len(closed) else 0.0,
+            'total_return': float(curve[-1] / 100 - 1),
+            'average_pnl': float(closed['pnl_percentage'].mean()) if len(closed) else 0.0,
+            'max_drawdown': float(((peaks - curve) / peaks).max()),
+            'average_bars': float(closed['bars'].mean()) if len(closed) else 0.0,
+            'entry_orders': entry_orders,
+            'entry_fills': len(trades),
+            'entry_fill_rate': len(trades) / entry_orders if entry_orders else 0.0,
+            'taker_entries': int(trades['entry_taker'].sum()),
+            'taker_exits': int(closed['exit_taker'].sum()),
+            'exits': {reason: int((trades['exit_reason'] == i).sum()) for i, reason in enumerate(EXIT_REASONS)},
+        }
+
+
+def load_klines(exchange, symbol, interval, start_time=None, end_time=None, archive: KlineArchive = kline_archive,
+                csv_root="klines") -> np.ndarray:
+    """
+    Candles of a series from archive, or the csv file if the series is not archived
+    """
+    if archive.has_series(exchange, symbol, interval):
+        return archive.read(exchange, symbol, interval, start_time, end_time)
+    klines = candles_to_array([c for c in read_candles(exchange, symbol, interval, csv_root) if c])
+    if start_time is not None:
+        klines = klines[klines['open_time'] >= start_time]
+    if end_time is not None:
+        klines = klines[klines['open_time'] <= end_time]
+    return klines
+
+
+def run_backtest(arg_file, start_time=None, end_time=None, **kwargs) -> BacktestResult:
+    params = FlushStrategyParams.from_args_file(arg_file)
+    klines = load_klines(params.exchange, params.symbol, params.interval, start_time, end_time)
+    return FlushBacktest(params, klines, **kwargs).run()
+
+
+if __name__ == "__main__":
+    """
+    python -m trading_automation.analysis.FlushBacktest args_file.txt [start_time_ms] [end_time_ms]
+    """
+    result = run_backtest(sys.argv[1], *(int(x) for x in sys.argv[2:4]))
+    print(result.report())
@@ -0,0 +1,176 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+# fractions of the balance bet on each trade ProcessTradesText.sample_trades_from_pnl_list reports on
+RATIOS = [0.01, 0.03, 0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1]
+STARTING_BALANCE = 1000
+# paths x trades of a chunk of paths, 64MB of float64
+CHUNK_ELEMENTS = 1 << 23
+
+
+@dataclass
+class MonteCarloResult:
+    ratio: float
+    end_balances: np.ndarray
+    max_drawdowns: np.ndarray  # fraction of the highest balance seen, starting balance included
+
+    def summary(self) -> str:
+        b = self.end_balances
+        return f"RATIO {self.ratio} MASTER RESULT MEDIAN {np.median(b)} MIN {np.min(b)} MAX {np.max(b)} " \
+               f"MEAN {np.mean(b)} STANDARD_ERROR {np.std(b) / np.sqrt(len(b))}. MAX DRAWDOWN STATS: " \
+               f"MEAN BALANCE {np.mean(self.max_drawdowns)}"
+
+
+def sample_trades(trades, number_of_trades, paths, seed) -> np.ndarray:
+    """
+    :param trades: number of past trades to draw from
+    :param seed: anything np.random.default_rng takes
+    :return: (paths, number_of_trades) indices of past trades drawn with replacement
+    """
+    dtype = np.uint16 if trades <= 1 << 16 else np.int64
+    return np.random.default_rng(seed).integers(0, trades, (paths, number_of_trades), dtype=dtype)
+
+
+def _simulate_chunk(pnl_percentages, ratios, number_of_trades, paths, compounding, starting_balance, seed):
+    """
+    :return: (len(ratios), paths) arrays of end balances and max drawdowns, every ratio over the same trades
+    """
+    returns = np.asarray(pnl_percentages, dtype=np.float64) * 0.01
+    drawn = sample_trades(len(returns), number_of_trades, paths, seed)
+    end_balances = np.empty((len(ratios), paths))
+    max_drawdowns = np.empty((len(ratios), paths))
+    if not compounding:
+        drawn = np.ascontiguousarray(drawn.T)
+    for k, ratio in enumerate(ratios):
+        if compounding:
+            # the whole balance is bet each trade so balances relative to the starting balance are the cumulative
+            # product of each drawn trade's factor, a balance that reaches 0 stays there
+            factors = np.maximum(0, 1 + ratio * returns)
+            balances = factors.take(drawn)
+            np.cumprod(balances, axis=1, out=balances)
+            # drawdowns from the running maximum, which starts at the starting balance
+            peaks = np.maximum.accumulate(balances, axis=1)
+            np.maximum(peaks, 1, out=peaks)
+            np.divide(balances, peaks, out=peaks)
+            end_balances[k] = balances[:, -1] * starting_balance
+            max_drawdowns[k] = 1 - peaks.min(axis=1)
+        else:
+            # at most the starting balance is bet, which depends on the balance so far
+            balance = np.full(paths, float(starting_balance))
+            peak = balance.copy()
+            max_drawdown = np.zeros(paths)
+            for trades in drawn:
+                balance = np.maximum(0, balance + ratio * np.minimum(balance, starting_balance) * returns[trades])
+                np.maximum(peak, balance, out=peak)
+                np.maximum(max_drawdown, (peak - balance) / peak, out=max_drawdown)
+            end_balances[k] = balance
+            max_drawdowns[k] = max_drawdown
+    return end_balances, max_drawdowns
+
+
+def _run_chunks(func, chunks, max_workers):
+    if max_workers == 1 or len(chunks) == 1:
+        return [func(*args) for args in chunks]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(func, *zip(*chunks)))
+
+
+def simulate_pnl(pnl_percentages, number_of_trades=1000, paths=1000, ratios: Sequence[float] = RATIOS,
+                 compounding=True, starting_balance=STARTING_BALANCE, seed=None,
+                 max_workers: Optional[int] = None) -> Dict[float, MonteCarloResult]:
+    """
+    Monte Carlo test of a strategy from its past trades: paths of number_of_trades trades drawn at random from
+    pnl_percentages, betting ratio of the balance on each (at most the starting balance without compounding).
+    The paths are split in chunks, each drawing its trades from its own child of seed, and the ratios in groups so
+    there are enough chunk and ratio group pairs to keep every process of the pool busy. Every pair of a chunk draws
+    the same trades, so the ratios are compared over the same trades and the results only depend on seed, not on
+    max_workers.
+    :param pnl_percentages: pnl% of each past trade, e.g. 1.5 for 1.5%
+    :param max_workers: processes, None for one per core
+    :return: the result of each ratio
+    """
+    max_workers = max_workers or os.cpu_count()
+    chunk_paths = max(1, CHUNK_ELEMENTS // max(number_of_trades, 1))
+    sizes = [min(chunk_paths, paths - start) for start in range(0, paths, chunk_paths)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    pnl = np.asarray(pnl_percentages, dtype=np.float64)
+    groups = max(1, min(len(ratios), -(-max_workers // len(sizes))))
+    ratio_groups = [list(group) for group in np.array_split(np.asarray(ratios, dtype=np.float64), groups)]
+    chunks = [(pnl, ratio_group, number_of_trades, size, compounding, starting_balance, chunk_seed)
+              for size, chunk_seed in zip(sizes, seeds) for ratio_group in ratio_groups]
+    results = _run_chunks(_simulate_chunk, chunks, max_workers)
+    # results are in chunk then ratio group order
+    results = [results[i:i + groups] for i in range(0, len(results), groups)]
+    end_balances = np.concatenate([np.concatenate([r[0] for r in chunk]) for chunk in results], axis=1)
+    max_drawdowns = np.concatenate([np.concatenate([r[1] for r in chunk]) for chunk in results], axis=1)
+    return {ratio: MonteCarloResult(ratio, end_balances[k], max_drawdowns[k]) for k, ratio in enumerate(ratios)}
+
+
+@dataclass
+class CapitalRiskResult:
+    risk: float
+    take_profit: float
+    end_capitals: np.ndarray
+    profits_taken: np.ndarray
+    total_losses: np.ndarray
+
+    def summary(self) -> str:
+        results, profits, losses = self.end_capitals, self.profits_taken, self.total_losses
+        return f"risk {self.risk}:\t total money earned median = {np.median(results) + np.median(profits)}," \
+               f"\t median total loss = {np.median(losses)}," \
+               f"\t median profits taken = {np.median(profits)}," \
+               f"\t median end trading balance = {np.median(results)}," \
+               f"\t average = {np.mean(results)}," \
+               f"\t average profits taken = {np.mean(profits)}," \
+               f"\t total average = {np.mean(results) + np.mean(profits)}," \
+               f"\t s.d = {np.std(results)}," \
+               f"\t worst run = {np.min(results)}," \
+               f"\t best run = {np.max(results)}"
+
+
+def _simulate_capital_risk_chunk(risk, take_profit, loops, runs, win_gains, liquidation_probability,
+                                 win_probability, starting_capital, max_position_size, seed):
+    rng = np.random.default_rng(seed)
+    capital = np.full(runs, float(starting_capital))
+    profits_taken = np.zeros(runs)
+    total_losses = np.zeros(runs)
+    # whole percentages from -99% up to win_gains
+    highest_change = int(round(win_gains * 100, 9))
+    for _ in range(loops):
+        position = np.minimum(capital * risk, max_position_size)
+        capital -= position
+        liquidation_draw, win_draw = rng.random((2, runs))
+        change = rng.integers(-99, highest_change + 1, runs) * 0.01
+        liquidated = liquidation_draw <= liquidation_probability
+        won = ~liquidated & (win_draw <= win_probability)
+        net_change = np.where(won, position * (1 + win_gains), position * (1 + change))
+        net_change[liquidated] = 0
+        total_losses += np.where(liquidated, position, np.minimum(net_change, 0))
+        capital += net_change
+        profits = capital * take_profit
+        capital -= profits
+        profits_taken += profits
+    return capital, profits_taken, total_losses
+
+
+def simulate_capital_risk(risk, take_profit=0.0, loops=208, runs=50000, win_gains=0.13, liquidation_probability=0.076,
+                          win_probability=1.0, starting_capital=4000, max_position_size=80000, seed=None,
+                          max_workers: Optional[int] = None) -> CapitalRiskResult:
+    """
+    The scripts/sim.py simulation: each of loops rounds risk of the capital (at most max_position_size) is bet and
+    with liquidation_probability lost, otherwise with win_probability won at win_gains, otherwise changed by a
+    whole percentage drawn from -99% to win_gains. take_profit of the capital is taken out after each round.
+    Runs are simulated together in chunks across a process pool.
+    """
+    chunk_runs = max(1, CHUNK_ELEMENTS // 64)
+    sizes = [min(chunk_runs, runs - start) for start in range(0, runs, chunk_runs)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    chunks = [(risk, take_profit, loops, size, win_gains, liquidation_probability, win_probability, starting_capital,
+               max_position_size, chunk_seed) for size, chunk_seed in zip(sizes, seeds)]
+    results = _run_chunks(_simulate_capital_risk_chunk, chunks, max_workers or os.cpu_count())
+    end_capitals, profits_taken, total_losses = (np.concatenate([r[i] for r in results]) for i in range(3))
+    return CapitalRiskResult(risk, take_profit, end_capitals, profits_taken, total_losses)
@@ -0,0 +1,311 @@
+import hashlib
+import itertools
+import json
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, fields, replace
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from trading_automation.analysis.FlushBacktest import ARG_FILE_FIELDS, FlushBacktest, FlushStrategyParams, load_klines
+from trading_automation.config.settings import get_settings
+from trading_automation.data.KlineArchive import KlineArchive, kline_archive
+
+settings = get_settings()
+SWEEP_MAX_WORKERS = settings.sweep_max_workers or os.cpu_count() or 1
+SWEEP_PATH = settings.sweep_path
+COMBINATIONS_PER_TASK = 16
+# part of every result's key, bump it when FlushBacktest changes its results so cached results are not used
+RESULT_VERSION = 1
+PROGRESS_REPORT_SECONDS = 30
+RANKINGS = {
+    "total_return": lambda stats: stats['total_return'],
+    "return_over_drawdown": lambda stats: stats['total_return'] / max(stats['max_drawdown'], 0.001),
+    "average_pnl": lambda stats: stats['average_pnl'],
+    "win_rate": lambda stats: stats['win_rate'],
+}
+SWEEPABLE_FIELDS = {f.name: f.type for f in fields(FlushStrategyParams) if f.name not in ARG_FILE_FIELDS[:3]}
+
+
+def parse_range(name, value) -> list:
+    """
+    :param value: a list of values, one value, "start:stop:step" (stop included) or "a,b,c"
+    :return: the values of parameter name converted to its FlushStrategyParams type
+    """
+    if name not in SWEEPABLE_FIELDS:
+        raise Exception(f"{name} is not a FlushStrategyParams parameter that can be swept")
+    field_type = SWEEPABLE_FIELDS[name]
+    if isinstance(value, str) and ":" in value:
+        start, stop, step = (Decimal(x) for x in value.split(":"))
+        if step <= 0:
+            raise Exception(f"{name} range {value} needs a positive step")
+        values = []
+        while start <= stop:
+            values.append(start)
+            start += step
+    elif isinstance(value, str):
+        values = [x.strip() for x in value.split(",") if x.strip()]
+    elif isinstance(value, list):
+        values = value
+    else:
+        values = [value]
+    if field_type is bool:
+        return [v if isinstance(v, bool) else str(v).lower() in ("1", "true", "yes") for v in values]
+    return [field_type(float(v)) if field_type is int else field_type(v) for v in values]
+
+
+@dataclass
+class SweepResult:
+    params: FlushStrategyParams
+    stats: dict
+    stopped_reason: Optional[str]
+    score: float = 0.0
+
+
+class SweepResultCache:
+    """
+    Backtest results keyed by the hash of their parameters, candles and backtest settings in a SQLite database, so
+    a sweep only runs the combinations it has not run before. Only the sweep's main process uses it.
+    """
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS sweep_results (key TEXT PRIMARY KEY, symbol TEXT, "
+                                "args TEXT, stats TEXT, stopped_reason TEXT)")
+        self.connection.commit()
+
+    def get_many(self, keys) -> Dict[str, tuple]:
+        """
+        :return: {key: (stats, stopped_reason)} of the keys there are results of
+        """
+        results = {}
+        keys = list(keys)
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            rows = self.connection.execute(f"SELECT key, stats, stopped_reason FROM sweep_results WHERE key IN "
+                                           f"({', '.join('?' * len(chunk))})", chunk).fetchall()
+            results.update({key: (json.loads(stats), stopped_reason) for key, stats, stopped_reason in rows})
+        return results
+
+    def put_many(self, rows):
+        """
+        :param rows: (key, symbol, args lines, stats, stopped_reason)
+        """
+        self.connection.executemany("INSERT OR REPLACE INTO sweep_results VALUES (?, ?, ?, ?, ?)",
+                                    [(key, symbol, "\n".join(args), json.dumps(stats), stopped_reason)
+                                     for key, symbol, args, stats, stopped_reason in rows])
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+
+# candles and FlushBacktest cache of the series a pool worker is running combinations of
+_worker_series: Dict[str, tuple] = {}
+
+
+def _run_combinations(klines_path, combinations, backtest_kwargs):
+    """
+    Runs in the pool workers. The candles are memory mapped from the file the sweep saved them to, so every worker
+    shares the same pages instead of reading the klines itself, and kept with the arrays FlushBacktest caches while
+    the worker gets combinations of the same series.
+    :param combinations: (key, FlushStrategyParams fields)
+    :return: (key, stats, stopped_reason) of each combination
+    """
+    if klines_path not in _worker_series:
+        _worker_series.clear()
+        _worker_series[klines_path] = (np.load(klines_path, mmap_mode='r'), {})
+    klines, cache = _worker_series[klines_path]
+    results = []
+    for key, params in combinations:
+        result = FlushBacktest(FlushStrategyParams(**params), klines, cache=cache, **backtest_kwargs).run()
+        results.append((key, result.stats, result.stopped_reason))
+    return results
+
+
+class ParameterSweep:
+    """
+    Grid search of FlushStrategyParams over the archived candles of many symbols. A sweep is described by a spec,
+    e.g. loaded from a JSON file:
+        {
+            "base": "args_reference.txt",         arg file the swept parameters are changed in
+            "exchange": "BINANCE", "interval": "1m",   optional, otherwise those of base
+            "symbols": ["BTCUSDT", "ETHUSDT"],    or "all" archived symbols, or {"BTCUSDT": {ranges of the symbol}}
+            "ranges": {"flushPercent": "1.5:3:0.5", "numberOfFlushBars": [30, 60], "shorts": [true, false]},
+            "start_time": 1672531200000, "end_time": null,
+            "backtest": {"maker_fee": 0.0002, "taker_fee": 0.0004},   FlushBacktest keyword arguments
+            "rank_by": "return_over_drawdown", "min_trades": 10, "exclude_stopped": true, "top": 3
+        }
+    The combinations run across a process pool. The candles of each series are saved once to
+    <path>/klines/<series>.npy which the workers memory map, and results are cached in <path>/results.db by the hash
+    of everything that determines them so a repeated or extended sweep only runs new combinations.
+    """
+
+    def __init__(self, spec: dict, path=SWEEP_PATH, max_workers=SWEEP_MAX_WORKERS,
+                 archive: KlineArchive = kline_archive, csv_root="klines", print_process=True):
+        self.spec = spec
+        self.path = path
+        self.max_workers = max_workers
+        self.archive = archive
+        self.csv_root = csv_root
+        self.print_process = print_process
+        with open(spec['base'], 'r') as file:
+            lines = [line.strip() for line in file.readlines()]
+        self.base = FlushStrategyParams.from_lines(lines)
+        self.base = replace(self.base, exchange=spec.get('exchange', self.base.exchange),
+                            interval=spec.get('interval', self.base.interval))
+        self.base_optionals = lines[20:]
+        self.backtest_kwargs = spec.get('backtest', {})
+        self.rank_by = spec.get('rank_by', "total_return")
+        if self.rank_by not in RANKINGS:
+            raise Exception(f"rank_by must be one of {list(RANKINGS)} not {self.rank_by}")
+        self.cache = SweepResultCache(os.path.join(path, "results.db"))
+        self.combinations_run = 0
+        self.combinations_cached = 0
+
+    def symbols(self) -> List[str]:
+        symbols = self.spec.get('symbols', [self.base.symbol])
+        if symbols == "all":
+            return self.archive.symbols(self.base.exchange)
+        return list(symbols)
+
+    def combinations(self, symbol) -> List[FlushStrategyParams]:
+        ranges = dict(self.spec.get('ranges', {}))
+        if isinstance(self.spec.get('symbols'), dict):
+            ranges.update(self.spec['symbols'][symbol] or {})
+        names = list(ranges)
+        values = [parse_range(name, ranges[name]) for name in names]
+        base = replace(self.base, symbol=symbol)
+        return [replace(base, **dict(zip(names, combination))) for combination in itertools.product(*values)]
+
+    def prepare_klines(self, symbol) -> Optional[str]:
+        """
+        Save the candles of the symbol to the file the workers memory map, unless they are already there
+        :return: path of the file, None if there are no candles
+        """
+        klines = load_klines(self.base.exchange, symbol, self.base.interval, self.spec.get('start_time'),
+                             self.spec.get('end_time'), self.archive, self.csv_root)
+        if len(klines) == 0:
+            return None
+        series = f"{self.base.exchange}_{symbol}_{self.base.interval}_{klines['open_time'][0]}_" \
+                 f"{klines['open_time'][-1]}_{len(klines)}"
+        path = os.path.join(self.path, "klines", f"{series}.npy")
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp.npy"
+            np.save(tmp_path, np.ascontiguousarray(klines))
+            os.replace(tmp_path, path)
+        return path
+
+    def result_key(self, params: FlushStrategyParams, klines_path) -> str:
+        data = {"params": asdict(params), "klines": os.path.basename(klines_path), "backtest": self.backtest_kwargs,
+                "version": RESULT_VERSION}
+        return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+    def run(self) -> Dict[str, List[SweepResult]]:
+        """
+        :return: the ranked results of each symbol with candles
+        """
+        started = time.time()
+        results: Dict[str, Dict[str, SweepResult]] = {}
+        tasks = []
+        for symbol in self.symbols():
+            klines_path = self.prepare_klines(symbol)
+            if klines_path is None:
+                if self.print_process:
+                    print(f"ParameterSweep: no {self.base.interval} candles of {self.base.exchange} {symbol}")
+                continue
+            combinations = {self.result_key(params, klines_path): params for params in self.combinations(symbol)}
+            cached = self.cache.get_many(combinations)
+            results[symbol] = {key: SweepResult(params, *cached[key]) if key in cached else SweepResult(params, {}, None)
+                               for key, params in combinations.items()}
+            self.combinations_cached += len(cached)
+            pending = [(key, asdict(params)) for key, params in combinations.items() if key not in cached]
+            for i in range(0, len(pending), COMBINATIONS_PER_TASK):
+                tasks.append((symbol, klines_path, pending[i:i + COMBINATIONS_PER_TASK]))
+        total = sum(len(task[2]) for task in tasks)
+        if self.print_process:
+            print(f"ParameterSweep: {total} combinations to run, {self.combinations_cached} cached")
+
+        def record(symbol, task_results):
+            self.cache.put_many([(key, symbol, results[symbol][key].params.to_lines(self.base_optionals), stats,
+                                  stopped_reason) for key, stats, stopped_reason in task_results])
+            for key, stats, stopped_reason in task_results:
+                results[symbol][key].stats = stats
+                results[symbol][key].stopped_reason = stopped_reason
+            self.combinations_run += len(task_results)
+
+        last_report = time.time()
+        if self.max_workers <= 1:
+            for symbol, klines_path, combinations in tasks:
+                record(symbol, _run_combinations(klines_path, combinations, self.backtest_kwargs))
+        else:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {executor.submit(_run_combinations, klines_path, combinations, self.backtest_kwargs): symbol
+                           for symbol, klines_path, combinations in tasks}
+                for future in as_completed(futures):
+                    record(futures[future], future.result())
+                    if self.print_process and time.time() - last_report >= PROGRESS_REPORT_SECONDS:
+                        last_report = time.time()
+                        print(self.progress_report(total, last_report - started))
+        if self.print_process:
+            print(self.progress_report(total, time.time() - started))
+        return {symbol: self.rank(list(symbol_results.values())) for symbol, symbol_results in results.items()}
+
+    def progress_report(self, total, elapsed) -> str:
+        rate = self.combinations_run / elapsed if elapsed > 0 else 0.0
+        return f"ParameterSweep: {self.combinations_run}/{total} combinations run ({rate:.1f}/s), " \
+               f"{self.combinations_cached} cached, {elapsed:.0f}s"
+
+    def rank(self, results: List[SweepResult]) -> List[SweepResult]:
+        """
+        :return: results with at least min_trades trades (and that were not stopped if exclude_stopped) best first
+        """
+        min_trades = self.spec.get('min_trades', 1)
+        exclude_stopped = self.spec.get('exclude_stopped', True)
+        ranked = [r for r in results if r.stats and r.stats['trades'] >= min_trades
+                  and not (exclude_stopped and r.stopped_reason)]
+        for result in ranked:
+            result.score = RANKINGS[self.rank_by](result.stats)
+        return sorted(ranked, key=lambda r: r.score, reverse=True)
+
+    def write_arg_files(self, ranked: Dict[str, List[SweepResult]], output_dir=None) -> List[str]:
+        """
+        Write the top results of each symbol to args_<symbol>_<interval>_sweep<rank>.txt files and list them in
+        arglist_sweep.txt, the best of each symbol ready to copy into arglist.txt and the rest commented out
+        :return: paths of the arg files written
+        """
+        output_dir = output_dir or self.spec.get('output', os.path.join(self.path, "args"))
+        os.makedirs(output_dir, exist_ok=True)
+        top = self.spec.get('top', 3)
+        written = []
+        arglist = []
+        for symbol, results in ranked.items():
+            for rank, result in enumerate(results[:top], 1):
+                name = f"args_{symbol}_{result.params.interval}_sweep{rank}.txt"
+                with open(os.path.join(output_dir, name), 'w') as file:
+                    file.writelines(f"{line}\n" for line in result.params.to_lines(self.base_optionals))
+                written.append(os.path.join(output_dir, name))
+                arglist.append(f"{'' if rank == 1 else '#'}{name}  # {self.rank_by} {result.score:.4f} "
+                               f"trades {result.stats['trades']} return {result.stats['total_return'] * 100:.2f}% "
+                               f"max drawdown {result.stats['max_drawdown'] * 100:.2f}%")
+        with open(os.path.join(output_dir, "arglist_sweep.txt"), 'w') as file:
+            file.writelines(f"{line}\n" for line in arglist)
+        return written
+
+
+if __name__ == "__main__":
+    """
+    python -m trading_automation.analysis.ParameterSweep sweep.json
+    """
+    with open(sys.argv[1], 'r') as spec_file:
+        sweep = ParameterSweep(json.load(spec_file))
+    ranked_results = sweep.run()
+    for path in sweep.write_arg_files(ranked_results):
+        print(path)
@@ -0,0 +1,203 @@
+import calendar
+import hashlib
+import mmap
+import os
+import re
+import sqlite3
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from trading_automation.config.settings import get_settings
+
+TRADE_TEXT_MAX_WORKERS = get_settings().trade_text_max_workers or os.cpu_count() or 1
+# below this many new bytes a log is parsed in this process
+PARALLEL_MIN_BYTES = 64 * 1024 * 1024
+# trades passed to each executemany
+INSERT_BATCH = 10000
+# bytes hashed at the start of a log to tell a log that was replaced or rotated from one that grew
+HEAD_BYTES = 4096
+# every line TRADE_PATTERN matches has this, lines without it are skipped without running the regex
+EXIT_ORDER_MARKER = b" exit order "
+# FuturesManager's "<symbol> Sell|Buy exit order <id> filled @<price> ($<value>, gain: $<gain>, pnl%: <pnl%>)" lines
+TRADE_PATTERN = re.compile(rb"(\d{2}/\d{2}/\d{4} \d{2}:\d{2}:\d{2}) (?:.* )?(\S+) (Sell|Buy) exit order .* "
+                           rb"\(\$(-?\d*\.\d*), gain: \$(-?\d*\.\d*), pnl%: (-?\d*.\d*)\)")
+DATETIME_PATTERN = '%d/%m/%Y %H:%M:%S'
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS logs (path TEXT PRIMARY KEY, parsed_bytes INTEGER NOT NULL, head_hash TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS trades (path TEXT NOT NULL, offset INTEGER NOT NULL, time INTEGER NOT NULL, "
+    "weekday INTEGER NOT NULL, symbol TEXT NOT NULL, side TEXT NOT NULL, value REAL NOT NULL, gain REAL NOT NULL, "
+    "pnl_percentage REAL NOT NULL, PRIMARY KEY (path, offset)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS trades_symbol ON trades (symbol)",
+]
+
+
+def parse_trade_line(line: bytes) -> Optional[tuple]:
+    """
+    :return: (time, weekday, symbol, side, value, gain, pnl_percentage) of a trade exit line, time in epoch seconds
+    and weekday 0 for Monday, None if it is not one
+    """
+    match = TRADE_PATTERN.search(line)
+    if match is None:
+        return None
+    date_time = datetime.strptime(match.group(1).decode(), DATETIME_PATTERN)
+    return (calendar.timegm(date_time.timetuple()), date_time.weekday(), match.group(2).decode(),
+            match.group(3).decode(), float(match.group(4)), float(match.group(5)), float(match.group(6)))
+
+
+def parse_trades(data, start=0, end=None) -> List[tuple]:
+    """
+    Parse the trades of the lines starting in data[start:end], data being bytes or an mmap. Only the lines around
+    each EXIT_ORDER_MARKER are looked at, so the rest of the log is skipped at memory search speed.
+    :param start: start of a line
+    :return: (offset, time, weekday, symbol, side, value, gain, pnl_percentage) of each trade, offset being where its
+    line starts in data
+    """
+    end = len(data) if end is None else end
+    trades = []
+    position = start
+    while True:
+        marker = data.find(EXIT_ORDER_MARKER, position)
+        if marker < 0:
+            break
+        line_start = data.rfind(b"\n", 0, marker) + 1
+        if line_start >= end:
+            break
+        line_end = data.find(b"\n", marker)
+        line_end = len(data) if line_end < 0 else line_end
+        trade = parse_trade_line(data[line_start:line_end])
+        if trade is not None:
+            trades.append((line_start,) + trade)
+        position = line_end + 1
+    return trades
+
+
+def split_lines(data, start, end, parts) -> List[Tuple[int, int]]:
+    """
+    :return: up to parts (start, end) ranges of data[start:end], each starting at the start of a line
+    """
+    bounds = [start]
+    for i in range(1, parts):
+        newline = data.find(b"\n", start + (end - start) * i // parts, end)
+        if newline < 0:
+            break
+        if newline + 1 > bounds[-1]:
+            bounds.append(newline + 1)
+    bounds.append(end)
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if a < b]
+
+
+def _head_hash(data, parsed_bytes) -> str:
+    return hashlib.sha256(data[:min(HEAD_BYTES, parsed_bytes)]).hexdigest()
+
+
+def _parse_range(path, start, end) -> List[tuple]:
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        return parse_trades(data, start, end)
+
+
+class TradeTextLog:
+    """
+    Trades parsed from a Discord/trade text log, kept in a SQLite database so each line of the log is only parsed
+    once. update() memory maps the log and parses the complete lines added since the last update, in parallel by
+    byte ranges when there are enough of them. A log that was replaced or rotated is parsed again from its start.
+    """
+
+    def __init__(self, path, db_path=None, max_workers=TRADE_TEXT_MAX_WORKERS):
+        self.path = os.path.abspath(path)
+        self.db_path = db_path or f"{path}.trades.db"
+        self.max_workers = max_workers
+        self.connection = sqlite3.connect(self.db_path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        for statement in SCHEMA:
+            self.connection.execute(statement)
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+    def update(self) -> int:
+        """
+        Parse the complete lines written to the log since the last update
+        :return: number of new trades
+        """
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return 0
+        with open(self.path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            row = self.connection.execute("SELECT parsed_bytes, head_hash FROM logs WHERE path = ?",
+                                          (self.path,)).fetchone()
+            start = 0
+            if row is not None:
+                parsed_bytes, parsed_head_hash = row
+                if parsed_bytes <= len(data) and _head_hash(data, parsed_bytes) == parsed_head_hash:
+                    start = parsed_bytes
+                else:
+                    self.connection.execute("DELETE FROM trades WHERE path = ?", (self.path,))
+            # a last line without its newline may still be being written
+            end = data.rfind(b"\n", start) + 1
+            if end <= start:
+                self.connection.commit()
+                return 0
+            head_hash = _head_hash(data, end)
+            if self.max_workers > 1 and end - start >= PARALLEL_MIN_BYTES:
+                ranges = split_lines(data, start, end, self.max_workers * 4)
+                with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                    parsed = executor.map(_parse_range, *zip(*[(self.path, a, b) for a, b in ranges]))
+                    trades = [trade for range_trades in parsed for trade in range_trades]
+            else:
+                trades = parse_trades(data, start, end)
+        for i in range(0, len(trades), INSERT_BATCH):
+            self.connection.executemany("INSERT OR REPLACE INTO trades VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                        [(self.path,) + trade for trade in trades[i:i + INSERT_BATCH]])
+        self.connection.execute("INSERT OR REPLACE INTO logs VALUES (?, ?, ?)", (self.path, end, head_hash))
+        self.connection.commit()
+        return len(trades)
+
+    def trades(self, instrument=None, columns="time, symbol, side, gain, pnl_percentage") -> List[tuple]:
+        """
+        :param instrument: only trades of symbols containing instrument
+        :return: columns of the log's trades in log order
+        """
+        sql = f"SELECT {columns} FROM trades WHERE path = ?"
+        params = [self.path]
+        if instrument is not None:
+            sql += " AND instr(symbol, ?) > 0"
+            params.append(instrument)
+        return self.connection.execute(sql + " ORDER BY offset", params).fetchall()
+
+    def pnl_lists(self, instrument=None, skip_zero=True):
+        """
+        :param skip_zero: leave out trades with a pnl% of 0
+        :return: long_trades, short_trades, long_gains, short_gains - the pnl% and gain of Sell and Buy exits
+        """
+        long_trades, short_trades, long_gains, short_gains = [], [], [], []
+        for side, gain, pnl_percentage in self.trades(instrument, "side, gain, pnl_percentage"):
+            if skip_zero and pnl_percentage == 0:
+                continue
+            if side == "Sell":
+                long_trades.append(pnl_percentage)
+                long_gains.append(gain)
+            else:
+                short_trades.append(pnl_percentage)
+                short_gains.append(gain)
+        return long_trades, short_trades, long_gains, short_gains
+
+    def trades_by_weekday(self, instrument=None, skip_zero=True) -> Dict[int, List[Tuple[float, float]]]:
+        """
+        :return: (pnl%, gain) of the trades exited each weekday, 0 being Monday
+        """
+        trades_day_dict = {day: [] for day in range(7)}
+        for weekday, gain, pnl_percentage in self.trades(instrument, "weekday, gain, pnl_percentage"):
+            if not skip_zero or pnl_percentage != 0:
+                trades_day_dict[weekday].append((pnl_percentage, gain))
+        return trades_day_dict
+
+
+if __name__ == '__main__':
+    # python TradeTextLog.py discordlog.txt [instrument]
+    trade_log = TradeTextLog(sys.argv[1])
+    print(f"{trade_log.update()} new trades parsed from {sys.argv[1]} into {trade_log.db_path}")
+    for day, day_trades in trade_log.trades_by_weekday(sys.argv[2] if len(sys.argv) > 2 else None).items():
+        print(f"weekday {day}: {len(day_trades)} trades, pnl% sum {sum(t[0] for t in day_trades)}, "
+              f"gain sum {sum(t[1] for t in day_trades)}")
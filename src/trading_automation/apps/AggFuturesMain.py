@@ -5,9 +5,32 @@ from typing import Dict
 
 from trading_automation.apps.FuturesManager import FuturesFlushBuyManager
 from trading_automation.clients.DiscordClient import DISCORD_TOKEN, DiscordNotificationService
+from trading_automation.clients.AsyncUniversalClient import AsyncUniversalClient, run_bulk
 from trading_automation.clients.UniversalClient import UniversalClient
+from trading_automation.clients.http_transport import http_transport
+from trading_automation.core.CandleCloseDispatcher import get_candle_close_dispatcher
+from trading_automation.core.ConfigWatcher import get_config_watcher
+from trading_automation.core.Metrics import metrics
 from trading_automation.core.Utils import ARG_FILE_REGEX
 from trading_automation.websockets.PhemexWebSocketMaster import PhemexWebSocketMaster
+from trading_automation.websockets.MarketDataHub import get_market_data_hub
+
+
+async def open_position_symbols(client: AsyncUniversalClient, symbols, cancel_orders=False):
+    """
+    :param cancel_orders: cancel the open orders of symbols without a position, then check their positions again in
+    case an order filled meanwhile
+    :return: the symbols with an open position
+    """
+    def is_open(position):
+        return float(position[0]['positionAmt']) != 0.0
+
+    positions = await client.positions(symbols)
+    flat_symbols = [symbol for symbol, position in positions.items() if not is_open(position)]
+    if cancel_orders and flat_symbols:
+        await client.cancel_open_orders(flat_symbols)
+        positions.update(await client.positions(flat_symbols))
+    return [symbol for symbol, position in positions.items() if is_open(position)]
 
 
 def main(argv=None) -> int:
@@ -29,21 +52,21 @@ def main(argv=None) -> int:
                     arg_file_names.append(r.group(1))
             runfile.close()
 
+            arg_file_symbols = {}
             for arg_file in arg_file_names:
                 file = open(arg_file, 'r')
                 lines = list(map(str.strip, file.readlines()))
                 params = lines[0:19]
-                exchange = params[0]
-                symbol = params[2]
-                if exchange not in clients:
-                    clients[exchange] = UniversalClient(exchange=exchange)
-                position = clients[exchange].futures_get_position(symbol=symbol)
-                if float(position[0]['positionAmt']) != 0.0:
-                    arg_files_with_open_positions.append(arg_file)
-                elif exchange != "BINANCE":
-                    clients[exchange].futures_cancel_all_open_orders(symbol=symbol)
-                    if float(clients[exchange].futures_get_position(symbol=symbol)[0]['positionAmt']) != 0.0:
-                        arg_files_with_open_positions.append(arg_file)
+                arg_file_symbols[arg_file] = (params[0], params[2])
+                file.close()
+            # check the positions of every symbol of an exchange at once
+            open_symbols = set()
+            for exchange in dict.fromkeys(exchange for exchange, _ in arg_file_symbols.values()):
+                clients[exchange] = UniversalClient(exchange=exchange)
+                symbols = [symbol for symbol_exchange, symbol in arg_file_symbols.values() if symbol_exchange == exchange]
+                open_symbols.update((exchange, symbol) for symbol in run_bulk(
+                    clients[exchange], lambda client: open_position_symbols(client, symbols, cancel_orders=exchange != "BINANCE")))
+            arg_files_with_open_positions = [arg_file for arg_file in arg_file_names if arg_file_symbols[arg_file] in open_symbols]
             print(f"Still open positions {arg_files_with_open_positions}")
             # compare if these strats are in arglist2.txt
             runfile = open('arglist2.txt', 'r')
@@ -85,30 +108,19 @@ def main(argv=None) -> int:
         if '-mexc' in sys.argv[1:]:
             close_only_exchanges.append("MEXC")
 
-        runfile = open('arglist.txt', 'r')
-        arg_file_names = []
-        close_only_arg_files = []
-        ignore_abnormal_volume_files = []
-        for line in runfile.readlines():
-            r = re.search(ARG_FILE_REGEX, line.strip())
-            if r:
-                arg_file_names.append(r.group(1))
-                if r.group(2):
-                    if '-x' in r.group(2):
-                        close_only_arg_files.append(r.group(1))
-                    if '-n' in r.group(2):
-                        ignore_abnormal_volume_files.append(r.group(1))
-        runfile.close()
+        # arglist.txt, the arg files and .env are parsed once here and again only when they change
+        config_watcher = get_config_watcher()
+        config = config_watcher.snapshot
+        arg_file_names = list(config.arg_files)
+        missing_arg_files = [arg_file for arg_file in arg_file_names if config.arg_lines(arg_file) is None]
+        if missing_arg_files:
+            raise Exception(f"ERROR unable to read arg files {missing_arg_files}")
+        close_only_arg_files = [arg_file for arg_file in arg_file_names if 'x' in config.arglist_flags(arg_file)]
+        ignore_abnormal_volume_files = [arg_file for arg_file in arg_file_names if 'n' in config.arglist_flags(arg_file)]
 
         discord_service = DiscordNotificationService()
         # check if PHEMEX is one of the exchanges, if so, start up web socket master
-        exchanges = []
-        for arg_file in arg_file_names:
-            file = open(arg_file, 'r')
-            lines = list(map(str.strip, file.readlines()))
-            params = lines[0:20]
-            exchanges.append(params[0])
-            file.close()
+        exchanges = [config.arg_lines(arg_file)[0] for arg_file in arg_file_names]
         phemex_input_q = None
         phemex_output_q = None
         if 'PHEMEX' in exchanges:
@@ -119,10 +131,17 @@ def main(argv=None) -> int:
             pwsm = PhemexWebSocketMaster(phemex_input_q, phemex_output_q)
             pwsm.start()
 
+        # every strategy thread can be sending a request to the same exchange at once
+        http_transport.set_strategy_threads(len(arg_file_names))
+
+        # one MarketDataHub per exchange account so that managers on the same account share websocket connections
+        market_data_hubs = {}
+        for exchange in set(exchanges):
+            market_data_hubs[exchange] = get_market_data_hub(exchange)
+
         FutureManagerObjects = []
         for arg_file in arg_file_names:
-            file = open(arg_file, 'r')
-            lines = list(map(str.strip, file.readlines()))
+            lines = list(config.arg_lines(arg_file))
             params = lines[0:20]
             optionals = lines[20:]
             blocking = True if '-b' in optionals else False
@@ -169,8 +188,16 @@ def main(argv=None) -> int:
                                                                ignore_abnormal_volume=ignore_abnormal_volume,
                                                                discord_service=discord_service,
                                                                argfilename=arg_file, phemex_input_q=phemex_input_q,
-                                                               phemex_output_q=phemex_output_q))
-            file.close()
+                                                               phemex_output_q=phemex_output_q,
+                                                               market_data_hub=market_data_hubs[params[0]]))
+
+        # connect to the exchanges now so the first orders after a candle close don't wait for DNS, TCP and TLS
+        http_transport.warm_up()
+        http_transport.start_keep_alive()
+        config_watcher.start()
+        # METRICS_ENABLED: Prometheus text on http://127.0.0.1:METRICS_PORT/metrics and summaries in the log
+        metrics.start_http_server()
+        metrics.start_summaries(get_candle_close_dispatcher().logger)
 
         for FutureManager in FutureManagerObjects:
             FutureManager.daemon = False
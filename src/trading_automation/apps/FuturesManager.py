@@ -1,17 +1,19 @@
 import os
 import sys
 import threading
+import time
 import traceback
 from typing import Optional
 
-from apscheduler.executors.pool import ThreadPoolExecutor
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.schedulers.blocking import BlockingScheduler
-from pytz import utc
-
 from trading_automation.clients.DiscordClient import DiscordNotificationService
 from trading_automation.clients.UniversalClient import UniversalClient
 from trading_automation.config.settings import get_settings
+from trading_automation.core.AccountSnapshot import get_account_snapshot_service
+from trading_automation.core.CandleCloseDispatcher import get_candle_close_dispatcher
+from trading_automation.core.ConfigWatcher import ConfigSnapshot, get_config_watcher
+from trading_automation.core.OrderEvents import ORDER_FILLED, ORDER_PARTIALLY_FILLED, POSITION_UPDATED, \
+    get_order_event_bus
+from trading_automation.core.OrderReconciler import DesiredOrder, OrderReconciler
 from trading_automation.core.UniversalClientWebsocket import UniversalClientWebsocket
 from trading_automation.core.Utils import *
 
@@ -27,7 +29,12 @@ DISCORD_SKIPPING_ORDERS_CHANNEL_ID = settings.discord_skipping_orders_channel_id
 DISCORD_ERROR_MESSAGES_CHANNEL_ID = settings.discord_error_messages_channel_id or 0
 BTC_PRICE_UPPER_BOUND = settings.btc_price_upper_bound
 BTC_PRICE_LOWER_BOUND = settings.btc_price_lower_bound
+ORDER_RECONCILE_INTERVAL = settings.order_reconcile_interval
 RANGE_LIMIT_DAYS = 21
+# positions in an arg file of the params a running strategy cannot change: exchange, interval, symbol,
+# numberOfFlushBars, exitLookbackBars and softSLN (which size its candle subscriptions) and maxDrawdownPercentage
+ARG_FILE_RESTART_PARAMS = (0, 1, 2, 5, 6, 10, 16)
+ARG_FILE_PARAMS_COUNT = 20
 VOLATILITY_LIMIT = 25  # percentage of change within 1 hour to stop orders
 
 
@@ -40,7 +47,8 @@ class FuturesFlushBuyManager(threading.Thread):
                  postOnly=False, takeProfitPercentage=0, blocking=False, stopLossTermination=False, minBalance=0,
                  closePartialFills=False, avoidMarketEntries=False, exchange="BINANCE", maxNumOfPositions=0, close_position_only=False,
                  volumeBasedPosSize=False, ignore_abnormal_volume=False, discord_service: Optional[DiscordNotificationService] = None, argfilename=None,
-                 phemex_input_q=None, phemex_output_q=None, reverse_mode=False, shortsPositionMultiplier=1.0):
+                 phemex_input_q=None, phemex_output_q=None, reverse_mode=False, shortsPositionMultiplier=1.0,
+                 market_data_hub=None):
         """
         :param symbol:
         :param flushPercent:
@@ -64,13 +72,15 @@ class FuturesFlushBuyManager(threading.Thread):
         :param closePartialFills:
         :param postOnly: Makes it so that all limit orders at entry are post only so that limit orders are never
                         executed immediately. Any invalid orders are set to expired.
-        :param blocking: Use blocking scheduler?
+        :param blocking: Block run() until the manager is stopped?
         :param avoidMarketEntries: If a limit entry order would become a market entry order because of current price,
                                    avoidMarketEntries will make sure that the entry order will be at the bid/ask instead
                                    . postOnly and avoidMarketEntries needs to me mutually exclusive because postOnly
                                    implies that the order should be cancelled if it is a market order (and not altered
                                    to be at bid/ask like avoidMarketEntries does)
         :param shortsPositionMultiplier: multiply any short position sizes made by this value
+        :param market_data_hub: MarketDataHub shared with the other managers trading on the same exchange account. If
+                                None the client opens its own websocket connection(s) for the symbol
         """
         threading.Thread.__init__(self)
         if (quantity and balancePercent) or (quantity and fixedBalance) or (balancePercent and fixedBalance) or \
@@ -90,8 +100,11 @@ class FuturesFlushBuyManager(threading.Thread):
         self.client = UniversalClientWebsocket(self.exchange, self.symbol, self.interval,
                                                candles_limit=max(self.numberOfFlushBars, self.softSLN,
                                                                  self.exitLookbackBars) + 1, discord_service=discord_service,
-                                               phemex_input_q=phemex_input_q, phemex_output_q=phemex_output_q)
+                                               phemex_input_q=phemex_input_q, phemex_output_q=phemex_output_q,
+                                               market_data_hub=market_data_hub)
         self.logger = self.client.logger
+        # positions and balances of the account, shared with the other managers on the same exchange account
+        self.account_snapshots = get_account_snapshot_service(self.exchange)
         self.sql_log_trades = False
         if self.shorts and squeezePercent:
             self.squeezePercent = input_to_percentage(squeezePercent)
@@ -130,7 +143,7 @@ class FuturesFlushBuyManager(threading.Thread):
         self.reverse_mode = reverse_mode
         self.RANGE_LIMIT_DAYS = RANGE_LIMIT_DAYS
         # Special case for CAPITAL, we usually want certain params so hardcoding this in
-        if "CAPITAL" in self.exchange:
+        if self.client.venue == "CAPITAL":
             self.volumeBasedPosSize = False
             self.reverse_mode = True
             self.ignore_abnormal_volume = True
@@ -161,13 +174,15 @@ class FuturesFlushBuyManager(threading.Thread):
         if softSLPercentage and not softSLN:
             print("ERROR: If using soft stop loss need to specify softSLN!")
             exit(2)
-        if self.blocking:
-            self.scheduler = BlockingScheduler(executors={'default': ThreadPoolExecutor(1)}, timezone=utc)
-        else:
-            self.scheduler = BackgroundScheduler(executors={'default': ThreadPoolExecutor(1)}, timezone=utc)
+        # set_orders and regular_check are run by the process wide dispatcher rather than a scheduler per manager
+        self.dispatcher = get_candle_close_dispatcher()
+        self.stopped = threading.Event()
         self.currentPosition = self.client.position
         self.maxDrawdownPercentage = min(input_to_percentage(maxDrawdownPercentage), 1.0) if maxDrawdownPercentage is not None else 1.0
-        internal_wallet_stored_values = self.logger.get_internal_wallet_balance_and_drawdown_value_and_last_trade_id(str(self))
+        # key of this strategy's internal wallet and trade records, kept while it runs as str(self) changes with the
+        # params apply_arg_lines applies
+        self.strategy_key = str(self)
+        internal_wallet_stored_values = self.logger.get_internal_wallet_balance_and_drawdown_value_and_last_trade_id(self.strategy_key)
         if internal_wallet_stored_values:
             self.internal_wallet = internal_wallet_stored_values[0]  # Used to calculate the drawdown of this running strat
             self.maxDrawdownValue = internal_wallet_stored_values[1]
@@ -177,12 +192,12 @@ class FuturesFlushBuyManager(threading.Thread):
         else:
             self.internal_wallet = 100
             self.maxDrawdownValue = self.internal_wallet * (1 - self.maxDrawdownPercentage)
-            self.logger.log_internal_wallet(str(self), self.internal_wallet, self.maxDrawdownValue)
+            self.logger.log_internal_wallet(self.strategy_key, self.internal_wallet, self.maxDrawdownValue)
             self.trade_id_tracker = None
         self.stopLossTermination = stopLossTermination
         self.minBalance = minBalance
         self.closePartialFills = closePartialFills
-        self.unrealised_pnl_drawdown_to_stop_new_orders = UNREALISED_PNL_DRAWDOWN_TO_STOP_NEW_ORDERS if "BYBIT" not in self.exchange else UNREALISED_PNL_DRAWDOWN_TO_STOP_NEW_ORDERS_BYBIT
+        self.unrealised_pnl_drawdown_to_stop_new_orders = UNREALISED_PNL_DRAWDOWN_TO_STOP_NEW_ORDERS if self.client.venue != "BYBIT" else UNREALISED_PNL_DRAWDOWN_TO_STOP_NEW_ORDERS_BYBIT
         # set below to 'True' whenever on TV we have exited the position but have not in live trading
         # use to track how often after a bar finishes we are not able to exit the position as in the strategy
         # may also be used in the future to know when to force close a position before the bar finishes to match TV
@@ -198,22 +213,176 @@ class FuturesFlushBuyManager(threading.Thread):
         self.shortsPositionMultiplier = shortsPositionMultiplier
         self.btcpricelowerbound = BTC_PRICE_LOWER_BOUND
         self.btcpriceupperbound = BTC_PRICE_UPPER_BOUND
+        # flag letters after this strategy's arg file in arglist.txt, kept up to date by on_config_change
+        self.arglist_flags = frozenset()
+        # lines of this strategy's arg file last applied, see apply_arg_lines
+        self.arg_lines = None
+        self.config_watcher = get_config_watcher()
+        self.on_config_change(self.config_watcher.snapshot)
+        self.config_watcher.subscribe(self.on_config_change)
+        # latest state of this symbol's orders pushed by the exchange's private order channel, see on_order_event
+        self.order_events = get_order_event_bus()
+        self._event_orders = {}
+        self._event_orders_lock = threading.Lock()
+        self._fill_check_pending = threading.Event()
+        self._last_reconcile_time = 0
+        self.order_events.subscribe(self.exchange, self.symbol, self.on_order_event)
+        # places the orders of each bar with the fewest order requests, see reconcile_orders
+        self.order_reconciler = OrderReconciler(self.client, self.symbol, strategy=self)
 
         self.market_currently_open_flag = True
-        if "CAPITAL" in self.exchange:
+        if self.client.venue == "CAPITAL":
             market_status = self.client.client_capital.get_market(self.symbol)['snapshot']['marketStatus']
             self.market_currently_open_flag = False if market_status == "CLOSED" or market_status == "SUSPENDED" else True
 
     def __str__(self):
         return f"{self.exchange} {self.symbol} {self.interval} {percentage_to_input(self.flushPercent)} {percentage_to_input(self.squeezePercent)} {self.numberOfFlushBars} {self.exitLookbackBars} {percentage_to_input(self.stopLossPercentageLong)} {percentage_to_input(self.stopLossPercentageShort)} {percentage_to_input(self.softSLPercentage)} {self.softSLN} {percentage_to_input(self.takeProfitPercentage)}"
 
+    def candle_close_priority(self):
+        """
+        Order in which the dispatcher runs set_orders at candle close, strategies with a position to exit go first
+        """
+        snapshot = self.account_snapshots.latest()
+        if snapshot is not None and get_position_size(snapshot.position(self.symbol)) != 0:
+            return 0
+        return 1
+
+    def on_config_change(self, snapshot: ConfigSnapshot):
+        """
+        Apply changes to the BTC range in .env, to this strategy's arg file and to its flags in arglist.txt, called by
+        the ConfigWatcher
+        """
+        self.btcpricelowerbound = snapshot.env_float('BTC_PRICE_LOWER_BOUND', self.btcpricelowerbound)
+        self.btcpriceupperbound = snapshot.env_float('BTC_PRICE_UPPER_BOUND', self.btcpriceupperbound)
+        if self.argfilename is None:
+            return
+        lines = snapshot.arg_lines(self.argfilename)
+        if lines is not None and lines != self.arg_lines:
+            if self.arg_lines is None:
+                # the lines first seen are the ones the strategy was started with
+                self.arg_lines = lines
+            else:
+                # applied between the strategy's jobs so set_orders never runs with half of the changed params
+                self.dispatcher.submit(self, self.apply_arg_lines, args=(lines,))
+        flags = snapshot.arglist_flags(self.argfilename)
+        if flags is None or flags == self.arglist_flags:
+            return
+        self.arglist_flags = flags
+        if flags:
+            self.close_position_only = 'x' in flags
+            self.ignore_abnormal_volume = 'n' in flags
+
+    def apply_arg_lines(self, lines):
+        """
+        Apply the params and optionals of this strategy's changed arg file, in the same format AggFuturesMain reads it.
+        Changes to ARG_FILE_RESTART_PARAMS are ignored until the strategy is restarted, -x and -n are left to the
+        arglist.txt flags
+        :return: whether lines were applied, False if they are not a valid arg file
+        """
+        if lines == self.arg_lines:
+            return True
+        params, optionals = list(lines[0:ARG_FILE_PARAMS_COUNT]), lines[ARG_FILE_PARAMS_COUNT:]
+        try:
+            if len(params) < ARG_FILE_PARAMS_COUNT:
+                raise ValueError(f"{len(params)} params")
+            values = [float(param) for param in params[3:]]
+        except ValueError as e:
+            self.logger.writeline(f"{self.symbol} ERROR unable to apply changed {self.argfilename}, keeping the running params {e}")
+            return False
+        (flushPercent, squeezePercent, _, _, stopLossPercentageLong, stopLossPercentageShort, softSLPercentage, _,
+         takeProfitPercentage, quantity, fixedBalance, balancePercent, minBalance, _, maxSingleTradeLossPercentage,
+         maxNumOfPositions, shortsPositionMultiplier) = values
+        shorts = '-s' in optionals
+        if (quantity and balancePercent) or (quantity and fixedBalance) or (balancePercent and fixedBalance) or \
+                (not quantity and not balancePercent and not fixedBalance) or (shorts and not squeezePercent):
+            self.logger.writeline(f"{self.symbol} ERROR changed {self.argfilename} needs one of quantity, fixedBalance or "
+                                  f"balancePercent and squeezePercent with shorts, keeping the running params")
+            return False
+        restart_params = [i for i in ARG_FILE_RESTART_PARAMS if self.arg_lines is not None and
+                          i < len(self.arg_lines) and params[i] != self.arg_lines[i]]
+        if restart_params:
+            self.logger.writeline(f"{self.symbol} {self.argfilename} params {restart_params} only change on restart")
+        self.flushPercent = input_to_percentage(flushPercent)
+        self.shorts = shorts
+        self.squeezePercent = input_to_percentage(squeezePercent) if shorts else 0
+        self.stopLossPercentageLong = input_to_percentage(stopLossPercentageLong) if stopLossPercentageLong else 0
+        self.stopLossPercentageShort = input_to_percentage(stopLossPercentageShort) if stopLossPercentageShort else 0
+        if softSLPercentage and not self.softSLN:
+            self.logger.writeline(f"{self.symbol} ERROR soft stop loss needs softSLN, keeping softSLPercentage")
+        else:
+            self.softSLPercentage = input_to_percentage(softSLPercentage) if softSLPercentage else 0
+        self.takeProfitPercentage = input_to_percentage(takeProfitPercentage) if takeProfitPercentage else 0
+        self.quantity = quantity if quantity > 0 else None
+        self.fixedBalance = fixedBalance if fixedBalance > 0 else None
+        self.balancePercent = input_to_percentage(balancePercent) if balancePercent else 0
+        self.minBalance = minBalance
+        self.maxSingleTradeLossPercentage = input_to_percentage(maxSingleTradeLossPercentage) \
+            if maxSingleTradeLossPercentage else None
+        self.maxNumOfPositions = int(maxNumOfPositions)
+        self.shortsPositionMultiplier = shortsPositionMultiplier
+        self.stopLossTermination = '-t' in optionals
+        self.recalcOnFill = '-r' in optionals
+        self.closePartialFills = '-c' in optionals
+        self.volumeBasedPosSize = '-v' in optionals and self.client.venue != "CAPITAL"
+        self.postOnly = '-p' in optionals
+        self.avoidMarketEntries = '-a' in optionals and not self.postOnly
+        self.arg_lines = lines
+        self.logger.writeline(f"{self.symbol} applied changed {self.argfilename}: {self}")
+        return True
+
+    def on_order_event(self, event, payload):
+        """
+        Keep the pushed order for check_filled and run fill_check as soon as an order of the symbol is (partially)
+        filled, called by the OrderEventBus from the websocket's thread
+        """
+        if event == POSITION_UPDATED:
+            self.account_snapshots.invalidate()
+            return
+        with self._event_orders_lock:
+            self._event_orders[payload['orderId']] = payload
+        if event in (ORDER_FILLED, ORDER_PARTIALLY_FILLED) and not self._fill_check_pending.is_set():
+            self._fill_check_pending.set()
+            self.dispatcher.submit(self, self.fill_check)
+
+    def fill_check(self):
+        """
+        check_filled, and set_orders if recalcOnFill, run by the dispatcher when an order event reports a fill
+        """
+        self._fill_check_pending.clear()
+        if self.check_filled(reconcile=False) and self.recalcOnFill:
+            self.set_orders()
+
+    def reconcile_due(self):
+        """
+        :return: whether check_filled should get the orders from the API, always if the exchange publishes no order
+        events otherwise every ORDER_RECONCILE_INTERVAL seconds in case an event was missed e.g. while reconnecting
+        """
+        now = time.time()
+        if not self.order_events.is_streaming(self.exchange) or now - self._last_reconcile_time >= ORDER_RECONCILE_INTERVAL:
+            self._last_reconcile_time = now
+            return True
+        return False
+
+    def get_tracked_order(self, order, reconcile=True):
+        """
+        :param order: an order placed by this strategy
+        :param reconcile: get the order from the API (websockets as the fallback) instead of the order events
+        :return: the latest state of order, order itself if no event has been pushed for it since it was placed
+        """
+        if reconcile:
+            return self.client.get_order_api_first(order.get('orderId'))
+        with self._event_orders_lock:
+            return self._event_orders.get(order.get('orderId'), order)
+
     def stop(self):
+        self.config_watcher.unsubscribe(self.on_config_change)
+        self.order_events.unsubscribe(self.exchange, self.symbol, self.on_order_event)
         self.cancel_all_orders()
         self.client.futures_close_best_price(self.symbol, CLOSE_BEST_PRICE_MIN_VALUE,
                                              self.client.get_position_api_first())
         self.logger.writeline(f"{self.symbol} Exiting Program...")
-        if self.scheduler.running:
-            self.scheduler.shutdown(wait=False)
+        self.dispatcher.unregister(self)
+        self.stopped.set()
         sys.exit(0)
 
     def get_open_current_buy_order(self):
@@ -277,10 +446,10 @@ class FuturesFlushBuyManager(threading.Thread):
             if order and is_order_filled_partial(order):
                 if not self.trade_id_tracker and not self.at_bidask_post_only_entry_attempt:
                     # log new trade from partial filled order
-                    self.trade_id_tracker = self.logger.write_new_trade(str(self), order=order)
+                    self.trade_id_tracker = self.logger.write_new_trade(self.strategy_key, order=order)
                 elif not self.trade_id_tracker and self.at_bidask_post_only_entry_attempt:
                     # log new trade from a post only partial filled order
-                    self.trade_id_tracker = self.logger.write_new_trade(str(self), order=order, post_only_entry=True)
+                    self.trade_id_tracker = self.logger.write_new_trade(self.strategy_key, order=order, post_only_entry=True)
                 elif self.trade_id_tracker or (self.trade_id_tracker and self.at_bidask_post_only_entry_attempt):
                     # update (post only) trade from a partial filled order (but use position to update table)
                     self.logger.update_trade_entry(self.trade_id_tracker,
@@ -288,11 +457,11 @@ class FuturesFlushBuyManager(threading.Thread):
             elif order and is_order_filled(
                     order) and not self.trade_id_tracker and self.at_bidask_post_only_entry_attempt:
                 # log new post only entry trade
-                self.trade_id_tracker = self.logger.write_new_trade(str(self), position=
+                self.trade_id_tracker = self.logger.write_new_trade(self.strategy_key, position=
                 self.client.get_position_api_first()[0], post_only_entry=True)
             elif order and self.at_bidask_post_only_entry_attempt and not self.trade_id_tracker:
                 # log new post only entry attempt
-                self.trade_id_tracker = self.logger.write_new_trade(str(self), order=order, post_only_entry=True)
+                self.trade_id_tracker = self.logger.write_new_trade(self.strategy_key, order=order, post_only_entry=True)
 
             # below assumes that entry order has been filled and we can get info from position
             if not order:
@@ -302,7 +471,7 @@ class FuturesFlushBuyManager(threading.Thread):
                                                    position=self.client.get_position_api_first()[0])
                 elif not self.trade_id_tracker:
                     # log new trade triggered normally
-                    self.trade_id_tracker = self.logger.write_new_trade(str(self), position=
+                    self.trade_id_tracker = self.logger.write_new_trade(self.strategy_key, position=
                                                                         self.client.get_position_api_first()[0])
         except Exception as e:
             self.logger.writeline(f"{self.symbol} ERROR: log_entry_trade {e} \n {traceback.format_exc()}")
@@ -342,14 +511,23 @@ class FuturesFlushBuyManager(threading.Thread):
         except Exception as e:
             self.logger.writeline(f"{self.symbol} ERROR: log_exit_trade {e} \n {traceback.format_exc()}")
 
-    def check_filled(self):
+    def check_filled(self, reconcile=True):
         """
         checks if any order has been filled at all
         If using long & short this function needs to cancel the other leg if one order is (partially) filled
+        :param reconcile: get the orders from the API rather than from the pushed order events, see get_tracked_order
         :return: if an order has been filled
         """
+        filled = self._check_filled(reconcile)
+        if filled:
+            # the shared snapshot still has the position from before the fill, only exchanges streaming position
+            # updates invalidate it themselves
+            self.account_snapshots.invalidate()
+        return filled
+
+    def _check_filled(self, reconcile):
         # Special case, for CAPITAL exchange, we cannot get past filled/cancelled orders, only active (unfilled) ones
-        if "CAPITAL" in self.exchange:
+        if self.client.venue == "CAPITAL":
             previously_known_position = self.currentPosition
             previous_position_size = get_position_size(previously_known_position)
             current_position = self.client.get_position_api_first()
@@ -390,6 +568,11 @@ class FuturesFlushBuyManager(threading.Thread):
             self.currentPosition = current_position
             return
 
+        # forget pushed orders that are no longer this strategy's, orders are only placed while check_filled is not running
+        tracked_order_ids = {order.get('orderId') for order in (self.stopLossOrder, self.currentBuyOrder, self.currentSellOrder) if order}
+        with self._event_orders_lock:
+            self._event_orders = {k: v for k, v in self._event_orders.items() if k in tracked_order_ids}
+
         buy_filled = False
         buy_filled_partial = False
         sell_filled = False
@@ -397,14 +580,14 @@ class FuturesFlushBuyManager(threading.Thread):
         stop_loss_filled = False
         # check stop loss order
         if self.stopLossOrder:
-            sl_order = self.client.get_order_api_first(self.stopLossOrder.get('orderId'))
+            sl_order = self.get_tracked_order(self.stopLossOrder, reconcile)
             if sl_order and is_order_filled(sl_order):
                 self.logger.writeline(f"Stop loss order hit for {self.symbol}")
                 stop_loss_filled = True
                 self.log_exit_trade(sl_order)
                 stop_loss_percentage_lost = self.stopLossPercentageShort if get_order_side(sl_order) == "BUY" else self.stopLossPercentageLong
                 self.internal_wallet = self.internal_wallet * (1 - stop_loss_percentage_lost)
-                self.logger.log_internal_wallet(str(self), self.internal_wallet, self.maxDrawdownValue)
+                self.logger.log_internal_wallet(self.strategy_key, self.internal_wallet, self.maxDrawdownValue)
                 if self.internal_wallet < self.maxDrawdownValue:
                     self.logger.writeline(f"{self.symbol} maxDrawdownPercentage exceeded, exiting program")
                     self.stop()
@@ -416,12 +599,12 @@ class FuturesFlushBuyManager(threading.Thread):
                 self.stopLossOrder = None
 
         if self.currentBuyOrder:
-            buy_order = self.client.get_order_api_first(self.currentBuyOrder['orderId'])
+            buy_order = self.get_tracked_order(self.currentBuyOrder, reconcile)
             buy_filled = is_order_filled(buy_order)
             buy_filled_partial = is_order_filled_partial(buy_order)
 
         if self.currentSellOrder:
-            sell_order = self.client.get_order_api_first(self.currentSellOrder['orderId'])
+            sell_order = self.get_tracked_order(self.currentSellOrder, reconcile)
             sell_filled = is_order_filled(sell_order)
             sell_filled_partial = is_order_filled_partial(sell_order)
 
@@ -442,7 +625,7 @@ class FuturesFlushBuyManager(threading.Thread):
                 new_drawdown = self.internal_wallet * (1 - self.maxDrawdownPercentage)
                 if new_drawdown > self.maxDrawdownValue:
                     self.maxDrawdownValue = new_drawdown
-                self.logger.log_internal_wallet(str(self), self.internal_wallet, self.maxDrawdownValue)
+                self.logger.log_internal_wallet(self.strategy_key, self.internal_wallet, self.maxDrawdownValue)
                 if self.internal_wallet < self.maxDrawdownValue:
                     self.logger.writeline(f"{self.symbol} Max drawdown reached")
                     self.stop()
@@ -473,7 +656,7 @@ class FuturesFlushBuyManager(threading.Thread):
                 new_drawdown = self.internal_wallet * (1 - self.maxDrawdownPercentage)
                 if new_drawdown > self.maxDrawdownValue:
                     self.maxDrawdownValue = new_drawdown
-                self.logger.log_internal_wallet(str(self), self.internal_wallet, self.maxDrawdownValue)
+                self.logger.log_internal_wallet(self.strategy_key, self.internal_wallet, self.maxDrawdownValue)
                 if self.internal_wallet < self.maxDrawdownValue:
                     self.logger.writeline(f"{self.symbol} Max drawdown reached")
                     self.stop()
@@ -538,10 +721,10 @@ class FuturesFlushBuyManager(threading.Thread):
         if self.maxNumOfPositions == 0:
             return True
 
-        if all_positions is None:
-            all_positions = self.client.futures_get_position()
-        if wallet_balance is None:
-            wallet_balance = float(self.client.futures_get_total_balance())
+        if all_positions is None or wallet_balance is None:
+            snapshot = self.account_snapshots.get(self.client)
+            all_positions = snapshot.positions if all_positions is None else all_positions
+            wallet_balance = snapshot.wallet_balance if wallet_balance is None else wallet_balance
 
         position = [x for x in all_positions if x['symbol'] == self.symbol]
         position_sizes_sum = float(sum([Decimal(x['entryPrice']) * abs(Decimal(x['positionAmt'])) for x in all_positions]))
@@ -558,6 +741,7 @@ class FuturesFlushBuyManager(threading.Thread):
                     f"WARNING: {self.exchange} currently has over the set limit ({self.maxNumOfPositions}+1) of ({position_sizes_sum / float(wallet_balance)}) account size positions opened! market closing {self.symbol} position for safety!",
                     discord_channel_id=DISCORD_TERMINATIONS_CHANNEL_ID)
                 self.client.futures_close_position(symbol=self.symbol)
+                self.account_snapshots.invalidate()
 
         # need to add in the potential of if the current buy/sell orders being filled will make the max positions size
         # check to be over
@@ -594,7 +778,7 @@ class FuturesFlushBuyManager(threading.Thread):
         recalcOnFill: used to match behavior seen on tradingview when recalculating, the current candle is included
         """
         try:
-            filled = self.check_filled()
+            filled = self.check_filled(reconcile=self.reconcile_due())
             if self.recalcOnFill:
                 if filled:
                     self.set_orders()
@@ -602,8 +786,9 @@ class FuturesFlushBuyManager(threading.Thread):
                     self.logger.writeline(f"{self.symbol} Creating new orders")
                     self.set_orders()
             if self.maxNumOfPositions > 0:
-                all_positions = self.client.futures_get_position()
-                maxPosCheckFlag = self.max_positions_check(all_positions=all_positions)
+                snapshot = self.account_snapshots.get(self.client)
+                maxPosCheckFlag = self.max_positions_check(all_positions=snapshot.positions,
+                                                           wallet_balance=snapshot.wallet_balance)
                 if not maxPosCheckFlag and (self.currentBuyOrder or self.currentSellOrder):
                     self.logger.writeline(f"{self.symbol} Max positions sizes detected, cancelling pending orders for this strategy")
                     self.cancel_all_orders()
@@ -621,7 +806,7 @@ class FuturesFlushBuyManager(threading.Thread):
             #         if equity < wallet_balance * (1 - self.unrealised_pnl_drawdown_to_stop_new_orders*0.01):
             #             self.logger.writeline(f"{self.symbol} Cancelling open orders as max unrealised balance drawdown reached", discord_channel_id=DISCORD_SKIPPING_ORDERS_CHANNEL_ID)
             #             self.cancel_all_orders()
-            if "CAPITAL" in self.exchange:
+            if self.client.venue == "CAPITAL":
                 # check for duplicate orders and cancel them
                 orders = self.client.futures_get_open_orders(self.symbol)
                 duplicate_orders = []
@@ -634,18 +819,6 @@ class FuturesFlushBuyManager(threading.Thread):
                 for duplicate_order in duplicate_orders:
                     self.logger.writeline(f"Found duplicate order {duplicate_order}", discord_channel_id=DISCORD_TERMINATIONS_CHANNEL_ID)
                     self.client.futures_cancel_order(symbol=self.symbol, orderID=duplicate_order['orderId'])
-            # check env file for changes to the BTC range
-            envfile = open('.env', 'r')
-            for line in envfile.readlines():
-                r = re.search(r'BTC_PRICE_LOWER_BOUND = (\d*.?\d*)', line.strip())
-                if r:
-                    lowerbound = float(r.group(1))
-                    self.btcpricelowerbound = lowerbound
-                r = re.search(r'BTC_PRICE_UPPER_BOUND = (\d*.?\d*)', line.strip())
-                if r:
-                    upperbound = float(r.group(1))
-                    self.btcpriceupperbound = upperbound
-            envfile.close()
             if self.btcpricelowerbound > 0 and self.btcpricelowerbound > 0 and self.close_position_only is False:
                 btc_exchange_names = [n for n in self.client.precisionPriceDict.keys() if "BTC" in n]
                 if len(btc_exchange_names) == 1:
@@ -674,47 +847,112 @@ class FuturesFlushBuyManager(threading.Thread):
         self.currentSellOrder = None
         self.stopLossOrder = None
 
+    def desired_entry_order(self, side, limit, stop, wallet_balance, max_size_remaining):
+        """
+        :return: DesiredOrder of the entry limit, or stop limit if stop, as futures_create_limit_order would place it.
+        None if its quantity is unknown
+        """
+        multiplier = 1 if side == "BUY" else self.shortsPositionMultiplier
+        price = self.client.futures_limit_order_price(self.symbol, limit, side)
+        quantity = self.client.futures_limit_order_quantity(
+            self.symbol, price, quantity=self.quantity,
+            balancePercent=self.balancePercent if self.balancePercent is None else self.balancePercent * multiplier,
+            fixedBalance=self.fixedBalance if self.fixedBalance is None else self.fixedBalance * multiplier,
+            balance=wallet_balance, volume_based_max_usdt_pos_size=self.volumeBasedPosSize,
+            absoluteMaxUsdtPosSize=max_size_remaining)
+        if quantity is None:
+            return None
+        if stop is not None:
+            stop = round_interval_down(stop, self.client.precisionPriceDict.get(self.symbol))
+        return DesiredOrder(side, quantity, price, stop, post_only=self.postOnly)
+
+    def desired_exit_order(self, side, limit, positionSize):
+        quantity = self.client.futures_limit_order_quantity(self.symbol, limit, quantity=abs(positionSize))
+        return DesiredOrder(side, quantity, self.client.futures_limit_order_price(self.symbol, limit, side),
+                            reduce_only=True)
+
+    def desired_stop_loss(self, side, stop, positionSize):
+        """
+        :return: DesiredOrder of the stop loss placed by futures_long_stop_loss if side is SELL otherwise
+        futures_short_stop_loss, its stop rounded the same way
+        """
+        if side == "SELL":
+            stop = round_interval_up(stop, self.client.precisionPriceDict.get(self.symbol))
+        else:
+            stop = round_interval_down(stop, self.client.precisionPriceDict.get(self.symbol))
+        quantity = round_interval_nearest(abs(positionSize), self.client.precisionQuantityDict.get(self.symbol))
+        return DesiredOrder(side, quantity, stop=stop, reduce_only=True)
+
+    def live_orders(self):
+        """
+        :return: the symbol's open orders, with the tracked stop loss on exchanges that do not list stop orders
+        """
+        orders = list(self.client.futures_get_open_orders(self.symbol) or [])
+        if self.stopLossOrder and self.stopLossOrder.get('orderId') not in [order.get('orderId') for order in orders]:
+            orders.append(self.stopLossOrder)
+        return orders
+
+    def track_orders(self, orders):
+        """
+        Set currentBuyOrder, currentSellOrder and stopLossOrder to the open orders of a reconciled OrderPlan
+        """
+        self.currentBuyOrder = None
+        self.currentSellOrder = None
+        self.stopLossOrder = None
+        for desired, order in orders:
+            if desired.reduce_only and desired.price is None:
+                self.stopLossOrder = order
+            elif desired.side == "BUY":
+                self.currentBuyOrder = order
+            else:
+                self.currentSellOrder = order
+
+    def reconcile_orders(self, desired_orders, replaced_every_bar=True, check_position=False):
+        """
+        Bring the symbol's open orders in line with desired_orders using the fewest order requests: unchanged orders
+        are kept, changed ones amended where the exchange supports it and only the rest cancelled and created
+        :param desired_orders: list of DesiredOrder
+        :param replaced_every_bar: whether set_orders replaced these orders every bar even when unchanged, for the
+        requests saved reported
+        :param check_position: if an open order was cancelled or amended, check it has not created a position before
+        creating the new orders
+        :return: the executed OrderPlan, None if check_position found a position
+        """
+        plan = self.order_reconciler.plan(desired_orders, self.live_orders(),
+                                          replace_all=self.client.venue == "CAPITAL",
+                                          replaced_every_bar=replaced_every_bar)
+        position_created = self.order_reconciler.cancel_and_amend(plan) and check_position and \
+            get_position_size(self.client.get_position_api_first()) != 0
+        if not position_created:
+            self.order_reconciler.create(plan)
+        self.track_orders(plan.orders)
+        if position_created:
+            return None
+        self.logger.writeline(self.order_reconciler.report(plan))
+        return plan
+
     def set_orders(self):
         """
         Function that sets orders.
         """
-        all_positions = self.client.futures_get_position()
-        position = [x for x in all_positions if x['symbol'] == self.symbol]
-        if not position:
-            # sometimes BYBIT when getting all positions would not get specific symbols even though
-            # there is an open position open for it so need to specify it just in case
-            position = self.client.futures_get_position(self.symbol)
-            if not position:
-                position = [{"entryPrice": '0',
-                            "positionAmt": '0', "symbol": self.symbol,
-                            "unRealizedProfit": '0'}]
+        snapshot = self.account_snapshots.get(self.client)
+        all_positions = snapshot.positions
+        position = snapshot.position(self.symbol)
         positionSize = get_position_size(position)
-        # check local arglist files to see if optionals such as close_position_only has changed
-        if self.argfilename is not None:
-            # check for changes in master arglist file first
-            runfile = open('arglist.txt', 'r')
-            for line in runfile.readlines():
-                r = re.search(ARG_FILE_REGEX, line.strip())
-                if r and self.argfilename == r.group(1):
-                    if r.group(2):
-                        self.close_position_only = True if '-x' in r.group(2) else False
-                        self.ignore_abnormal_volume = True if '-n' in r.group(2) else False
-                        if '-f' in r.group(2):
-                            self.logger.writeline(f"{self.symbol} force closing FuturesManager...",
-                                                  discord_channel_id=DISCORD_TERMINATIONS_CHANNEL_ID)
-                            self.client.futures_close_best_price(symbol=self.symbol)
-                            sys.exit(0)
-                        if '-w' in r.group(2):
-                            self.logger.writeline(f"{self.symbol} waiting...")
-                            return
-                    break
-            runfile.close()
-            # TODO: check for changes in individual arg files
+        # -x and -n flags in arglist.txt are applied by on_config_change as soon as they change
+        if 'f' in self.arglist_flags:
+            self.logger.writeline(f"{self.symbol} force closing FuturesManager...",
+                                  discord_channel_id=DISCORD_TERMINATIONS_CHANNEL_ID)
+            self.client.futures_close_best_price(symbol=self.symbol)
+            sys.exit(0)
+        if 'w' in self.arglist_flags:
+            self.logger.writeline(f"{self.symbol} waiting...")
+            return
 
         if self.close_position_only and positionSize == 0:
             self.stop()
-        equity = float(self.client.futures_get_balance())
-        wallet_balance = float(self.client.futures_get_total_balance())
+        equity = snapshot.equity
+        wallet_balance = snapshot.wallet_balance
         max_size_remaining = 0.0
         if self.maxNumOfPositions > 0:
             if not self.max_positions_check(all_positions=all_positions, wallet_balance=wallet_balance):
@@ -868,17 +1106,10 @@ class FuturesFlushBuyManager(threading.Thread):
                                    -self.numberOfFlushBars:]  # get the last numberOfFlushBars candles from candles
                 else:
                     candlesEntry = (candles[0][-self.numberOfFlushBars:], candles[1][-self.numberOfFlushBars:])
-                self.cancel_all_orders()
-                # check that cancelled orders have not created a position before creating new ones
-                if get_position_size(self.client.get_position_api_first()) != 0:
-                    self.logger.writeline(
-                        f"{self.symbol} WARNING: Attempt to cancel orders but a position was created")
-                    self.log_entry_trade()
-                    self.set_orders()
-                    return
                 if float(wallet_balance) < self.minBalance:
                     self.logger.writeline(f"{self.symbol} Balance is below min threshold")
                     self.stop()
+                desired_orders = []
                 if not ask_bid_candles:
                     highestEntry = max(Decimal(candle[2]) for candle in candlesEntry)
                     lowestEntry = min(Decimal(candle[3]) for candle in candlesEntry)
@@ -920,17 +1151,10 @@ class FuturesFlushBuyManager(threading.Thread):
                                 self.logger.writeline(f"WARNING {self.symbol} price gapped up. Was placing buy entry order @{flushEntry} but current price @{current_ask_price}. Updating to be current price instead", discord_channel_id=DISCORD_SKIPPING_ORDERS_CHANNEL_ID)
                                 flushEntry = Decimal(current_ask_price)
                         stop = None if not self.reverse_mode else flushEntry
-                        self.currentBuyOrder = self.client.futures_create_limit_order(symbol=self.symbol,
-                                                                                      limit=flushEntry,
-                                                                                      quantity=self.quantity,
-                                                                                      postOnly=self.postOnly,
-                                                                                      fixedBalance=self.fixedBalance,
-                                                                                      balancePercent=self.balancePercent,
-                                                                                      balance=wallet_balance,
-                                                                                      volume_based_max_usdt_pos_size=self.volumeBasedPosSize,
-                                                                                      stop=stop,
-                                                                                      side="BUY",
-                                                                                      absoluteMaxUsdtPosSize=max_size_remaining)
+                        buy_order = self.desired_entry_order("BUY", flushEntry, stop, wallet_balance,
+                                                             max_size_remaining)
+                        if buy_order:
+                            desired_orders.append(buy_order)
                     elif self.avoidMarketEntries and get_current_price(order_side_is_buy=True) < flushEntry:
                         self.logger.writeline(
                             f"{self.symbol} current price {get_current_price(order_side_is_buy=True)} < {flushEntry} flushEntry, not placing any orders...", discord_channel_id=DISCORD_ERROR_MESSAGES_CHANNEL_ID)
@@ -958,6 +1182,7 @@ class FuturesFlushBuyManager(threading.Thread):
                 else:
                     self.logger.writeline(
                         f"{self.symbol} Skipping buy order @{min(flushEntry, get_current_price(order_side_is_buy=True))} because it falls below the {self.RANGE_LIMIT_DAYS} day range limit @{lower_limit}")
+                sell_order_skipped = False
                 if self.shorts:
                     if flushEntry > squeezeEntry and not self.reverse_mode:
                         self.logger.writeline(
@@ -965,11 +1190,13 @@ class FuturesFlushBuyManager(threading.Thread):
                         if flushEntry > get_current_price(order_side_is_buy=False) > squeezeEntry:
                             self.logger.writeline(
                                 f"WARNING: AND flushEntry > current price @{get_current_price(order_side_is_buy=False)} > squeezeEntry! Skipping sell order...")
-                            return
+                            sell_order_skipped = True
                             # the reason why we ignore the sell order if current price < flushEntry is because this will
                             # cause a conflict with both buy and sell orders being valid when the above is true, we pick
                             # to only go long in this case.
-                    if range_limit_sell_flag:
+                    if sell_order_skipped:
+                        pass
+                    elif range_limit_sell_flag:
                         if self.reverse_mode or self.postOnly or self.avoidMarketEntries is False or get_current_price(order_side_is_buy=False) <= squeezeEntry:
                             if self.reverse_mode:
                                 #  gap down checks so we don't enter a smaller position than expected if price gaps down
@@ -980,17 +1207,10 @@ class FuturesFlushBuyManager(threading.Thread):
                                         discord_channel_id=DISCORD_SKIPPING_ORDERS_CHANNEL_ID)
                                     squeezeEntry = Decimal(current_bid_price)
                             stop = None if not self.reverse_mode else squeezeEntry
-                            self.currentSellOrder = self.client.futures_create_limit_order(symbol=self.symbol,
-                                                                                           limit=squeezeEntry,
-                                                                                           quantity=self.quantity,
-                                                                                           postOnly=self.postOnly,
-                                                                                           fixedBalance=self.fixedBalance if self.fixedBalance is None else self.fixedBalance * self.shortsPositionMultiplier,
-                                                                                           balancePercent=self.balancePercent * self.shortsPositionMultiplier,
-                                                                                           balance=wallet_balance,
-                                                                                           volume_based_max_usdt_pos_size=self.volumeBasedPosSize,
-                                                                                           stop=stop,
-                                                                                           side="SELL",
-                                                                                           absoluteMaxUsdtPosSize=max_size_remaining)
+                            sell_order = self.desired_entry_order("SELL", squeezeEntry, stop, wallet_balance,
+                                                                  max_size_remaining)
+                            if sell_order:
+                                desired_orders.append(sell_order)
                         elif self.avoidMarketEntries and get_current_price(order_side_is_buy=False) > squeezeEntry:
                             self.logger.writeline(
                                 f"{self.symbol} current price {get_current_price(order_side_is_buy=False)} > {squeezeEntry} squeezeEntry, skipping placing order...", discord_channel_id=DISCORD_ERROR_MESSAGES_CHANNEL_ID)
@@ -1018,6 +1238,13 @@ class FuturesFlushBuyManager(threading.Thread):
                     else:
                         self.logger.writeline(
                             f"{self.symbol} Skipping sell order @{max(squeezeEntry, get_current_price(order_side_is_buy=False))} because it's above the {self.RANGE_LIMIT_DAYS} day range limit @{upper_limit}")
+                if self.reconcile_orders(desired_orders, check_position=True) is None:
+                    # a cancelled or amended order filled before it was replaced
+                    self.logger.writeline(
+                        f"{self.symbol} WARNING: Attempt to cancel orders but a position was created")
+                    self.log_entry_trade()
+                    self.set_orders()
+                    return
         except Exception as e:
             # if there was a problem setting orders and there is no position,
             # cancel all previous orders as these would be out of date
@@ -1051,40 +1278,32 @@ class FuturesFlushBuyManager(threading.Thread):
                                       self.client.precisionPriceDict.get(self.symbol))))
             else:
                 limit = highestLookback
-            self.get_open_current_sell_order()
-            if "CAPITAL" in self.exchange or not self.currentSellOrder or (
-                    self.currentSellOrder and (Decimal(self.currentSellOrder.get("price")) != limit)) or ((abs(
-                Decimal(self.currentSellOrder.get("origQty"))) - abs(
-                Decimal(self.currentSellOrder.get("executedQty")))) != abs(Decimal(str(positionSize)))):
-                self.cancel_all_orders()
-                if not self.avoidMarketEntries or get_current_price(order_side_is_buy=False) < limit:
-                    self.currentSellOrder = self.client.futures_create_limit_order(symbol=self.symbol, limit=limit,
-                                                                                   quantity=positionSize,
-                                                                                   reduceOnly=True, side="SELL")
-                    if stop:
-                        self.stopLossOrder = self.client.futures_long_stop_loss(symbol=self.symbol,
-                                                                                quantity=positionSize, stop=stop)
-                else:
-                    # # when the current price > limit the order would normally become a market exit. Instead we use
-                    # # the close_best_price function so that it becomes a limit exit
-                    # self.logger.writeline(f"{self.symbol} take profit exceeded, closing at best price")
-                    # futures_close_best_price(self.symbol, CLOSE_BEST_PRICE_MIN_VALUE, position=position)
-                    price_entry_side, atBid, atAsk = get_orderbook_side_for_order_side(order_side_is_buy=False)
-                    self.logger.writeline(
-                        f"{self.symbol} long take profit (@{limit}) exceeded (current price: {get_current_price(order_side_is_buy=False)}), placing limit exit at {price_entry_side}")
-                    # total, pnl, avPrice, slippage = market_close_now_profit(self.symbol, position)
-                    # self.logger.writeline(
-                    #     f"{self.symbol} if close at market now: total ${total} pnl {pnl}, avPrice {avPrice}, slippage {slippage}")
-                    self.log_exit_trade(position=position, increase_post_only_exit_count=True)
-                    self.currentSellOrder = self.client.futures_create_limit_order(symbol=self.symbol, limit=limit,
-                                                                                   quantity=positionSize,
-                                                                                   reduceOnly=True,
-                                                                                   atAsk=atAsk,
-                                                                                   atBid=atBid,
-                                                                                   side="SELL")
-                    self.exceeded_profit_still_in_position = True
+            if not self.avoidMarketEntries or get_current_price(order_side_is_buy=False) < limit:
+                desired_orders = [self.desired_exit_order("SELL", limit, positionSize)]
+                if stop:
+                    desired_orders.append(self.desired_stop_loss("SELL", stop, positionSize))
+                if self.reconcile_orders(desired_orders, replaced_every_bar=False).unchanged:
+                    self.logger.writeline(f"{self.symbol} Current sell limit @{limit} exit doesnt need updating")
             else:
-                self.logger.writeline(f"{self.symbol} Current sell limit @{limit} exit doesnt need updating")
+                self.reconcile_orders([], replaced_every_bar=False)
+                # # when the current price > limit the order would normally become a market exit. Instead we use
+                # # the close_best_price function so that it becomes a limit exit
+                # self.logger.writeline(f"{self.symbol} take profit exceeded, closing at best price")
+                # futures_close_best_price(self.symbol, CLOSE_BEST_PRICE_MIN_VALUE, position=position)
+                price_entry_side, atBid, atAsk = get_orderbook_side_for_order_side(order_side_is_buy=False)
+                self.logger.writeline(
+                    f"{self.symbol} long take profit (@{limit}) exceeded (current price: {get_current_price(order_side_is_buy=False)}), placing limit exit at {price_entry_side}")
+                # total, pnl, avPrice, slippage = market_close_now_profit(self.symbol, position)
+                # self.logger.writeline(
+                #     f"{self.symbol} if close at market now: total ${total} pnl {pnl}, avPrice {avPrice}, slippage {slippage}")
+                self.log_exit_trade(position=position, increase_post_only_exit_count=True)
+                self.currentSellOrder = self.client.futures_create_limit_order(symbol=self.symbol, limit=limit,
+                                                                               quantity=positionSize,
+                                                                               reduceOnly=True,
+                                                                               atAsk=atAsk,
+                                                                               atBid=atBid,
+                                                                               side="SELL")
+                self.exceeded_profit_still_in_position = True
 
         if positionSize < 0:
             if abs(positionSize) > self.full_pos_qty:
@@ -1108,38 +1327,29 @@ class FuturesFlushBuyManager(threading.Thread):
                                         self.client.precisionPriceDict.get(self.symbol))))
             else:
                 limit = lowestLookback
-                self.get_open_current_buy_order()
-            if "CAPITAL" in self.exchange or not self.currentBuyOrder or (
-                    self.currentBuyOrder and (Decimal(self.currentBuyOrder.get("price")) != limit)) or ((abs(
-                Decimal(self.currentBuyOrder.get("origQty"))) - abs(
-                Decimal(self.currentBuyOrder.get("executedQty")))) != abs(Decimal(str(positionSize)))):
-                self.cancel_all_orders()
-                if not self.avoidMarketEntries or get_current_price(order_side_is_buy=True) > limit:
-                    self.currentBuyOrder = self.client.futures_create_limit_order(symbol=self.symbol, limit=limit,
-                                                                                  quantity=abs(positionSize),
-                                                                                  reduceOnly=True, side="BUY")
-                    if stop:
-                        self.stopLossOrder = self.client.futures_short_stop_loss(symbol=self.symbol,
-                                                                                 quantity=abs(positionSize),
-                                                                                 stop=stop)
-                else:
-                    # self.logger.writeline(f"{self.symbol} take profit exceeded, closing at best price")
-                    # futures_close_best_price(self.symbol, CLOSE_BEST_PRICE_MIN_VALUE, position=position)
-                    price_entry_side, atBid, atAsk = get_orderbook_side_for_order_side(order_side_is_buy=True)
-                    self.logger.writeline(
-                        f"{self.symbol} short take profit (@{limit}) exceeded (current price: {get_current_price(order_side_is_buy=True)}), placing limit exit at {price_entry_side}")
-                    # total, pnl, avPrice, slippage = market_close_now_profit(self.symbol, position)
-                    # self.logger.writeline(
-                    #     f"{self.symbol} if close at market now: total ${total} pnl {pnl}, avPrice {avPrice}, slippage {slippage}")
-                    self.log_exit_trade(position=position, increase_post_only_exit_count=True)
-                    self.currentBuyOrder = self.client.futures_create_limit_order(symbol=self.symbol, limit=limit,
-                                                                                  quantity=abs(positionSize),
-                                                                                  reduceOnly=True, atBid=atBid,
-                                                                                  atAsk=atAsk,
-                                                                                  side="BUY")
-                    self.exceeded_profit_still_in_position = True
+            if not self.avoidMarketEntries or get_current_price(order_side_is_buy=True) > limit:
+                desired_orders = [self.desired_exit_order("BUY", limit, positionSize)]
+                if stop:
+                    desired_orders.append(self.desired_stop_loss("BUY", stop, positionSize))
+                if self.reconcile_orders(desired_orders, replaced_every_bar=False).unchanged:
+                    self.logger.writeline(f"{self.symbol} Current buy limit @{limit} exit doesnt need updating")
             else:
-                self.logger.writeline(f"{self.symbol} Current buy limit @{limit} exit doesnt need updating")
+                self.reconcile_orders([], replaced_every_bar=False)
+                # self.logger.writeline(f"{self.symbol} take profit exceeded, closing at best price")
+                # futures_close_best_price(self.symbol, CLOSE_BEST_PRICE_MIN_VALUE, position=position)
+                price_entry_side, atBid, atAsk = get_orderbook_side_for_order_side(order_side_is_buy=True)
+                self.logger.writeline(
+                    f"{self.symbol} short take profit (@{limit}) exceeded (current price: {get_current_price(order_side_is_buy=True)}), placing limit exit at {price_entry_side}")
+                # total, pnl, avPrice, slippage = market_close_now_profit(self.symbol, position)
+                # self.logger.writeline(
+                #     f"{self.symbol} if close at market now: total ${total} pnl {pnl}, avPrice {avPrice}, slippage {slippage}")
+                self.log_exit_trade(position=position, increase_post_only_exit_count=True)
+                self.currentBuyOrder = self.client.futures_create_limit_order(symbol=self.symbol, limit=limit,
+                                                                              quantity=abs(positionSize),
+                                                                              reduceOnly=True, atBid=atBid,
+                                                                              atAsk=atAsk,
+                                                                              side="BUY")
+                self.exceeded_profit_still_in_position = True
 
     def handle_market_open_and_close_times(self, is_open: bool):
         self.market_currently_open_flag = is_open
@@ -1184,21 +1394,9 @@ class FuturesFlushBuyManager(threading.Thread):
             f"avoidMarketEntries: {self.avoidMarketEntries},"
             f"shortsPositionMultiplier: {self.shortsPositionMultiplier}"
         )
-        if self.interval == "5m":
-            self.scheduler.add_job(self.set_orders, 'cron', minute='*/5', second='01')
-        elif self.interval == "1m":
-            self.scheduler.add_job(self.set_orders, 'cron', second='01')
-        elif self.interval == "2m":
-            self.scheduler.add_job(self.set_orders, 'cron', minute='*/2', second='01')
-        elif self.interval == "3m":
-            self.scheduler.add_job(self.set_orders, 'cron', minute='*/3', second='01')
-        elif self.interval == "15m":
-            self.scheduler.add_job(self.set_orders, 'cron', minute='*/15', second='01')
-        elif self.interval == "1h":
-            self.scheduler.add_job(self.set_orders, 'cron', hour='*/1', minute='0', second='01', misfire_grace_time=360)
-        self.scheduler.add_job(self.regular_check, 'cron', second='*/5', misfire_grace_time=3)
-
-        if "CAPITAL" in self.exchange:
+        self.dispatcher.register(self)
+
+        if self.client.venue == "CAPITAL":
             opening_times_str = self.client.client_capital.get_market(self.symbol)['instrument']['openingHours']
             opening_times_pattern = r'((([0-1]{0,1}[0-9])|(2[0-3])):[0-5]{0,1}[0-9]) -'
             closing_times_pattern = r'- ((([0-1]{0,1}[0-9])|(2[0-3])):[0-5]{0,1}[0-9])'
@@ -1208,11 +1406,12 @@ class FuturesFlushBuyManager(threading.Thread):
                 opening_time_hour = opening_time[:2]
                 opening_time_minute = opening_time[-2:]
                 # add extra calls to scheduler to set_orders() every time market opens
-                self.scheduler.add_job(self.set_orders, 'cron', hour=opening_time_hour, minute=opening_time_minute, second='02')
-                self.scheduler.add_job(self.handle_market_open_and_close_times, trigger='cron', args=(True,), hour=opening_time_hour, minute=opening_time_minute, second='00')
+                self.dispatcher.add_job(self, self.set_orders, 'cron', hour=opening_time_hour, minute=opening_time_minute, second='02')
+                self.dispatcher.add_job(self, self.handle_market_open_and_close_times, 'cron', args=(True,), hour=opening_time_hour, minute=opening_time_minute, second='00')
             for closing_time in closing_times_str_list:
                 closing_time_hour = closing_time[:2]
                 closing_time_minute = closing_time[-2:]
-                self.scheduler.add_job(self.handle_market_open_and_close_times, trigger='cron', args=(False,), hour=closing_time_hour, minute=closing_time_minute, second='00')
+                self.dispatcher.add_job(self, self.handle_market_open_and_close_times, 'cron', args=(False,), hour=closing_time_hour, minute=closing_time_minute, second='00')
 
-        self.scheduler.start()
+        if self.blocking:
+            self.stopped.wait()
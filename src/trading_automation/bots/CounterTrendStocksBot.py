@@ -17,6 +17,7 @@ from trading_automation.config.settings import get_settings
 from trading_automation.core.Logger import *
 from trading_automation.core.Utils import *
 from trading_automation.data.DownloadKlinesOneTime import run as download_klines
+from trading_automation.data.KlineArchive import USE_KLINE_ARCHIVE, kline_archive, read_candles
 
 settings = get_settings()
 CLOSE_BEST_PRICE_MIN_VALUE = settings.close_best_price_min_value
@@ -78,9 +79,12 @@ class CounterTrendStocksBot(threading.Thread):
         self.discord_service = discord_service or DiscordNotificationService()
         self.client = UniversalClient(self.exchange, discord_service=self.discord_service, use_local_tick_and_step_data=True, timeout=30)
         self.logger = self.client.logger
-        self.folders = [name for name in
-                        os.listdir(f'klines/{self.exchange}')
-                        if os.path.isdir(os.path.join(f'klines/{self.exchange}', name)) and not re.fullmatch(r"20\d{6}", name) and "_ASK" not in name and "_COMBINED" not in name]
+        if USE_KLINE_ARCHIVE:
+            self.folders = [name for name in kline_archive.symbols(self.exchange) if "_ASK" not in name and "_COMBINED" not in name]
+        else:
+            self.folders = [name for name in
+                            os.listdir(f'klines/{self.exchange}')
+                            if os.path.isdir(os.path.join(f'klines/{self.exchange}', name)) and not re.fullmatch(r"20\d{6}", name) and "_ASK" not in name and "_COMBINED" not in name]
         self.open_instrument_trade_dates_tracker = {}
 
     def find_tradeable_instruments(self):
@@ -88,8 +92,7 @@ class CounterTrendStocksBot(threading.Thread):
         for instrument_name in self.folders:
             if instrument_name in self.CAPITAL_BLACKLIST:
                 continue
-            path = str(f'klines/{self.exchange}/{instrument_name}/{instrument_name}_{self.interval}.csv')
-            kline_list = readcsv(path)
+            kline_list = read_candles(self.exchange, instrument_name, self.interval)
             if len(kline_list) < self.lookback_number_of_bars:
                 continue
             past_closes = [Decimal(x[4]) for x in kline_list[-self.lookback_number_of_bars:]]
@@ -168,8 +171,7 @@ class CounterTrendStocksBot(threading.Thread):
                 opening_time = opening_times_for_today[0].split(' - ')[0]
                 opening_hour = int(opening_time.split(':')[0])
                 opening_minute = int(opening_time.split(':')[1])
-                path = str(f'klines/{self.exchange}/{instrument}/{instrument}_{self.interval}.csv')
-                candles = readcsv(path)[-self.wait_bars:]
+                candles = read_candles(self.exchange, instrument, self.interval)[-self.wait_bars:]
                 if [int(x[0]) for x in candles].index(int(self.open_instrument_trade_dates_tracker[instrument])) == 0:
                     if current_datetime.hour >= opening_hour and current_datetime.minute >= opening_minute:
                         self.logger.writeline(f"{instrument} market currently open, placing sell exit at bid...")
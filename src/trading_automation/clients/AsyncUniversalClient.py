@@ -0,0 +1,202 @@
+"""Coroutine interface to UniversalClient for requests over many symbols at once."""
+from __future__ import annotations
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Iterable, Optional
+
+import aiohttp
+from binance import AsyncClient
+from binance.exceptions import BinanceAPIException
+
+from trading_automation.clients.http_transport import http_transport
+from trading_automation.clients.rate_limiter import rate_limiter
+
+if TYPE_CHECKING:
+    from trading_automation.clients.UniversalClient import UniversalClient
+
+# "Too many requests" and "Too many new orders"
+BINANCE_RATE_LIMIT_CODES = (-1003, -1015)
+BINANCE_RATE_LIMIT_BACKOFF = 1.0
+KEEPALIVE_TIMEOUT = 60
+
+
+class AsyncUniversalClient:
+    """Coroutine versions of the ``UniversalClient`` methods, returning the same Binance style results.
+
+    BINANCE position, open order, cancel all and leverage requests are sent with python-binance's aiohttp
+    ``AsyncClient`` over one pooled keep-alive connector. Every other method, and every method of the other exchanges,
+    runs the blocking ``UniversalClient`` method on a thread pool of ``max_concurrency`` threads, the size of the
+    shared HTTP transport pools by default.
+
+    Each request takes its token from the shared ``rate_limiter`` before it is sent (the thread pool ones in
+    ``tries_wrapper``), so the bulk helpers that gather one request per symbol stay inside the exchange's budget
+    however many symbols they are given.
+    """
+
+    def __init__(self, exchange: Optional[str] = None, client: Optional[UniversalClient] = None,
+                 max_concurrency: Optional[int] = None, **kwargs) -> None:
+        if client is None:
+            from trading_automation.clients.UniversalClient import UniversalClient
+            client = UniversalClient(exchange=exchange, **kwargs)
+        self.client = client
+        self.exchange = client.exchange
+        self.max_concurrency = max_concurrency or http_transport.pool_maxsize
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                            thread_name_prefix=f"AsyncUniversalClient {self.exchange}")
+        self._binance: Optional[AsyncClient] = None
+        self._binance_lock: Optional[asyncio.Lock] = None
+
+    async def __aenter__(self) -> AsyncUniversalClient:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        if self._binance is not None:
+            await self._binance.close_connection()
+            self._binance = None
+        self._executor.shutdown(wait=False)
+
+    def __getattr__(self, name: str) -> Any:
+        """Any other ``UniversalClient`` method as a coroutine run on the thread pool."""
+        if name.startswith('_') or 'client' not in self.__dict__:
+            raise AttributeError(name)
+        attribute = getattr(self.client, name)
+        if not callable(attribute):
+            return attribute
+
+        async def method(*args, **kwargs):
+            return await self.run(attribute, *args, **kwargs)
+        return method
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run blocking ``func`` on the thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def _binance_client(self) -> AsyncClient:
+        if self._binance_lock is None:
+            self._binance_lock = asyncio.Lock()
+        async with self._binance_lock:
+            if self._binance is None:
+                connector = aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=KEEPALIVE_TIMEOUT)
+                sync_client = self.client.client_binance
+                self._binance = await AsyncClient.create(sync_client.API_KEY, sync_client.API_SECRET,
+                                                         requests_params={'timeout': self.client.timeout},
+                                                         session_params={'connector': connector})
+        return self._binance
+
+    async def _binance_request(self, func_name: str, request: Callable[[AsyncClient], Awaitable]) -> Any:
+        """Send ``request`` as UniversalClient method ``func_name`` would: rate limited, retrying timeouts."""
+        tries = 0
+        while True:
+            await rate_limiter.acquire_async(self.exchange, func_name)
+            try:
+                return await request(await self._binance_client())
+            except BinanceAPIException as e:
+                if e.code not in BINANCE_RATE_LIMIT_CODES and e.status_code != 429:
+                    raise
+                # back off every request of this endpoint class and retry until it goes through
+                rate_limiter.backoff(self.exchange, func_name, BINANCE_RATE_LIMIT_BACKOFF)
+            except (asyncio.TimeoutError, aiohttp.ClientConnectionError):
+                tries += 1
+                if tries >= self.client.tries:
+                    raise
+
+    async def futures_get_position(self, symbol: Optional[str] = None) -> Any:
+        if self.exchange != "BINANCE":
+            return await self.run(self.client.futures_get_position, symbol)
+        if symbol:
+            return await self._binance_request('futures_get_position',
+                                               lambda c: c.futures_position_information(symbol=symbol))
+        positions = await self._binance_request('futures_get_position', lambda c: c.futures_position_information())
+        return [x for x in positions if float(x['positionAmt']) != 0]
+
+    async def futures_get_open_orders(self, symbol: str) -> Any:
+        if self.exchange != "BINANCE":
+            return await self.run(self.client.futures_get_open_orders, symbol)
+        return await self._binance_request('futures_get_open_orders',
+                                           lambda c: c.futures_get_open_orders(symbol=symbol))
+
+    async def futures_cancel_all_open_orders(self, symbol: str) -> None:
+        if self.exchange != "BINANCE":
+            return await self.run(self.client.futures_cancel_all_open_orders, symbol)
+        await self._binance_request('futures_cancel_all_open_orders',
+                                    lambda c: c.futures_cancel_all_open_orders(symbol=symbol))
+
+    async def futures_change_leverage(self, symbol: str, leverage: int) -> None:
+        if self.exchange != "BINANCE":
+            return await self.run(self.client.futures_change_leverage, symbol, leverage)
+        await self._binance_request('futures_change_leverage',
+                                    lambda c: c.futures_change_leverage(symbol=symbol, leverage=leverage))
+
+    async def gather_symbols(self, method: Callable[..., Awaitable], symbols: Iterable[str], *args,
+                             return_exceptions: bool = False, **kwargs) -> Dict[str, Any]:
+        """Await ``method(symbol, *args, **kwargs)`` for every symbol, ``max_concurrency`` at a time.
+
+        Returns the results by symbol. Like a loop over the symbols the first exception is raised unless
+        ``return_exceptions``, in which case exceptions are returned as the symbol's result.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def call(symbol: str) -> Any:
+            async with semaphore:
+                return await method(symbol, *args, **kwargs)
+
+        results = await asyncio.gather(*(call(symbol) for symbol in symbols), return_exceptions=True)
+        if not return_exceptions:
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+        return dict(zip(symbols, results))
+
+    async def positions(self, symbols: Iterable[str], return_exceptions: bool = False) -> Dict[str, Any]:
+        return await self.gather_symbols(self.futures_get_position, symbols, return_exceptions=return_exceptions)
+
+    async def open_orders(self, symbols: Iterable[str], return_exceptions: bool = False) -> Dict[str, Any]:
+        return await self.gather_symbols(self.futures_get_open_orders, symbols, return_exceptions=return_exceptions)
+
+    async def cancel_all(self, symbols: Iterable[str], return_exceptions: bool = False) -> Dict[str, Any]:
+        return await self.gather_symbols(self.futures_cancel_all_open_orders, symbols,
+                                         return_exceptions=return_exceptions)
+
+    async def cancel_open_orders(self, symbols: Iterable[str]) -> None:
+        """Cancel the open orders of ``symbols`` with one listing request and batch cancels of the symbols that have any.
+
+        Falls back to ``cancel_all`` on exchanges that cannot list every symbol's open orders in one request.
+        """
+        symbols = set(symbols)
+        orders = await self.run(self.client.futures_get_all_open_orders)
+        if orders is None:
+            await self.cancel_all(symbols)
+            return
+        orders = [order for order in orders if order['symbol'] in symbols]
+        if orders:
+            await self.run(self.client.futures_cancel_orders_batch, orders)
+
+    async def change_leverage(self, symbols: Iterable[str], leverage: int,
+                              return_exceptions: bool = False) -> Dict[str, Any]:
+        return await self.gather_symbols(self.futures_change_leverage, symbols, leverage,
+                                         return_exceptions=return_exceptions)
+
+
+def run_bulk(client: UniversalClient, bulk: Callable[[AsyncUniversalClient], Awaitable]) -> Any:
+    """Run ``bulk(async_client)`` to completion from blocking code, e.g. ``run_bulk(client, lambda c: c.positions(symbols))``.
+
+    ``asyncio.run`` cannot be called from a thread already running an event loop, so from there ``bulk`` runs on its
+    own loop in another thread while this thread, and so its loop, waits for it. Coroutines should await ``bulk`` on
+    an ``AsyncUniversalClient`` instead.
+    """
+    async def main():
+        async with AsyncUniversalClient(client=client) as async_client:
+            return await bulk(async_client)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(main())
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="run_bulk") as executor:
+        return executor.submit(asyncio.run, main()).result()
@@ -1,9 +1,10 @@
 import base64
 import hmac
-import requests
 import time
 import urllib.request
 
+from trading_automation.clients.http_transport import http_transport
+
 
 class BingxAPIException(Exception):
 
@@ -37,7 +38,7 @@ class BingxClient(object):
         self.api_secret = api_secret
         self.api_URL = self.MAIN_NET_API_URL
         self.timeout = timeout
-        self.session = requests.session()
+        http_transport.register(self.api_URL)
 
     def genSignature(self, path, method, paramsMap):
         sortedKeys = sorted(paramsMap)
@@ -52,7 +53,7 @@ class BingxClient(object):
         paramsStr = "&".join(["%s=%s" % (x, params[x]) for x in sortedKeys])
         paramsStr += "&sign=" + urllib.parse.quote(base64.b64encode(self.genSignature(method=method, path=endpoint, paramsMap=params)))
         url = self.api_URL + endpoint
-        response = self.session.request(method, url + f'?{paramsStr}', timeout=self.timeout)
+        response = http_transport.request(method, url + f'?{paramsStr}', timeout=self.timeout)
 
         if not str(response.status_code).startswith('2'):
             raise BingxAPIException(response)
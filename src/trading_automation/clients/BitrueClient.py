@@ -4,11 +4,12 @@ from https://github.com/Bitrue-exchange/Bitrue-future-SDK/blob/main/futures_api_
 # coding=utf-8
 import hashlib
 import hmac
-import requests
 import time
 from urllib.parse import urlparse
 import json
 
+from trading_automation.clients.http_transport import http_transport
+
 
 class BitrueAPIException(Exception):
 
@@ -141,7 +142,7 @@ class BitrueClient(object):
 
         self.API_KEY = api_key
         self.API_SECRET = api_secret
-        self.session = self._init_session()
+        http_transport.register(self.API_URL, self.WEBSITE_URL)
         self._requests_params = requests_params
         self.response = None
         self.timestamp_offset = 0
@@ -152,14 +153,11 @@ class BitrueClient(object):
         res = self.get_server_time()
         self.timestamp_offset = res['serverTime'] - int(time.time() * 1000)
 
-    def _init_session(self):
-        session = requests.session()
-        session.headers.update({
+    def _default_headers(self):
+        return {
             'Accept': 'application/json',
             'User-Agent': 'Bitrue/Python',
-
-        })
-        return session
+        }
 
     def _create_api_uri(self, path, signed=True, version=PUBLIC_API_VERSION):
         return self.API_URL + '/' + version + '/' + path
@@ -217,7 +215,8 @@ class BitrueClient(object):
                 kwargs['json'] = kwargs['data']
             del (kwargs['data'])
 
-        headers = {'Content-Type': 'application/json'}
+        headers = self._default_headers()
+        headers['Content-Type'] = 'application/json'
 
         if signed:
             ts = int(time.time() * 1000 + self.timestamp_offset)
@@ -235,8 +234,9 @@ class BitrueClient(object):
         kwargs.update({'headers': headers})
         # print(kwargs)
 
-        self.response = getattr(self.session, method)(uri, **kwargs)
-        return self._handle_response()
+        response = http_transport.request(method.upper(), uri, **kwargs)
+        self.response = response
+        return self._handle_response(response)
 
     def _request_api(self, method, path, signed=False, version=PUBLIC_API_VERSION, **kwargs):
         uri = self._create_api_uri(path, signed, version)
@@ -246,17 +246,17 @@ class BitrueClient(object):
         uri = self._create_website_uri(path)
         return self._reqeust(method, uri, signed, **kwargs)
 
-    def _handle_response(self):
+    def _handle_response(self, response):
         """internal helper for handing API responses from the Bitrue server.
         Rasises the appropriate exceptions when necessary; otherwise, returns the response
         """
-        if not (200 <= self.response.status_code < 300):
-            raise BitrueAPIException(self.response)
+        if not (200 <= response.status_code < 300):
+            raise BitrueAPIException(response)
 
         try:
-            return self.response.json()
+            return response.json()
         except ValueError:
-            raise BitrueRequestException('Invalid Response: %s' % (self.response.text,))
+            raise BitrueRequestException('Invalid Response: %s' % (response.text,))
 
     def _get(self, path, signed=False, version=PUBLIC_API_VERSION, **kwargs):
         return self._request_api('get', path, signed, version, **kwargs)
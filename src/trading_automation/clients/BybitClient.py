@@ -2,9 +2,14 @@ from datetime import datetime, timedelta
 from typing import Any
 from pybit.unified_trading import HTTP
 from pybit.exceptions import InvalidRequestError
+from trading_automation.clients.http_transport import http_transport
 from trading_automation.core.Utils import binance_intervals_to_seconds
 
 
+# most positions one page of the positions listing returns
+POSITIONS_PAGE_LIMIT = 200
+
+
 class BybitClient:
     API_URL = "https://api.bybit.com"
 
@@ -14,6 +19,8 @@ class BybitClient:
         self._api_secret = api_secret
         self._timeout = timeout
         self._session = HTTP(api_key=self._api_key, api_secret=self._api_secret, max_retries=1, retry_delay=0)
+        # pybit signs each request itself, its session only shares the pooled connections
+        http_transport.mount(self._session.client, self._session.endpoint)
 
     def _process_result(self, result: dict) -> Any:
         if not result:
@@ -52,12 +59,22 @@ class BybitClient:
     def latest_information_for_symbol(self, symbol):
         return self._session.get_tickers(category='linear', symbol=symbol)
 
-    @_process_result_wrapper
     def my_position(self, symbol=None):
-        settle_coin = None
-        if symbol is None:
-            settle_coin = 'USDT'
-        return self._session.get_positions(category='linear', symbol=symbol, settleCoin=settle_coin)
+        """
+        :return: the positions of symbol, or of every USDT settled symbol with a position if symbol is None, following
+        the pages of the listing so no symbol is left out
+        """
+        if symbol is not None:
+            return self._process_result(self._session.get_positions(category='linear', symbol=symbol))
+        positions = []
+        cursor = None
+        while True:
+            result = self._session.get_positions(category='linear', settleCoin='USDT', limit=POSITIONS_PAGE_LIMIT,
+                                                 cursor=cursor)
+            positions += self._process_result(result)
+            cursor = result['result'].get('nextPageCursor')
+            if not cursor:
+                return positions
 
     @_process_result_wrapper
     def get_wallet_balance(self, coin=None):
@@ -65,6 +82,10 @@ class BybitClient:
 
     @_process_result_wrapper
     def place_order(self, side, symbol, order_type, qty, time_in_force, close_on_trigger, reduce_only, price="", order_link_id=""):
+        return self._session.place_order(category='linear', **self._order_request(side, symbol, order_type, qty, time_in_force, close_on_trigger, reduce_only, price, order_link_id))
+
+    @staticmethod
+    def _order_request(side, symbol, order_type, qty, time_in_force, close_on_trigger, reduce_only, price="", order_link_id=""):
         if order_type == "MARKET":
             price = ""
             order_type = "Market"
@@ -76,7 +97,28 @@ class BybitClient:
             side = "Buy"
         elif side == "SELL":
             side = "Sell"
-        return self._session.place_order(category='linear', side=side, symbol=symbol, orderType=order_type, qty=str(qty), timeInForce=time_in_force, closeOnTrigger=close_on_trigger, reduceOnly=reduce_only, price=str(price), orderLinkId=order_link_id, positionIdx=0)
+        return dict(side=side, symbol=symbol, orderType=order_type, qty=str(qty), timeInForce=time_in_force, closeOnTrigger=close_on_trigger, reduceOnly=reduce_only, price=str(price), orderLinkId=order_link_id, positionIdx=0)
+
+    def place_batch_order(self, orders):
+        """
+        :param orders: place_order kwargs of each order, at most 10
+        :return: per order {'orderId', 'orderLinkId', 'code', 'msg'}, a rejected order has a non zero code
+        """
+        result = self._session.place_batch_order(category='linear', request=[self._order_request(**order) for order in orders])
+        return self._batch_results(result)
+
+    def cancel_batch_order(self, orders):
+        """
+        :param orders: (symbol, order_id) of each order, at most 10
+        :return: per order {'orderId', 'orderLinkId', 'code', 'msg'}, a rejected cancel has a non zero code
+        """
+        result = self._session.cancel_batch_order(category='linear', request=[{'symbol': symbol, 'orderId': order_id} for symbol, order_id in orders])
+        return self._batch_results(result)
+
+    def _batch_results(self, result):
+        orders = self._process_result(result)
+        errors = (result.get('retExtInfo') or {}).get('list') or [{}] * len(orders)
+        return [dict(order, code=error.get('code', 0), msg=error.get('msg', '')) for order, error in zip(orders, errors)]
 
     @_process_result_wrapper
     def query_active_order(self, symbol, order_id="", order_link_id=""):
@@ -87,8 +129,15 @@ class BybitClient:
         return self._session.cancel_order(category='linear', symbol=symbol, orderId=order_id, orderLinkId=order_link_id)
 
     @_process_result_wrapper
-    def cancel_all_active_orders(self, symbol):
-        return self._session.cancel_all_orders(category='linear', symbol=symbol)
+    def amend_order(self, symbol, order_id, qty, price):
+        return self._session.amend_order(category='linear', symbol=symbol, orderId=order_id, qty=str(qty), price=str(price))
+
+    @_process_result_wrapper
+    def cancel_all_active_orders(self, symbol=None):
+        settle_coin = None
+        if symbol is None:
+            settle_coin = 'USDT'
+        return self._session.cancel_all_orders(category='linear', symbol=symbol, settleCoin=settle_coin)
 
     @_process_result_wrapper
     def orderbook(self, symbol, limit=None):
@@ -1,7 +1,7 @@
 import time
 import urllib.parse
 from typing import Optional, Dict, Any, List
-from requests import Request, Session, Response
+from requests import Request, Response
 import hmac
 # from ciso8601 import parse_datetime
 # from UniversalClient import CAPITALDOTCOM_API_KEY, CAPITALDOTCOM_PASSWORD, CAPITALDOTCOM_USERNAME
@@ -9,6 +9,8 @@ import threading
 import os
 from dotenv import load_dotenv, find_dotenv
 
+from trading_automation.clients.http_transport import http_transport
+
 
 load_dotenv(find_dotenv())
 CAPITALDOTCOM_API_KEY = os.environ.get("CAPITALDOTCOM_API_KEY")
@@ -24,8 +26,8 @@ class CapitalClient:
     SECOND_ACCOUNT_ID = 170989073324863632
 
     def __init__(self, api_key=None, username=None, password=None, timeout=0.5, subaccount=None, demo=False, second_account=False) -> None:
-        self._session = Session()
         self._base_url = self.PROD_URL if not demo else self.DEMO_URL
+        http_transport.register(self._base_url)
         self._api_key = api_key
         self._username = username
         self._password = password
@@ -55,7 +57,7 @@ class CapitalClient:
                                                                     "identifier": self._username,
                                                                     "password": self._password})
         self._sign_request(request)
-        response = self._session.send(request.prepare(), timeout=self._timeout)
+        response = http_transport.send(request.prepare(), timeout=self._timeout)
         self._security_token = response.headers['X-SECURITY-TOKEN']
         self._authorization_token = response.headers['CST']
         self._request('PUT', 'session', json={'accountId': self._account_id})
@@ -77,11 +79,10 @@ class CapitalClient:
     def _request(self, method: str, path: str, **kwargs) -> Any:
         request = Request(method, self._base_url + path, **kwargs)
         self._sign_request(request)
-        response = self._session.send(request.prepare(), timeout=self._timeout)
+        response = http_transport.send(request.prepare(), timeout=self._timeout)
         return self._process_response(response)
 
     def _sign_request(self, request: Request) -> None:
-        request.prepare()
         request.headers['X-CAP-API-KEY'] = self._api_key
         if self._security_token:
             request.headers['X-SECURITY-TOKEN'] = self._security_token
@@ -2,9 +2,11 @@ import time
 import urllib.parse
 from typing import Optional, Dict, Any, List
 
-from requests import Request, Session, Response
+from requests import PreparedRequest, Request, Response
 import hmac
 
+from trading_automation.clients.http_transport import http_transport
+
 
 # from ciso8601 import parse_datetime
 
@@ -12,8 +14,8 @@ import hmac
 class FtxClient:
 
     def __init__(self, base_url=None, api_key=None, api_secret=None, subaccount_name=None, timeout=0.3) -> None:
-        self._session = Session()
         self._base_url = 'https://ftx.com/api/'
+        http_transport.register(self._base_url)
         self._api_key = api_key
         self._api_secret = api_secret
         self._subaccount_name = subaccount_name
@@ -29,19 +31,18 @@ class FtxClient:
         return self._request('DELETE', path, json=params)
 
     def _request(self, method: str, path: str, **kwargs) -> Any:
-        request = Request(method, self._base_url + path, **kwargs)
+        request = Request(method, self._base_url + path, **kwargs).prepare()
         if self._api_key:
             self._sign_request(request)
-        response = self._session.send(request.prepare(), timeout=self._timeout)
+        response = http_transport.send(request, timeout=self._timeout)
 
         return self._process_response(response)
 
-    def _sign_request(self, request: Request) -> None:
+    def _sign_request(self, request: PreparedRequest) -> None:
         ts = int(time.time() * 1000)
-        prepared = request.prepare()
-        signature_payload = f'{ts}{prepared.method}{prepared.path_url}'.encode()
-        if prepared.body:
-            signature_payload += prepared.body
+        signature_payload = f'{ts}{request.method}{request.path_url}'.encode()
+        if request.body:
+            signature_payload += request.body
         signature = hmac.new(self._api_secret.encode(), signature_payload, 'sha256').hexdigest()
         request.headers['FTX-KEY'] = self._api_key
         request.headers['FTX-SIGN'] = signature
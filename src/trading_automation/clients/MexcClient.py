@@ -2,10 +2,11 @@ import hmac
 import json
 import time
 import urllib.parse
-from requests import Session
 import os
 from dotenv import load_dotenv, find_dotenv
 
+from trading_automation.clients.http_transport import http_transport
+
 # Load environment variables
 
 load_dotenv(find_dotenv())
@@ -16,12 +17,7 @@ load_dotenv(find_dotenv())
 class MxcClient(object):
     API_BASE = "https://contract.mexc.com"
 
-    def __del__(self):
-        if self.session:
-            self.session.close()
-
     def __init__(self, access_key="",  secret_key="", api_base="", timeout=1, **kwargs):
-        self.session = Session()
         self.access_key = access_key
         self.secret_key = secret_key
         if api_base:
@@ -30,6 +26,7 @@ class MxcClient(object):
             self.api_base = self.API_BASE.rstrip('/')
         self.proxies = kwargs.get('proxies', {})
         self.timeout = timeout
+        http_transport.register(self.api_base)
 
     def sign(self, to_be_sign):
         return hmac.new(self.secret_key.encode('utf-8'), to_be_sign.encode('utf-8'), 'sha256').hexdigest()
@@ -57,8 +54,7 @@ class MxcClient(object):
         if is_private is True:
             headers.update({'Signature': self.sign(f'{self.access_key}{ts}{p_str}')})
         url = f'{url}?{p_str}' if p_str else url
-        self.session.cookies.clear()
-        resp = self.session.request('GET', url, headers=headers, timeout=self.timeout, proxies=self.proxies)
+        resp = http_transport.request('GET', url, headers=headers, timeout=self.timeout, proxies=self.proxies)
         return self._handle_response(resp)
 
     def mxc_post(self, endpoint, payload, is_private=False):
@@ -72,8 +68,7 @@ class MxcClient(object):
         }
         if is_private is True:
             headers.update({'Signature': self.sign(f'{self.access_key}{ts}{data}')})
-        self.session.cookies.clear()
-        resp = self.session.request('POST', url, data=data, headers=headers, timeout=self.timeout, proxies=self.proxies)
+        resp = http_transport.request('POST', url, data=data, headers=headers, timeout=self.timeout, proxies=self.proxies)
         return self._handle_response(resp)
 
     # 公共接口部分
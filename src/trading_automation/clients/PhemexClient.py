@@ -2,12 +2,13 @@ import base64
 import hmac
 import hashlib
 import json
-import requests
 import time
 from math import trunc
 import os
 from dotenv import load_dotenv, find_dotenv
 
+from trading_automation.clients.http_transport import http_transport
+
 # Load environment variables
 
 load_dotenv(find_dotenv())
@@ -67,7 +68,13 @@ class PhemexClient(object):
     ORDER_STATUS_TRIGGERED = "Triggered"
     ORDER_STATUS_UNTRIGGERED = "Untriggered"
 
-    def __init__(self, api_key=None, api_secret=None, is_testnet=False, timeout=1, use_high_rate_endpoint=False):
+    def __init__(self, api_key=None, api_secret=None, is_testnet=False, timeout=1, use_high_rate_endpoint=False,
+                 rate_limit_headers_callback=None):
+        """
+        :param rate_limit_headers_callback: called with the headers of every response so the caller can track the
+                                            X-RateLimit-* values
+        """
+        self.rate_limit_headers_callback = rate_limit_headers_callback
         self.api_key = api_key
         self.api_secret = api_secret
         self.api_URL = self.MAIN_NET_API_URL
@@ -76,7 +83,7 @@ class PhemexClient(object):
         if is_testnet:
             self.api_URL = self.TEST_NET_API_URL
         self.timeout = timeout
-        self.session = requests.session()
+        http_transport.register(self.api_URL)
 
     def _send_request(self, method, endpoint, params={}, body={}):
         expiry = str(trunc(time.time()) + 60)
@@ -87,15 +94,17 @@ class PhemexClient(object):
             body_str = json.dumps(body, separators=(',', ':'))
             message += body_str
         signature = hmac.new(self.api_secret.encode('utf-8'), message.encode('utf-8'), hashlib.sha256)
-        self.session.headers.update({
+        headers = {
             'x-phemex-request-signature': signature.hexdigest(),
             'x-phemex-request-expiry': expiry,
             'x-phemex-access-token': self.api_key,
-            'Content-Type': 'application/json'})
+            'Content-Type': 'application/json'}
         url = self.api_URL + endpoint
         if query_string:
             url += '?' + query_string
-        response = self.session.request(method, url, data=body_str.encode(), timeout=self.timeout)
+        response = http_transport.request(method, url, headers=headers, data=body_str.encode(), timeout=self.timeout)
+        if self.rate_limit_headers_callback and str(response.status_code).startswith('2'):
+            self.rate_limit_headers_callback(response.headers)
         if not str(response.status_code).startswith('2'):
             raise PhemexAPIException(response)
         try:
@@ -1,9 +1,11 @@
+import math
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
 from binance.client import Client
-from pybit.exceptions import InvalidRequestError, FailedRequestError
+from pybit.exceptions import InvalidRequestError
 # from FtxClient import FtxClient
 import sys
 from pathlib import Path
@@ -14,6 +16,9 @@ if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
 
 from trading_automation.core.Logger import Logger
+from trading_automation.core.OrderBook import ASKS, BIDS, OrderBook
+from trading_automation.core.DepthAnalytics import DepthAnalytics
+from trading_automation.core.Metrics import metrics
 # from MexcClient import MxcClient
 import os
 from binance.exceptions import BinanceAPIException
@@ -25,6 +30,7 @@ from gate_api import ApiClient, Configuration, FuturesApi, FuturesOrder, Futures
 from gate_api.exceptions import GateApiException
 from urllib3.exceptions import MaxRetryError
 from trading_automation.core.Utils import binance_intervals_to_seconds
+from okex.consts import API_URL as OKEX_API_URL
 from okex.okexclient import OkexClient
 from okex.exceptions import OkexAPIException
 import traceback
@@ -38,6 +44,19 @@ from trading_automation.clients.BitrueClient import BitrueClient
 from trading_automation.clients.BingxClient import BingxClient, BingxAPIException
 import statistics
 from trading_automation.clients.XtClient import XtClient, XtAPIException
+from trading_automation.clients.AsyncUniversalClient import run_bulk
+from trading_automation.clients.exchange_adapters import (
+    AUTH_EXPIRED,
+    DUPLICATE_ID,
+    IP_BLOCKED,
+    NOT_FOUND,
+    RATE_LIMIT,
+    RETRYABLE,
+    exchange_adapters,
+)
+from trading_automation.clients.exchange_info import exchange_info_registry
+from trading_automation.clients.http_transport import http_transport
+from trading_automation.clients.rate_limiter import rate_limiter
 from trading_automation.clients.order_processors import (
     process_ftx_order_to_binance,
     process_okex_order_to_binance as normalize_okex_order,
@@ -107,6 +126,8 @@ XT_API_KEY = settings.xt_api_key
 XT_API_SECRET = settings.xt_api_secret
 
 DISCORD_ERROR_MESSAGES_CHANNEL_ID = settings.discord_error_messages_channel_id or 0
+# most open orders list_futures_orders returns in one request
+GATE_OPEN_ORDERS_LIMIT = 100
 
 API0 = 'https://api.binance.{}/api'.format('com')
 API1 = 'https://api1.binance.{}/api'.format('com')
@@ -120,11 +141,21 @@ TRIES = settings.tries
 DEFAULT_RECVWINDOW = settings.default_recvwindow
 OKEX_USE_DEMO = settings.okex_use_demo
 STAGGER_BYBIT_CLIENT_INITS = settings.stagger_bybit_client_inits
+DEPTH_SNAPSHOT_MAX_AGE = settings.depth_snapshot_max_age
 IG_USE_DEMO = settings.ig_use_demo
 PHEMEX_USE_HIGH_RATE_API_ENDPOINT = settings.phemex_use_high_rate_api_endpoint
 CAPITAL_ACCOUNT_CURRENCY = settings.capital_account_currency
 
 
+def gate_api_client(key, secret):
+    """
+    gate_api uses its own urllib3 pool rather than requests so it cannot share http_transport's pools, size it the same
+    """
+    configuration = Configuration(key=key, secret=secret)
+    configuration.connection_pool_maxsize = http_transport.pool_maxsize
+    return ApiClient(configuration)
+
+
 
 
 class UniversalClient:
@@ -149,19 +180,24 @@ class UniversalClient:
         self.tries = tries
         self.timeout = timeout
         self.exchange = exchange
+        # resolved once here, methods dispatch on self.venue rather than scanning self.exchange
+        self.adapter = exchange_adapters.resolve(exchange)
+        self.venue = self.adapter.name
         self.use_local_tick_and_step_data = use_local_tick_and_step_data
         self.okex_pos_mode = OKEX_POS_MODE
         self.logger = Logger(self, print_console=PRINT_CONSOLE, discord_service=discord_service)
-        if self.exchange == "BINANCE" or self.exchange == "BINANCE_SPOT":
+        if self.venue == "BINANCE" or self.venue == "BINANCE_SPOT":
             self.client_binance = Client(BINANCE_API_KEY, BINANCE_API_SECRET, requests_params={'timeout': self.timeout})
-        elif "FTX" in self.exchange:
+            # the session keeps this account's api key header, only the pooled connections are shared
+            http_transport.mount(self.client_binance.session, Client.API_URL, Client.FUTURES_URL)
+        elif self.venue == "FTX":
             #check for subaccount e.g. "FTX_subaccount1"
             subaccount = None
             if len(self.exchange.split("_")) == 2:
                 subaccount = self.exchange.split("_")[1]
                 # self.exchange = self.exchange.split("_")[0]
             self.client_ftx = FtxClient(api_key=FTX_API_KEY, api_secret=FTX_API_SECRET, timeout=self.timeout, subaccount_name=subaccount)
-        elif "OKEX" in self.exchange:
+        elif self.venue == "OKEX":
             if OKEX_USE_DEMO:
                 self.client_okex = OkexClient(OKEX_API_KEY_DEMO, OKEX_API_SECRET_DEMO, OKEX_PASSPHRASE_DEMO, False, '1', timeout=self.timeout)
             else:
@@ -169,19 +205,21 @@ class UniversalClient:
                     self.client_okex = OkexClient(OKEX_API_KEY_SECOND, OKEX_API_SECRET_SECOND, OKEX_PASSPHRASE_SECOND, False, '0', timeout=timeout)
                 else:
                     self.client_okex = OkexClient(OKEX_API_KEY, OKEX_API_SECRET, OKEX_PASSPHRASE, False, '0', timeout=timeout)
+            # the signature headers are passed with each request, only the pooled connections are shared
+            http_transport.mount(self.client_okex.session, OKEX_API_URL)
             if self.okex_pos_mode == 'net':
                 self.reduce_only_orders = {}  # orderId: time_added (in seconds)
-        elif "GATE" in self.exchange:
+        elif self.venue == "GATE":
             if "LowStakes" in self.exchange or "2" in self.exchange:
-                self.client_gate = FuturesApi(ApiClient(Configuration(key=GATEIO_API_KEY_SECOND, secret=GATEIO_API_SECRET_SECOND)))
+                self.client_gate = FuturesApi(gate_api_client(GATEIO_API_KEY_SECOND, GATEIO_API_SECRET_SECOND))
             elif "3" in self.exchange:
-                self.client_gate = FuturesApi(ApiClient(Configuration(key=GATEIO_API_KEY_THIRD, secret=GATEIO_API_SECRET_THIRD)))
+                self.client_gate = FuturesApi(gate_api_client(GATEIO_API_KEY_THIRD, GATEIO_API_SECRET_THIRD))
             elif "4" in self.exchange:
-                self.client_gate = FuturesApi(ApiClient(Configuration(key=GATEIO_API_KEY_FOURTH, secret=GATEIO_API_SECRET_FOURTH)))
+                self.client_gate = FuturesApi(gate_api_client(GATEIO_API_KEY_FOURTH, GATEIO_API_SECRET_FOURTH))
             else:
-                self.client_gate = FuturesApi(ApiClient(Configuration(key=GATEIO_API_KEY, secret=GATEIO_API_SECRET)))
-        elif "BYBIT" in self.exchange:
-            if STAGGER_BYBIT_CLIENT_INITS:
+                self.client_gate = FuturesApi(gate_api_client(GATEIO_API_KEY, GATEIO_API_SECRET))
+        elif self.venue == "BYBIT":
+            if STAGGER_BYBIT_CLIENT_INITS and not exchange_info_registry.is_loaded(self.venue):
                 # stagger BYBIT initialisation because of strict IP rate limits
                 sleep(6)
             if "LowStakes" in self.exchange or "2" in self.exchange:
@@ -190,14 +228,11 @@ class UniversalClient:
                 self.client_bybit = BybitClient(api_key=BYBIT_API_KEY_THIRD, api_secret=BYBIT_API_SECRET_THIRD, timeout=timeout)
             else:
                 self.client_bybit = BybitClient(api_key=BYBIT_API_KEY, api_secret=BYBIT_API_SECRET, timeout=timeout)
-            self.bybit_symbol_max_quantity = {}
-            for symbol_data in self._get_bybit_symbol_data():
-                self.bybit_symbol_max_quantity[symbol_data['symbol']] = Decimal(symbol_data['lotSizeFilter']['maxOrderQty'])
-        elif "MEXC" in self.exchange:
+        elif self.venue == "MEXC":
             self.client_mexc = MxcClient(access_key=MEXC_API_KEY, secret_key=MEXC_API_SECRET, timeout=timeout)
-        elif "KUCOIN" in self.exchange:
+        elif self.venue == "KUCOIN":
             self.client_kucoin_market = Market()
-        elif "CAPITAL" in self.exchange:
+        elif self.venue == "CAPITAL":
             subaccount = None
             if len(self.exchange.split("_")) == 2:
                 subaccount = self.exchange.split("_")[1]
@@ -206,7 +241,7 @@ class UniversalClient:
             self.capital_instrument_currency_data = {}
             if not use_local_tick_and_step_data:
                 threading.Thread(target=self._capital_update_exchange_rates_job).start()
-        elif "IG" in self.exchange:
+        elif self.venue == "IG":
             subaccount = None
             if len(self.exchange.split("_")) == 2:
                 subaccount = self.exchange.split("_")[1]
@@ -221,20 +256,37 @@ class UniversalClient:
                 password = IG_PASSWORD
                 acc_type = "live"
             # self.client_ig = IgClient(api_key=api_key, username=user_name, password=password, acc_type=acc_type, subaccount=subaccount, timeout=timeout)
-        elif "PHEMEX" in self.exchange:
-            self.client_phemex = PhemexClient(api_key=PHEMEX_API_ID, api_secret=PHEMEX_API_SECRET, timeout=timeout, use_high_rate_endpoint=PHEMEX_USE_HIGH_RATE_API_ENDPOINT)
-        elif "BITRUE" in self.exchange:
+        elif self.venue == "PHEMEX":
+            self.client_phemex = PhemexClient(api_key=PHEMEX_API_ID, api_secret=PHEMEX_API_SECRET, timeout=timeout, use_high_rate_endpoint=PHEMEX_USE_HIGH_RATE_API_ENDPOINT,
+                                              rate_limit_headers_callback=lambda headers: rate_limiter.update_from_phemex_headers(self.exchange, headers))
+        elif self.venue == "BITRUE":
             self.client_bitrue = BitrueClient()
-        elif "BINGX" in self.exchange:
+        elif self.venue == "BINGX":
             self.client_bingx = BingxClient(api_key=BINGX_API_KEY, api_secret=BINGX_API_SECRET, timeout=timeout)
-        elif "XT" in self.exchange:
+        elif self.venue == "XT":
             self.client_xt = XtClient(api_key=XT_API_KEY, api_secret=XT_API_SECRET, timeout=timeout)
         self.current_api_url = API0
-        self.precisionPriceDict = {}
-        self.precisionQuantityDict = {}
-        for pair in self.futures_exchange_info():
-            self.precisionPriceDict[pair.get('symbol')] = Decimal(pair.get('tickSize'))
-            self.precisionQuantityDict[pair.get('symbol')] = Decimal(pair.get('stepSize'))
+        # symbol: DepthAnalytics of the last order book fetched, see futures_get_depth_analytics
+        self.depth_analytics = {}
+        if self.use_local_tick_and_step_data or self.venue == "CAPITAL":
+            # CAPITAL also fills in capital_exchange_rate_data per client while getting exchange info
+            self.precisionPriceDict = {}
+            self.precisionQuantityDict = {}
+            for pair in self.futures_exchange_info():
+                self.precisionPriceDict[pair.get('symbol')] = Decimal(pair.get('tickSize'))
+                self.precisionQuantityDict[pair.get('symbol')] = Decimal(pair.get('stepSize'))
+            if self.venue == "BYBIT":
+                # the local exchange data has no max order quantities
+                self.bybit_symbol_max_quantity = {}
+                for symbol_data in self._get_bybit_symbol_data():
+                    self.bybit_symbol_max_quantity[symbol_data['symbol']] = Decimal(symbol_data['lotSizeFilter']['maxOrderQty'])
+        else:
+            # shared between all clients of the exchange in this process, see exchange_info.ExchangeInfoRegistry
+            exchange_info = exchange_info_registry.get(self)
+            self.precisionPriceDict = exchange_info.tick_sizes
+            self.precisionQuantityDict = exchange_info.step_sizes
+            if self.venue == "BYBIT":
+                self.bybit_symbol_max_quantity = exchange_info.max_quantities
 
     def _capital_update_exchange_rates_job(self):
         while True:
@@ -248,7 +300,7 @@ class UniversalClient:
                 self.capital_instrument_currency_data[sym_data['instrument']['epic']] = sym_data['instrument']['currency']
 
     def switch_api_url(self):
-        if self.exchange == "BINANCE":
+        if self.venue == "BINANCE":
             if self.current_api_url == API0:
                 self.client_binance.API_URL = API1
                 self.current_api_url = API1
@@ -459,7 +511,7 @@ class UniversalClient:
                 return None
             elif not kwargs['reduceOnly']:
                 self.logger.writeline(f"position created from timeout or rate limited order {kwargs}")
-                if "CAPITAL" in self.exchange:
+                if self.venue == "CAPITAL":
                     # get orderId (deal ref) from position info
                     positions = self.client_capital.get_positions()['positions']
                     for position in positions:
@@ -471,22 +523,48 @@ class UniversalClient:
                 return None
 
         def tries(*args, **kwargs):
+            if not metrics.enabled:
+                return retry(*args, **kwargs)
+            self: UniversalClient = args[0]
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                returnValue = retry(*args, **kwargs)
+                outcome = "ok"
+                if returnValue and func.__name__ == "futures_create_order":
+                    metrics.order_acknowledged()
+                return returnValue
+            finally:
+                metrics.observe('exchange_call_seconds', time.perf_counter() - started, exchange=self.exchange,
+                                endpoint=func.__name__, outcome=outcome)
+
+        def retry(*args, **kwargs):
             returnValue = None
             i = 0
             self: UniversalClient = args[0]
+            last_outcome = None
             while i < self.tries:
+                if last_outcome is not None and metrics.enabled:
+                    metrics.inc('exchange_retries_total', exchange=self.exchange, endpoint=func.__name__, reason=last_outcome)
+                attempt_started = time.perf_counter()
                 try:
+                    # wait for our turn rather than getting rate limited by the exchange
+                    rate_limiter.acquire(self.exchange, func.__name__)
+                    attempt_started = time.perf_counter()
                     returnValue = func(*args, **kwargs)
+                    if metrics.enabled:
+                        metrics.observe('exchange_request_seconds', time.perf_counter() - attempt_started,
+                                        exchange=self.exchange, endpoint=func.__name__, outcome="ok")
                 except Exception as e:
-                    # MEXC exchange specific: When sending a new reduce only order,
-                    # MEXC api seems to be a bit delayed thinking the previous reduce only order has not
-                    # been cancelled yet so gives below warning. Need to wait a bit then resend
-                    mexc_reduce_only_order_error = "MEXC" in str(e) and ("Close order's vol must less or equals than position hold vol" in str(e) or "2008" in str(e))
-                    if ((i < self.tries - 1) and (isinstance(e, Timeout) or isinstance(e, MaxRetryError))) or mexc_reduce_only_order_error or \
-                       'CAPITAL unable to get deal confirmation' in str(e):
-                        if mexc_reduce_only_order_error:
-                            sleep(0.05)
-                        if sum([x in self.exchange for x in ["BINGX", "CAPITAL"]]) and func.__name__ == "futures_create_order":
+                    error_kind = self.adapter.classify_error(e)
+                    if metrics.enabled:
+                        last_outcome = error_kind or ("timeout" if isinstance(e, (Timeout, MaxRetryError)) else "error")
+                        metrics.observe('exchange_request_seconds', time.perf_counter() - attempt_started,
+                                        exchange=self.exchange, endpoint=func.__name__, outcome=last_outcome)
+                    if ((i < self.tries - 1) and (isinstance(e, Timeout) or isinstance(e, MaxRetryError))) or error_kind == RETRYABLE:
+                        if error_kind == RETRYABLE and self.adapter.retry_delay:
+                            sleep(self.adapter.retry_delay)
+                        if not self.adapter.client_order_ids and func.__name__ == "futures_create_order":
                             # Custom handling of create order timeout since no unique client order ID
                             order = handle_rate_limit_or_timeout_when_placing_order(self, *args, **kwargs)
                             if order:
@@ -494,20 +572,8 @@ class UniversalClient:
                         # ignore logging time outs unless we hit max retries
                         i = i + 1
                         continue
-                    if bool(re.match(r"Do not send more than \d orders( total)? per 200ms", str(e))) or \
-                            (isinstance(e, OkexAPIException) and e.code == "50011") or \
-                            ("MEXC" in str(e) and "510" in str(e)) or \
-                            (isinstance(e, InvalidRequestError) and e.status_code == 10018) or \
-                            'CapitalClient ERROR error.public-api.exceeded-request-rate-allowance' in str(e) or \
-                            'CapitalClient ERROR error.too-many.requests' in str(e) or \
-                            ((isinstance(e, BingxAPIException) and e.code == 80012) and 'System currently busy, try again' in str(e)) or \
-                            (isinstance(e, BingxAPIException) and e.status_code == 429):
-                        # BINGX code 80012: System currently busy, try again. Status code 429: Too Many Requests
-                        # OKEX error 50011 = Requests too frequent.
-                        # FTX order rate is limited per 200ms
-                        # MEXC error 510 = Request frequently too fast
-                        # BYBIT 10018 = Out of frequency limit
-                        if func.__name__ == 'futures_create_order' and "CAPITAL" in self.exchange:
+                    if error_kind == RATE_LIMIT:
+                        if func.__name__ == 'futures_create_order' and self.venue == "CAPITAL":
                             # CAPITAL even if rate limited error returned, order sometimes goes through
                             order = handle_rate_limit_or_timeout_when_placing_order(self, *args, **kwargs)
                             if order:
@@ -515,30 +581,17 @@ class UniversalClient:
                             else:
                                 i = i + 2
                         i = i - 1  # -1 from i means we try again infinitely many times until all orders are through
-                        sleep(0.1)
-                        continue
-                    if isinstance(e, FailedRequestError) and e.status_code == 403:
-                        # BYBIT IP rate limited, sleep for longer
-                        random_time_to_wait = random.randint(5, 60)
-                        self.logger.writeline(f"BYBIT IP rate limited from {func.__name__}!, waiting {random_time_to_wait} seconds")
-                        i = i - 1
-                        sleep(random_time_to_wait)
+                        # back off all threads using this endpoint class, not just this one
+                        self.adapter.back_off(self, e, func.__name__)
                         continue
-                    if 'CapitalClient ERROR error.security.token-invalid' in str(e) or 'CapitalClient ERROR error.invalid.session.token' in str(e):
-                        self.client_capital.refresh_security_tokens()
+                    if error_kind == IP_BLOCKED:
+                        # pause every request to the exchange for longer
+                        self.logger.writeline(f"{self.venue} IP rate limited from {func.__name__}!, waiting {self.adapter.ip_block_seconds} seconds")
+                        rate_limiter.block(self.exchange, self.adapter.ip_block_seconds)
                         i = i - 1
                         continue
-                    if isinstance(e, PhemexAPIException) and e.status_code == 429:
-                        if 'X-RateLimit-Retry-After-OTHER' in e.headers.keys():
-                            seconds_to_wait = int(e.headers['X-RateLimit-Retry-After-OTHER'])
-                        elif 'X-RateLimit-Retry-After-SPOTORDER' in e.headers.keys():
-                            seconds_to_wait = int(e.headers['X-RateLimit-Retry-After-SPOTORDER'])
-                        elif 'X-RateLimit-Retry-After-CONTRACT' in e.headers.keys():
-                            seconds_to_wait = int(e.headers['X-RateLimit-Retry-After-CONTRACT'])
-                        else:
-                            seconds_to_wait = int(e.headers['X-RateLimit-Retry-After'])
-                        self.logger.writeline(f"PHEMEX rate limited from {func.__name__}!, waiting {seconds_to_wait} seconds", discord_channel_id=DISCORD_ERROR_MESSAGES_CHANNEL_ID)
-                        sleep(seconds_to_wait)
+                    if error_kind == AUTH_EXPIRED:
+                        self.adapter.refresh_auth(self)
                         i = i - 1
                         continue
                     # self.logger.writeline(f"EXCEPTION in {func.__name__}!: {args[1:]} {kwargs} {e}")
@@ -547,17 +600,13 @@ class UniversalClient:
                     if func.__name__ == "futures_create_order":
                         isLongStopLoss = kwargs['side'] == "SELL" and kwargs['reduceOnly'] is True and kwargs['type'] == self.ORDER_TYPE_STOP_MARKET
                         isShortStopLoss = kwargs['side'] == "BUY" and kwargs['reduceOnly'] is True and kwargs['type'] == self.ORDER_TYPE_STOP_MARKET
-                        if self.exchange == "BINANCE":
+                        if error_kind == DUPLICATE_ID:
+                            return handle_duplicate_client_id_error(self, *args, **kwargs)
+                        if self.venue == "BINANCE":
                             if isLongStopLoss and isShortStopLoss and isinstance(e, BinanceAPIException) and e.code == -2021:  # code for 'Order will immediately trigger'
                                 self.logger.writeline(f"ERROR: {func.__name__} {args[1:]} {kwargs} Stop loss unable to be submitted, closing at market...")
                                 return self.futures_close_position(get_symbol_from_args(*args, **kwargs))
-                            # if the error when placing a limit order is one of the following then we need to return the order
-                            # that was submitted successfully to the server
-                            if isinstance(e, BinanceAPIException) and (e.code == -2022 or e.code == -4015):  # codes for 'ReduceOnly Order is rejected' and 'Client order id is not valid'
-                                return handle_duplicate_client_id_error(self, *args, **kwargs)
-                        elif "FTX" in self.exchange:
-                            if str(e) == "Duplicate client order ID":
-                                return handle_duplicate_client_id_error(self, *args, **kwargs)
+                        elif self.venue == "FTX":
                             if str(e) == "Invalid reduce-only order":
                                 # attempted to close a position but a previous reduce-only order must've been filled
                                 # at the same time or there is already a reduce-only order open.
@@ -568,13 +617,11 @@ class UniversalClient:
                                         return order
                                 self.logger.writeline(f"ERROR: {get_symbol_from_args(*args, **kwargs)} 'Invalid reduce-only order' and unable to get past reduce only order, skipping new reduce only order placement")
                                 raise Exception(f"{datetime.now().strftime('%d/%m/%Y %H:%M:%S')} ERROR: {get_symbol_from_args(*args, **kwargs)} skipping reduce only order placement")
-                        elif "OKEX" in self.exchange:
+                        elif self.venue == "OKEX":
                             if (isLongStopLoss or isShortStopLoss) and isinstance(e, OkexAPIException) and e.message == "Close order size exceeds your available size":
                                 # OKEX does not allow a TP limit order be active the same time as a STOP or STOP MARKET stop loss order
                                 # Will need to work with OCO trigger orders if this feature is to be used
                                 raise Exception("OKEX stop loss orders not supported")
-                            if isinstance(e, OkexAPIException) and e.code == "51016":  # duplicate client ID
-                                return handle_duplicate_client_id_error(self, *args, **kwargs)
                             if isinstance(e, OkexAPIException) and e.code == "51112":  # close order size exceeds your available size
                                 symbol = get_symbol_from_args(*args, **kwargs)
                                 position_size = get_position_size(self.futures_get_position(symbol))
@@ -596,20 +643,12 @@ class UniversalClient:
                                 self.logger.writeline(f"{symbol} Changing leverage to {current_leverage-1}")
                                 self.futures_cancel_all_orders(symbol=symbol)
                                 self.futures_change_leverage(symbol, current_leverage-1)
-                        elif "GATE" in self.exchange:
+                        elif self.venue == "GATE":
                             pass
-                        elif "MEXC" in self.exchange:
-                            if "Duplicate order ID" in str(e) or "2042" in str(e):
-                                return handle_duplicate_client_id_error(self, *args, **kwargs)
-                        elif "BYBIT" in self.exchange:
-                            if isinstance(e, InvalidRequestError) and (e.status_code == 30089 or e.status_code == 1141):
-                                return handle_duplicate_client_id_error(self, *args, **kwargs)
-                        elif "PHEMEX" in self.exchange:
-                            if isinstance(e, PhemexAPIException) and e.code == 11085:  # duplicate client order id
-                                return handle_duplicate_client_id_error(self, *args, **kwargs)
-                            elif isinstance(e, PhemexAPIException) and e.code == 11011:  # invalid reduce only
+                        elif self.venue == "PHEMEX":
+                            if isinstance(e, PhemexAPIException) and e.code == 11011:  # invalid reduce only
                                 return
-                        elif "BINGX" in self.exchange:
+                        elif self.venue == "BINGX":
                             if isinstance(e, BingxAPIException) and e.code == 80014:  # "Insufficient position, please adjust and resubmit" when placing an invalid reduce only order, we skip
                                 return
                             if '"Code":101414' in str(e):  # sometimes this error code appears when placing orders, must try again
@@ -621,17 +660,13 @@ class UniversalClient:
                             symbol = get_symbol_from_args(*args, **kwargs)
                             self.logger.writeline(f"ERROR {e} when placing BINGX order for {symbol} {kwargs}, cancelling", discord_channel_id=DISCORD_ERROR_MESSAGES_CHANNEL_ID)
                             return
-                        elif "CAPITAL" in self.exchange:
+                        elif self.venue == "CAPITAL":
                             # if there is an error creating an order it probably means we tried to reduce position
                             # with no position opened or error trying to get the order we already placed
                             # so we don't retry for either cases
                             self.logger.writeline(f'{e}')
                             raise e
-                    if isinstance(e, BinanceAPIException) and e.code == -2013:  # Order does not exist
-                        return None
-                    if isinstance(e, OkexAPIException) and e.code == "51603":  # Order does not exist
-                        return None
-                    if isinstance(e, GateApiException) and e.label == "ORDER_NOT_FOUND":
+                    if error_kind == NOT_FOUND:
                         return None
                     if isinstance(e, GateApiException) and str(e.status) == "500":  # Server Error
                         raise e
@@ -691,7 +726,7 @@ class UniversalClient:
                                "stepSize": csv_data[2]})
             return result
 
-        if self.exchange == "BINANCE":
+        if self.venue == "BINANCE":
             for pair in self.client_binance.futures_exchange_info().get('symbols'):
                 for f in pair['filters']:
                     if f.get('tickSize'):
@@ -700,7 +735,7 @@ class UniversalClient:
                             'filterType') == "LOT_SIZE":  # there is another stepSize under ['filterType']="MARKET_LOT_SIZE" that is given
                         stepSize = f.get('stepSize')
                 result.append({"symbol": pair.get('symbol'), "tickSize": tickSize, "stepSize": stepSize})
-        elif self.exchange == "BINANCE_SPOT":
+        elif self.venue == "BINANCE_SPOT":
             for pair in self.client_binance.get_exchange_info().get('symbols'):
                 if str(pair['symbol']).endswith("USDT"):
                     for f in pair['filters']:
@@ -710,40 +745,41 @@ class UniversalClient:
                                 'filterType') == "LOT_SIZE":  # there is another stepSize under ['filterType']="MARKET_LOT_SIZE" that is given
                             stepSize = f.get('stepSize')
                     result.append({"symbol": pair.get('symbol'), "tickSize": tickSize, "stepSize": stepSize})
-        elif "FTX" in self.exchange:
+        elif self.venue == "FTX":
             for pair in self.client_ftx.get_markets():
                 if "PERP" in pair.get('name') and "PERP/USD" not in pair.get('name'):
                     result.append({"symbol": pair.get('name'),
                                    "tickSize": format_float_in_standard_form(pair.get("priceIncrement")),
                                    "stepSize": format_float_in_standard_form(pair.get('sizeIncrement'))})
-        elif "OKEX" in self.exchange:
+        elif self.venue == "OKEX":
             for instrument in self.client_okex.get_instruments("SWAP"):
                 result.append({"symbol": instrument.get('instId'),
                                "tickSize": instrument.get("tickSz"),
                                "stepSize": instrument.get('ctVal')})
-        elif "GATE" in self.exchange:
+        elif self.venue == "GATE":
             for instrument in self.client_gate.list_futures_contracts(settle="usdt", _request_timeout=(self.timeout, self.timeout)):
                 result.append({"symbol": instrument.name,
                                "tickSize": instrument.order_price_round,
                                "stepSize": instrument.quanto_multiplier})
-        elif "BYBIT" in self.exchange:
+        elif self.venue == "BYBIT":
             for instrument in self.client_bybit.query_symbol():
                 if instrument["contractType"] == 'LinearPerpetual':
                     result.append({"symbol": instrument['symbol'],
                                    "tickSize": instrument['priceFilter']['tickSize'],
-                                   "stepSize": format_float_in_standard_form(instrument['lotSizeFilter']['qtyStep'])})
-        elif "MEXC" in self.exchange:
+                                   "stepSize": format_float_in_standard_form(instrument['lotSizeFilter']['qtyStep']),
+                                   "maxQty": instrument['lotSizeFilter']['maxOrderQty']})
+        elif self.venue == "MEXC":
             for instrument in self.client_mexc.get_contract_detail():
                 result.append({"symbol": instrument.get('symbol'),
                                "tickSize": format_float_in_standard_form(instrument.get("priceUnit")),
                                "stepSize": format_float_in_standard_form(instrument.get('contractSize'))})
-        elif "KUCOIN" in self.exchange:
+        elif self.venue == "KUCOIN":
             for instrument in self.client_kucoin_market.get_contracts_list():
                 if "USDTM" in instrument.get('symbol'):
                     result.append({"symbol": instrument.get('symbol'),
                                    "tickSize": format_float_in_standard_form(instrument.get("tickSize")),
                                    "stepSize": format_float_in_standard_form(instrument.get('multiplier'))})
-        elif "CAPITAL" in self.exchange:
+        elif self.venue == "CAPITAL":
             # API does not provide all instruments, only what is most trending/traded so getting instruments
             # from the API varies from whenever it is called. We must therefore store a local file of known
             # instruments to look up upon.
@@ -781,7 +817,7 @@ class UniversalClient:
                 if sym_data['instrument']['type'] == 'CURRENCIES' and 'bid' in sym_data['snapshot']:
                     self.capital_exchange_rate_data[sym_data['instrument']['epic']] = sym_data['snapshot']['bid']
                 self.capital_instrument_currency_data[sym_data['instrument']['epic']] = sym_data['instrument']['currency']
-        elif "IG" in self.exchange:
+        elif self.venue == "IG":
             symbol_list = []
             result = []
             node_ids_to_check = ['264146', '264141', '264148', '264246', '264160',
@@ -796,7 +832,7 @@ class UniversalClient:
                                    10 ** -sym_data['snapshot']['decimalPlacesFactor']),
                                "stepSize": format_float_in_standard_form(float(sym_data['instrument'][
                                                                                    'contractSize']) * 0.01)})  # Step size for forex is denoted for first quoted currency. Hard coded 0.01 ratio step size as this seems to be the default and is not listed in api
-        elif "PHEMEX" in self.exchange:
+        elif self.venue == "PHEMEX":
             result = []
             products = self.client_phemex.query_product_information()['products']
             for product in products:
@@ -804,7 +840,7 @@ class UniversalClient:
                     result.append({"symbol": product['symbol'],
                                    "tickSize": format_float_in_standard_form(product['tickSize']),
                                    "stepSize": format_float_in_standard_form(product['contractSize'])})
-        elif "BITRUE" in self.exchange:
+        elif self.venue == "BITRUE":
             result = []
             contracts = self.client_bitrue.get_contracts()
             for contract in contracts:
@@ -812,14 +848,14 @@ class UniversalClient:
                     result.append({"symbol": contract['symbol'],
                                    "tickSize": format_float_in_standard_form(10 ** -contract['pricePrecision']),
                                    "stepSize": format_float_in_standard_form(contract['multiplier'])})
-        elif "BINGX" in self.exchange:
+        elif self.venue == "BINGX":
             result = []
             contracts = self.client_bingx.contract_information()['contracts']
             for contract in contracts:
                 result.append({"symbol": contract['symbol'],
                                "tickSize": contract['minStep'],
                                "stepSize": contract['size']})
-        elif "XT" in self.exchange:
+        elif self.venue == "XT":
             result = []
             contracts = self.client_xt.get_exchange_info()
             for contract in contracts:
@@ -852,55 +888,55 @@ class UniversalClient:
             price: str
         }
         """
-        if self.exchange == "BINANCE":
+        if self.venue == "BINANCE":
             return self.client_binance.futures_symbol_ticker(symbol=symbol)
-        elif "FTX" in self.exchange:
+        elif self.venue == "FTX":
             result = self.client_ftx.get_market(market=symbol)
             return {"symbol": result['name'], "price": format_float_in_standard_form(result['last'])}
-        elif "OKEX" in self.exchange:
+        elif self.venue == "OKEX":
             result = self.client_okex.get_ticker(symbol)
             return {"symbol": result['instId'], "price": result['last']}
-        elif "GATE" in self.exchange:
+        elif self.venue == "GATE":
             result = self.client_gate.list_futures_tickers(settle="usdt", contract=symbol, _request_timeout=(self.timeout, self.timeout))[0]
             return {"symbol": result.contract, "price": result.last}
-        elif "MEXC" in self.exchange:
+        elif self.venue == "MEXC":
             result = self.client_mexc.get_contract_ticker(symbol=symbol)
             return {"symbol": result['symbol'], "price": format_float_in_standard_form(result['lastPrice'])}
-        elif "BYBIT" in self.exchange:
+        elif self.venue == "BYBIT":
             result = self.client_bybit.latest_information_for_symbol(symbol=symbol)[0]
             return {"symbol": result['symbol'], "price": result['lastPrice']}
-        elif "IG" in self.exchange:
+        elif self.venue == "IG":
             # return mid price of bid and ask
             result = self.client_ig.get_klines(epic=symbol, resolution="MINUTE", limit=1)
             bid = result['prices'][0]['closePrice']['bid']
             ask = result['prices'][0]['closePrice']['ask']
             mid_price = round_interval_nearest((bid + ask) / 2, self.precisionPriceDict[symbol])
             return {"symbol": symbol, "price": str(mid_price)}
-        elif "CAPITAL" in self.exchange:
+        elif self.venue == "CAPITAL":
             # return mid price of bid and ask
             result = self.client_capital.get_klines(epic=symbol, resolution="MINUTE", limit=1)
             bid = result['prices'][0]['closePrice']['bid']
             ask = result['prices'][0]['closePrice']['ask']
             mid_price = round_interval_nearest((bid + ask) / 2, self.precisionPriceDict[symbol])
             return {"symbol": symbol, "price": str(mid_price)}
-        elif "PHEMEX" in self.exchange:
+        elif self.venue == "PHEMEX":
             last_price = Decimal(str(self.client_phemex.query_24h_ticker(symbol=symbol)['close'])) * Decimal('0.0001')
             return {"symbol": symbol, "price": str(last_price)}
-        elif "BINGX" in self.exchange:
+        elif self.venue == "BINGX":
             last_price = self.client_bingx.get_latest_price_of_a_trading_pair(symbol)
             return {"symbol": symbol, "price": str(round_interval_nearest(last_price['tradePrice'], self.precisionPriceDict[symbol]))}
 
     @tries_wrapper
     def futures_mark_price(self, symbol):
-        if self.exchange == "BINANCE":
+        if self.venue == "BINANCE":
             return self.client_binance.futures_mark_price(symbol=symbol)
-        elif "FTX" in self.exchange:
+        elif self.venue == "FTX":
             # TODO: futures_mark_price for FTX (not currently needed for strategy)
             raise Exception("futures_mark_price for FTX TODO")
-        elif "OKEX" in self.exchange:
+        elif self.venue == "OKEX":
             # TODO: futures_mark_price for OKEX (not currently needed for strategy)
             raise Exception("futures_mark_price for OKEX TODO")
-        elif "GATE" in self.exchange:
+        elif self.venue == "GATE":
             # TODO: futures_mark_price for GATE (not currently needed for strategy)
             raise Exception("futures_mark_price for GATE TODO")
         raise Exception("futures_mark_price TODO")
@@ -926,13 +962,13 @@ class UniversalClient:
             ]
         ]
         """
-        if self.exchange == "BINANCE":
+        if self.venue == "BINANCE":
             return self.client_binance.futures_klines(symbol=symbol, interval=interval, limit=limit,
                                                       startTime=startTime, endTime=endTime)
-        elif self.exchange == "BINANCE_SPOT":
+        elif self.venue == "BINANCE_SPOT":
             return self.client_binance.get_klines(symbol=symbol, interval=interval, limit=limit,
                                                   startTime=startTime, endTime=endTime)
-        elif "FTX" in self.exchange:
+        elif self.venue == "FTX":
             # FTX kline data from REST API is not updated realtime
             # Completed candles can are also not final it seems, the completed candles can change when queried in the future
             # The candles don't also match up exactly on TV
@@ -951,7 +987,7 @@ class UniversalClient:
                                format_float_in_standard_form(kline['volume']),
                                int(kline['time']) + int(binance_intervals_to_seconds(interval))*1000 - 1])
             return result
-        elif "OKEX" in self.exchange:
+        elif self.venue == "OKEX":
             # start time exclusive
             # end time exclusive
             result = []
@@ -971,7 +1007,7 @@ class UniversalClient:
                               int(kline[0]) + int(binance_intervals_to_seconds(interval))*1000 - 1,
                               round(Decimal(kline[6]) * ((Decimal(kline[2])+Decimal(kline[3]))/2), 2)])  # estimated volume in USD
             return result
-        elif "GATE" in self.exchange:
+        elif self.venue == "GATE":
             # NOTE: if retrieving last n candles and all n candles have 0 volume, GATE API returns an empty array!
             # To counter the above, always fetch at least 300 candles and return only the last specified limit
             result = []
@@ -1002,7 +1038,7 @@ class UniversalClient:
                 return result[:limit]
             else:
                 return result[-limit:]
-        elif "BYBIT" in self.exchange:
+        elif self.venue == "BYBIT":
             # NOTE: BYBIT API sometimes does not return the freshly created candle. e.g. when requesting 2 candles
             # at around the time a new candle is generated, only 1 candle (the old candle) is returned.
             # currently handle the above using WS
@@ -1024,7 +1060,7 @@ class UniversalClient:
                 # if limit != 200 and (200 > limit != len(candles)) or (limit >= 200 and len(candles) != 200):
                 #     self.logger.writeline(f"{symbol} API WARNING: Asked for {limit} candles but got {len(candles)}")
             return result
-        elif "MEXC" in self.exchange:
+        elif self.venue == "MEXC":
             result = []
             if startTime is None:
                 start_time = ""
@@ -1047,7 +1083,7 @@ class UniversalClient:
                                    int(candles['time'][-i] * 1000) + int(binance_intervals_to_seconds(interval)) * 1000 - 1,
                                    format_float_in_standard_form(candles['amount'][-i])])
             return result
-        elif "KUCOIN" in self.exchange:
+        elif self.venue == "KUCOIN":
             # API Note: Candles with 0 volume are skipped e.g if requesting the latest 3 candles but one of the candles
             # has 0 volume, the API skips the 0 volume candle and returns the last 3 candles with volume in. This can
             # cause gaps in the 'start_time' values in the candles data and retrieves older data than asked so is
@@ -1110,25 +1146,25 @@ class UniversalClient:
                 result = [c for c in result if c[0] >= startTime]
                 return result[:limit]
             return result[-limit:]
-        elif "CAPITAL" in self.exchange or "IG" in self.exchange:
+        elif self.venue == "CAPITAL" or self.venue == "IG":
             # CAPITAL Klines seem to be delayed by around 20 seconds, may also be gaps in candles if no volume traded.
             # New candles may not be made on time until volume shows up
             # IG only gives last 20 klines in a single call, 60 stored
-            if "CAPITAL" in self.exchange:
+            if self.venue == "CAPITAL":
                 client = self.client_capital
-            elif "IG" in self.exchange:
+            elif self.venue == "IG":
                 client = self.client_ig
             result = []
             result_asks = []
             if startTime is not None:
-                if "CAPITAL" in self.exchange:
+                if self.venue == "CAPITAL":
                     # CAPITAL takes UTC time
                     startTime = datetime.utcfromtimestamp(startTime/1000).strftime(CAPITAL_DATETIME_STRING_FORMAT)
                 else:
                     # IG takes time in local(?)
                     startTime = datetime.fromtimestamp(startTime / 1000).strftime(CAPITAL_DATETIME_STRING_FORMAT)
             if endTime is not None:
-                if "CAPITAL" in self.exchange:
+                if self.venue == "CAPITAL":
                     endTime = datetime.utcfromtimestamp(endTime/1000).strftime(CAPITAL_DATETIME_STRING_FORMAT)
                 else:
                     endTime = datetime.fromtimestamp(endTime / 1000).strftime(CAPITAL_DATETIME_STRING_FORMAT)
@@ -1156,7 +1192,7 @@ class UniversalClient:
                 except KeyError:
                     continue
             return result, result_asks
-        elif "PHEMEX" in self.exchange:
+        elif self.venue == "PHEMEX":
             # note candles are delayed by 1 min
             result = []
             if endTime is None:
@@ -1180,7 +1216,7 @@ class UniversalClient:
                               int(kline[0]*1000) + int(binance_intervals_to_seconds(interval))*1000 - 1,
                               format_float_in_standard_form(Decimal(str(kline[8])) * Decimal('0.0001'))])  # estimated volume in USD
             return result[-limit:]
-        elif "BITRUE" in self.exchange:
+        elif self.venue == "BITRUE":
             # not does not return current incomplete candle
             result = []
             candles = self.client_bitrue.get_klines(contractName=symbol, interval=binance_intervals_to_bitrue_intervals(interval), limit=min(300, limit))
@@ -1199,7 +1235,7 @@ class UniversalClient:
             if endTime is not None:
                 result = [k for k in result if k[6] < endTime]
             return result
-        elif "BINGX" in self.exchange:
+        elif self.venue == "BINGX":
             # Note: daily candles are in UTC+8
             # Does not get latest candle, described below
             result = []
@@ -1237,7 +1273,7 @@ class UniversalClient:
                                str(round(vol * ((hi+lo)/2), 2))  # estimated volume in USD
                                ])
             return result
-        elif "XT" in self.exchange:
+        elif self.venue == "XT":
             result = []
             klines = self.client_xt.get_kline(symbol=symbol, interval=interval, startTime=startTime, endTime=endTime, limit=limit)
             for kline in klines:
@@ -1273,12 +1309,12 @@ class UniversalClient:
                     "positionAmt": '0', "symbol": symbol,
                     "unRealizedProfit": '0'}
 
-        if self.exchange == "BINANCE":
+        if self.venue == "BINANCE":
             if symbol:
                 return self.client_binance.futures_position_information(symbol=symbol)
             else:
                 return [x for x in self.client_binance.futures_position_information() if float(x['positionAmt']) != 0]
-        elif "FTX" in self.exchange:
+        elif self.venue == "FTX":
             result = []
             if symbol:
                 positions = [x for x in self.client_ftx.get_positions() if x and x['size'] != 0 and x['future'] == symbol]
@@ -1302,7 +1338,7 @@ class UniversalClient:
             elif symbol:
                 result.append(zero_initialised_dict())
             return result
-        elif "OKEX" in self.exchange:
+        elif self.venue == "OKEX":
             result = []
             positions = self.client_okex.get_positions("SWAP", symbol)
             if isinstance(positions, dict):  # if only one position if found, OKEX api returns it as a dict instead of a list
@@ -1313,7 +1349,7 @@ class UniversalClient:
                 for position in positions:
                     result.append(self.process_okex_position_to_binance_position(position, symbol))
             return result
-        elif "GATE" in self.exchange:
+        elif self.venue == "GATE":
             result = []
             positions = []
             if symbol:
@@ -1338,7 +1374,7 @@ class UniversalClient:
                                    "positionAmt": str(position.size * self.precisionQuantityDict[position.contract]), "symbol": position.contract,
                                    "unRealizedProfit": position.unrealised_pnl})
             return result
-        elif "MEXC" in self.exchange:
+        elif self.venue == "MEXC":
             result = []
             positions = self.client_mexc.get_open_positions(symbol=symbol)
             if not positions and symbol is not None:
@@ -1346,7 +1382,7 @@ class UniversalClient:
             for position in positions:
                 result.append(self.process_mexc_position_to_binance(position))
             return result
-        elif "BYBIT" in self.exchange:
+        elif self.venue == "BYBIT":
             result = []
             positions = self.client_bybit.my_position(symbol=symbol)
             if symbol is not None:
@@ -1360,7 +1396,7 @@ class UniversalClient:
                 for position in positions:
                     result.append(self.process_bybit_position_to_binance(position))
             return result
-        elif "IG" in self.exchange:
+        elif self.venue == "IG":
             result = []
             positions = self.client_ig.fetch_open_positions()['positions']
             if not positions and symbol is not None:
@@ -1373,7 +1409,7 @@ class UniversalClient:
                 for position in positions:
                     result.append(self.process_ig_position_to_binance(position))
             return result
-        elif "CAPITAL" in self.exchange:
+        elif self.venue == "CAPITAL":
             result = []
             positions = self.client_capital.get_positions()['positions']
             if symbol is not None:
@@ -1398,7 +1434,7 @@ class UniversalClient:
             if not result and symbol is not None:
                 return [zero_initialised_dict()]
             return result
-        elif "PHEMEX" in self.exchange:
+        elif self.venue == "PHEMEX":
             result = []
             positions = self.client_phemex.query_account_n_positions('USD')['positions']
             positions = [p for p in positions if p['size'] != 0]
@@ -1408,7 +1444,7 @@ class UniversalClient:
             if not result and symbol is not None:
                 result.append(zero_initialised_dict())
             return result
-        elif "BINGX" in self.exchange:
+        elif self.venue == "BINGX":
             result = []
             positions = self.client_bingx.get_positions(symbol)['positions']
             if positions:
@@ -1431,52 +1467,52 @@ class UniversalClient:
             }
         ]
         """
-        if self.exchange == "BINANCE":
+        if self.venue == "BINANCE":
             return self.client_binance.futures_account_balance()
-        elif "FTX" in self.exchange:
+        elif self.venue == "FTX":
             result = []
             for asset in self.client_ftx.get_balances():
                 result.append({"asset": asset['coin'], "balance": format_float_in_standard_form(asset['total'])})
             return result
-        elif "OKEX" in self.exchange:
+        elif self.venue == "OKEX":
             result = []
             for asset in self.client_okex.get_account()['details']:
                 result.append({"asset": asset['ccy'], "balance": asset['eq']})
             return result
-        elif "GATE" in self.exchange:
+        elif self.venue == "GATE":
             result = []
             settle_currencies = ['usdt']
             for cur in settle_currencies:
                 res = self.client_gate.list_futures_accounts(settle=cur, _request_timeout=(self.timeout, self.timeout))
                 result.append({"asset": res.currency, "balance": res.total})
             return result
-        elif "MEXC" in self.exchange:
+        elif self.venue == "MEXC":
             result = []
             assets = self.client_mexc.get_account_assets()
             for asset in assets:
                 result.append({"asset": asset['currency'], "balance": format_float_in_standard_form(asset['equity'])})
             return result
-        elif "BYBIT" in self.exchange:
+        elif self.venue == "BYBIT":
             result = []
             assets = self.client_bybit.get_wallet_balance()[0]['coin']
             for asset in assets:
                 result.append({"asset": asset['coin'], "balance": format_float_in_standard_form(asset['equity'])})
             return result
-        elif "IG" in self.exchange:
+        elif self.venue == "IG":
             accounts = self.client_ig.fetch_accounts()['accounts']
             for account in accounts:
                 if self.client_ig.subaccount is None and account['preferred']:
                     return [{"asset": account['currency'], "balance": format_float_in_standard_form(account['balance']['balance'])}]
                 elif account['accountName'] == self.client_ig.subaccount:
                     return [{"asset": account['currency'], "balance": format_float_in_standard_form(account['balance']['balance'])}]
-        elif "CAPITAL" in self.exchange:
+        elif self.venue == "CAPITAL":
             accounts = self.client_capital.get_account_info()['accounts']
             for account in accounts:
                 if self.client_capital.subaccount is None and account['preferred']:
                     return [{"asset": account['currency'], "balance": format_float_in_standard_form(account['balance']['balance'])}]
                 elif account['accountName'] == self.client_capital.subaccount:
                     return [{"asset": account['currency'], "balance": format_float_in_standard_form(account['balance']['balance'])}]
-        elif "PHEMEX" in self.exchange:
+        elif self.venue == "PHEMEX":
             # currently only returns main account balances, is there a way to use subaccounts from API?
             result = []
             accounts = self.client_phemex.query_client_and_wallets()
@@ -1485,7 +1521,7 @@ class UniversalClient:
             for asset in assets:
                 result.append({"asset": asset['currency'], "balance": asset['accountBalance']})
             return result
-        elif "BINGX" in self.exchange:
+        elif self.venue == "BINGX":
             result = []
             account = self.client_bingx.get_account_asset_information('USDT')['account']
             result.append({"asset": account['currency'], "balance": account['balance']})
@@ -1497,7 +1533,7 @@ class UniversalClient:
         gets the assets that are able to be used as margin for multi-margin asset mode
         :return: list of multi-margin assets
         """
-        if self.exchange == "BINANCE":
+        if self.venue == "BINANCE":
             assets = self.client_binance.futures_account()['assets']
             result = []
             for asset in assets:
@@ -1520,41 +1556,41 @@ class UniversalClient:
         for BYBIT: USDT equity
         for IG: GBP equity
         """
-        if self.exchange == "BINANCE":
+        if self.venue == "BINANCE":
             return self.client_binance.futures_account()['totalMarginBalance']
-        elif "FTX" in self.exchange:
+        elif self.venue == "FTX":
             balances = self.client_ftx.get_balances()
             for balance in balances:
                 if balance['coin'] == 'USD':
                     return format_float_in_standard_form(balance['total'])
-        elif "OKEX" in self.exchange:
+        elif self.venue == "OKEX":
             return self.client_okex.get_account("USDT")['details'][0]['eq']
-        elif "GATE" in self.exchange:
+        elif self.venue == "GATE":
             ac_info = self.client_gate.list_futures_accounts(settle="usdt", _request_timeout=(self.timeout, self.timeout))
             return str(Decimal(ac_info.total) + Decimal(ac_info.unrealised_pnl))
-        elif "MEXC" in self.exchange:
+        elif self.venue == "MEXC":
             return format_float_in_standard_form(self.client_mexc.get_account_asset("USDT")['equity'])
-        elif "BYBIT" in self.exchange:
+        elif self.venue == "BYBIT":
             return format_float_in_standard_form(self.client_bybit.get_wallet_balance(coin="USDT")[0]["totalEquity"])
-        elif "IG" in self.exchange:
+        elif self.venue == "IG":
             accounts = self.client_ig.fetch_accounts()['accounts']
             for account in accounts:
                 if self.client_ig.subaccount is None and account['preferred']:
                     return format_float_in_standard_form(account['balance']['balance'] + account['balance']['profitLoss'])
                 elif account['accountName'] == self.client_ig.subaccount:
                     return format_float_in_standard_form(account['balance']['balance'] + account['balance']['profitLoss'])
-        elif "CAPITAL" in self.exchange:
+        elif self.venue == "CAPITAL":
             accounts = self.client_capital.get_account_info()['accounts']
             for account in accounts:
                 if self.client_capital.subaccount is None and account['preferred']:
                     return format_float_in_standard_form(account['balance']['balance'] + account['balance']['profitLoss'])
                 elif account['accountName'] == self.client_capital.subaccount:
                     return format_float_in_standard_form(account['balance']['balance'] + account['balance']['profitLoss'])
-        elif "PHEMEX" in self.exchange:
+        elif self.venue == "PHEMEX":
             balance = [b for b in self.futures_account_balance() if b['asset'] == 'USD'][0]['balance']
             positions_unrealised = [Decimal(p['unRealizedProfit']) for p in self.futures_get_position()]
             return str(Decimal(balance) + sum(positions_unrealised))
-        elif "BINGX" in self.exchange:
+        elif self.venue == "BINGX":
             equity = self.client_bingx.get_account_asset_information("USDT")['account']['equity']
             return str(equity)
 
@@ -1564,9 +1600,9 @@ class UniversalClient:
         Gets total margin wallet balance (just margin balance without unrealised pnl) for futures trading
         for Binance, utilises multi-margin mode to get total of all available assets
         """
-        if self.exchange == "BINANCE":
+        if self.venue == "BINANCE":
             return self.client_binance.futures_account()['totalWalletBalance']
-        elif "FTX" in self.exchange:
+        elif self.venue == "FTX":
             balances = self.client_ftx.get_balances()
             for balance in balances:
                 if balance['coin'] == 'USD':
@@ -1576,21 +1612,21 @@ class UniversalClient:
                 if position['size'] != 0.0:
                     total_unrealised_pnl += position['recentPnl']
             return str(format_float_in_standard_form(equity - total_unrealised_pnl))
-        elif "OKEX" in self.exchange:
+        elif self.venue == "OKEX":
             return self.client_okex.get_account("USDT")['details'][0]['cashBal']
-        elif "GATE" in self.exchange:
+        elif self.venue == "GATE":
             return self.client_gate.list_futures_accounts(settle="usdt", _request_timeout=(self.timeout, self.timeout)).total
-        elif "MEXC" in self.exchange:
+        elif self.venue == "MEXC":
             return format_float_in_standard_form(self.client_mexc.get_account_asset("USDT")['cashBalance'])
-        elif "BYBIT" in self.exchange:
+        elif self.venue == "BYBIT":
             return format_float_in_standard_form(self.client_bybit.get_wallet_balance(coin="USDT")[0]['coin'][0]["walletBalance"])
-        elif "IG" in self.exchange:
+        elif self.venue == "IG":
             return self.futures_account_balance()[0]['balance']
-        elif "CAPITAL" in self.exchange:
+        elif self.venue == "CAPITAL":
             return self.futures_account_balance()[0]['balance']
-        elif "PHEMEX" in self.exchange:
+        elif self.venue == "PHEMEX":
             return [b for b in self.futures_account_balance() if b['asset'] == 'USD'][0]['balance']
-        elif "BINGX" in self.exchange:
+        elif self.venue == "BINGX":
             balance = self.client_bingx.get_account_asset_information("USDT")['account']['balance']
             return str(balance)
 
@@ -1618,7 +1654,7 @@ class UniversalClient:
         if newClientOrderId is None:
             newClientOrderId = str(int(time.time()))
 
-        if self.exchange == "BINANCE":
+        if self.venue == "BINANCE":
             return self.client_binance.futures_create_order(symbol=symbol,
                                                             side=side,
                                                             type=type,
@@ -1629,7 +1665,7 @@ class UniversalClient:
                                                             recvWindow=recvWindow,
                                                             newClientOrderId=newClientOrderId,
                                                             stopPrice=stopPrice)
-        elif "FTX" in self.exchange:
+        elif self.venue == "FTX":
             # Note that Binance and FTX have same 'side' and 'type' specifications but FTX defines them in lower case
             # e.g. on Binance, side = "BUY" | "SELL", on FTX side = "buy" | "sell". Therefore we .lower() these params
             # Binance valid order statuses:
@@ -1689,7 +1725,7 @@ class UniversalClient:
                         "status": status,
                         "reduceOnly": order['reduceOnly'],
                         "origQty": format_float_in_standard_form(order['size'])}
-        elif "OKEX" in self.exchange:
+        elif self.venue == "OKEX":
             # 'sz' must be an integer multiple of lot size - we must convert quantity (denoted in crypto) to an integer
             # if the instrument is USDT margined, lot_size is denoted in the cryptocurrency
             # else if the instrument is USD margined, lot_size is denoted in USD
@@ -1710,19 +1746,7 @@ class UniversalClient:
                 ordType = "post_only"
             else:
                 ordType = type.lower()
-            if self.okex_pos_mode == 'net':
-                posSide = 'net'
-            else:
-                if reduceOnly is None or reduceOnly is False:
-                    if side == self.SIDE_BUY:
-                        posSide = 'long'
-                    else:
-                        posSide = 'short'
-                else:
-                    if side == self.SIDE_BUY:
-                        posSide = 'short'
-                    else:
-                        posSide = 'long'
+            posSide = self.okex_pos_side(side, reduceOnly)
             orderId = None
             if stopPrice is None:
                 # need to strip non alpha-numeric characters and truncate to 32 length for the clientID
@@ -1759,7 +1783,7 @@ class UniversalClient:
             if self.okex_pos_mode == 'net' and reduceOnly:
                 self.reduce_only_orders[orderId] = int(time.time())
             return self.futures_get_order(symbol=symbol, orderId=orderId)
-        elif "GATE" in self.exchange:
+        elif self.venue == "GATE":
             if timeInForce == "GTX":
                 time_in_force = "poc"
             else:
@@ -1792,7 +1816,7 @@ class UniversalClient:
                                                   trigger={"price": str(stopPrice), "rule": rule})
                 order = self.client_gate.create_price_triggered_order(settle="usdt", futures_price_triggered_order=body, _request_timeout=(self.timeout, self.timeout))
                 return self.futures_get_order(symbol=symbol, orderId=order.id)
-        elif "MEXC" in self.exchange:
+        elif self.venue == "MEXC":
             # orderType, 1:price limited order, 2:Post Only Maker, 3:transact or cancel instantly,
             # 4 : transact completely or cancel completely, 5:market orders,6 convert market price to current price
             type = 1
@@ -1803,19 +1827,10 @@ class UniversalClient:
             size = int(math.floor(Decimal(str(quantity)) / self.precisionQuantityDict[symbol]))
             if size == 0:
                 raise Exception("MEXC client too small order size!")
-            # order_side 1 open long ,2close short,3open short ,4 close l
-            if side == self.SIDE_BUY and not reduceOnly:
-                order_side = 1
-            elif side == self.SIDE_BUY and reduceOnly is True:
-                order_side = 2
-            elif side == self.SIDE_SELL and reduceOnly is True:
-                order_side = 4
-            elif side == self.SIDE_SELL and not reduceOnly:
-                order_side = 3
-            order_id = self.client_mexc.submit_order(symbol=symbol, price=str(price), vol=size, side=order_side, type_=type, open_type=2, external_oid=newClientOrderId[:32])
+            order_id = self.client_mexc.submit_order(symbol=symbol, price=str(price), vol=size, side=self.mexc_order_side(side, reduceOnly), type_=type, open_type=2, external_oid=newClientOrderId[:32])
             order = self.futures_get_order(symbol=symbol, orderId=order_id)
             return order
-        elif "BYBIT" in self.exchange:
+        elif self.venue == "BYBIT":
             # NOTE: Bybit heavily limits large orders so have to split them up when submitting. For purposes of the bot, only returns last order
             if timeInForce == "GTX":  # on Binance GTX means Good Till Crossing (or post only)
                 timeInForce = "PostOnly"
@@ -1841,7 +1856,7 @@ class UniversalClient:
                                                          order_link_id=(str(repeat_order_number) + newClientOrderId)[:36])['orderId']
             order = self.futures_get_order(symbol=symbol, orderId=order_id)
             return order
-        elif "IG" in self.exchange:
+        elif self.venue == "IG":
             size = Decimal(str(quantity)) / 10000
             # since forex trading does not have reduceOnly, need to manually check current position size
             if reduceOnly:
@@ -1869,7 +1884,7 @@ class UniversalClient:
                     "status": status,
                     "reduceOnly": reduceOnly,
                     "origQty": format_float_in_standard_form(size)}
-        elif "CAPITAL" in self.exchange:
+        elif self.venue == "CAPITAL":
             size = Decimal(str(quantity))
             # since forex trading does not have reduceOnly, need to manually check current position size
             if reduceOnly:
@@ -1895,7 +1910,7 @@ class UniversalClient:
                 if order and order['status'] != "CANCELLED":
                     return order
             raise Exception(f'CAPITAL client create order error: could not create order (dealReference: {deal_ref} {side}, {symbol}, {size} @{price})')
-        elif "PHEMEX" in self.exchange:
+        elif self.venue == "PHEMEX":
             if side == self.SIDE_BUY:
                 order_side = "Buy"
             elif side == self.SIDE_SELL:
@@ -1921,7 +1936,7 @@ class UniversalClient:
                                                     'orderQty': size, 'priceEp': priceEp, 'ordType': ordType, 'stopPxEp': stopPxEp,
                                                     'timeInForce': typeInForce, 'reduceOnly': reduce_only})
             return self.process_phemex_order_to_binance(order)
-        elif "BINGX" in self.exchange:
+        elif self.venue == "BINGX":
             # NOTE: current v1 api does not support client ID's
             if side == self.SIDE_BUY:
                 order_side = "Bid"
@@ -1937,6 +1952,19 @@ class UniversalClient:
             orderId = self.client_bingx.place_new_order(symbol=symbol, side=order_side, price=price, size=quantity, tradeType=ordType, action=order_action)['orderId']
             return self.futures_get_order(symbol=symbol, orderId=orderId)
 
+    def okex_pos_side(self, side, reduceOnly):
+        if self.okex_pos_mode == 'net':
+            return 'net'
+        if reduceOnly is None or reduceOnly is False:
+            return 'long' if side == self.SIDE_BUY else 'short'
+        return 'short' if side == self.SIDE_BUY else 'long'
+
+    def mexc_order_side(self, side, reduceOnly):
+        # order_side 1 open long ,2close short,3open short ,4 close l
+        if side == self.SIDE_BUY:
+            return 2 if reduceOnly is True else 1
+        return 4 if reduceOnly is True else 3
+
     @tries_wrapper
     def futures_get_order(self, symbol, orderId=None, origClientOrderId=None):
         """
@@ -1959,12 +1987,12 @@ class UniversalClient:
         """
         if not orderId and not origClientOrderId:
             raise Exception("No orderId/clientId provided")
-        if self.exchange == "BINANCE":
+        if self.venue == "BINANCE":
             if orderId:
                 return self.client_binance.futures_get_order(symbol=symbol, orderId=orderId)
             elif origClientOrderId:
                 return self.client_binance.futures_get_order(symbol=symbol, origClientOrderId=origClientOrderId)
-        elif "FTX" in self.exchange:
+        elif self.venue == "FTX":
             # FTX stores normal LIMIT orders and STOP/STOP-MARKET orders separately, API calls
             # are made to different endpoints to retrieve normal and trigger based orders
             if orderId:
@@ -1980,7 +2008,7 @@ class UniversalClient:
                 for order in conditional_orders:
                     if order['id'] == orderId:  # clientId does not exist for FTX conditional orders
                         return process_ftx_order_to_binance(order)
-        elif "OKEX" in self.exchange:
+        elif self.venue == "OKEX":
             if orderId is None:
                 orderId = ""
             if origClientOrderId is None:
@@ -1995,27 +2023,27 @@ class UniversalClient:
             order = self.client_okex.order_algos_history(algoId=orderId, instType="SWAP", instId=symbol, ordType="conditional")
             if order:
                 return self.process_okex_order_to_binance(order)
-        elif "GATE" in self.exchange:
+        elif self.venue == "GATE":
             oid = orderId if orderId else origClientOrderId
             order = self.process_gate_order_to_binance(self.client_gate.get_futures_order(settle="usdt", order_id=oid, _request_timeout=(self.timeout, self.timeout)))
             if order:
                 return order
             else:
                 return self.process_gate_order_to_binance(self.client_gate.get_price_triggered_order(settle="usdt", order_id=orderId))
-        elif "MEXC" in self.exchange:
+        elif self.venue == "MEXC":
             if orderId:
                 order = self.client_mexc.get_order_by_order_id(orderId)
             else:
                 order = self.client_mexc.get_order_by_external_oid(symbol=symbol, external_oid=origClientOrderId)
             return self.process_mexc_order_to_binance(order)
-        elif "BYBIT" in self.exchange:
+        elif self.venue == "BYBIT":
             if orderId is None:
                 orderId = ""
             if origClientOrderId is None:
                 origClientOrderId = ""
             order = self.client_bybit.query_active_order(symbol=symbol, order_id=orderId, order_link_id=origClientOrderId)[0]
             return self.process_bybit_order_to_binance(order)
-        elif "IG" in self.exchange:
+        elif self.venue == "IG":
             # if an order is returned, it is always open and unfilled, hence 'working order'
             orders = self.client_ig.fetch_working_orders(version='2')
             for order in orders['workingOrders']:
@@ -2037,7 +2065,7 @@ class UniversalClient:
                             "type": order['workingOrderData']['orderType'],
                             "updateTime": update_time
                             }
-        elif "CAPITAL" in self.exchange:
+        elif self.venue == "CAPITAL":
             order_status = None
             if orderId[:2] in ['r_', 'o_', 'p_']:
                 # sometimes a deal ref is provided, we can use this to get the actual order Id
@@ -2095,25 +2123,25 @@ class UniversalClient:
                 "type": None,  # not determinable
                 "updateTime": None
             }
-        elif "PHEMEX" in self.exchange:
+        elif self.venue == "PHEMEX":
             orders = self.client_phemex.query_order(symbol=symbol, orderId=orderId, cliOrderId=origClientOrderId)
             if orders:
                 return self.process_phemex_order_to_binance(orders[0])
             raise Exception(f"PHEMEX Order (orderId '{orderId}' / origClientOrderId '{origClientOrderId}') not found (was it recently made?)")
-        elif "BINGX" in self.exchange:
+        elif self.venue == "BINGX":
             order = self.client_bingx.query_order(symbol=symbol, orderId=orderId)
             return self.process_bingx_order_to_binance(order, symbol)
         return None
 
     @tries_wrapper
     def futures_get_open_orders(self, symbol):
-        if self.exchange == "BINANCE":
+        if self.venue == "BINANCE":
             return self.client_binance.futures_get_open_orders(symbol=symbol)
-        elif "FTX" in self.exchange:
+        elif self.venue == "FTX":
             normal_orders = list(map(process_ftx_order_to_binance, self.client_ftx.get_open_orders(market=symbol)))
             trigger_orders = list(map(process_ftx_order_to_binance, self.client_ftx.get_conditional_orders(market=symbol)))
             return normal_orders + trigger_orders
-        elif "OKEX" in self.exchange:
+        elif self.venue == "OKEX":
             orders = self.client_okex.get_order_list(instId=symbol)
             if isinstance(orders, dict):
                 # this case happens if only 1 order is returned, it is in a dict but we need it in an array
@@ -2124,16 +2152,16 @@ class UniversalClient:
                 orders = [orders]
             trigger_orders = list(map(self.process_okex_order_to_binance, orders))
             return normal_orders + trigger_orders
-        elif "GATE" in self.exchange:
+        elif self.venue == "GATE":
             orders = self.client_gate.list_futures_orders(settle="usdt", contract=symbol, status="open", _request_timeout=(self.timeout, self.timeout))
             return list(map(self.process_gate_order_to_binance, orders))
-        elif "MEXC" in self.exchange:
+        elif self.venue == "MEXC":
             orders = self.client_mexc.get_open_orders(symbol=symbol)['resultList']
             return list(map(self.process_mexc_order_to_binance, orders))
-        elif "BYBIT" in self.exchange:
+        elif self.venue == "BYBIT":
             orders = self.client_bybit.query_active_order(symbol=symbol)
             return list(map(self.process_bybit_order_to_binance, orders))
-        elif "IG" in self.exchange:
+        elif self.venue == "IG":
             # if an order is returned, it is always open and unfilled, hence 'working order'
             results = []
             orders = self.client_ig.fetch_working_orders(version='2')
@@ -2157,7 +2185,7 @@ class UniversalClient:
                                     "updateTime": update_time
                                     })
             return results
-        elif "CAPITAL" in self.exchange:
+        elif self.venue == "CAPITAL":
             # if an order is returned, it is always open and unfilled, hence 'working order'
             results = []
             orders = self.client_capital.get_open_oders()
@@ -2181,10 +2209,10 @@ class UniversalClient:
                         "updateTime": update_time
                     })
             return results
-        elif "PHEMEX" in self.exchange:
+        elif self.venue == "PHEMEX":
             orders = self.client_phemex.query_open_orders(symbol)['rows']
             return list(map(self.process_phemex_order_to_binance, orders))
-        elif "BINGX" in self.exchange:
+        elif self.venue == "BINGX":
             orders = self.client_bingx.query_unfilled_orders(symbol)['orders']
             if orders:
                 return list(map(self.process_bingx_order_to_binance, orders))
@@ -2193,22 +2221,22 @@ class UniversalClient:
 
     @tries_wrapper
     def futures_cancel_order(self, symbol, orderID):
-        if self.exchange == "BINANCE":
+        if self.venue == "BINANCE":
             self.client_binance.futures_cancel_order(symbol=symbol, orderID=orderID)
-        elif "FTX" in self.exchange:
+        elif self.venue == "FTX":
             self.client_ftx.cancel_order(order_id=orderID)
-        elif "OKEX" in self.exchange:
+        elif self.venue == "OKEX":
             # TODO: cancel trigger orders (using algoId=orderID)
             self.client_okex.cancel_order(instId=symbol, ordId=orderID)
-        elif "GATE" in self.exchange:
+        elif self.venue == "GATE":
             self.client_gate.cancel_futures_order(settle="usdt", order_id=orderID, _request_timeout=(self.timeout, self.timeout))
-        elif "MEXC" in self.exchange:
+        elif self.venue == "MEXC":
             self.client_mexc.cancel_orders([orderID])
-        elif "BYBIT" in self.exchange:
+        elif self.venue == "BYBIT":
             self.client_bybit.cancel_active_order(symbol=symbol, order_id=orderID)
-        elif "IG" in self.exchange:
+        elif self.venue == "IG":
             self.client_ig.delete_working_order(deal_id=orderID)
-        elif "CAPITAL" in self.exchange:
+        elif self.venue == "CAPITAL":
             if orderID[:2] in ['r_', 'o_', 'p_']:
                 # sometimes a deal ref is provided, we can use this to get the actual order Id
                 confirmation = self.client_capital.get_position_order_confirmation(dealReference=orderID)
@@ -2218,18 +2246,47 @@ class UniversalClient:
                     raise Exception(f"CAPITAL unable to get deal confirmation for {orderID}")
                 orderID = confirmation['affectedDeals'][0]['dealId']
             self.client_capital.cancel_order(orderId=orderID)
-        elif "PHEMEX" in self.exchange:
+        elif self.venue == "PHEMEX":
             self.client_phemex.cancel_order(symbol=symbol, orderID=orderID)
-        elif "BINGX" in self.exchange:
+        elif self.venue == "BINGX":
             self.client_bingx.cancel_order(symbol, orderID)
 
+    @tries_wrapper
+    def futures_amend_order(self, symbol, orderId, side, price, quantity):
+        """
+        Change the price and quantity of an open limit order in place, keeping its orderId, on exchanges whose adapter
+        has amend_orders
+        :param side: BUY | SELL, the side of the order
+        :param quantity: new total quantity of the order
+        :return: the amended order, None if the order no longer exists
+        """
+        if self.venue == "BINANCE":
+            return self.client_binance.futures_modify_order(symbol=symbol, orderId=orderId, side=side,
+                                                            quantity=str(quantity), price=str(price))
+        elif self.venue == "OKEX":
+            if "USDT" not in symbol:
+                raise Exception(f"OKEX client cannot amend {symbol} orders, 'sz' is denoted in USD")
+            sz = int(math.floor(Decimal(str(quantity)) / self.precisionQuantityDict[symbol]))
+            self.client_okex.amend_order(instId=symbol, ordId=orderId, newSz=str(sz),
+                                         newPx=format(price, f".{abs(self.precisionPriceDict[symbol].as_tuple().exponent)}f"))
+            return self.futures_get_order(symbol=symbol, orderId=orderId)
+        elif self.venue == "BYBIT":
+            self.client_bybit.amend_order(symbol=symbol, order_id=orderId, qty=quantity, price=price)
+            return self.futures_get_order(symbol=symbol, orderId=orderId)
+        elif self.venue == "PHEMEX":
+            size = int(math.floor(Decimal(str(quantity)) / self.precisionQuantityDict[symbol]))
+            order = self.client_phemex.amend_order(symbol, orderId, {'priceEp': float(Decimal(str(price)) * Decimal('10000')),
+                                                                     'orderQty': size})
+            return self.process_phemex_order_to_binance(order)
+        raise Exception(f"{self.exchange} futures_amend_order not supported")
+
     @tries_wrapper
     def futures_cancel_all_open_orders(self, symbol):
-        if self.exchange == "BINANCE":
+        if self.venue == "BINANCE":
             self.client_binance.futures_cancel_all_open_orders(symbol=symbol)
-        elif "FTX" in self.exchange:
+        elif self.venue == "FTX":
             self.client_ftx.cancel_orders(market_name=symbol)
-        elif "OKEX" in self.exchange:
+        elif self.venue == "OKEX":
             orders = self.client_okex.get_order_list(instId=symbol)
             if isinstance(orders, dict):
                 orders = [orders]
@@ -2246,29 +2303,269 @@ class UniversalClient:
                 cancel_list.append({"instId": symbol, "algoId": order['algoId']})
             if cancel_list:
                 self.client_okex.cancel_algo_order_list(cancel_list)
-        elif "GATE" in self.exchange:
+        elif self.venue == "GATE":
             self.client_gate.cancel_futures_orders(settle="usdt", contract=symbol, _request_timeout=(self.timeout, self.timeout))
-        elif "MEXC" in self.exchange:
+        elif self.venue == "MEXC":
             self.client_mexc.cancel_all_orders(symbol=symbol)
-        elif "BYBIT" in self.exchange:
+        elif self.venue == "BYBIT":
             self.client_bybit.cancel_all_active_orders(symbol=symbol)
-        elif "IG" in self.exchange:
+        elif self.venue == "IG":
             open_orders = self.futures_get_open_orders(symbol=symbol)
             for order in open_orders:
                 self.client_ig.delete_working_order(deal_id=order['orderId'])
-        elif "CAPITAL" in self.exchange:
+        elif self.venue == "CAPITAL":
             open_orders = self.futures_get_open_orders(symbol=symbol)
             for order in open_orders:
                 self.client_capital.cancel_order(orderId=order['orderId'])
-        elif "PHEMEX" in self.exchange:
+        elif self.venue == "PHEMEX":
             # note only cancels limit orders, for stop limits and stop losses need to change below
             self.client_phemex.cancel_all_normal_orders(symbol)
-        elif "BINGX" in self.exchange:
+        elif self.venue == "BINGX":
             open_orders = self.futures_get_open_orders(symbol)
             to_delete_list = [o['orderId'] for o in open_orders]
             if to_delete_list:
                 self.client_bingx.cancel_batch_orders(symbol, ','.join(map(str, to_delete_list)))
 
+    def futures_create_orders_batch(self, symbol, orders):
+        """
+        Place several orders of symbol at once. Limit orders go through the exchange's batch order endpoint, up to
+        adapter.batch_orders a request, every other order (and every order on exchanges without one) through concurrent
+        futures_create_order calls. An order the batch endpoint rejects is sent again on its own with the same client
+        order id, so one the batch did place is found by futures_create_order's duplicate client order id handling.
+        Note BYBIT batch orders do not cancel the open orders on the same side first as futures_create_order does
+        :param orders: futures_create_order kwargs of each order
+        :return: per order, in the same order, {'order': the Binance style order or None, 'error': why it was not
+        placed or None}
+        """
+        orders = [dict(order) for order in orders]
+        for i, order in enumerate(orders):
+            if not order.get('newClientOrderId'):
+                order['newClientOrderId'] = order['side'] + symbol + str(datetime.now().timestamp()) + str(i)
+        results = [{'order': None, 'error': None} for _ in orders]
+        single = list(range(len(orders)))
+        batchable = [i for i in single if self.batch_orderable(symbol, orders[i])] if len(orders) > 1 else []
+        # batch_orderable is False for every order of an exchange without batch orders
+        for chunk in (chunks(batchable, self.adapter.batch_orders) if len(batchable) > 1 else []):
+            try:
+                placed = self._batch_create_orders(symbol, [orders[i] for i in chunk])
+                if placed is None:
+                    # tries_wrapper returns None when the error is that of an order not found
+                    raise Exception("no result")
+            except Exception as e:
+                self.logger.writeline(f"{symbol} ERROR batch order request failed, placing the orders one by one {e}")
+                continue
+            for i, (order, error) in zip(chunk, placed):
+                if order:
+                    results[i]['order'] = order
+                    single.remove(i)
+                else:
+                    self.logger.writeline(f"{symbol} batch order {orders[i]} rejected: {error}, placing it on its own")
+        placed = self._run_concurrently(lambda order: self.futures_create_order(symbol=symbol, **order),
+                                        [orders[i] for i in single])
+        for i, (order, error) in zip(single, placed):
+            results[i] = {'order': order, 'error': error}
+            if error:
+                self.logger.writeline(f"{symbol} ERROR unable to place order {orders[i]}: {error}")
+        # futures_create_order acknowledges an order placed on this thread itself, not ones placed on the pool's
+        acknowledged = len(single) == 1 and results[single[0]]['order']
+        if metrics.enabled and not acknowledged and any(result['order'] for result in results):
+            metrics.order_acknowledged()
+        return results
+
+    def futures_cancel_orders_batch(self, orders):
+        """
+        Cancel open orders, of any symbols, through the exchange's batch cancel endpoint, up to adapter.batch_cancels
+        orders of a symbol a request, otherwise through concurrent futures_cancel_order calls. An order the batch
+        endpoint does not cancel is cancelled on its own
+        :param orders: Binance style orders, only their symbol and orderId are used
+        :return: per order, in the same order, {'order': the order if it is cancelled or no longer open otherwise None,
+        'error': why it was not cancelled or None}
+        """
+        results = [{'order': order, 'error': None} for order in orders]
+        single = list(range(len(orders)))
+        by_symbol = {}
+        for i, order in enumerate(orders):
+            by_symbol.setdefault(order['symbol'], []).append(i)
+        for symbol, indexes in by_symbol.items():
+            for chunk in (chunks(indexes, self.adapter.batch_cancels) if len(orders) > 1 and self.adapter.batch_cancels else []):
+                try:
+                    errors = self._batch_cancel_orders(symbol, [orders[i]['orderId'] for i in chunk])
+                    if errors is None:
+                        # tries_wrapper returns None when the error is that of an order not found, e.g. OKEX raising
+                        # 51603 for the whole batch when its first order has already filled
+                        raise Exception("an order was not found")
+                except Exception as e:
+                    self.logger.writeline(f"{symbol} ERROR batch cancel request failed, cancelling the orders one by one {e}")
+                    continue
+                for i, error in zip(chunk, errors):
+                    if error is None:
+                        single.remove(i)
+                    else:
+                        self.logger.writeline(f"{symbol} batch cancel of order {orders[i]['orderId']} rejected: {error}, cancelling it on its own")
+        cancelled = self._run_concurrently(lambda order: self.futures_cancel_order(order['symbol'], order['orderId']),
+                                           [orders[i] for i in single])
+        for i, (_, error) in zip(single, cancelled):
+            if error:
+                results[i] = {'order': None, 'error': error}
+                self.logger.writeline(f"{orders[i]['symbol']} ERROR unable to cancel order {orders[i]['orderId']}: {error}")
+        return results
+
+    def batch_orderable(self, symbol, order):
+        """
+        :param order: futures_create_order kwargs
+        :return: whether order can be sent through the exchange's batch order endpoint
+        """
+        if not self.adapter.batch_orders or order.get('type') != self.ORDER_TYPE_LIMIT or order.get('stopPrice') is not None:
+            return False
+        if self.venue == "OKEX":
+            # 'sz' of USD margined instruments is denoted in USD
+            return "USDT" in symbol
+        if self.venue == "BYBIT":
+            return order['quantity'] <= self.bybit_symbol_max_quantity[symbol]
+        return True
+
+    def _run_concurrently(self, func, items):
+        """
+        :return: (func(item), None) or (None, the exception's message) of each item, in the same order
+        """
+        def call(item):
+            try:
+                return func(item), None
+            except Exception as e:
+                return None, str(e)
+        if len(items) <= 1:
+            return [call(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(len(items), http_transport.pool_maxsize)) as executor:
+            return list(executor.map(call, items))
+
+    def _batch_order_result(self, symbol, order, orderId):
+        """
+        :return: the Binance style order of futures_create_order kwargs order, acknowledged by a batch endpoint that
+        only returns the order id
+        """
+        return {"clientOrderId": order['newClientOrderId'],
+                "orderId": orderId,
+                "symbol": symbol,
+                "price": str(order['price']),
+                "stopPrice": "0",
+                "side": order['side'],
+                "type": order['type'],
+                "status": "NEW",
+                "reduceOnly": bool(order.get('reduceOnly')),
+                "origQty": str(order['quantity']),
+                "avgPrice": "0",
+                "executedQty": "0"}
+
+    @tries_wrapper
+    def _batch_create_orders(self, symbol, orders):
+        """
+        One batch order request, see futures_create_orders_batch
+        :param orders: futures_create_order kwargs of limit orders
+        :return: per order (the Binance style order, None) or (None, why the exchange rejected it)
+        """
+        post_only = [order.get('timeInForce') == self.TIME_IN_FORCE_GTX for order in orders]
+        if self.venue == "BINANCE":
+            placed = self.client_binance.futures_place_batch_order(batchOrders=[
+                {'symbol': symbol, 'side': order['side'], 'type': order['type'], 'price': str(order['price']),
+                 'quantity': str(order['quantity']), 'timeInForce': order.get('timeInForce') or self.TIME_IN_FORCE_GTC,
+                 'reduceOnly': 'true' if order.get('reduceOnly') else 'false',
+                 'newClientOrderId': order['newClientOrderId']} for order in orders])
+            return [(item, None) if 'orderId' in item else (None, item.get('msg')) for item in placed]
+        elif self.venue == "OKEX":
+            placed = self.client_okex.place_multiple_orders([
+                {'instId': symbol, 'tdMode': "cross", 'ccy': "USDT", 'side': order['side'].lower(),
+                 'posSide': self.okex_pos_side(order['side'], order.get('reduceOnly')),
+                 'ordType': "post_only" if is_post_only else "limit",
+                 'sz': str(int(math.floor(Decimal(str(order['quantity'])) / self.precisionQuantityDict[symbol]))),
+                 'px': format(order['price'], f".{abs(self.precisionPriceDict[symbol].as_tuple().exponent)}f"),
+                 'clOrdId': ''.join(ch for ch in order['newClientOrderId'] if ch.isalnum())[:32]}
+                for order, is_post_only in zip(orders, post_only)])
+            if isinstance(placed, dict):
+                placed = [placed]
+            results = []
+            for order, item in zip(orders, placed):
+                if item.get('sCode', '0') != '0' or not item.get('ordId'):
+                    results.append((None, item.get('sMsg')))
+                    continue
+                if self.okex_pos_mode == 'net' and order.get('reduceOnly'):
+                    self.reduce_only_orders[item['ordId']] = int(time.time())
+                results.append((self._batch_order_result(symbol, order, item['ordId']), None))
+            return results
+        elif self.venue == "GATE":
+            futures_orders = []
+            for order, is_post_only in zip(orders, post_only):
+                size = int(math.floor(Decimal(str(order['quantity'])) / self.precisionQuantityDict[symbol]))
+                futures_orders.append(FuturesOrder(contract=symbol, size=size if order['side'] == self.SIDE_BUY else -size,
+                                                   price=format_float_in_standard_form(float(order['price'])),
+                                                   tif="poc" if is_post_only else "gtc",
+                                                   reduce_only=bool(order.get('reduceOnly')),
+                                                   text="t-" + ''.join(ch for ch in order['newClientOrderId'] if ch.isalnum())[:26]))
+            placed = self.client_gate.create_batch_futures_order(settle="usdt", futures_order=futures_orders, _request_timeout=(self.timeout, self.timeout))
+            return [(self.process_gate_order_to_binance(item), None) if item.succeeded else (None, f"{item.label} {item.detail}")
+                    for item in placed]
+        elif self.venue == "MEXC":
+            placed = self.client_mexc.submit_batch_order([
+                {'symbol': symbol, 'price': str(order['price']),
+                 'vol': int(math.floor(Decimal(str(order['quantity'])) / self.precisionQuantityDict[symbol])),
+                 'side': self.mexc_order_side(order['side'], order.get('reduceOnly')), 'type': 2 if is_post_only else 1,
+                 'openType': 2, 'externalOid': order['newClientOrderId'][:32]}
+                for order, is_post_only in zip(orders, post_only)])
+            return [(self._batch_order_result(symbol, order, item['orderId']), None) if item.get('orderId') and not item.get('errorCode')
+                    else (None, item.get('errorMsg')) for order, item in zip(orders, placed)]
+        elif self.venue == "BYBIT":
+            placed = self.client_bybit.place_batch_order([
+                dict(side=order['side'], symbol=symbol, order_type=order['type'], qty=order['quantity'], price=order['price'],
+                     time_in_force="PostOnly" if is_post_only else "GTC", close_on_trigger=False,
+                     reduce_only=bool(order.get('reduceOnly')), order_link_id=("0" + order['newClientOrderId'])[:36])
+                for order, is_post_only in zip(orders, post_only)])
+            return [(self._batch_order_result(symbol, order, item['orderId']), None) if item['code'] == 0 and item.get('orderId')
+                    else (None, item['msg']) for order, item in zip(orders, placed)]
+        raise Exception(f"{self.exchange} has no batch order endpoint")
+
+    @tries_wrapper
+    def _batch_cancel_orders(self, symbol, orderIds):
+        """
+        One batch cancel request, see futures_cancel_orders_batch
+        :return: per order None if it was cancelled, otherwise why the exchange did not cancel it
+        """
+        if self.venue == "BINANCE":
+            cancelled = self.client_binance.futures_cancel_orders(symbol=symbol, orderidlist=[int(orderId) for orderId in orderIds])
+            return [None if 'orderId' in item else item.get('msg') for item in cancelled]
+        elif self.venue == "OKEX":
+            cancelled = self.client_okex.cancel_multiple_orders([{"instId": symbol, "ordId": orderId} for orderId in orderIds])
+            if isinstance(cancelled, dict):
+                cancelled = [cancelled]
+            return [None if item.get('sCode', '0') == '0' else item.get('sMsg') for item in cancelled]
+        elif self.venue == "GATE":
+            cancelled = self.client_gate.cancel_batch_future_orders(settle="usdt", request_body=[str(orderId) for orderId in orderIds], _request_timeout=(self.timeout, self.timeout))
+            return [None if item.succeeded else item.message for item in cancelled]
+        elif self.venue == "MEXC":
+            cancelled = self.client_mexc.cancel_orders(list(orderIds)) or []
+            errors = {str(item.get('orderId')): item.get('errorMsg') for item in cancelled if item.get('errorCode')}
+            return [errors.get(str(orderId)) for orderId in orderIds]
+        elif self.venue == "BYBIT":
+            cancelled = self.client_bybit.cancel_batch_order([(symbol, orderId) for orderId in orderIds])
+            return [None if item['code'] == 0 else item['msg'] for item in cancelled]
+        elif self.venue == "BINGX":
+            self.client_bingx.cancel_batch_orders(symbol, ','.join(map(str, orderIds)))
+            return [None] * len(orderIds)
+        raise Exception(f"{self.exchange} has no batch cancel endpoint")
+
+    @tries_wrapper
+    def futures_get_all_open_orders(self):
+        """
+        :return: the open orders of every symbol, None if the exchange cannot list them in one request or more may be
+        open than one request returns
+        """
+        if self.venue == "BINANCE":
+            return self.client_binance.futures_get_open_orders()
+        elif self.venue == "GATE":
+            orders = self.client_gate.list_futures_orders(settle="usdt", status="open", limit=GATE_OPEN_ORDERS_LIMIT, _request_timeout=(self.timeout, self.timeout))
+            if len(orders) >= GATE_OPEN_ORDERS_LIMIT:
+                return None
+            return list(map(self.process_gate_order_to_binance, orders))
+        return None
+
     @tries_wrapper
     def futures_order_book(self, symbol, limit):
         """
@@ -2288,13 +2585,13 @@ class UniversalClient:
             ]
         }
         """
-        if self.exchange == "BINANCE":
+        if self.venue == "BINANCE":
             return self.client_binance.futures_order_book(symbol=symbol, limit=limit)
-        elif "FTX" in self.exchange:
+        elif self.venue == "FTX":
             orderbook = self.client_ftx.get_orderbook(symbol, limit)
             return {"asks": [[format_float_in_standard_form(item) for item in sub] for sub in orderbook['asks']],
                     "bids": [[format_float_in_standard_form(item) for item in sub] for sub in orderbook['bids']]}
-        elif "OKEX" in self.exchange:
+        elif self.venue == "OKEX":
             orderbook = self.client_okex.get_orderbook(instId=symbol, sz=limit)
             if "USDT" in symbol:
                 # since the quantity is given in 'sz', need to multiply this with the lot size to give quantity
@@ -2304,16 +2601,16 @@ class UniversalClient:
                 # quantity = sz * cont_size (or lot_size in USD) / price
                 return {"asks": list(map(lambda x: [x[0], str(Decimal(x[1]) * self.precisionQuantityDict[symbol] / Decimal(x[0]))], [[item for item in sub[:2]] for sub in orderbook['asks']])),
                         "bids": list(map(lambda x: [x[0], str(Decimal(x[1]) * self.precisionQuantityDict[symbol] / Decimal(x[0]))], [[item for item in sub[:2]] for sub in orderbook['bids']]))}
-        elif "GATE" in self.exchange:
+        elif self.venue == "GATE":
             limit = min(limit, 50)
             orderbook = self.client_gate.list_futures_order_book(settle="usdt", contract=symbol, limit=limit, _request_timeout=(self.timeout, self.timeout))
             return {"asks": list(map(lambda x: [x.p, str(Decimal(x.s) * self.precisionQuantityDict[symbol])], [item for item in orderbook.asks])),
                     "bids": list(map(lambda x: [x.p, str(Decimal(x.s) * self.precisionQuantityDict[symbol])], [item for item in orderbook.bids]))}
-        elif "MEXC" in self.exchange:
+        elif self.venue == "MEXC":
             orderbook = self.client_mexc.get_contract_depth(symbol=symbol, limit=limit)
             return {"asks": list(map(lambda x: [format_float_in_standard_form(x[0]), str(Decimal(str(x[1])) * self.precisionQuantityDict[symbol])], [[item for item in sub[:2]] for sub in orderbook['asks']])),
                     "bids": list(map(lambda x: [format_float_in_standard_form(x[0]), str(Decimal(str(x[1])) * self.precisionQuantityDict[symbol])], [[item for item in sub[:2]] for sub in orderbook['bids']]))}
-        elif "BYBIT" in self.exchange:
+        elif self.venue == "BYBIT":
             orderbook = self.client_bybit.orderbook(symbol=symbol)
             asks = []
             bids = []
@@ -2322,19 +2619,19 @@ class UniversalClient:
             for obAsks in orderbook['a']:
                 asks.append([obAsks[0], obAsks[1]])
             return {"asks": asks[:limit], "bids": bids[:limit]}
-        elif "IG" in self.exchange:
+        elif self.venue == "IG":
             # only offers the best bid/ask with unspecified qty
             data = self.client_ig.fetch_market_by_epic(epic=symbol)
             return {"asks": [[data['snapshot']['offer'], 0]], "bids": [[data['snapshot']['bid'], 0]]}
-        elif "CAPITAL" in self.exchange:
+        elif self.venue == "CAPITAL":
             # only offers the best bid/ask with unspecified qty
             data = self.client_capital.get_market(epic=symbol)
             return {"asks": [[data['snapshot']['offer'], 0]], "bids": [[data['snapshot']['bid'], 0]]}
-        elif "PHEMEX" in self.exchange:
+        elif self.venue == "PHEMEX":
             orderbook = self.client_phemex.query_orderbook(symbol)['book']
             return {"asks": list(map(lambda x: [format_float_in_standard_form(x[0] * 0.0001), str(Decimal(str(x[1])) * self.precisionQuantityDict[symbol])], [[item for item in sub[:2]] for sub in orderbook['asks']]))[:limit],
                     "bids": list(map(lambda x: [format_float_in_standard_form(x[0] * 0.0001), str(Decimal(str(x[1])) * self.precisionQuantityDict[symbol])], [[item for item in sub[:2]] for sub in orderbook['bids']]))[:limit]}
-        elif "BINGX" in self.exchange:
+        elif self.venue == "BINGX":
             orderbook = self.client_bingx.get_market_depth(symbol, limit)
             return {"asks": [[format_float_in_standard_form(round_interval_nearest(x['p'], self.precisionPriceDict[symbol])), str(Decimal(str(x['v'])))] for x in orderbook['asks']],
                     "bids": [[format_float_in_standard_form(round_interval_nearest(x['p'], self.precisionPriceDict[symbol])), str(Decimal(str(x['v'])))] for x in orderbook['bids']]}
@@ -2353,16 +2650,16 @@ class UniversalClient:
           "time": 1589437530011   // Transaction time
         }
         """
-        if self.exchange == "BINANCE":
+        if self.venue == "BINANCE":
             return self.client_binance.futures_orderbook_ticker(symbol=symbol)
-        elif "FTX" in self.exchange:
+        elif self.venue == "FTX":
             orderbook = self.client_ftx.get_orderbook(symbol, 1)
             bidPrice = format_float_in_standard_form(orderbook['bids'][0][0])
             bidQty = format_float_in_standard_form(orderbook['bids'][0][1])
             askPrice = format_float_in_standard_form(orderbook['asks'][0][0])
             askQty = format_float_in_standard_form(orderbook['asks'][0][1])
             return {"symbol": symbol, "bidPrice": bidPrice, "bidQty": bidQty, "askPrice": askPrice, "askQty": askQty}
-        elif "OKEX" in self.exchange:
+        elif self.venue == "OKEX":
             orderbook = self.client_okex.get_ticker(instId=symbol)
             if 'USDT' in symbol:
                 bidQty = str(Decimal(orderbook['bidSz']) * self.precisionQuantityDict[symbol])
@@ -2372,7 +2669,7 @@ class UniversalClient:
                 askQty = str(Decimal(orderbook['askSz']) * self.precisionQuantityDict[symbol] / Decimal(orderbook['askPx']))
             return {"symbol": symbol, "bidPrice": orderbook['bidPx'], "bidQty": bidQty,
                     "askPrice": orderbook['askPx'], "askQty": askQty}
-        elif "GATE" in self.exchange:
+        elif self.venue == "GATE":
             orderbook = self.client_gate.list_futures_order_book(settle="usdt", contract=symbol, limit=1,
                                                                  _request_timeout=(self.timeout, self.timeout))
             bidPrice = orderbook.bids[0].p
@@ -2380,7 +2677,7 @@ class UniversalClient:
             askPrice = orderbook.asks[0].p
             askQty = str(Decimal(str(orderbook.asks[0].s)) * self.precisionQuantityDict[symbol])
             return {"symbol": symbol, "bidPrice": bidPrice, "bidQty": bidQty, "askPrice": askPrice, "askQty": askQty}
-        elif "MEXC" in self.exchange or "BYBIT" in self.exchange or "IG" in self.exchange or "CAPITAL" in self.exchange or "PHEMEX" in self.exchange or "BINGX" in self.exchange:
+        elif self.venue == "MEXC" or self.venue == "BYBIT" or self.venue == "IG" or self.venue == "CAPITAL" or self.venue == "PHEMEX" or self.venue == "BINGX":
             # The below could be applied to all exchanges...
             orderbook = self.futures_get_order_book(symbol=symbol, limit=1)
             bidPrice = format_float_in_standard_form(orderbook['bids'][0][0])
@@ -2391,33 +2688,33 @@ class UniversalClient:
 
     @tries_wrapper
     def futures_change_leverage(self, symbol, leverage):
-        if self.exchange == "BINANCE":
+        if self.venue == "BINANCE":
             self.client_binance.futures_change_leverage(symbol=symbol, leverage=leverage)
-        elif "FTX" in self.exchange:
+        elif self.venue == "FTX":
             self.client_ftx.set_leverage(leverage)
-        elif "OKEX" in self.exchange:
+        elif self.venue == "OKEX":
             self.client_okex.set_leverage(instId=symbol, ccy='USDT', lever=leverage, mgnMode='cross')
-        elif "GATE" in self.exchange:
+        elif self.venue == "GATE":
             self.client_gate.update_position_leverage(settle="usdt", contract=symbol, leverage=leverage, _request_timeout=(self.timeout, self.timeout))
-        elif "MEXC" in self.exchange:
+        elif self.venue == "MEXC":
             raise Exception("MEXC API change leverage not supported")
-        elif "BYBIT" in self.exchange:
+        elif self.venue == "BYBIT":
             self.client_bybit.set_leverage(symbol=symbol, leverage=leverage)
-        elif "PHEMEX" in self.exchange:
+        elif self.venue == "PHEMEX":
             self.client_phemex.change_leverage(symbol=symbol, leverage=leverage)
-        elif "BINGX" in self.exchange:
+        elif self.venue == "BINGX":
             self.client_bingx.switch_leverage(symbol, leverage, 'Long')
             self.client_bingx.switch_leverage(symbol, leverage, 'Short')
 
     @tries_wrapper
     def futures_get_trades(self, symbol, limit):
-        if self.exchange == "BINANCE":
+        if self.venue == "BINANCE":
             raise NotImplementedError
-        elif "FTX" in self.exchange:
+        elif self.venue == "FTX":
             return self.client_ftx.get_trades(market=symbol, limit=limit)
-        elif "OKEX" in self.exchange:
+        elif self.venue == "OKEX":
             return NotImplementedError
-        elif "GATE" in self.exchange:
+        elif self.venue == "GATE":
             return NotImplementedError
 
     def futures_cancel_open_buy_orders(self, symbol):
@@ -2544,36 +2841,30 @@ class UniversalClient:
     def futures_cancel_all_orders(self, symbol):
         self.futures_cancel_all_open_orders(symbol=symbol)
 
-    # TV limits rounding testing
-    # Buy	sf<5	sf>5 (significant figure<5 cases should normally round down and vice versa)
-    # Entry	down	down
-    # Exit	down	down
-    #
-    # Sell
-    # Entry	up	    up
-    # Exit	up	    up
-    # So floor for buy limits and ceil for sell limits
-    def futures_create_limit_order(self, symbol, limit, side, stop=None, quantity=None, balancePercent=None,
-                                   fixedBalance=None,
-                                   reduceOnly=False, postOnly=False, recvWindow=DEFAULT_RECVWINDOW, balance=None,
-                                   atBid=False, atAsk=False, volume_based_max_usdt_pos_size=False,
-                                   absoluteMaxUsdtPosSize=0.0):
+    def futures_limit_order_price(self, symbol, limit, side):
         """
-        :param side: BUY | SELL
-        :param volume_based_max_usdt_pos_size: adaptive max usdt pos size based on the last 24hr volume (only applies if balancePercent is used)
-        :param balance: str
-        :param recvWindow:
-        :param symbol:
-        :param limit:
-        :param stop:
-        :param quantity: number of coins
-        :param balancePercent: position based on percentage of total balance
-        :param fixedBalance: position using a fixed amount of money (USDT)
-        :param reduceOnly:
-        :param postOnly:
-        :param atBid: places limit order at the bid price (instead of param limit price)
-        :param absoluteMaxUsdtPosSize: absolute max position size in usdt that an order can make. 0 means unlimited
-        :return:
+        :return: limit rounded to the symbol's tick as futures_create_limit_order places it, down for buys and up for sells
+        """
+        if side == self.SIDE_BUY:
+            return round_interval_down(limit, self.precisionPriceDict.get(symbol))
+        return round_interval_up(limit, self.precisionPriceDict.get(symbol))
+
+    def futures_max_order_quantity(self, symbol):
+        """
+        :return: the most one order of symbol can be for, None if there is no max. futures_create_order splits BYBIT
+        orders above it into several orders
+        """
+        if self.venue == "BYBIT":
+            return self.bybit_symbol_max_quantity.get(symbol)
+        return None
+
+    def futures_limit_order_quantity(self, symbol, limit, quantity=None, balancePercent=None, fixedBalance=None,
+                                     balance=None, volume_based_max_usdt_pos_size=False, absoluteMaxUsdtPosSize=0.0):
+        """
+        Quantity of a limit order at limit as futures_create_limit_order places it, see futures_create_limit_order for
+        the params
+        :return: Decimal quantity rounded to the symbol's lot size, None if none of quantity, balancePercent or
+        fixedBalance is given
         """
         def convert_value_to_capital_account_currency(value):
             instrument_currency = self.capital_instrument_currency_data[symbol]
@@ -2586,15 +2877,6 @@ class UniversalClient:
                     value = Decimal(value) / Decimal(self.capital_exchange_rate_data[exchange_rate_name])
             return value
 
-        if (quantity and balancePercent) or (quantity and fixedBalance) or (balancePercent and fixedBalance):
-            print("ERROR: Only specify one of quantity, balancePercent or fixedBalance!")
-            return
-        if atBid or atAsk:
-            return self.futures_post_only_at_bid_or_ask(symbol, side, atBid, quantity, balancePercent, fixedBalance,
-                                                        reduceOnly,
-                                                        balance, volume_based_max_usdt_pos_size)
-        else:
-            limit = round_interval_down(limit, self.precisionPriceDict.get(symbol)) if side == self.SIDE_BUY else round_interval_up(limit, self.precisionPriceDict.get(symbol))
         if quantity:
             if 0 < absoluteMaxUsdtPosSize < Decimal(str(quantity)) * Decimal(str(limit)):
                 quantity = round_interval_down(absoluteMaxUsdtPosSize / limit)
@@ -2602,7 +2884,7 @@ class UniversalClient:
         elif balancePercent:
             if not balance:  # perhaps needs a cleaner method/structure so that this doesn't need to make an API call
                 balance = self.futures_get_balance()
-            if "CAPITAL" in self.exchange:
+            if self.venue == "CAPITAL":
                 #  Instrument price may be in different currency.
                 #  Need to convert the size to be CAPITAL_ACCOUNT_CURRENCY (probably GBP) instead.
                 balance = convert_value_to_capital_account_currency(balance)
@@ -2617,15 +2899,63 @@ class UniversalClient:
                 usdt_pos_size / Decimal(str(limit)),
                 self.precisionQuantityDict.get(symbol))
         elif fixedBalance:
-            if "CAPITAL" in self.exchange:
+            if self.venue == "CAPITAL":
                 fixedBalance = convert_value_to_capital_account_currency(fixedBalance)
             fixedBalance = fixedBalance if absoluteMaxUsdtPosSize == 0.0 else min(fixedBalance, absoluteMaxUsdtPosSize)
             quantity = round_interval_down(Decimal(str(fixedBalance)) / Decimal(str(limit)),
                                            self.precisionQuantityDict.get(symbol))
         else:
             self.logger.writeline(f"ERROR: futures_create_limit_order requires quantity or balancePercent or fixedBalance")
+            return None
+        return quantity
+
+    # TV limits rounding testing
+    # Buy	sf<5	sf>5 (significant figure<5 cases should normally round down and vice versa)
+    # Entry	down	down
+    # Exit	down	down
+    #
+    # Sell
+    # Entry	up	    up
+    # Exit	up	    up
+    # So floor for buy limits and ceil for sell limits
+    def futures_create_limit_order(self, symbol, limit, side, stop=None, quantity=None, balancePercent=None,
+                                   fixedBalance=None,
+                                   reduceOnly=False, postOnly=False, recvWindow=DEFAULT_RECVWINDOW, balance=None,
+                                   atBid=False, atAsk=False, volume_based_max_usdt_pos_size=False,
+                                   absoluteMaxUsdtPosSize=0.0):
+        """
+        :param side: BUY | SELL
+        :param volume_based_max_usdt_pos_size: adaptive max usdt pos size based on the last 24hr volume (only applies if balancePercent is used)
+        :param balance: str
+        :param recvWindow:
+        :param symbol:
+        :param limit:
+        :param stop:
+        :param quantity: number of coins
+        :param balancePercent: position based on percentage of total balance
+        :param fixedBalance: position using a fixed amount of money (USDT)
+        :param reduceOnly:
+        :param postOnly:
+        :param atBid: places limit order at the bid price (instead of param limit price)
+        :param absoluteMaxUsdtPosSize: absolute max position size in usdt that an order can make. 0 means unlimited
+        :return:
+        """
+        if (quantity and balancePercent) or (quantity and fixedBalance) or (balancePercent and fixedBalance):
+            print("ERROR: Only specify one of quantity, balancePercent or fixedBalance!")
             return
-        currency_symbol = "$" if "CAPITAL" not in self.exchange else self.capital_instrument_currency_data[symbol] + " "
+        if atBid or atAsk:
+            return self.futures_post_only_at_bid_or_ask(symbol, side, atBid, quantity, balancePercent, fixedBalance,
+                                                        reduceOnly,
+                                                        balance, volume_based_max_usdt_pos_size)
+        else:
+            limit = self.futures_limit_order_price(symbol, limit, side)
+        quantity = self.futures_limit_order_quantity(symbol, limit, quantity=quantity, balancePercent=balancePercent,
+                                                     fixedBalance=fixedBalance, balance=balance,
+                                                     volume_based_max_usdt_pos_size=volume_based_max_usdt_pos_size,
+                                                     absoluteMaxUsdtPosSize=absoluteMaxUsdtPosSize)
+        if quantity is None:
+            return
+        currency_symbol = "$" if self.venue != "CAPITAL" else self.capital_instrument_currency_data[symbol] + " "
         order = None
         clientId = side + symbol + str(datetime.now().timestamp())
         if stop is None:
@@ -2786,97 +3116,89 @@ class UniversalClient:
         """
         return self.futures_order_book(symbol=symbol, limit=limit)
 
+    def futures_get_order_book_snapshot(self, symbol, limit=500) -> OrderBook:
+        """
+        gets the order book for symbol as an OrderBook
+        :param symbol:
+        :param limit:
+        :return:
+        """
+        return OrderBook.from_dict(symbol, self.precisionPriceDict[symbol], self.futures_order_book(symbol=symbol, limit=limit),
+                                   timestamp=int(time.time() * 1000))
+
+    def futures_get_depth_analytics(self, symbol, limit=500, max_age=DEPTH_SNAPSHOT_MAX_AGE) -> Optional[DepthAnalytics]:
+        """
+        gets DepthAnalytics of the order book for symbol. The last one fetched is reused if it is at most max_age
+        seconds old so several depth walks in a row (e.g. logging a trade) share one order book request
+        :param symbol:
+        :param limit:
+        :param max_age: 0 to always fetch a new order book
+        :return: None if the order book could not be fetched
+        """
+        cached = self.depth_analytics.get(symbol)
+        if cached is not None and cached[0] >= limit and time.time() - cached[1].book.timestamp / 1000 <= max_age:
+            return cached[1]
+        order_book = self.futures_order_book(symbol=symbol, limit=limit)
+        if not order_book:
+            return None
+        analytics = DepthAnalytics(OrderBook.from_dict(symbol, self.precisionPriceDict[symbol], order_book,
+                                                       timestamp=int(time.time() * 1000)))
+        self.depth_analytics[symbol] = (limit, analytics)
+        return analytics
+
     def futures_get_bid(self, symbol):
         return self.futures_orderbook_ticker(symbol=symbol).get('bidPrice')
 
     def futures_get_ask(self, symbol):
         return self.futures_orderbook_ticker(symbol=symbol).get('askPrice')
 
-    def futures_get_bid_min_value(self, symbol, minValue=0):
+    def futures_get_bid_min_value(self, symbol, minValue=0, max_age=DEPTH_SNAPSHOT_MAX_AGE):
         """
         Gets the bid with minValue threshold for the price returned
         :param symbol:
         :param minValue:
+        :param max_age: see futures_get_depth_analytics
         :return:
         """
-        order_book = self.futures_get_order_book(symbol)
-        if order_book:
-            bids = order_book.get('bids')
-            total = 0
-            for bid in bids:
-                total += float(bid[0]) * float(bid[1])
-                if total > minValue:
-                    return float(bid[0])
-        return None
+        analytics = self.futures_get_depth_analytics(symbol, max_age=max_age)
+        if analytics is None:
+            return None
+        price = float(analytics.price_at_depth(BIDS, minValue)[0])
+        return None if math.isnan(price) else price
 
-    def futures_get_ask_min_value(self, symbol, minValue=0):
+    def futures_get_ask_min_value(self, symbol, minValue=0, max_age=DEPTH_SNAPSHOT_MAX_AGE):
         """
         Gets the ask with minValue threshold for the price returned
         :param symbol:
         :param minValue:
+        :param max_age: see futures_get_depth_analytics
         :return:
         """
-        order_book = self.futures_get_order_book(symbol)
-        if order_book:
-            asks = order_book.get('asks')
-            total = 0
-            for ask in asks:
-                total += float(ask[0]) * float(ask[1])
-                if total > minValue:
-                    return float(ask[0])
-        return None
+        analytics = self.futures_get_depth_analytics(symbol, max_age=max_age)
+        if analytics is None:
+            return None
+        price = float(analytics.price_at_depth(ASKS, minValue)[0])
+        return None if math.isnan(price) else price
 
-    def market_open_avg_price_and_slippage(self, symbol, side, amount_usd):
+    def market_open_avg_price_and_slippage(self, symbol, side, amount_usd, max_age=DEPTH_SNAPSHOT_MAX_AGE):
         """
         :param symbol:
         :param side:
         :param amount_usd:
+        :param max_age: see futures_get_depth_analytics
         :return: total amount of asset bought, avg price, slippage
         """
-        order_book = self.futures_get_order_book(symbol)
-        slippage_start = 0
-        if side == "LONG":
-            asks = order_book.get('asks')
-            money_left = amount_usd
-            total_asset = 0
-            for ask in asks:
-                if money_left > Decimal(ask[0]) * Decimal(ask[1]):
-                    money_left = money_left - (Decimal(ask[0]) * Decimal(ask[1]))
-                    total_asset = total_asset + Decimal(ask[1])
-                    if slippage_start == 0:
-                        slippage_start = Decimal(ask[0])
-                elif Decimal(ask[0]) * Decimal(ask[1]) > money_left:
-                    total_asset = total_asset + (money_left / Decimal(ask[0]))
-                    slippage_end = Decimal(ask[0])
-                    if slippage_start == 0:
-                        slippage_start = slippage_end
-                    return round_interval_nearest(total_asset, self.precisionPriceDict[symbol]), round_interval_nearest(
-                        amount_usd / total_asset, self.precisionPriceDict[symbol]), round_interval_nearest(
-                        slippage_end - slippage_start, self.precisionPriceDict[symbol])
-        if side == "SHORT":
-            bids = order_book.get('bids')
-            money_left = amount_usd
-            total_asset = 0
-            for bid in bids:
-                if money_left > Decimal(bid[0]) * Decimal(bid[1]):
-                    money_left = money_left - (Decimal(bid[0]) * Decimal(bid[1]))
-                    total_asset = total_asset + Decimal(bid[1])
-                    if slippage_start == 0:
-                        slippage_start = Decimal(bid[0])
-                elif Decimal(bid[0]) * Decimal(bid[1]) > money_left:
-                    total_asset = total_asset + (money_left / Decimal(bid[0]))
-                    slippage_end = Decimal(bid[0])
-                    if slippage_start == 0:
-                        slippage_start = slippage_end
-                    return round_interval_nearest(total_asset, self.precisionPriceDict[symbol]), round_interval_nearest(
-                        amount_usd / total_asset, self.precisionPriceDict[symbol]), round_interval_nearest(
-                        slippage_start - slippage_end, self.precisionPriceDict[symbol])
-
-    def market_close_now_profit(self, symbol, position=None):
+        analytics = self.futures_get_depth_analytics(symbol, max_age=max_age)
+        if analytics is None:
+            return None
+        return analytics.market_open(side, amount_usd)
+
+    def market_close_now_profit(self, symbol, position=None, max_age=DEPTH_SNAPSHOT_MAX_AGE):
         """
         What the realised profits would be if you were to close the position at market price
         :param symbol:
         :param position:
+        :param max_age: see futures_get_depth_analytics
         :return: total, realised pnl, average price, slippage
         """
         if not position:
@@ -2884,51 +3206,10 @@ class UniversalClient:
         positionSize = get_position_size(position)
         if positionSize == 0:
             return None
-        entryPrice = get_entry_price(position)
-        entryTotal = entryPrice * abs(positionSize)
-        order_book = self.futures_get_order_book(symbol)
-        slippage_start = 0
-        if positionSize > 0:
-            bids = order_book.get('bids')
-            positionSize_left = positionSize
-            total = 0
-            for bid in bids:
-                if positionSize_left > float(bid[1]):
-                    total = total + (float(bid[0]) * float(bid[1]))
-                    positionSize_left = positionSize_left - float(bid[1])
-                    if slippage_start == 0:
-                        slippage_start = float(bid[0])
-                elif float(bid[1]) > positionSize_left:
-                    total = total + (float(bid[0]) * positionSize_left)
-                    if slippage_start == 0:
-                        slippage_end = 0
-                    else:
-                        slippage_end = float(bid[0])
-                    return round(total, 3), round(total - entryTotal, 3), round_interval_nearest(total / positionSize,
-                                                                                                 self.precisionPriceDict[
-                                                                                                     symbol]), round_interval_nearest(
-                        slippage_start - slippage_end, self.precisionPriceDict[symbol])
-        if positionSize < 0:
-            asks = order_book.get('asks')
-            positionSize = abs(positionSize)
-            positionSize_left = positionSize
-            total = 0
-            for ask in asks:
-                if positionSize_left > float(ask[1]):
-                    total = total + (float(ask[0]) * float(ask[1]))
-                    positionSize_left = positionSize_left - float(ask[1])
-                    if slippage_start == 0:
-                        slippage_start = float(ask[0])
-                elif float(ask[1]) > positionSize_left:
-                    total = total + (float(ask[0]) * positionSize_left)
-                    if slippage_start == 0:
-                        slippage_end = 0
-                    else:
-                        slippage_end = float(ask[0])
-                    return round(total, 3), round(entryTotal - total, 3), round_interval_nearest(total / positionSize,
-                                                                                                 self.precisionPriceDict[
-                                                                                                     symbol]), round_interval_nearest(
-                        slippage_end - slippage_start, self.precisionPriceDict[symbol])
+        analytics = self.futures_get_depth_analytics(symbol, max_age=max_age)
+        if analytics is None:
+            return None
+        return analytics.market_close(positionSize, get_entry_price(position))
 
     def calculate_max_unrealised_loss_percentage(self, symbol, start_time: float, entry_price, side, interval="5m"):
         candles = self.futures_get_candlesticks(symbol, interval=interval, startTime=round(start_time),
@@ -3012,9 +3293,9 @@ class UniversalClient:
             # tick_vol = usd_vol / number_of_ticks_in_candle
             # usd_vol = volume * avg_price_of_candle
             # number_of_ticks_in_candle = (candle_high - candle_low) / tickSize
-            if self.exchange == "BINANCE":
+            if self.venue == "BINANCE":
                 usd_vol = Decimal(candle[5]) * ((Decimal(candle[2]) + Decimal(candle[3])) / Decimal("2"))
-            elif "FTX" in self.exchange:
+            elif self.venue == "FTX":
                 # on FTX usd_vol is provided by default (quote price volume)
                 usd_vol = Decimal(candle[5])
             total_usd_vol = total_usd_vol + usd_vol
@@ -3026,12 +3307,9 @@ class UniversalClient:
         return total_usd_vol / total_ticks
 
     def change_leverage_for_all_symbols(self, leverage):
-        for symbols in self.futures_exchange_info():
-            try:
-                symbol = symbols.get('symbol')
-                self.futures_change_leverage(symbol=symbol, leverage=leverage)
-            except Exception as e:
-                pass
+        symbols = [symbols.get('symbol') for symbols in self.futures_exchange_info()]
+        # symbols that fail are skipped
+        run_bulk(self, lambda client: client.change_leverage(symbols, leverage, return_exceptions=True))
 
     def get_last_24h_usdt_volume(self, symbol):
         candles = self.futures_klines(symbol=symbol, interval="1h", limit=24)
@@ -3074,10 +3352,19 @@ class UniversalClient:
         return self.get_last_24h_usdt_volume(symbol=symbol) > self.get_av_volume_for_past_n_days(
             symbol=symbol, n=abnormal_volume_spike_average_number_of_days) * abnormal_volume_spike_multiplier_threshold
 
+    @tries_wrapper
+    def _cancel_all_symbols_orders(self):
+        """
+        BYBIT only, cancels the orders of every USDT settled symbol in one request
+        """
+        return self.client_bybit.cancel_all_active_orders()
+
     def cancel_all_orders_for_all_symbols(self):
-        for symbols in self.futures_exchange_info():
-            symbol = symbols.get('symbol')
-            self.futures_cancel_all_orders(symbol)
+        if self.venue == "BYBIT":
+            self._cancel_all_symbols_orders()
+            return
+        symbols = [symbols.get('symbol') for symbols in self.futures_exchange_info()]
+        run_bulk(self, lambda client: client.cancel_open_orders(symbols))
 
 # client = FtxClient(api_key=FTX_API_KEY, api_secret=FTX_API_SECRET)
 # uniClientFTX = UniversalClient("FTX")
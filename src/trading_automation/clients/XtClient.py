@@ -10,6 +10,8 @@ import json
 import os
 from dotenv import load_dotenv, find_dotenv
 
+from trading_automation.clients.http_transport import http_transport
+
 # Load environment variables
 
 load_dotenv(find_dotenv())
@@ -57,7 +59,7 @@ class XtClient(object):
         self.api_secret = api_secret
         self.api_URL = self.MAIN_NET_API_URL
         self.timeout = timeout
-        self.session = requests.session()
+        http_transport.register(self.api_URL)
 
     def get_datas(self, param: dict = None):
         """ """
@@ -124,7 +126,7 @@ class XtClient(object):
         try:
             sortedKeys = sorted(params)
             paramsStr = "&".join(["%s=%s" % (x, params[x]) for x in sortedKeys if params[x] is not None])
-            response = requests.request(method, self.MAIN_NET_API_URL+url+f'?{paramsStr}')
+            response = http_transport.request(method, self.MAIN_NET_API_URL+url+f'?{paramsStr}', timeout=self.timeout)
             response.raise_for_status()
         except requests.exceptions.RequestException as e:
             msg = 'Request timeout, content:{t}]........'.format(t=e.response.text)
@@ -0,0 +1,352 @@
+"""One adapter per exchange, resolved once per exchange account name in place of ``"X" in exchange`` dispatch chains."""
+from __future__ import annotations
+
+import re
+import threading
+from typing import TYPE_CHECKING, Dict, List, Optional, Type
+
+from binance.exceptions import BinanceAPIException
+from gate_api.exceptions import GateApiException
+from okex.exceptions import OkexAPIException
+from pybit.exceptions import FailedRequestError, InvalidRequestError
+
+from trading_automation.clients.BingxClient import BingxAPIException
+from trading_automation.clients.PhemexClient import PhemexAPIException
+from trading_automation.clients.rate_limiter import rate_limiter
+from trading_automation.config.settings import get_settings
+
+if TYPE_CHECKING:
+    from trading_automation.clients.UniversalClient import UniversalClient
+    from trading_automation.websockets.WebsocketInterface import WebsocketInterface
+
+settings = get_settings()
+BYBIT_IP_RATE_LIMIT_BACKOFF = settings.bybit_ip_rate_limit_backoff
+DISCORD_ERROR_MESSAGES_CHANNEL_ID = settings.discord_error_messages_channel_id or 0
+
+# error kinds returned by ExchangeAdapter.classify_error
+RATE_LIMIT = "rate_limit"  # back off and send again, however many times it takes
+IP_BLOCKED = "ip_blocked"  # pause every request to the exchange for ip_block_seconds and send again
+AUTH_EXPIRED = "auth_expired"  # the session expired, refresh_auth and send again
+DUPLICATE_ID = "duplicate_id"  # the order was already placed by an earlier try
+NOT_FOUND = "not_found"  # the order does not exist
+RETRYABLE = "retryable"  # send again, counting towards the client's tries
+
+FTX_ORDER_RATE_PATTERN = re.compile(r"Do not send more than \d orders( total)? per 200ms")
+
+
+class ExchangeAdapter:
+    """What sets an exchange apart from the others, besides the REST calls themselves.
+
+    ``name`` is the exchange family every ``UniversalClient`` method compares ``client.venue`` with, an account name
+    belongs to the first registered adapter whose ``name`` it contains (or equals, if ``exact``) so e.g. "BYBIT2" and
+    "OKEX_LowStakes" resolve to BYBIT and OKEX.
+    """
+    name = ""
+    exact = False
+    # False when orders carry no client order id, so an order that timed out is looked for by side and type instead
+    client_order_ids = True
+    # seconds to wait before sending a request again after a RETRYABLE error
+    retry_delay = 0.0
+    # True when ``UniversalClient.futures_amend_order`` can change the price and quantity of an open limit order
+    amend_orders = False
+    # most limit orders one ``UniversalClient._batch_create_orders`` request places, 0 when the exchange has no batch
+    # order endpoint
+    batch_orders = 0
+    # most orders of a symbol one ``UniversalClient._batch_cancel_orders`` request cancels, 0 when it has no batch cancel
+    batch_cancels = 0
+    # seconds to pause every request to the exchange after an IP_BLOCKED error
+    ip_block_seconds = 60.0
+
+    def matches(self, exchange: str) -> bool:
+        return exchange == self.name if self.exact else self.name in exchange
+
+    def classify_error(self, e: Exception) -> Optional[str]:
+        """The kind of error ``e`` is: RATE_LIMIT, IP_BLOCKED, AUTH_EXPIRED, DUPLICATE_ID, NOT_FOUND, RETRYABLE or None
+        for any other error.
+
+        DUPLICATE_ID is only looked at when creating orders.
+        """
+        return None
+
+    def back_off(self, client: UniversalClient, e: Exception, endpoint: str) -> None:
+        """Slow down the threads sending requests to ``endpoint`` after the RATE_LIMIT error ``e``."""
+        rate_limiter.backoff(client.exchange, endpoint, 0.1)
+
+    def refresh_auth(self, client: UniversalClient) -> None:
+        """Renew ``client``'s session after an AUTH_EXPIRED error."""
+
+    def create_websocket(self, client: UniversalClient, symbol: str, interval: str, candles_limit: int,
+                         **kwargs) -> WebsocketInterface:
+        """A dedicated websocket manager of ``symbol`` for ``client``."""
+        client.logger.writeline(f"ERROR no ws initiated self.exchange: {client.exchange}")
+        raise Exception(f"ERROR no ws initiated self.exchange: {client.exchange}")
+
+
+class ExchangeAdapterRegistry:
+    """Registered adapters in resolution order, and the adapter each exchange account name resolved to."""
+
+    def __init__(self) -> None:
+        self._adapters: List[ExchangeAdapter] = []
+        self._resolved: Dict[str, Optional[ExchangeAdapter]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, adapter_class: Type[ExchangeAdapter]) -> Type[ExchangeAdapter]:
+        """Class decorator adding an adapter after the ones already registered."""
+        with self._lock:
+            self._adapters.append(adapter_class())
+            self._resolved.clear()
+        return adapter_class
+
+    def resolve(self, exchange: str) -> ExchangeAdapter:
+        adapter = self.get(exchange)
+        if adapter is None:
+            raise Exception(f"ERROR no exchange adapter for {exchange}")
+        return adapter
+
+    def get(self, exchange: str) -> Optional[ExchangeAdapter]:
+        """The adapter of ``exchange``, None if there is none."""
+        try:
+            return self._resolved[exchange]
+        except KeyError:
+            pass
+        with self._lock:
+            adapter = next((adapter for adapter in self._adapters if adapter.matches(exchange)), None)
+            self._resolved[exchange] = adapter
+        return adapter
+
+    def names(self) -> List[str]:
+        return [adapter.name for adapter in self._adapters]
+
+
+exchange_adapters = ExchangeAdapterRegistry()
+
+
+@exchange_adapters.register
+class BinanceAdapter(ExchangeAdapter):
+    name = "BINANCE"
+    exact = True
+    amend_orders = True
+    batch_orders = 5
+    batch_cancels = 10
+
+    def classify_error(self, e):
+        if isinstance(e, BinanceAPIException):
+            if e.code == -2013:  # Order does not exist
+                return NOT_FOUND
+            if e.code in (-2022, -4015):  # 'ReduceOnly Order is rejected' and 'Client order id is not valid'
+                return DUPLICATE_ID
+        return None
+
+    def create_websocket(self, client, symbol, interval, candles_limit, **kwargs):
+        from trading_automation.websockets.fwebsockets import WebSocketManager
+        return WebSocketManager(symbol, interval, candles_limit=candles_limit, client=client)
+
+
+@exchange_adapters.register
+class BinanceSpotAdapter(ExchangeAdapter):
+    name = "BINANCE_SPOT"
+    exact = True
+
+    def classify_error(self, e):
+        if isinstance(e, BinanceAPIException) and e.code == -2013:
+            return NOT_FOUND
+        return None
+
+
+@exchange_adapters.register
+class FtxAdapter(ExchangeAdapter):
+    name = "FTX"
+
+    def classify_error(self, e):
+        if FTX_ORDER_RATE_PATTERN.match(str(e)):
+            return RATE_LIMIT
+        if str(e) == "Duplicate client order ID":
+            return DUPLICATE_ID
+        return None
+
+    def create_websocket(self, client, symbol, interval, candles_limit, **kwargs):
+        from trading_automation.websockets.FTXWebSocketManager import FtxWebSocketManager
+        return FtxWebSocketManager(symbol, interval, candles_limit=candles_limit, client=client)
+
+
+@exchange_adapters.register
+class OkexAdapter(ExchangeAdapter):
+    name = "OKEX"
+    amend_orders = True
+    batch_orders = 20
+    batch_cancels = 20
+
+    def classify_error(self, e):
+        if isinstance(e, OkexAPIException):
+            if e.code == "50011":  # Requests too frequent
+                return RATE_LIMIT
+            if e.code == "51016":  # duplicate client ID
+                return DUPLICATE_ID
+            if e.code == "51603":  # Order does not exist
+                return NOT_FOUND
+        return None
+
+    def create_websocket(self, client, symbol, interval, candles_limit, **kwargs):
+        from okex.okexWebSocketManager import OkexWebSocketManager
+        return OkexWebSocketManager(symbol, interval, candles_limit=candles_limit, client=client)
+
+
+@exchange_adapters.register
+class GateAdapter(ExchangeAdapter):
+    name = "GATE"
+    batch_orders = 10
+    batch_cancels = 20
+
+    def classify_error(self, e):
+        if isinstance(e, GateApiException) and e.label == "ORDER_NOT_FOUND":
+            return NOT_FOUND
+        return None
+
+    def create_websocket(self, client, symbol, interval, candles_limit, **kwargs):
+        from trading_automation.websockets.GateWebSocketManager import GateWebSocketManager
+        return GateWebSocketManager(symbol, interval, candles_limit=candles_limit, client=client)
+
+
+@exchange_adapters.register
+class BybitAdapter(ExchangeAdapter):
+    name = "BYBIT"
+    amend_orders = True
+    batch_orders = 10
+    batch_cancels = 10
+
+    ip_block_seconds = BYBIT_IP_RATE_LIMIT_BACKOFF
+
+    def classify_error(self, e):
+        if isinstance(e, InvalidRequestError):
+            if e.status_code == 10018:  # Out of frequency limit
+                return RATE_LIMIT
+            if e.status_code in (30089, 1141):  # duplicate order link id
+                return DUPLICATE_ID
+        if isinstance(e, FailedRequestError) and e.status_code == 403:  # IP rate limited
+            return IP_BLOCKED
+        return None
+
+    def create_websocket(self, client, symbol, interval, candles_limit, **kwargs):
+        from trading_automation.websockets.BybitWebSocketManager import BybitWebSocketManager
+        return BybitWebSocketManager(symbol, interval, candles_limit=candles_limit, client=client)
+
+
+@exchange_adapters.register
+class MexcAdapter(ExchangeAdapter):
+    name = "MEXC"
+    retry_delay = 0.05
+    batch_orders = 50
+    batch_cancels = 50
+
+    def classify_error(self, e):
+        message = str(e)
+        if "MEXC" not in message:
+            return None
+        if "Close order's vol must less or equals than position hold vol" in message or "2008" in message:
+            # when sending a new reduce only order MEXC can still think the previous one has not been cancelled yet
+            return RETRYABLE
+        if "510" in message:  # Request frequently too fast
+            return RATE_LIMIT
+        if "Duplicate order ID" in message or "2042" in message:
+            return DUPLICATE_ID
+        return None
+
+    def create_websocket(self, client, symbol, interval, candles_limit, **kwargs):
+        from trading_automation.websockets.MexcWebSocketManager import MexcWebSocketManager
+        return MexcWebSocketManager(symbol, interval, candles_limit=candles_limit, client=client)
+
+
+@exchange_adapters.register
+class KucoinAdapter(ExchangeAdapter):
+    name = "KUCOIN"
+
+
+@exchange_adapters.register
+class CapitalAdapter(ExchangeAdapter):
+    name = "CAPITAL"
+    client_order_ids = False
+
+    def classify_error(self, e):
+        message = str(e)
+        if 'CAPITAL unable to get deal confirmation' in message:
+            return RETRYABLE
+        if 'CapitalClient ERROR error.public-api.exceeded-request-rate-allowance' in message or \
+                'CapitalClient ERROR error.too-many.requests' in message:
+            return RATE_LIMIT
+        if 'CapitalClient ERROR error.security.token-invalid' in message or \
+                'CapitalClient ERROR error.invalid.session.token' in message:
+            return AUTH_EXPIRED
+        return None
+
+    def refresh_auth(self, client):
+        client.client_capital.refresh_security_tokens()
+
+    def create_websocket(self, client, symbol, interval, candles_limit, **kwargs):
+        from trading_automation.websockets.CapitalWebSocketManager import CapitalWebSocketManager
+        return CapitalWebSocketManager(symbol, interval, candles_limit=candles_limit, client=client)
+
+
+@exchange_adapters.register
+class IgAdapter(ExchangeAdapter):
+    name = "IG"
+
+    def create_websocket(self, client, symbol, interval, candles_limit, **kwargs):
+        from trading_automation.websockets.IgWebSocketManager import IgWebSocketManager
+        return IgWebSocketManager(symbol, interval, candles_limit=candles_limit, client=client)
+
+
+@exchange_adapters.register
+class PhemexAdapter(ExchangeAdapter):
+    name = "PHEMEX"
+    amend_orders = True
+
+    def classify_error(self, e):
+        if isinstance(e, PhemexAPIException):
+            if e.status_code == 429:
+                return RATE_LIMIT
+            if e.code == 11085:  # duplicate client order id
+                return DUPLICATE_ID
+        return None
+
+    def back_off(self, client, e, endpoint):
+        # the Retry-After headers pause the matching buckets so rate_limiter.acquire waits it out
+        retry_after_headers = {k: v for k, v in e.headers.items() if k.startswith('X-RateLimit-Retry-After')}
+        client.logger.writeline(f"PHEMEX rate limited from {endpoint}!, waiting {retry_after_headers}",
+                                discord_channel_id=DISCORD_ERROR_MESSAGES_CHANNEL_ID)
+        rate_limiter.update_from_phemex_headers(client.exchange, e.headers)
+        if not retry_after_headers:
+            rate_limiter.backoff(client.exchange, endpoint, 1)
+
+    def create_websocket(self, client, symbol, interval, candles_limit, phemex_input_q=None, phemex_output_q=None,
+                         **kwargs):
+        from trading_automation.websockets.PhemexWebSocketManager import PhemexWebSocketManager
+        return PhemexWebSocketManager(symbol, interval, candles_limit=candles_limit, client=client,
+                                      phemex_ws_input_q=phemex_input_q, phemex_ws_output_q=phemex_output_q)
+
+
+@exchange_adapters.register
+class BitrueAdapter(ExchangeAdapter):
+    name = "BITRUE"
+
+
+@exchange_adapters.register
+class BingxAdapter(ExchangeAdapter):
+    name = "BINGX"
+    client_order_ids = False
+    batch_cancels = 20
+
+    def classify_error(self, e):
+        # 80012: System currently busy, try again. Status code 429: Too Many Requests
+        if isinstance(e, BingxAPIException) and (e.status_code == 429 or
+                                                 (e.code == 80012 and 'System currently busy, try again' in str(e))):
+            return RATE_LIMIT
+        return None
+
+    def create_websocket(self, client, symbol, interval, candles_limit, **kwargs):
+        from trading_automation.websockets.BingxWebSocketManager import BingxSocketManager
+        return BingxSocketManager(symbol, interval, candles_limit=candles_limit, client=client)
+
+
+@exchange_adapters.register
+class XtAdapter(ExchangeAdapter):
+    name = "XT"
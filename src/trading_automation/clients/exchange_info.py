@@ -0,0 +1,153 @@
+"""Process wide instrument metadata (tick size, step size, max order quantity) shared between UniversalClients."""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from decimal import Decimal
+from typing import TYPE_CHECKING, Dict, Optional
+
+from trading_automation.config.settings import get_settings
+
+if TYPE_CHECKING:
+    from trading_automation.clients.UniversalClient import UniversalClient
+
+EXCHANGE_INFO_TTL = get_settings().exchange_info_ttl
+SNAPSHOT_DIR = os.path.dirname(os.path.realpath(__file__))
+
+
+class ExchangeInfo:
+    """Instrument metadata of one exchange.
+
+    The dictionaries are shared by reference with every client of the exchange and are updated in place on refresh.
+    """
+
+    def __init__(self) -> None:
+        self.tick_sizes: Dict[str, Decimal] = {}
+        self.step_sizes: Dict[str, Decimal] = {}
+        self.max_quantities: Dict[str, Decimal] = {}
+        self.fetched_at = 0.0
+
+    def is_stale(self, ttl: float) -> bool:
+        return time.time() - self.fetched_at > ttl
+
+    def update(self, instruments: list, fetched_at: Optional[float] = None) -> None:
+        """Update from a ``futures_exchange_info()`` style list of instruments."""
+        tick_sizes = {}
+        step_sizes = {}
+        max_quantities = {}
+        for instrument in instruments:
+            tick_sizes[instrument['symbol']] = Decimal(instrument['tickSize'])
+            step_sizes[instrument['symbol']] = Decimal(instrument['stepSize'])
+            if instrument.get('maxQty') is not None:
+                max_quantities[instrument['symbol']] = Decimal(instrument['maxQty'])
+        self.tick_sizes.update(tick_sizes)
+        self.step_sizes.update(step_sizes)
+        self.max_quantities.update(max_quantities)
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+
+    def to_instruments(self) -> list:
+        instruments = []
+        for symbol, tick_size in self.tick_sizes.items():
+            instrument = {"symbol": symbol, "tickSize": str(tick_size), "stepSize": str(self.step_sizes[symbol])}
+            if symbol in self.max_quantities:
+                instrument["maxQty"] = str(self.max_quantities[symbol])
+            instruments.append(instrument)
+        return instruments
+
+
+class ExchangeInfoRegistry:
+    """Thread safe registry holding one :class:`ExchangeInfo` per exchange, keyed by ``client.venue`` so every account
+    of an exchange ("BYBIT", "BYBIT2", ...) shares the same instruments.
+
+    The first client of an exchange in the process fetches the instruments (or loads the on-disk snapshot if it is
+    younger than ``ttl``); every later client reuses the result. A daemon thread per exchange refreshes the data every
+    ``ttl`` seconds and rewrites the snapshot.
+    """
+
+    def __init__(self, ttl: float = EXCHANGE_INFO_TTL, snapshot_dir: str = SNAPSHOT_DIR) -> None:
+        self.ttl = ttl
+        self.snapshot_dir = snapshot_dir
+        self._lock = threading.Lock()
+        self._exchange_locks: Dict[str, threading.Lock] = {}
+        self._infos: Dict[str, ExchangeInfo] = {}
+        self._refreshers: Dict[str, threading.Thread] = {}
+
+    def snapshot_path(self, exchange: str) -> str:
+        return os.path.join(self.snapshot_dir, f'exchange_info_{exchange}.json')
+
+    def is_loaded(self, exchange: str) -> bool:
+        with self._lock:
+            return exchange in self._infos
+
+    def get(self, client: UniversalClient) -> ExchangeInfo:
+        """Return the instrument metadata of ``client.venue``, fetching it with ``client`` only if needed."""
+        exchange = client.venue
+        with self._lock:
+            if exchange in self._infos:
+                return self._infos[exchange]
+            exchange_lock = self._exchange_locks.setdefault(exchange, threading.Lock())
+
+        with exchange_lock:
+            with self._lock:
+                if exchange in self._infos:
+                    return self._infos[exchange]
+            info = self._load_snapshot(exchange)
+            if info is None or info.is_stale(self.ttl):
+                info = ExchangeInfo()
+                self._fetch(client, info)
+            with self._lock:
+                self._infos[exchange] = info
+            self._start_refresher(client, info)
+            return info
+
+    def refresh(self, client: UniversalClient) -> ExchangeInfo:
+        """Fetch the instruments of ``client.venue`` now, regardless of the TTL."""
+        info = self.get(client)
+        self._fetch(client, info)
+        return info
+
+    def _fetch(self, client: UniversalClient, info: ExchangeInfo) -> None:
+        instruments = client.futures_exchange_info()
+        if not instruments:
+            raise Exception(f"ERROR {client.exchange} unable to get exchange info")
+        info.update(instruments)
+        self._save_snapshot(client.venue, info)
+
+    def _load_snapshot(self, exchange: str) -> Optional[ExchangeInfo]:
+        try:
+            with open(self.snapshot_path(exchange), 'r') as f:
+                snapshot = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        info = ExchangeInfo()
+        info.update(snapshot['instruments'], fetched_at=snapshot['fetched_at'])
+        return info
+
+    def _save_snapshot(self, exchange: str, info: ExchangeInfo) -> None:
+        path = self.snapshot_path(exchange)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({"fetched_at": info.fetched_at, "instruments": info.to_instruments()}, f)
+        os.replace(tmp_path, path)
+
+    def _start_refresher(self, client: UniversalClient, info: ExchangeInfo) -> None:
+        with self._lock:
+            if client.venue in self._refreshers:
+                return
+            thread = threading.Thread(target=self._refresh_job, args=(client, info), daemon=True)
+            self._refreshers[client.venue] = thread
+        thread.start()
+
+    def _refresh_job(self, client: UniversalClient, info: ExchangeInfo) -> None:
+        while True:
+            time.sleep(max(self.ttl - (time.time() - info.fetched_at), 1))
+            try:
+                self._fetch(client, info)
+            except Exception as e:
+                client.logger.writeline(f"ERROR {client.exchange} exchange info refresh failed: {e}")
+                time.sleep(60)
+
+
+exchange_info_registry = ExchangeInfoRegistry()
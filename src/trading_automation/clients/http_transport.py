@@ -0,0 +1,145 @@
+"""Pooled keep-alive HTTP connections shared by every exchange client in the process."""
+from __future__ import annotations
+
+import http.cookiejar
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from trading_automation.config.settings import get_settings
+
+settings = get_settings()
+HTTP_POOL_MAXSIZE = settings.http_pool_maxsize
+HTTP_WARM_CONNECTIONS = settings.http_warm_connections
+HTTP_KEEP_ALIVE_INTERVAL = settings.http_keep_alive_interval
+# requests' own pool size, used until the number of strategy threads is known
+DEFAULT_POOL_MAXSIZE = 10
+WARM_UP_TIMEOUT = 5
+
+
+def host_of(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+class HttpTransport:
+    """Keep-alive connection pools per exchange host, shared by every client of the host in the process.
+
+    Each host has a ``requests.Session`` that is never changed after it is created: it stores no cookies and only has
+    requests' default headers, so api keys and signatures are passed as headers of each request and several strategy
+    threads can use the same client at once. Sessions of third party SDKs (python-binance, pybit) keep their own
+    headers but have the host's adapter mounted with ``mount`` so they use the same pool.
+
+    Pools hold up to ``pool_maxsize`` idle connections, set from the number of strategy threads with
+    ``set_strategy_threads`` before clients are created. ``warm_up`` resolves and connects (TCP + TLS) to every
+    registered host ahead of the first order and ``start_keep_alive`` keeps the pooled connections from going idle
+    between candle closes. requests/urllib3 only speak HTTP/1.1, the pools of keep-alive connections stand in for
+    HTTP/2 multiplexing.
+    """
+
+    def __init__(self, pool_maxsize: int = HTTP_POOL_MAXSIZE, warm_connections: int = HTTP_WARM_CONNECTIONS,
+                 keep_alive_interval: float = HTTP_KEEP_ALIVE_INTERVAL) -> None:
+        self.fixed_pool_maxsize = bool(pool_maxsize)
+        self.pool_maxsize = pool_maxsize or DEFAULT_POOL_MAXSIZE
+        self.warm_connections = warm_connections
+        self.keep_alive_interval = keep_alive_interval
+        self._sessions: Dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+        self._keep_alive_thread: Optional[threading.Thread] = None
+
+    def set_strategy_threads(self, threads: int) -> None:
+        """Size the pools of hosts not used yet for ``threads`` strategy threads sending requests at once."""
+        with self._lock:
+            if not self.fixed_pool_maxsize:
+                self.pool_maxsize = max(DEFAULT_POOL_MAXSIZE, threads)
+
+    def session(self, url: str) -> requests.Session:
+        """The shared session of the host of ``url``, created (and the host registered for warm up) on first use."""
+        host = host_of(url)
+        session = self._sessions.get(host)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(host)
+                if session is None:
+                    session = requests.Session()
+                    session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+                    session.mount(host, HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize))
+                    self._sessions[host] = session
+        return session
+
+    def register(self, *urls: str) -> None:
+        """Create the pools of ``urls``' hosts so they are warmed up and kept alive."""
+        for url in urls:
+            self.session(url)
+
+    def adapter(self, url: str) -> HTTPAdapter:
+        return self.session(url).get_adapter(host_of(url))
+
+    def mount(self, session: requests.Session, *urls: str) -> requests.Session:
+        """Make a third party SDK's ``session`` use the shared pools of ``urls``' hosts, before it sends requests."""
+        for url in urls:
+            session.mount(host_of(url), self.adapter(url))
+        return session
+
+    def request(self, method: str, url: str, headers: Optional[dict] = None, **kwargs) -> requests.Response:
+        """``requests.Session.request`` on the shared session of the host, ``headers`` only apply to this request."""
+        return self.session(url).request(method, url, headers=headers, **kwargs)
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        return self.session(request.url).send(request, **kwargs)
+
+    def warm_up(self, urls: Optional[Iterable[str]] = None, connections: Optional[int] = None) -> Dict[str, float]:
+        """Open ``connections`` pooled connections to each host of ``urls`` (default every registered host) at once.
+
+        Any response, even an error status, leaves a resolved and TLS connected keep-alive connection in the pool.
+        Returns the seconds each host took, or -1 for hosts that could not be reached.
+        """
+        if urls is None:
+            with self._lock:
+                hosts = list(self._sessions)
+        else:
+            hosts = sorted({host_of(url) for url in urls})
+        connections = max(1, connections or self.warm_connections)
+        if not hosts:
+            return {}
+
+        def head(host: str) -> float:
+            start = time.monotonic()
+            try:
+                self.request('HEAD', host + '/', timeout=WARM_UP_TIMEOUT, allow_redirects=False)
+            except requests.RequestException:
+                return -1
+            return time.monotonic() - start
+
+        with ThreadPoolExecutor(max_workers=len(hosts) * connections) as executor:
+            futures = {host: [executor.submit(head, host) for _ in range(connections)] for host in hosts}
+        seconds = {}
+        for host, host_futures in futures.items():
+            results = [future.result() for future in host_futures]
+            seconds[host] = -1 if min(results) < 0 else max(results)
+        return seconds
+
+    def start_keep_alive(self, interval: Optional[float] = None) -> None:
+        """Warm up every registered host each ``interval`` seconds in a daemon thread, 0 to not keep alive."""
+        interval = self.keep_alive_interval if interval is None else interval
+        if interval <= 0:
+            return
+        with self._lock:
+            if self._keep_alive_thread is not None:
+                return
+            self._keep_alive_thread = threading.Thread(target=self._keep_alive, args=(interval,),
+                                                       name="HttpTransport keep alive", daemon=True)
+        self._keep_alive_thread.start()
+
+    def _keep_alive(self, interval: float) -> None:
+        while True:
+            time.sleep(interval)
+            self.warm_up()
+
+
+http_transport = HttpTransport()
@@ -8,109 +8,7 @@ import base64
 from typing import Dict, List
 import threading
 from trading_automation.core.Utils import check_if_candles_are_latest, get_current_datetime_string, binance_intervals_to_seconds
-import zlib
-
-
-def update_bids(res, bids_p):
-    bids_u = res['data'][0]['bids']
-    for i in bids_u:
-        bid_price = i[0]
-        for j in bids_p:
-            if bid_price == j[0]:
-                if i[1] == '0':
-                    bids_p.remove(j)
-                    break
-                else:
-                    del j[1]
-                    j.insert(1, i[1])
-                    break
-        else:
-            if i[1] != "0":
-                bids_p.append(i)
-    else:
-        bids_p.sort(key=lambda price: sort_num(price[0]), reverse=True)
-    return bids_p
-
-
-def update_asks(res, asks_p):
-    asks_u = res['data'][0]['asks']
-    for i in asks_u:
-        ask_price = i[0]
-        for j in asks_p:
-            if ask_price == j[0]:
-                if i[1] == '0':
-                    asks_p.remove(j)
-                    break
-                else:
-                    del j[1]
-                    j.insert(1, i[1])
-                    break
-        else:
-            if i[1] != "0":
-                asks_p.append(i)
-    else:
-        asks_p.sort(key=lambda price: sort_num(price[0]))
-    return asks_p
-
-
-def sort_num(n):
-    if n.isdigit():
-        return int(n)
-    else:
-        return float(n)
-
-
-def check(bids, asks):
-    bids_l = []
-    bid_l = []
-    count_bid = 1
-    while count_bid <= 25:
-        if count_bid > len(bids):
-            break
-        bids_l.append(bids[count_bid - 1])
-        count_bid += 1
-    for j in bids_l:
-        str_bid = ':'.join(j[0: 2])
-        bid_l.append(str_bid)
-    asks_l = []
-    ask_l = []
-    count_ask = 1
-    while count_ask <= 25:
-        if count_ask > len(asks):
-            break
-        asks_l.append(asks[count_ask - 1])
-        count_ask += 1
-    for k in asks_l:
-        str_ask = ':'.join(k[0: 2])
-        ask_l.append(str_ask)
-    num = ''
-    if len(bid_l) == len(ask_l):
-        for m in range(len(bid_l)):
-            num += bid_l[m] + ':' + ask_l[m] + ':'
-    elif len(bid_l) > len(ask_l):
-        for n in range(len(ask_l)):
-            num += bid_l[n] + ':' + ask_l[n] + ':'
-        for l in range(len(ask_l), len(bid_l)):
-            num += bid_l[l] + ':'
-    elif len(bid_l) < len(ask_l):
-        for n in range(len(bid_l)):
-            num += bid_l[n] + ':' + ask_l[n] + ':'
-        for l in range(len(bid_l), len(ask_l)):
-            num += ask_l[l] + ':'
-
-    new_num = num[:-1]
-    int_checksum = zlib.crc32(new_num.encode())
-    fina = change(int_checksum)
-    return fina
-
-
-def change(num_old):
-    num = pow(2, 31) - 1
-    if num_old > num:
-        out = num_old - num * 2 - 2
-    else:
-        out = num_old
-    return out
+from trading_automation.core.OrderBook import OrderBook
 
 
 class OkexWebSocket(Websocket, WebsocketInterface):
@@ -189,8 +87,7 @@ class OkexWebSocket(Websocket, WebsocketInterface):
             time.sleep(10)
 
     def _set_up_orderbooks(self):
-        self.asks = []
-        self.bids = []
+        self.orderbook = OrderBook(self.symbol, self.client.precisionPriceDict[self.symbol])
         self._unsubscribe({'channel': 'books', 'instId': self.symbol})
         self._subscribe({'channel': 'books', 'instId': self.symbol})
         self._last_orderbook_update_time = int(time.time()) * 1000
@@ -285,24 +182,15 @@ class OkexWebSocket(Websocket, WebsocketInterface):
             self.orders.pop(oid)
 
     def _handle_orderbook_message(self, message):
+        data = message['data'][0]
         if message['action'] == 'snapshot':
-            self.bids = message['data'][0]['bids']
-            self.asks = message['data'][0]['asks']
-            # checksum
-            checksum = message['data'][0]['checksum']
-            check_num = check(self.bids, self.asks)
-            if check_num != checksum:
-                self.logger.writeline(f"{self.symbol} OKEX orderbook WS Checksum Failed")
-                self._set_up_orderbooks()
+            self.orderbook.apply_snapshot(data['bids'], data['asks'], int(data['ts']))
         elif message['action'] == 'update':
-            self.bids = update_bids(message, self.bids)
-            self.asks = update_asks(message, self.asks)
-            checksum = message['data'][0]['checksum']
-            check_num = check(self.bids, self.asks)
-            if check_num != checksum:
-                self.logger.writeline(f"{self.symbol} OKEX orderbook WS Checksum Failed")
-                self._set_up_orderbooks()
-        self._last_orderbook_update_time = int(message['data'][0]['ts'])
+            self.orderbook.apply_delta(data['bids'], data['asks'], int(data['ts']))
+        if not self.orderbook.validate_okx_checksum(data['checksum']):
+            self.logger.writeline(f"{self.symbol} OKEX orderbook WS Checksum Failed")
+            self._set_up_orderbooks()
+        self._last_orderbook_update_time = int(data['ts'])
 
     def _on_message(self, ws, raw_message):
         if raw_message == "pong":
@@ -402,7 +290,7 @@ class OkexWebSocket(Websocket, WebsocketInterface):
 
     def get_orderbook(self, limit):
         try:
-            return {'asks': self.asks[:limit], 'bids': self.bids[:limit]}
+            return self.orderbook.to_dict(limit)
         except Exception as e:
             self.logger.writeline(f"ERROR: {self.symbol} Websockets cannot provide orderbook")
             self._set_up_orderbooks()
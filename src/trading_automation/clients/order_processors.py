@@ -5,7 +5,7 @@ import time
 from decimal import Decimal
 from typing import TYPE_CHECKING, Any, Dict, Optional
 
-from gate_api import FuturesOrder, FuturesPriceTriggeredOrder
+from gate_api import BatchFuturesOrder, FuturesOrder, FuturesPriceTriggeredOrder
 
 from trading_automation.core.Utils import (
     format_float_in_standard_form,
@@ -132,7 +132,7 @@ def process_okex_order_to_binance(client: 'UniversalClient', order: Optional[Dic
 def process_gate_order_to_binance(client: 'UniversalClient', order: Optional[Any]) -> Optional[Dict[str, Any]]:
     if not order:
         return None
-    if isinstance(order, FuturesOrder):
+    if isinstance(order, (FuturesOrder, BatchFuturesOrder)):
         clientOrderId = order.text
         orderId = order.id
         symbol = order.contract
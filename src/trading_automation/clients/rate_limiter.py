@@ -0,0 +1,193 @@
+"""Proactive token-bucket rate limiting shared by every UniversalClient in the process."""
+from __future__ import annotations
+
+import asyncio
+import functools
+import threading
+import time
+from typing import Dict, Mapping, Optional, Tuple
+
+from trading_automation.core.Metrics import metrics
+
+ORDERS = "orders"
+MARKET_DATA = "market_data"
+ACCOUNT = "account"
+
+# UniversalClient api methods that are not market data
+ENDPOINT_CLASSES: Dict[str, str] = {
+    "futures_create_order": ORDERS,
+    "futures_cancel_order": ORDERS,
+    "futures_amend_order": ORDERS,
+    "_batch_create_orders": ORDERS,
+    "_batch_cancel_orders": ORDERS,
+    "futures_cancel_all_open_orders": ORDERS,
+    "_cancel_all_symbols_orders": ORDERS,
+    "futures_change_leverage": ORDERS,
+    "futures_get_position": ACCOUNT,
+    "futures_account_balance": ACCOUNT,
+    "binance_futures_get_multi_margin_assets": ACCOUNT,
+    "futures_get_balance": ACCOUNT,
+    "futures_get_total_balance": ACCOUNT,
+    "futures_get_order": ACCOUNT,
+    "futures_get_open_orders": ACCOUNT,
+    "futures_get_all_open_orders": ACCOUNT,
+    "futures_get_trades": ACCOUNT,
+}
+
+# (requests per second, burst capacity) per endpoint class, set a little under each exchange's published limits.
+# Market data limits are per IP so are shared by every account of the exchange, order and account limits are per
+# account (e.g. BYBIT and BYBIT2 have separate order buckets).
+RATE_LIMITS: Dict[str, Dict[str, Tuple[float, float]]] = {
+    "BINANCE": {ORDERS: (25, 25), MARKET_DATA: (30, 60), ACCOUNT: (10, 20)},  # 2400 weight/min, 300 orders/10s
+    "FTX": {ORDERS: (8, 2), MARKET_DATA: (25, 25), ACCOUNT: (10, 10)},  # "Do not send more than 2 orders per 200ms"
+    "OKEX": {ORDERS: (25, 30), MARKET_DATA: (9, 10), ACCOUNT: (4, 5)},  # 60/2s orders, 20/2s public, 10/2s account
+    "GATE": {ORDERS: (80, 100), MARKET_DATA: (150, 150), ACCOUNT: (60, 60)},
+    "BYBIT": {ORDERS: (8, 10), MARKET_DATA: (100, 120), ACCOUNT: (8, 10)},  # 600/5s per IP, 10/s per UID
+    "MEXC": {ORDERS: (8, 10), MARKET_DATA: (8, 10), ACCOUNT: (8, 10)},  # 20/2s
+    "PHEMEX": {ORDERS: (7, 10), MARKET_DATA: (1.5, 10), ACCOUNT: (1.5, 10)},  # CONTRACT 500/min, OTHER 100/min
+    "BINGX": {ORDERS: (4, 5), MARKET_DATA: (8, 10), ACCOUNT: (4, 5)},
+    "CAPITAL": {ORDERS: (0.9, 1), MARKET_DATA: (8, 10), ACCOUNT: (8, 10)},  # 1 position/order request per 0.1s
+}
+
+# Phemex rate limit header groups
+PHEMEX_HEADER_GROUPS: Dict[str, Tuple[str, ...]] = {
+    "CONTRACT": (ORDERS,),
+    "OTHER": (MARKET_DATA, ACCOUNT),
+}
+
+
+class TokenBucket:
+    """Thread safe token bucket refilled at ``rate`` tokens per second up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.blocked_until = 0.0
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        # no tokens are added while blocked
+        since = max(self._last_refill, min(self.blocked_until, now))
+        self.tokens = min(self.capacity, self.tokens + (now - since) * self.rate)
+        self._last_refill = now
+
+    def try_acquire(self, tokens: float = 1) -> float:
+        """Take ``tokens`` if available. Returns 0 on success otherwise the number of seconds to wait before retrying."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self.blocked_until:
+                return self.blocked_until - now
+            self._refill(now)
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0
+            return (tokens - self.tokens) / self.rate
+
+    def acquire(self, tokens: float = 1) -> None:
+        """Block until ``tokens`` are available."""
+        while True:
+            wait = self.try_acquire(tokens)
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: float = 1) -> None:
+        """Wait without blocking the event loop until ``tokens`` are available."""
+        while True:
+            wait = self.try_acquire(tokens)
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+    def block(self, seconds: float) -> None:
+        """Stop handing out tokens for ``seconds`` (e.g. after the exchange rate limited us) and empty the bucket."""
+        with self._lock:
+            now = time.monotonic()
+            self.blocked_until = max(self.blocked_until, now + seconds)
+            self.tokens = 0
+            self._last_refill = now
+
+    def set_remaining(self, remaining: float) -> None:
+        """Lower the available tokens to what the exchange reports is remaining."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = max(0, min(self.tokens, remaining))
+
+
+@functools.lru_cache(maxsize=None)
+def exchange_family(exchange: str) -> Optional[str]:
+    """Return the RATE_LIMITS key of an exchange account name, e.g. "BYBIT2" -> "BYBIT", scanned once per name."""
+    for family in RATE_LIMITS:
+        if family in exchange:
+            return family
+    return None
+
+
+class RateLimiter:
+    """Registry of token buckets keyed by exchange and endpoint class."""
+
+    def __init__(self, rate_limits: Mapping[str, Mapping[str, Tuple[float, float]]] = RATE_LIMITS) -> None:
+        self.rate_limits = rate_limits
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, exchange: str, endpoint_class: str) -> Optional[TokenBucket]:
+        family = exchange_family(exchange)
+        if family is None or endpoint_class not in self.rate_limits.get(family, {}):
+            return None
+        # market data limits are per IP rather than per account
+        key = (family if endpoint_class == MARKET_DATA else exchange, endpoint_class)
+        with self._lock:
+            if key not in self._buckets:
+                self._buckets[key] = TokenBucket(*self.rate_limits[family][endpoint_class])
+            return self._buckets[key]
+
+    def acquire(self, exchange: str, func_name: str) -> None:
+        """Block until a call of UniversalClient method ``func_name`` may be sent to ``exchange``."""
+        bucket = self.bucket(exchange, ENDPOINT_CLASSES.get(func_name, MARKET_DATA))
+        if bucket is None:
+            return
+        if not metrics.enabled:
+            bucket.acquire()
+            return
+        started = time.perf_counter()
+        bucket.acquire()
+        metrics.observe('rate_limit_wait_seconds', time.perf_counter() - started, exchange=exchange, endpoint=func_name)
+
+    async def acquire_async(self, exchange: str, func_name: str) -> None:
+        """``acquire`` for coroutines."""
+        bucket = self.bucket(exchange, ENDPOINT_CLASSES.get(func_name, MARKET_DATA))
+        if bucket is not None:
+            await bucket.acquire_async()
+
+    def block(self, exchange: str, seconds: float, endpoint_classes=(ORDERS, MARKET_DATA, ACCOUNT)) -> None:
+        for endpoint_class in endpoint_classes:
+            bucket = self.bucket(exchange, endpoint_class)
+            if bucket is not None:
+                bucket.block(seconds)
+
+    def backoff(self, exchange: str, func_name: str, seconds: float) -> None:
+        """Pause the endpoint class of ``func_name`` for every thread after the exchange rejected a call."""
+        metrics.inc('rate_limit_backoffs_total', exchange=exchange, endpoint=func_name)
+        self.block(exchange, seconds, (ENDPOINT_CLASSES.get(func_name, MARKET_DATA),))
+
+    def update_from_phemex_headers(self, exchange: str, headers: Mapping[str, str]) -> None:
+        """Sync the PHEMEX buckets with the ``X-RateLimit-Remaining-*`` and ``X-RateLimit-Retry-After-*`` headers."""
+        for group, endpoint_classes in PHEMEX_HEADER_GROUPS.items():
+            retry_after = headers.get(f'X-RateLimit-Retry-After-{group}')
+            remaining = headers.get(f'X-RateLimit-Remaining-{group}')
+            for endpoint_class in endpoint_classes:
+                bucket = self.bucket(exchange, endpoint_class)
+                if bucket is None:
+                    continue
+                if retry_after is not None:
+                    bucket.block(float(retry_after))
+                elif remaining is not None:
+                    bucket.set_remaining(float(remaining))
+        if headers.get('X-RateLimit-Retry-After') is not None:
+            self.block(exchange, float(headers['X-RateLimit-Retry-After']))
+
+
+rate_limiter = RateLimiter()
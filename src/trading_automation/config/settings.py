@@ -82,6 +82,33 @@ class Settings(BaseSettings):
     default_recvwindow: int = Field(default=5000, env="DEFAULT_RECVWINDOW")
     okex_use_demo: bool = Field(default=False, env="OKEX_USE_DEMO")
     stagger_bybit_client_inits: bool = Field(default=False, env="STAGGER_BYBIT_CLIENT_INITS")
+    exchange_info_ttl: int = Field(default=21600, env="EXCHANGE_INFO_TTL")
+    bybit_ip_rate_limit_backoff: float = Field(default=30.0, env="BYBIT_IP_RATE_LIMIT_BACKOFF")
+    account_snapshot_max_age: float = Field(default=3.0, env="ACCOUNT_SNAPSHOT_MAX_AGE")
+    candle_close_max_workers: int = Field(default=8, env="CANDLE_CLOSE_MAX_WORKERS")
+    depth_snapshot_max_age: float = Field(default=0.5, env="DEPTH_SNAPSHOT_MAX_AGE")
+    use_kline_archive: bool = Field(default=False, env="USE_KLINE_ARCHIVE")
+    kline_archive_path: str = Field(default="klines_archive", env="KLINE_ARCHIVE_PATH")
+    kline_download_max_workers: int = Field(default=4, env="KLINE_DOWNLOAD_MAX_WORKERS")
+    kline_download_job_tries: int = Field(default=3, env="KLINE_DOWNLOAD_JOB_TRIES")
+    trade_log_max_batch: int = Field(default=256, env="TRADE_LOG_MAX_BATCH")
+    log_queue_size: int = Field(default=10000, env="LOG_QUEUE_SIZE")
+    log_queue_overflow: str = Field(default="block", env="LOG_QUEUE_OVERFLOW")
+    log_flush_interval: float = Field(default=0.5, env="LOG_FLUSH_INTERVAL")
+    log_max_bytes: int = Field(default=100_000_000, env="LOG_MAX_BYTES")
+    log_rotate_interval: float = Field(default=0, env="LOG_ROTATE_INTERVAL")
+    log_backup_count: int = Field(default=5, env="LOG_BACKUP_COUNT")
+    sweep_max_workers: int = Field(default=0, env="SWEEP_MAX_WORKERS")
+    sweep_path: str = Field(default="sweeps", env="SWEEP_PATH")
+    trade_text_max_workers: int = Field(default=0, env="TRADE_TEXT_MAX_WORKERS")
+    http_pool_maxsize: int = Field(default=0, env="HTTP_POOL_MAXSIZE")
+    http_warm_connections: int = Field(default=2, env="HTTP_WARM_CONNECTIONS")
+    http_keep_alive_interval: float = Field(default=20.0, env="HTTP_KEEP_ALIVE_INTERVAL")
+    config_poll_interval: float = Field(default=2.0, env="CONFIG_POLL_INTERVAL")
+    metrics_enabled: bool = Field(default=False, env="METRICS_ENABLED")
+    metrics_port: int = Field(default=9108, env="METRICS_PORT")
+    metrics_summary_interval: float = Field(default=300.0, env="METRICS_SUMMARY_INTERVAL")
+    order_reconcile_interval: float = Field(default=60.0, env="ORDER_RECONCILE_INTERVAL")
     ig_use_demo: bool = Field(default=False, env="IG_USE_DEMO")
     phemex_use_high_rate_api_endpoint: bool = Field(
         default=False, env="PHEMEX_USE_HIGH_RATE_API_ENDPOINT"
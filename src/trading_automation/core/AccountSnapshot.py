@@ -0,0 +1,102 @@
+import threading
+import time
+from typing import Dict, Optional
+
+from trading_automation.clients.UniversalClient import UniversalClient
+from trading_automation.config.settings import get_settings
+
+ACCOUNT_SNAPSHOT_MAX_AGE = get_settings().account_snapshot_max_age
+
+
+class AccountSnapshot:
+    """
+    Read only view of an exchange account's open positions and balances at one point in time.
+    positions is a tuple in the same format as UniversalClient.futures_get_position() with no symbol given, the
+    position dicts are copies so must not be modified as they are shared between strategies, use position() instead
+    """
+    __slots__ = ('positions', 'equity', 'wallet_balance', 'timestamp')
+
+    def __init__(self, positions, equity, wallet_balance, timestamp=None):
+        object.__setattr__(self, 'positions', tuple(dict(p) for p in positions))
+        object.__setattr__(self, 'equity', float(equity))
+        object.__setattr__(self, 'wallet_balance', float(wallet_balance))
+        object.__setattr__(self, 'timestamp', time.time() if timestamp is None else timestamp)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("AccountSnapshot is read only")
+
+    def age(self):
+        return time.time() - self.timestamp
+
+    def position(self, symbol):
+        """
+        :return: list of copies of the positions of symbol, as futures_get_position(symbol) returns them: a zero
+        initialised position if there is no open position, as positions holds every open position of the account
+        """
+        positions = [dict(p) for p in self.positions if p['symbol'] == symbol]
+        if not positions:
+            positions.append({"entryPrice": '0', "positionAmt": '0', "symbol": symbol, "unRealizedProfit": '0'})
+        return positions
+
+    def position_sizes_sum(self):
+        return sum(float(p['entryPrice']) * abs(float(p['positionAmt'])) for p in self.positions)
+
+
+class AccountSnapshotService:
+    """
+    Shares one AccountSnapshot between all strategies on the same exchange account. The snapshot is fetched at most
+    once every max_age seconds no matter how many strategies ask for it; concurrent callers wait for the one fetch in
+    progress rather than making their own requests.
+    """
+
+    def __init__(self, exchange, max_age=ACCOUNT_SNAPSHOT_MAX_AGE):
+        self.exchange = exchange
+        self.max_age = max_age
+        self._snapshot: Optional[AccountSnapshot] = None
+        self._fetch_lock = threading.Lock()
+
+    def get(self, client: UniversalClient, max_age=None) -> AccountSnapshot:
+        """
+        :param client: client of the exchange account used if a new snapshot needs to be fetched
+        :param max_age: override of the maximum age in seconds of the snapshot returned
+        """
+        max_age = self.max_age if max_age is None else max_age
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.age() <= max_age:
+            return snapshot
+        with self._fetch_lock:
+            # another strategy may have fetched while we waited
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.age() <= max_age:
+                return snapshot
+            fetched_at = time.time()
+            positions = client.futures_get_position()
+            equity = client.futures_get_balance()
+            wallet_balance = client.futures_get_total_balance()
+            if positions is None or equity is None or wallet_balance is None:
+                raise Exception(f"ERROR {self.exchange} unable to get account snapshot")
+            self._snapshot = AccountSnapshot(positions, equity, wallet_balance, timestamp=fetched_at)
+            return self._snapshot
+
+    def latest(self) -> Optional[AccountSnapshot]:
+        """
+        :return: the last snapshot fetched without fetching a new one, None if there is none
+        """
+        return self._snapshot
+
+    def invalidate(self):
+        """
+        Force the next get() to fetch a new snapshot, e.g. after a position was opened or closed
+        """
+        self._snapshot = None
+
+
+_services: Dict[str, AccountSnapshotService] = {}
+_services_lock = threading.Lock()
+
+
+def get_account_snapshot_service(exchange) -> AccountSnapshotService:
+    with _services_lock:
+        if exchange not in _services:
+            _services[exchange] = AccountSnapshotService(exchange)
+        return _services[exchange]
@@ -0,0 +1,167 @@
+import threading
+import time
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
+
+from apscheduler.schedulers.background import BackgroundScheduler
+from pytz import utc
+
+from trading_automation.config.settings import get_settings
+from trading_automation.core.Logger import Logger
+from trading_automation.core.Metrics import metrics
+from trading_automation.core.Utils import binance_intervals_to_seconds
+
+settings = get_settings()
+CANDLE_CLOSE_MAX_WORKERS = settings.candle_close_max_workers
+PRINT_CONSOLE = settings.print_console
+
+# cron trigger of set_orders for each interval, run 1 second after the candle closes
+INTERVAL_CRON_TRIGGERS = {
+    "1m": dict(second='01'),
+    "2m": dict(minute='*/2', second='01'),
+    "3m": dict(minute='*/3', second='01'),
+    "5m": dict(minute='*/5', second='01'),
+    "15m": dict(minute='*/15', second='01'),
+    "1h": dict(hour='*/1', minute='0', second='01', misfire_grace_time=360),
+}
+REGULAR_CHECK_SECONDS = 5
+LATENCY_HISTORY = 100
+
+
+class CandleCloseDispatcher:
+    """
+    Owns the clock for every strategy in the process. Instead of each strategy running its own scheduler, strategies
+    register here and are grouped by (exchange, interval). On each candle close the set_orders of every strategy in the
+    group is submitted to one bounded worker pool, strategies exiting a position first, and the strategies'
+    regular_check is run every REGULAR_CHECK_SECONDS on the same pool.
+    A strategy needs exchange, interval, set_orders(), regular_check() and optionally candle_close_priority() (lower
+    runs first). Jobs of the same strategy never run concurrently.
+    Time from candle close to the start and end of each set_orders is kept in latencies.
+    """
+
+    def __init__(self, max_workers=CANDLE_CLOSE_MAX_WORKERS):
+        self.logger = Logger(None, print_console=PRINT_CONSOLE)
+        self.scheduler = BackgroundScheduler(timezone=utc)
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="CandleCloseDispatcher")
+        self.lock = threading.Lock()
+        self.groups: Dict[Tuple[str, str], List] = {}
+        self._strategy_locks: Dict[int, threading.Lock] = {}
+        self._regular_check_pending = set()
+        self._regular_check_job = None
+        # id(strategy): deque of (candle close time, seconds to start set_orders, seconds to finish set_orders), keyed
+        # like the locks by id as str(strategy) can change while the strategy runs
+        self.latencies: Dict[int, deque] = {}
+
+    def register(self, strategy):
+        interval = strategy.interval
+        if interval not in INTERVAL_CRON_TRIGGERS:
+            raise Exception(f"CandleCloseDispatcher does not support interval {interval}")
+        key = (strategy.exchange, interval)
+        with self.lock:
+            self._strategy_locks[id(strategy)] = threading.Lock()
+            self.latencies[id(strategy)] = deque(maxlen=LATENCY_HISTORY)
+            if key not in self.groups:
+                self.groups[key] = []
+                self.scheduler.add_job(self._dispatch_candle_close, 'cron', args=(key,), **INTERVAL_CRON_TRIGGERS[interval])
+            self.groups[key].append(strategy)
+            if self._regular_check_job is None:
+                self._regular_check_job = self.scheduler.add_job(self._dispatch_regular_check, 'cron',
+                                                                 second=f'*/{REGULAR_CHECK_SECONDS}', misfire_grace_time=3)
+            if not self.scheduler.running:
+                self.scheduler.start()
+
+    def unregister(self, strategy):
+        with self.lock:
+            group = self.groups.get((strategy.exchange, strategy.interval), [])
+            if strategy in group:
+                group.remove(strategy)
+            # jobs of the strategy submitted or scheduled after this no longer run
+            self._strategy_locks.pop(id(strategy), None)
+
+    def add_job(self, strategy, func, trigger, args=(), **trigger_args):
+        """
+        Schedule an extra job for a registered strategy, run on the worker pool like set_orders
+        """
+        self.scheduler.add_job(lambda: self.pool.submit(self._run, strategy, func, args), trigger, **trigger_args)
+
+    def submit(self, strategy, func, args=()):
+        """
+        Run func of a registered strategy on the worker pool now, once the strategy's running job (if any) finishes
+        """
+        return self.pool.submit(self._run, strategy, func, args)
+
+    def _run(self, strategy, func, args=(), blocking=True):
+        strategy_lock = self._strategy_locks.get(id(strategy))
+        if strategy_lock is None or not strategy_lock.acquire(blocking=blocking):
+            return False
+        try:
+            func(*args)
+        except Exception as e:
+            self.logger.writeline(f"{strategy} ERROR running {func.__name__} {e} {traceback.format_exc()}")
+        finally:
+            strategy_lock.release()
+        return True
+
+    def _run_set_orders(self, strategy, close_time):
+        started = time.time()
+        # orders the exchange acknowledges during this set_orders are timed from the candle close
+        metrics.set_candle_close(strategy, close_time)
+        try:
+            ran = self._run(strategy, strategy.set_orders)
+        finally:
+            metrics.clear_candle_close()
+        if ran:
+            finished = time.time()
+            self.latencies[id(strategy)].append((close_time, started - close_time, finished - close_time))
+            metrics.observe('set_orders_start_seconds', started - close_time, strategy=str(strategy))
+            metrics.observe('set_orders_finish_seconds', finished - close_time, strategy=str(strategy))
+
+    def _dispatch_candle_close(self, key):
+        exchange, interval = key
+        interval_seconds = binance_intervals_to_seconds(interval)
+        close_time = time.time() // interval_seconds * interval_seconds
+        with self.lock:
+            strategies = list(self.groups[key])
+        # exits before entries
+        strategies.sort(key=lambda s: s.candle_close_priority() if hasattr(s, 'candle_close_priority') else 1)
+        futures = [self.pool.submit(self._run_set_orders, strategy, close_time) for strategy in strategies]
+        wait(futures)
+        finished = [self.latencies[id(s)][-1] for s in strategies
+                    if self.latencies[id(s)] and self.latencies[id(s)][-1][0] == close_time]
+        if finished:
+            self.logger.writeline(f"{exchange} {interval} candle close: set_orders of {len(finished)} strategies "
+                                  f"started within {max(x[1] for x in finished):.2f}s and finished within "
+                                  f"{max(x[2] for x in finished):.2f}s of close")
+
+    def _regular_check(self, strategy):
+        try:
+            # skip if set_orders or the previous regular_check of this strategy is still running
+            self._run(strategy, strategy.regular_check, blocking=False)
+        finally:
+            with self.lock:
+                self._regular_check_pending.discard(id(strategy))
+
+    def _dispatch_regular_check(self):
+        with self.lock:
+            strategies = [s for group in self.groups.values() for s in group
+                          if id(s) not in self._regular_check_pending]
+            self._regular_check_pending.update(id(s) for s in strategies)
+        for strategy in strategies:
+            self.pool.submit(self._regular_check, strategy)
+
+    def get_latencies(self, strategy):
+        return list(self.latencies.get(id(strategy), []))
+
+
+_dispatcher: Optional[CandleCloseDispatcher] = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_candle_close_dispatcher() -> CandleCloseDispatcher:
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = CandleCloseDispatcher()
+        return _dispatcher
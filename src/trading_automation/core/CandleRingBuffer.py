@@ -0,0 +1,138 @@
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+OPEN_TIME = "open_time"
+OPEN = "open"
+HIGH = "high"
+LOW = "low"
+CLOSE = "close"
+VOLUME = "volume"
+CLOSE_TIME = "close_time"
+QUOTE_VOLUME = "quote_volume"
+# column name: (index in the legacy candle list, dtype)
+COLUMNS = {
+    OPEN_TIME: (0, np.int64),
+    OPEN: (1, np.float64),
+    HIGH: (2, np.float64),
+    LOW: (3, np.float64),
+    CLOSE: (4, np.float64),
+    VOLUME: (5, np.float64),
+    CLOSE_TIME: (6, np.int64),
+    QUOTE_VOLUME: (7, np.float64),
+}
+
+
+class CandleRingBuffer:
+    """
+    Fixed capacity store of the latest candles of one symbol and interval, held as one NumPy array per column
+    (open_time, open, high, low, close, volume, close_time, quote_volume).
+    Every slot is written twice, at i and i + ring size, so the latest n candles are always one contiguous slice and
+    columns() returns read only views without copying. The ring holds twice capacity candles so a view taken stays
+    valid for at least capacity more candles, only its live (last) candle is updated in place.
+    The candles are also kept in the legacy [open_time, "open", "high", "low", "close", "volume", close_time, ...] list
+    format as given, to_list() only builds the list of them for callers that still need that format.
+    """
+
+    def __init__(self, capacity, candles=None):
+        if capacity < 1:
+            raise Exception(f"CandleRingBuffer capacity must be at least 1 not {capacity}")
+        self.capacity = capacity
+        self._ring = 2 * capacity
+        self._columns: Dict[str, np.ndarray] = {name: np.zeros(2 * self._ring, dtype=dtype)
+                                                for name, (_, dtype) in COLUMNS.items()}
+        self._rows = np.empty(2 * self._ring, dtype=object)
+        self._count = 0
+        if candles:
+            self.extend(candles)
+
+    def __len__(self):
+        return min(self._count, self.capacity)
+
+    def __getitem__(self, index) -> List:
+        """
+        :return: the legacy candle list at index, e.g. buffer[-1] is the live candle
+        """
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("CandleRingBuffer index out of range")
+        return self._rows[self._end() - size + index]
+
+    def _end(self):
+        """
+        :return: index after the latest candle in the mirrored half of the arrays
+        """
+        return (self._count - 1) % self._ring + self._ring + 1
+
+    def _write(self, slot, candle):
+        for name, (i, dtype) in COLUMNS.items():
+            if i < len(candle):
+                value = int(candle[i]) if dtype is np.int64 else float(candle[i])
+            else:
+                value = np.nan if dtype is np.float64 else 0
+            column = self._columns[name]
+            column[slot] = value
+            column[slot + self._ring] = value
+        self._rows[slot] = candle
+        self._rows[slot + self._ring] = candle
+
+    def append(self, candle):
+        self._write(self._count % self._ring, candle)
+        self._count += 1
+
+    def extend(self, candles):
+        for candle in candles:
+            self.append(candle)
+
+    def replace_last(self, candle):
+        """
+        Update the live candle in place
+        """
+        if self._count == 0:
+            raise Exception("CandleRingBuffer replace_last called with no candles")
+        self._write((self._count - 1) % self._ring, candle)
+
+    def clear(self):
+        self._count = 0
+
+    def last_open_time(self) -> Optional[int]:
+        return int(self._columns[OPEN_TIME][self._end() - 1]) if self._count else None
+
+    def column(self, name, limit=None) -> np.ndarray:
+        """
+        :return: read only view of column name for the latest limit candles, oldest first
+        """
+        size = len(self)
+        limit = size if limit is None else min(limit, size)
+        end = self._end() if self._count else 0
+        view = self._columns[name][end - limit:end]
+        view.flags.writeable = False
+        return view
+
+    def columns(self, limit=None) -> Dict[str, np.ndarray]:
+        return {name: self.column(name, limit) for name in COLUMNS}
+
+    def to_list(self, limit=None) -> List[List]:
+        """
+        :return: the latest limit candles in the legacy list format, as returned by
+        UniversalClient.futures_get_candlesticks
+        """
+        size = len(self)
+        limit = size if limit is None else min(limit, size)
+        if limit <= 0:
+            return []
+        end = self._end()
+        return self._rows[end - limit:end].tolist()
+
+    def is_latest(self):
+        """
+        Same as Utils.check_if_candles_are_latest without building the candle list, False if there are < 2 candles
+        """
+        if len(self) < 2:
+            return False
+        open_times = self.column(OPEN_TIME, 2)
+        close_time = int(open_times[1]) + int(open_times[1] - open_times[0]) - 1
+        return int(time.time() * 1000) <= close_time + 5000
@@ -0,0 +1,205 @@
+import os
+import re
+import threading
+import traceback
+from types import MappingProxyType
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from trading_automation.config.settings import get_settings
+from trading_automation.core.Logger import Logger
+from trading_automation.core.Utils import ARG_FILE_REGEX
+
+settings = get_settings()
+CONFIG_POLL_INTERVAL = settings.config_poll_interval
+PRINT_CONSOLE = settings.print_console
+ARGLIST_PATH = 'arglist.txt'
+ENV_PATH = '.env'
+ENV_LINE_PATTERN = re.compile(r'^\s*([A-Za-z_][A-Za-z0-9_]*)\s*=\s*(.*?)\s*$')
+FLAG_PATTERN = re.compile(r'-([a-z])')
+
+
+def parse_arglist(lines) -> Dict[str, FrozenSet[str]]:
+    """
+    :return: arg file name: flags letters after it (e.g. {'x', 'n'} for "args_x.txt -x -n") of every arg file listed,
+    in arglist order, the first line of an arg file listed more than once is used
+    """
+    arg_files = {}
+    for line in lines:
+        r = re.search(ARG_FILE_REGEX, line.strip())
+        if r and r.group(1) not in arg_files:
+            arg_files[r.group(1)] = frozenset(FLAG_PATTERN.findall(r.group(2) or ""))
+    return arg_files
+
+
+def parse_env(lines) -> Dict[str, str]:
+    """
+    :return: KEY: value of each "KEY = value" line, without quotes around value
+    """
+    env = {}
+    for line in lines:
+        r = ENV_LINE_PATTERN.match(line)
+        if r and not line.lstrip().startswith('#'):
+            value = r.group(2)
+            if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+                value = value[1:-1]
+            env[r.group(1)] = value
+    return env
+
+
+def _read_lines(path) -> Optional[List[str]]:
+    try:
+        with open(path, 'r') as file:
+            return file.readlines()
+    except FileNotFoundError:
+        return None
+
+
+def _stat(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ConfigSnapshot:
+    """
+    Read only view of arglist.txt, the arg files it lists and .env at one point in time. version goes up by one each
+    time any of the files changes.
+    """
+    __slots__ = ('version', 'arglist', 'args', 'env')
+
+    def __init__(self, version, arglist, args, env):
+        object.__setattr__(self, 'version', version)
+        object.__setattr__(self, 'arglist', MappingProxyType(dict(arglist)))
+        object.__setattr__(self, 'args', MappingProxyType({k: tuple(v) for k, v in args.items()}))
+        object.__setattr__(self, 'env', MappingProxyType(dict(env)))
+
+    def __setattr__(self, key, value):
+        raise AttributeError("ConfigSnapshot is read only")
+
+    @property
+    def arg_files(self) -> Tuple[str, ...]:
+        return tuple(self.arglist)
+
+    def arglist_flags(self, arg_file) -> Optional[FrozenSet[str]]:
+        """
+        :return: the flag letters after arg_file in arglist.txt, None if it is not listed
+        """
+        return self.arglist.get(arg_file)
+
+    def arg_lines(self, arg_file) -> Optional[Tuple[str, ...]]:
+        """
+        :return: the stripped lines of arg_file, None if it could not be read
+        """
+        return self.args.get(arg_file)
+
+    def env_float(self, key, default=None) -> Optional[float]:
+        try:
+            return float(self.env[key])
+        except (KeyError, ValueError):
+            return default
+
+
+class ConfigWatcher:
+    """
+    Parses arglist.txt, the arg files it lists and .env once per change and shares the result with every strategy in
+    the process as an immutable ConfigSnapshot, so strategies read their options from memory instead of opening and
+    regex scanning the files on every check. A daemon thread polls the files' modification times every poll_interval
+    seconds; when any file changed the files are parsed again and each subscribed callback is called with the new
+    snapshot.
+    """
+
+    def __init__(self, arglist_path=ARGLIST_PATH, env_path=ENV_PATH, poll_interval=CONFIG_POLL_INTERVAL):
+        self.arglist_path = arglist_path
+        self.env_path = env_path
+        self.poll_interval = poll_interval
+        self.logger = Logger(None, print_console=PRINT_CONSOLE)
+        self._callbacks: List[Callable[[ConfigSnapshot], None]] = []
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._snapshot = self._load(version=1)
+
+    @property
+    def snapshot(self) -> ConfigSnapshot:
+        return self._snapshot
+
+    def _paths(self, arglist) -> List[str]:
+        arglist_dir = os.path.dirname(self.arglist_path)
+        return [self.arglist_path, self.env_path] + [os.path.join(arglist_dir, arg_file) for arg_file in arglist]
+
+    def _load(self, version) -> ConfigSnapshot:
+        arglist = parse_arglist(_read_lines(self.arglist_path) or [])
+        args = {}
+        arglist_dir = os.path.dirname(self.arglist_path)
+        for arg_file in arglist:
+            lines = _read_lines(os.path.join(arglist_dir, arg_file))
+            if lines is not None:
+                args[arg_file] = [line.strip() for line in lines]
+        env = parse_env(_read_lines(self.env_path) or [])
+        self._stats = {path: _stat(path) for path in self._paths(arglist)}
+        return ConfigSnapshot(version, arglist, args, env)
+
+    def check(self) -> bool:
+        """
+        Parse the files again if any of them changed since they were last parsed and call the callbacks
+        :return: whether the files changed
+        """
+        with self._lock:
+            if all(_stat(path) == stat for path, stat in self._stats.items()):
+                return False
+            self._snapshot = self._load(self._snapshot.version + 1)
+            snapshot = self._snapshot
+            callbacks = list(self._callbacks)
+        for callback in callbacks:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                self.logger.writeline(f"ERROR ConfigWatcher callback {callback} {e} {traceback.format_exc()}")
+        return True
+
+    def subscribe(self, callback: Callable[[ConfigSnapshot], None]):
+        """
+        :param callback: called with the new snapshot from the watcher's thread after each change, must not block
+        """
+        with self._lock:
+            self._callbacks.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None or self.poll_interval <= 0:
+                return
+            self._thread = threading.Thread(target=self._poll, name="ConfigWatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def _poll(self):
+        while not self._stopped.wait(self.poll_interval):
+            try:
+                self.check()
+            except Exception as e:
+                self.logger.writeline(f"ERROR ConfigWatcher unable to check config files {e}")
+
+
+_watcher: Optional[ConfigWatcher] = None
+_watcher_lock = threading.Lock()
+
+
+def get_config_watcher() -> ConfigWatcher:
+    """
+    :return: the process wide watcher of arglist.txt and .env in the working directory, polling once started
+    """
+    global _watcher
+    with _watcher_lock:
+        if _watcher is None:
+            _watcher = ConfigWatcher()
+        return _watcher
@@ -0,0 +1,140 @@
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from trading_automation.core.OrderBook import ASKS, BIDS, OrderBook
+from trading_automation.core.Utils import round_interval_nearest
+
+
+class DepthAnalytics:
+    """
+    Depth walks over one OrderBook snapshot. Cumulative quantities and notionals of each side are computed once so every
+    query is a searchsorted over them, and queries accept arrays so many sizes can be answered in one call.
+    Buying walks the asks and selling walks the bids.
+    """
+
+    def __init__(self, book: OrderBook):
+        self.book = book
+        self.tick_size = book.tick_size
+        self._sides: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = {}
+        for side in (BIDS, ASKS):
+            prices, qty = book.levels(side)
+            notional = prices * qty
+            self._sides[side] = (prices, qty, np.cumsum(qty), np.cumsum(notional))
+
+    def _walk(self, side, quantity=None, notional=None):
+        """
+        :return: arrays of (quantity filled, notional filled, index of the last level used), index is len(levels) where
+        the book is not deep enough
+        """
+        if (quantity is None) == (notional is None):
+            raise Exception("DepthAnalytics needs one of quantity or notional")
+        prices, qty, cum_qty, cum_notional = self._sides[side]
+        target = np.atleast_1d(np.asarray(quantity if quantity is not None else notional, dtype=np.float64))
+        cum = cum_qty if quantity is not None else cum_notional
+        i = np.searchsorted(cum, target, side='left')
+        unfilled = i >= len(prices)
+        j = np.minimum(i, len(prices) - 1)
+        qty_before = np.where(j > 0, cum_qty[j - 1], 0.0)
+        notional_before = np.where(j > 0, cum_notional[j - 1], 0.0)
+        if quantity is not None:
+            filled_qty = target
+            filled_notional = notional_before + (target - qty_before) * prices[j]
+        else:
+            filled_notional = target
+            filled_qty = qty_before + (target - notional_before) / prices[j]
+        filled_qty = np.where(unfilled, cum_qty[-1], filled_qty)
+        filled_notional = np.where(unfilled, cum_notional[-1], filled_notional)
+        return filled_qty, filled_notional, i
+
+    def _check_side(self, side):
+        if len(self._sides[side][0]) == 0:
+            raise Exception(f"{self.book.symbol} DepthAnalytics no {side} in order book")
+
+    def vwap(self, side, quantity=None, notional=None):
+        """
+        Average fill price of a market order of quantity (of the asset) or notional (quote value) against side.
+        :return: array of average prices, nan where the book is not deep enough
+        """
+        self._check_side(side)
+        filled_qty, filled_notional, i = self._walk(side, quantity, notional)
+        return np.where(i >= len(self._sides[side][0]), np.nan, filled_notional / filled_qty)
+
+    def last_price(self, side, quantity=None, notional=None):
+        """
+        :return: array of the prices of the last level a market order would reach, nan where the book is not deep enough
+        """
+        self._check_side(side)
+        prices = self._sides[side][0]
+        _, _, i = self._walk(side, quantity, notional)
+        return np.where(i >= len(prices), np.nan, prices[np.minimum(i, len(prices) - 1)])
+
+    def slippage_ticks(self, side, quantity=None, notional=None):
+        """
+        :return: array of the number of ticks between the best price and the last level reached
+        """
+        last = self.last_price(side, quantity, notional)
+        return np.rint(np.abs(last - self._sides[side][0][0]) / float(self.tick_size))
+
+    def price_at_depth(self, side, notional):
+        """
+        :return: array of the prices of the first level at which the cumulative notional from the best price is over
+        notional, nan where the book is not deep enough
+        """
+        prices, _, _, cum_notional = self._sides[side]
+        i = np.searchsorted(cum_notional, np.atleast_1d(np.asarray(notional, dtype=np.float64)), side='right')
+        if len(prices) == 0:
+            return np.full(i.shape, np.nan)
+        return np.where(i >= len(prices), np.nan, prices[np.minimum(i, len(prices) - 1)])
+
+    def imbalance(self, levels):
+        """
+        :return: (bids notional, asks notional, percentage) over the best levels of each side. percentage is positive
+        when there is more notional on the bids
+        """
+        bids_total = float(self._sides[BIDS][3][:levels][-1]) if len(self._sides[BIDS][0]) else 0.0
+        asks_total = float(self._sides[ASKS][3][:levels][-1]) if len(self._sides[ASKS][0]) else 0.0
+        if bids_total < asks_total:
+            percentage = (1 - (asks_total / bids_total)) * 100 if bids_total else -100.0
+        else:
+            percentage = (1 - (bids_total / asks_total)) * -100 if asks_total else 100.0
+        return bids_total, asks_total, percentage
+
+    def market_open(self, position_side, amount_usd) -> Optional[Tuple[Decimal, Decimal, Decimal]]:
+        """
+        See UniversalClient.market_open_avg_price_and_slippage
+        :return: total amount of asset bought, avg price, slippage, None if the book is not deep enough
+        """
+        side = ASKS if position_side == "LONG" else BIDS
+        if len(self._sides[side][0]) == 0:
+            return None
+        filled_qty, filled_notional, i = self._walk(side, notional=float(amount_usd))
+        if i[0] >= len(self._sides[side][0]):
+            return None
+        prices = self._sides[side][0]
+        slippage = abs(float(prices[i[0]]) - float(prices[0]))
+        return round_interval_nearest(Decimal(str(filled_qty[0])), self.tick_size), \
+            round_interval_nearest(Decimal(str(amount_usd)) / Decimal(str(filled_qty[0])), self.tick_size), \
+            round_interval_nearest(Decimal(str(slippage)), self.tick_size)
+
+    def market_close(self, position_size, entry_price) -> Optional[Tuple[float, float, Decimal, Decimal]]:
+        """
+        See UniversalClient.market_close_now_profit
+        :param position_size: negative for shorts
+        :return: total, realised pnl, average price, slippage, None if the book is not deep enough
+        """
+        side = BIDS if position_size > 0 else ASKS
+        if position_size == 0 or len(self._sides[side][0]) == 0:
+            return None
+        size = abs(position_size)
+        _, filled_notional, i = self._walk(side, quantity=size)
+        if i[0] >= len(self._sides[side][0]):
+            return None
+        prices = self._sides[side][0]
+        total = float(filled_notional[0])
+        entry_total = entry_price * size
+        pnl = total - entry_total if position_size > 0 else entry_total - total
+        slippage = abs(float(prices[0]) - float(prices[i[0]]))
+        return round(total, 3), round(pnl, 3), round_interval_nearest(Decimal(str(total / size)), self.tick_size), \
+            round_interval_nearest(Decimal(str(slippage)), self.tick_size)
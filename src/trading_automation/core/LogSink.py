@@ -0,0 +1,172 @@
+import atexit
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict
+
+from trading_automation.config.settings import get_settings
+
+settings = get_settings()
+LOG_QUEUE_SIZE = settings.log_queue_size
+LOG_QUEUE_OVERFLOW = settings.log_queue_overflow
+LOG_FLUSH_INTERVAL = settings.log_flush_interval
+LOG_MAX_BYTES = settings.log_max_bytes
+LOG_ROTATE_INTERVAL = settings.log_rotate_interval
+LOG_BACKUP_COUNT = settings.log_backup_count
+LOG_BUFFER_SIZE = 65536
+
+
+class LogSink:
+    """
+    Writes the lines of a log file from one background thread so threads logging never wait on disk (or console) I/O.
+    write() only appends to a bounded deque, which needs no lock, and the sink thread drains it every flush_interval
+    into a persistent buffered file handle, flushing the handle once per drain.
+    When the queue is full overflow "block" waits for the sink to drain it and "drop" discards the line (counted in
+    dropped and reported in the log once there is room).
+    The file is rotated to <path>.1 ... <path>.<backup_count> when it reaches max_bytes or is rotate_interval seconds
+    old, 0 turns either off.
+    """
+
+    def __init__(self, path, max_queue=LOG_QUEUE_SIZE, overflow=LOG_QUEUE_OVERFLOW, flush_interval=LOG_FLUSH_INTERVAL,
+                 max_bytes=LOG_MAX_BYTES, rotate_interval=LOG_ROTATE_INTERVAL, backup_count=LOG_BACKUP_COUNT):
+        if overflow not in ("block", "drop"):
+            raise Exception(f"LogSink overflow must be 'block' or 'drop' not {overflow}")
+        self.path = path
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.backup_count = backup_count
+        self.dropped = 0
+        self._queue = deque()
+        self._wake = threading.Event()
+        self._space = threading.Condition()
+        self._closed = False
+        self._file = None
+        self._open()
+        self._thread = threading.Thread(target=self._run, name=f"LogSink {path}", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def write(self, line, print_console=False):
+        """
+        Queue one line, a newline is added
+        """
+        if self._closed:
+            if print_console:
+                print(line)
+            with open(self.path, "a") as file:
+                file.write(f"{line}\n")
+            return
+        if len(self._queue) >= self.max_queue:
+            if self.overflow == "drop":
+                self.dropped += 1
+                return
+            self._wake.set()
+            with self._space:
+                self._space.wait_for(lambda: len(self._queue) < self.max_queue or self._closed)
+        self._queue.append((line, print_console))
+
+    def flush(self, timeout=None):
+        """
+        Wait until every line queued so far is written and flushed to the file
+        """
+        if not self._thread.is_alive():
+            return
+        done = threading.Event()
+        self._queue.append(done)
+        self._wake.set()
+        done.wait(timeout)
+
+    def close(self):
+        """
+        Flush and stop the sink thread, lines written afterwards are written straight to the file
+        """
+        if self._closed:
+            return
+        self.flush(timeout=10)
+        self._closed = True
+        self._wake.set()
+        self._thread.join(timeout=10)
+        with self._space:
+            self._space.notify_all()
+
+    def _open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, "a", buffering=LOG_BUFFER_SIZE)
+        self._size = self._file.tell()
+        self._opened = time.time()
+
+    def _rotate(self):
+        self._file.close()
+        if self.backup_count > 0:
+            for i in range(self.backup_count - 1, 0, -1):
+                if os.path.exists(f"{self.path}.{i}"):
+                    os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            open(self.path, "w").close()
+        self._open()
+
+    def _should_rotate(self):
+        return ((self.max_bytes and self._size >= self.max_bytes)
+                or (self.rotate_interval and time.time() - self._opened >= self.rotate_interval))
+
+    def _write_dropped(self):
+        if not self.dropped:
+            return False
+        dropped, self.dropped = self.dropped, 0
+        self._file.write(f"LogSink dropped {dropped} lines as the queue of {self.max_queue} was full\n")
+        return True
+
+    def _drain(self):
+        written = False
+        while self._queue:
+            item = self._queue.popleft()
+            if isinstance(item, threading.Event):
+                self._write_dropped()
+                self._file.flush()
+                item.set()
+                continue
+            line, print_console = item
+            if print_console:
+                print(line)
+            self._file.write(f"{line}\n")
+            self._size += len(line) + 1
+            written = True
+            if self._should_rotate():
+                self._rotate()
+        if self._write_dropped() or written:
+            self._file.flush()
+        with self._space:
+            self._space.notify_all()
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self._drain()
+            except Exception as e:
+                print(f"LogSink error '{e}' occurred writing to {self.path}")
+        self._drain()
+        self._file.close()
+
+
+_sinks: Dict[str, LogSink] = {}
+_sinks_lock = threading.Lock()
+
+
+def get_log_sink(path) -> LogSink:
+    """
+    :return: the process wide LogSink of the log file at path
+    """
+    key = os.path.abspath(path)
+    with _sinks_lock:
+        if key not in _sinks:
+            _sinks[key] = LogSink(path)
+        return _sinks[key]
@@ -12,10 +12,14 @@ from typing import Optional
 from trading_automation.core.Utils import (
     DATETIME_STRING_FORMAT,
     get_current_datetime_string,
+    get_current_timestamp_ms,
     get_datetime_from_string,
     round_interval_nearest,
 )
 from trading_automation.clients.DiscordClient import DiscordClient, DiscordNotificationService
+from trading_automation.core.LogSink import get_log_sink
+from trading_automation.core.TradeLogSchema import to_real
+from trading_automation.core.TradeLogStore import TradeLogStore, get_trade_log_store
 from trading_automation.logging.config import get_logger, log_event
 
 DB_LOG_PATH = str(Path(__file__).resolve().parents[2] / "logs" / "trades.sqlite")
@@ -53,6 +57,29 @@ def execute_read_query(connection, query):
         print(f"{get_current_datetime_string()} The error '{e}' occurred for read query \n {query}")
 
 
+# index seek on internal_wallets(setting, last_update_time), the last updated record is the latest started one as only
+# that one is updated once it exists
+INTERNAL_WALLET_QUERY = "SELECT * FROM internal_wallets WHERE setting = ? ORDER BY last_update_time DESC LIMIT 1"
+INTERNAL_WALLET_MAX_AGE_MS = 30 * 24 * 60 * 60 * 1000
+
+
+def current_internal_wallet_record(existing_record):
+    """
+    :param existing_record: the last updated internal_wallets record of a setting or None
+    :return: existing_record if started less than 30 days ago otherwise None
+    """
+    if existing_record and existing_record[1] is not None and existing_record[1] + INTERNAL_WALLET_MAX_AGE_MS > get_current_timestamp_ms():
+        return existing_record
+    return None
+
+
+def record_decimal(value):
+    """
+    :return: a REAL column value of a trade log record as the Decimal it was written from
+    """
+    return Decimal(str(value))
+
+
 def reverse_readline(filename, buf_size=8192):
     """A generator that returns the lines of a file in reverse order"""
     try:
@@ -131,6 +158,7 @@ class Logger:
         if logpath and not os.path.exists(self.logpath):
             with open(self.logpath, "w"):
                 pass
+        self.log_sink = get_log_sink(logpath) if logpath else None
 
         try:
             os.makedirs(os.path.dirname(self.tradelog_path), exist_ok=True)
@@ -141,23 +169,14 @@ class Logger:
                 pass
 
     def writeline(self, line, discord_channel_id=None):
-        try:
-            os.makedirs(os.path.dirname(self.logpath), exist_ok=True)
-        except OSError as e:
-            print("Creation of the directory %s failed" % e)
-
-        if not os.path.exists(self.logpath):
-            with open(self.logpath, "w"):
-                pass
-        file = open(self.logpath, "a")
         exchange_name = getattr(self.client, "exchange", "") if self.client is not None else ""
         log_event(self._logger, logging.INFO, line, exchange=exchange_name)
         log_entry = f"{get_current_datetime_string()} {exchange_name} {line}"
-        if self.print_console:
+        if self.log_sink is not None:
+            # printing and the file write are done by the sink thread
+            self.log_sink.write(log_entry, self.print_console)
+        elif self.print_console:
             print(log_entry)
-        with file:
-            file.write(f"{log_entry}\n")
-        file.close()
 
         if discord_channel_id and self.discord_client:
             self.discord_client.send_message(log_entry, channel_id=discord_channel_id)
@@ -208,112 +227,116 @@ class Logger:
             csv_writer.writerows(lines)
         file.close()
 
+    @property
+    def trade_log(self) -> TradeLogStore:
+        """
+        The process wide writer of the trade log, opened on first use
+        """
+        return get_trade_log_store(self.tradelog_path)
+
     def write_new_trade(self, setting,  position: dict = None, order: dict = None, post_only_entry=False):
-        sql_connection = create_connection(self.tradelog_path)
         if position and not post_only_entry:
             if position['positionAmt'][0] == "-":
                 position_side = "SHORT"
             else:
                 position_side = "LONG"
-            time = get_current_datetime_string()
-            new_trade = f"""
+            time = get_current_timestamp_ms()
+            new_trade = """
             INSERT INTO
                 trades (symbol, setting, entry_time, average_entry_price, entry_order_amount, position_size, position_size_usdt, position_side)
             VALUES
-                ('{position['symbol']}', '{setting}', '{time}', '{position['entryPrice']}', '{abs(Decimal(position['positionAmt']))}', '{position['positionAmt']}', '{str(abs(Decimal(position['entryPrice']) * Decimal(position['positionAmt'])))}', '{position_side}')
+                (?, ?, ?, ?, ?, ?, ?, ?)
             """
+            params = (position['symbol'], setting, time, float(position['entryPrice']), abs(float(position['positionAmt'])), float(position['positionAmt']), float(abs(Decimal(position['entryPrice']) * Decimal(position['positionAmt']))), position_side)
         elif position and post_only_entry:
             if position['positionAmt'][0] == "-":
                 position_side = "SHORT"
             else:
                 position_side = "LONG"
-            time = get_current_datetime_string()
+            time = get_current_timestamp_ms()
             _, avg_price, slippage = self.client.market_open_avg_price_and_slippage(order['symbol'], position_side, Decimal(order['price']) * Decimal(order['origQty']))
-            new_trade = f"""
+            new_trade = """
             INSERT INTO
                 trades (symbol, setting, entry_time, average_entry_price, entry_order_amount, position_size, position_size_usdt, position_side, at_bid_ask_post_only_entry, if_market_open_avg_price, if_market_open_slippage)
             VALUES
-                ('{position['symbol']}', '{setting}', '{time}', '{position['entryPrice']}', '{abs(Decimal(position['positionAmt']))}', '{position['positionAmt']}', '{str(abs(Decimal(position['entryPrice']) * Decimal(position['positionAmt'])))}', '{position_side}', 'TRUE', '{avg_price}', '{slippage}')
+                (?, ?, ?, ?, ?, ?, ?, ?, 1, ?, ?)
             """
+            params = (position['symbol'], setting, time, float(position['entryPrice']), abs(float(position['positionAmt'])), float(position['positionAmt']), float(abs(Decimal(position['entryPrice']) * Decimal(position['positionAmt']))), position_side, to_real(avg_price), to_real(slippage))
         elif order and post_only_entry:
             if order['side'] == "BUY":
                 position_side = "LONG"
             else:
                 position_side = "SHORT"
             _, avg_price, slippage = self.client.market_open_avg_price_and_slippage(order['symbol'], position_side, Decimal(order['price']) * Decimal(order['origQty']))
-            new_trade = f"""
+            new_trade = """
             INSERT INTO
                 trades (symbol, setting, entry_order_amount, average_entry_price, position_side, at_bid_ask_post_only_entry, if_market_open_avg_price, if_market_open_slippage)
             VALUES
-                ('{order['symbol']}', '{setting}', '{order['origQty']}', '{order['price']}', '{position_side}', 'TRUE', '{avg_price}', '{slippage}')
+                (?, ?, ?, ?, ?, 1, ?, ?)
             """
+            params = (order['symbol'], setting, float(order['origQty']), float(order['price']), position_side, to_real(avg_price), to_real(slippage))
         elif order and not post_only_entry:
             # when an order is provided with not post_only_entry that means a partial filled entry order needs to be logged as a new trade
             if order['side'] == "BUY":
                 position_side = "LONG"
             else:
                 position_side = "SHORT"
-            time = get_current_datetime_string()
-            new_trade = f"""
+            time = get_current_timestamp_ms()
+            new_trade = """
             INSERT INTO
                 trades (symbol, entry_time, setting, entry_order_amount, position_size, position_side, position_size_usdt, average_entry_price)
             VALUES
-                ('{order['symbol']}', '{time}', '{setting}', '{order['origQty']}', '{'-' if position_side=='SHORT' else ''}{order['executedQty']}', '{position_side}', '{str(abs(Decimal(order['avgPrice']) * Decimal(order['executedQty'])))}', '{order['avgPrice']}')
+                (?, ?, ?, ?, ?, ?, ?, ?)
             """
-        record_id = execute_query(sql_connection, new_trade).lastrowid
-        internal_wallet_record = self.get_internal_wallet_record(setting)
-        update_last_trade_id_query = f"""
-        UPDATE
-            internal_wallets
-        SET
-            last_trade_id = {record_id}
-        WHERE
-            id = {internal_wallet_record[0]}
-        """
-        execute_query(sql_connection, update_last_trade_id_query)
-        sql_connection.close()
-        return record_id
+            params = (order['symbol'], time, setting, float(order['origQty']), -float(order['executedQty']) if position_side == 'SHORT' else float(order['executedQty']), position_side, float(abs(Decimal(order['avgPrice']) * Decimal(order['executedQty']))), float(order['avgPrice']))
+
+        def insert_trade(connection):
+            # runs on the trade log writer so the wallet read sees every write queued before it
+            record_id = connection.execute(new_trade, params).lastrowid
+            internal_wallet_record = current_internal_wallet_record(connection.execute(INTERNAL_WALLET_QUERY, (setting,)).fetchone())
+            if internal_wallet_record:
+                connection.execute("UPDATE internal_wallets SET last_trade_id = ? WHERE id = ?", (record_id, internal_wallet_record[0]))
+            return record_id
+
+        return self.trade_log.submit(insert_trade).result()
 
     def update_trade_entry(self, tid: int, position: dict):
         if not tid:
             print("ERROR: update_trade_entry called with not tid")
             return
-        sql_connection = create_connection(self.tradelog_path)
-        time = get_current_datetime_string()
-        update_trade = f"""
+        time = get_current_timestamp_ms()
+        update_trade = """
         UPDATE
             trades
         SET
-            entry_time = '{time}',
-            average_entry_price = '{position['entryPrice']}',
-            position_size = '{position['positionAmt']}',
-            position_size_usdt = '{str(abs(Decimal(position['entryPrice']) * Decimal(position['positionAmt'])))}'
+            entry_time = ?,
+            average_entry_price = ?,
+            position_size = ?,
+            position_size_usdt = ?
         WHERE
-            id = {tid}
+            id = ?
         """
-        execute_query(sql_connection, update_trade)
-        sql_connection.close()
+        self.trade_log.execute(update_trade, (time, float(position['entryPrice']), float(position['positionAmt']), float(abs(Decimal(position['entryPrice']) * Decimal(position['positionAmt']))), tid))
 
     def close_trade_update(self, tid: int, order: dict):
         if not tid:
             print("ERROR: close_trade_update called with not tid")
             return
-        sql_connection = create_connection(self.tradelog_path)
-        time = get_current_datetime_string()
-        trade_record = execute_read_query(sql_connection, f"SELECT * FROM trades WHERE id={tid}")[0]
+        time = get_current_timestamp_ms()
+        trade_record = self.trade_log.query_one("SELECT * FROM trades WHERE id = ?", (tid,), wait_for_writes=True)
         symbol = trade_record[1]
-        initial_position_size = abs(Decimal(trade_record[6]))
+        initial_position_size = abs(record_decimal(trade_record[6]))
         # -------- calculate exit_amount and average_exit_price manually
         exit_amount = trade_record[10]
         if not exit_amount:
             exit_amount = 0
         else:
-            exit_amount = Decimal(exit_amount)
+            exit_amount = record_decimal(exit_amount)
         average_exit_price = trade_record[8]
         if not average_exit_price:
             average_exit_price = 0
         else:
-            average_exit_price = Decimal(average_exit_price)
+            average_exit_price = record_decimal(average_exit_price)
         if Decimal(order['origQty']) == initial_position_size:
             new_exit_amount = Decimal(order['executedQty'])
             new_average_exit_price = Decimal(order['avgPrice'])
@@ -332,23 +355,21 @@ class Logger:
             # above sums for each case is not possible. If there was no errors then the above cases
             # should catch all eventualities
             self.client.logger.writeline(f"{symbol} ERROR: unable to complete trade log")
-            sql_connection.close()
             return
         # /---------- calcs done
         if abs(new_exit_amount) == abs(initial_position_size):
             # calc pnl and fully close trade as we have closed position entirely
             side = trade_record[4]
-            initial_position_size_usdt = Decimal(trade_record[7])
+            initial_position_size_usdt = record_decimal(trade_record[7])
             final_position_size_usdt = new_exit_amount * new_average_exit_price
-            average_entry_price = Decimal(trade_record[8])
+            average_entry_price = record_decimal(trade_record[8])
             if side == "LONG":
                 raw_pnl = final_position_size_usdt - initial_position_size_usdt
                 raw_pnl_percentage = round(((new_average_exit_price/average_entry_price) - 1) * 100, 3)
             elif side == "SHORT":
                 raw_pnl = initial_position_size_usdt - final_position_size_usdt
                 raw_pnl_percentage = round((1 - (new_average_exit_price/average_entry_price)) * 100, 3)
-            entry_time = trade_record[3]
-            ts_entry_time = datetime.strptime(entry_time, DATETIME_STRING_FORMAT).timestamp() * 1000
+            ts_entry_time = trade_record[3]
             interval = re.search("\\d*m", trade_record[2])[0]
             # Need to take off some time to include starting candle. below should be looked at if supporting 2m intervals.
             if interval == "1m":
@@ -359,124 +380,90 @@ class Logger:
                 ts_entry_time -= 300000
             max_unrealised_loss = round(self.client.calculate_max_unrealised_loss_percentage(symbol, ts_entry_time, average_entry_price, side, interval), 3)
             wallet_balance = self.client.futures_get_balance()
-            update_trade = f"""
+            update_trade = """
             UPDATE
                 trades
             SET
-                exit_time = '{time}',
-                exit_amount = '{str(new_exit_amount)}',
-                average_exit_price = '{str(new_average_exit_price)}',
-                raw_pnl = '{str(raw_pnl)}',
-                raw_pnl_percentage = '{str(raw_pnl_percentage)}',
-                max_unrealised_loss = '{str(max_unrealised_loss)}',
-                wallet_balance = '{str(wallet_balance)}'
+                exit_time = ?,
+                exit_amount = ?,
+                average_exit_price = ?,
+                raw_pnl = ?,
+                raw_pnl_percentage = ?,
+                max_unrealised_loss = ?,
+                wallet_balance = ?
             WHERE
-                id = {tid}
+                id = ?
             """
+            params = (time, float(new_exit_amount), float(new_average_exit_price), float(raw_pnl), float(raw_pnl_percentage), float(max_unrealised_loss), to_real(wallet_balance), tid)
             self.update_last_trade_id(tid, None)
         elif abs(new_exit_amount) != abs(initial_position_size):
             # trade not finished so update time, exit_amount and average_exit_price only
-            update_trade = f"""
+            update_trade = """
             UPDATE
                 trades
             SET
-                exit_time = '{time}',
-                exit_amount = '{str(new_exit_amount)}',
-                average_exit_price = '{str(new_average_exit_price)}'
+                exit_time = ?,
+                exit_amount = ?,
+                average_exit_price = ?
             WHERE
-                id = {tid}
+                id = ?
             """
-        execute_query(sql_connection, update_trade)
-        sql_connection.close()
+            params = (time, float(new_exit_amount), float(new_average_exit_price), tid)
+        self.trade_log.execute(update_trade, params)
 
     def increase_post_only_exit_count(self, tid: int, position=None):
         if not tid:
             print("ERROR: increase_post_only_exit_count called with not tid")
             return
-        sql_connection = create_connection(self.tradelog_path)
-        trade_record = execute_read_query(sql_connection, f"SELECT * FROM trades WHERE id={tid}")[0]
+        trade_record = self.trade_log.query_one("SELECT * FROM trades WHERE id = ?", (tid,), wait_for_writes=True)
         # these need to be adjusted if changes are made to the table
         symbol = trade_record[1]
         exit_count = trade_record[23]
         if exit_count:
-            exit_count = int(exit_count) + 1
-            update_trade = f"""
-            UPDATE
-                trades
-            SET
-                at_bid_ask_post_only_exit_count = {exit_count}
-            WHERE
-                id = {tid}
-            """
+            self.trade_log.execute("UPDATE trades SET at_bid_ask_post_only_exit_count = at_bid_ask_post_only_exit_count + 1 WHERE id = ?", (tid,))
         else:
             _, realised_pnl, average_price, slippage = self.client.market_close_now_profit(symbol, position=position)
-            update_trade = f"""
+            update_trade = """
             UPDATE
                 trades
             SET
                 at_bid_ask_post_only_exit_count = 1,
                 at_bid_ask_post_only_exit_failed_count = 0,
-                if_market_close_avg_price = '{str(average_price)}',
-                if_market_close_pnl = '{str(realised_pnl)}',
-                if_market_close_slippage = '{str(slippage)}'
+                if_market_close_avg_price = ?,
+                if_market_close_pnl = ?,
+                if_market_close_slippage = ?
             WHERE
-                id = {tid}
+                id = ?
             """
-        execute_query(sql_connection, update_trade)
-        sql_connection.close()
+            self.trade_log.execute(update_trade, (to_real(average_price), to_real(realised_pnl), to_real(slippage), tid))
 
     def increase_post_only_exit_failed_count(self, tid: int):
         if not tid:
             print("ERROR: increase_post_only_exit_failed_count called with not tid")
             return
-        sql_connection = create_connection(self.tradelog_path)
-        trade_record = execute_read_query(sql_connection, f"SELECT * FROM trades WHERE id={tid}")[0]
-        # these need to be adjusted if changes are made to the table
-        exit_failed_count = trade_record[24]
-        update_trade = f"""
+        update_trade = """
         UPDATE
             trades
         SET
-            at_bid_ask_post_only_exit_failed_count = {exit_failed_count + 1}
+            at_bid_ask_post_only_exit_failed_count = COALESCE(at_bid_ask_post_only_exit_failed_count, 0) + 1
         WHERE
-            id = {tid}
+            id = ?
         """
-        execute_query(sql_connection, update_trade)
-        sql_connection.close()
+        self.trade_log.execute(update_trade, (tid,))
 
     def trades_log_failed_entry(self, symbol):
         """
         use this to create a dummy entry when a trade has failed to log
         """
-        sql_connection = create_connection(self.tradelog_path)
-        time = get_current_datetime_string()
-        new_trade = f"""
-                INSERT INTO
-                    trades (symbol, position_side, exit_time)
-                VALUES
-                    ('{symbol}', 'UNKNOWN', '{time}')
-                """
-        execute_query(sql_connection, new_trade)
-        sql_connection.close()
+        time = get_current_timestamp_ms()
+        self.trade_log.execute("INSERT INTO trades (symbol, position_side, exit_time) VALUES (?, 'UNKNOWN', ?)", (symbol, time))
 
     def get_internal_wallet_record(self, setting: str):
         """
         Only returns a record if found less than 30 days old
         :return: None or record
         """
-        sql_connection = create_connection(self.tradelog_path)
-        existing_records = execute_read_query(sql_connection, f"SELECT * FROM internal_wallets WHERE setting = '{setting}'")
-        retval = None
-        if existing_records:
-            if len(existing_records) == 1:
-                existing_record = existing_records[0]
-            else:
-                existing_records.sort(key=lambda x: get_datetime_from_string(x[1]))
-                existing_record = existing_records[-1]
-            if get_datetime_from_string(existing_record[1]) + timedelta(days=30) > datetime.now():
-                retval = existing_record
-        sql_connection.close()
-        return retval
+        return current_internal_wallet_record(self.trade_log.query_one(INTERNAL_WALLET_QUERY, (setting,), wait_for_writes=True))
 
     def get_internal_wallet_balance_and_drawdown_value_and_last_trade_id(self, setting: str):
         """
@@ -497,41 +484,32 @@ class Logger:
         wallet goes below
         :return:
         """
-        sql_connection = create_connection(self.tradelog_path)
-        existing_record = self.get_internal_wallet_record(setting)
-        if existing_record:
-            update_record_query = f"""
-                UPDATE
-                    internal_wallets
-                SET
-                    internal_wallet = '{str(round(internal_wallet_value,2))}',
-                    internal_wallet_max_drawdown = '{str(round(internal_wallet_max_drawdown_value,2))}',
-                    last_update_time = '{get_current_datetime_string()}'
-                WHERE
-                    id = {existing_record[0]}
-                """
-            execute_query(sql_connection, update_record_query)
-        else:
-            create_query = f"""
-                INSERT INTO
-                    internal_wallets (start_time, setting, internal_wallet, internal_wallet_max_drawdown, last_update_time)
-                VALUES
-                    ('{get_current_datetime_string()}', '{setting}', '{str(round(internal_wallet_value, 2))}', '{str(round(internal_wallet_max_drawdown_value, 2))}', '{get_current_datetime_string()}')
-                """
-            execute_query(sql_connection, create_query)
-        sql_connection.close()
+        internal_wallet = round(float(internal_wallet_value), 2)
+        internal_wallet_max_drawdown = round(float(internal_wallet_max_drawdown_value), 2)
+        time = get_current_timestamp_ms()
+
+        def write_internal_wallet(connection):
+            existing_record = current_internal_wallet_record(connection.execute(INTERNAL_WALLET_QUERY, (setting,)).fetchone())
+            if existing_record:
+                connection.execute("""
+                    UPDATE
+                        internal_wallets
+                    SET
+                        internal_wallet = ?,
+                        internal_wallet_max_drawdown = ?,
+                        last_update_time = ?
+                    WHERE
+                        id = ?
+                    """, (internal_wallet, internal_wallet_max_drawdown, time, existing_record[0]))
+            else:
+                connection.execute("""
+                    INSERT INTO
+                        internal_wallets (start_time, setting, internal_wallet, internal_wallet_max_drawdown, last_update_time)
+                    VALUES
+                        (?, ?, ?, ?, ?)
+                    """, (time, setting, internal_wallet, internal_wallet_max_drawdown, time))
+
+        self.trade_log.submit(write_internal_wallet)
 
     def update_last_trade_id(self, old_tid, new_tid):
-        sql_connection = create_connection(self.tradelog_path)
-        if new_tid is None:
-            new_tid = 'NULL'
-        update_last_trade_id_query = f"""
-        UPDATE
-            internal_wallets
-        SET
-            last_trade_id = {new_tid}
-        WHERE
-            last_trade_id = {old_tid}
-        """
-        execute_query(sql_connection, update_last_trade_id_query)
-        sql_connection.close()
+        self.trade_log.execute("UPDATE internal_wallets SET last_trade_id = ? WHERE last_trade_id = ?", (new_tid, old_tid))
@@ -0,0 +1,235 @@
+import bisect
+import functools
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+from trading_automation.config.settings import get_settings
+
+settings = get_settings()
+METRICS_ENABLED = settings.metrics_enabled
+METRICS_PORT = settings.metrics_port
+METRICS_SUMMARY_INTERVAL = settings.metrics_summary_interval
+# upper bounds in seconds of the histogram buckets, the last bucket is +Inf
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# (label name, label value) pairs of a series
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """
+    Counts of observations per bucket, their sum and count, in the Prometheus histogram format
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q) -> float:
+        """
+        :return: upper bound of the bucket holding quantile q, the largest finite bound if it is in the +Inf bucket
+        """
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return bound
+        return self.buckets[-1]
+
+
+class Metrics:
+    """
+    Process wide counters and latency histograms of exchange calls, websocket message handlers and strategies, keyed
+    by metric name and labels. Nothing is recorded unless enabled, callers check metrics.enabled before timing so
+    disabled metrics cost one attribute lookup. Exposed as Prometheus text on http://127.0.0.1:<port>/metrics by
+    start_http_server and written to the log every interval seconds by start_summaries.
+    """
+
+    def __init__(self, enabled=METRICS_ENABLED):
+        self.enabled = enabled
+        self.counters: Dict[str, Dict[Labels, float]] = {}
+        self.histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self.help: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._summary_thread: Optional[threading.Thread] = None
+
+    def describe(self, name, help_text):
+        self.help[name] = help_text
+
+    def inc(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        if not self.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(seconds)
+
+    def timed_handler(self, func):
+        """
+        Decorator of websocket message handlers (self, *args) counting the messages and timing the handler per class
+        """
+        @functools.wraps(func)
+        def wrapper(handler_self, *args, **kwargs):
+            if not self.enabled:
+                return func(handler_self, *args, **kwargs)
+            started = time.perf_counter()
+            handler = type(handler_self).__name__
+            try:
+                return func(handler_self, *args, **kwargs)
+            finally:
+                self.observe('websocket_handler_seconds', time.perf_counter() - started, handler=handler)
+                self.inc('websocket_messages_total', handler=handler)
+        return wrapper
+
+    def set_candle_close(self, strategy, close_time):
+        """
+        Mark the current thread as running strategy's set_orders for the candle that closed at close_time (epoch
+        seconds), orders acknowledged by the exchange on this thread until clear_candle_close are timed from it
+        """
+        self._local.candle_close = (str(strategy), close_time)
+
+    def clear_candle_close(self):
+        self._local.candle_close = None
+
+    def order_acknowledged(self):
+        """
+        Record the time from candle close to now if the current thread is running a set_orders after a candle close
+        """
+        candle_close = getattr(self._local, 'candle_close', None)
+        if candle_close is not None:
+            strategy, close_time = candle_close
+            self.observe('candle_close_to_order_ack_seconds', time.time() - close_time, strategy=strategy)
+
+    def render(self) -> str:
+        """
+        :return: every series in the Prometheus text exposition format
+        """
+        lines = []
+        with self._lock:
+            for name, series in sorted(self.counters.items()):
+                lines.append(f"# HELP {name} {self.help.get(name, name)}")
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in series.items():
+                    lines.append(f"{name}{_format_labels(labels)} {value}")
+            for name, series in sorted(self.histograms.items()):
+                lines.append(f"# HELP {name} {self.help.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, histogram in series.items():
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets + ('+Inf',), histogram.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(labels + (('le', str(bound)),))} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> List[str]:
+        """
+        :return: one line per histogram series with its count, mean, p50 and p99 and one per counter series
+        """
+        lines = []
+        with self._lock:
+            for name, series in sorted(self.histograms.items()):
+                for labels, h in sorted(series.items()):
+                    mean = h.sum / h.count if h.count else 0.0
+                    lines.append(f"{name}{_format_labels(labels)} count={h.count} mean={mean:.4f}s "
+                                 f"p50<={h.quantile(0.5)}s p99<={h.quantile(0.99)}s")
+            for name, series in sorted(self.counters.items()):
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(labels)} {value}")
+        return lines
+
+    def start_http_server(self, port=METRICS_PORT, host='127.0.0.1') -> Optional[ThreadingHTTPServer]:
+        """
+        Serve render() on /metrics in a daemon thread, port 0 to not serve
+        """
+        if not self.enabled or not port or self._server is not None:
+            return self._server
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="Metrics http", daemon=True).start()
+        return self._server
+
+    def start_summaries(self, logger, interval=METRICS_SUMMARY_INTERVAL):
+        """
+        Write summary() with logger every interval seconds in a daemon thread, 0 to not write summaries
+        """
+        if not self.enabled or interval <= 0 or self._summary_thread is not None:
+            return
+
+        def write_summaries():
+            while True:
+                time.sleep(interval)
+                lines = self.summary()
+                if lines:
+                    logger.writeline("metrics summary:\n" + "\n".join(lines))
+
+        self._summary_thread = threading.Thread(target=write_summaries, name="Metrics summary", daemon=True)
+        self._summary_thread.start()
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+metrics = Metrics()
+metrics.describe('exchange_request_seconds', 'Seconds per exchange request attempt by outcome')
+metrics.describe('exchange_call_seconds', 'Seconds per UniversalClient api call including retries and waits')
+metrics.describe('exchange_retries_total', 'Exchange request attempts retried by reason')
+metrics.describe('rate_limit_wait_seconds', 'Seconds waited for a rate limiter token before a request')
+metrics.describe('rate_limit_backoffs_total', 'Endpoint class back offs after the exchange rate limited a request')
+metrics.describe('websocket_messages_total', 'Websocket messages handled')
+metrics.describe('websocket_handler_seconds', 'Seconds spent handling a websocket message')
+metrics.describe('set_orders_start_seconds', 'Seconds from candle close to the start of set_orders')
+metrics.describe('set_orders_finish_seconds', 'Seconds from candle close to the end of set_orders')
+metrics.describe('candle_close_to_order_ack_seconds', 'Seconds from candle close to an order acknowledged by the exchange')
+metrics.describe('order_requests_total', 'Order requests sent placing the orders of a bar')
+metrics.describe('order_requests_saved_total', 'Order requests saved by reconciling orders instead of replacing them')
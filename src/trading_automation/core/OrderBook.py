@@ -0,0 +1,172 @@
+import zlib
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from trading_automation.core.Utils import format_float_in_standard_form
+
+BIDS = "bids"
+ASKS = "asks"
+OKX_CHECKSUM_DEPTH = 25
+
+
+class OrderBook:
+    """
+    Order book of one symbol held as NumPy arrays: prices as int64 numbers of ticks and quantities as float64.
+    Bids are kept sorted best (highest) first and asks best (lowest) first so the best bid/ask is index 0.
+    Levels can be given as [price, qty] pairs of strings or numbers, as returned by UniversalClient.futures_order_book
+    or the exchanges' websocket depth channels. A snapshot replaces the book and a delta merges levels into it, a
+    quantity of 0 removing the level. The raw strings of each level are also kept so exchange checksums that are
+    calculated on the strings (e.g. OKX) can be validated.
+    """
+
+    def __init__(self, symbol, tick_size):
+        self.symbol = symbol
+        self.tick_size = Decimal(str(tick_size))
+        self._tick = float(self.tick_size)
+        # prices are rounded to the tick's decimal places so ticks * tick does not give e.g. 11.870000000000001
+        self._decimals = max(0, -self.tick_size.normalize().as_tuple().exponent)
+        empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64))
+        # (price ticks, quantities), replaced as a whole on update so readers always see a consistent side
+        self._sides: Dict[str, Tuple[np.ndarray, np.ndarray]] = {BIDS: empty, ASKS: empty}
+        self._raw: Dict[str, Dict[int, Tuple[str, str]]] = {BIDS: {}, ASKS: {}}
+        self.timestamp = None
+
+    @classmethod
+    def from_dict(cls, symbol, tick_size, order_book, timestamp=None):
+        """
+        :param order_book: {"bids": [[price, qty], ...], "asks": [[price, qty], ...]}
+        """
+        book = cls(symbol, tick_size)
+        book.apply_snapshot(order_book.get(BIDS, []), order_book.get(ASKS, []), timestamp)
+        return book
+
+    def _to_arrays(self, levels):
+        if len(levels) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        levels = np.asarray([level[:2] for level in levels], dtype=np.float64)
+        return np.rint(levels[:, 0] / self._tick).astype(np.int64), levels[:, 1]
+
+    def _set_side(self, side, ticks, qty):
+        order = np.argsort(-ticks if side == BIDS else ticks, kind='stable')
+        self._sides[side] = (ticks[order], qty[order])
+
+    def _set_raw(self, side, levels, ticks, replace):
+        raw = {} if replace else self._raw[side]
+        for tick, level in zip(ticks.tolist(), levels):
+            if float(level[1]) == 0:
+                raw.pop(tick, None)
+            else:
+                raw[tick] = (str(level[0]), str(level[1]))
+        self._raw[side] = raw
+
+    def apply_snapshot(self, bids, asks, timestamp=None):
+        for side, levels in ((BIDS, bids), (ASKS, asks)):
+            ticks, qty = self._to_arrays(levels)
+            keep = qty > 0
+            self._set_side(side, ticks[keep], qty[keep])
+            self._set_raw(side, levels, ticks, replace=True)
+        self.timestamp = timestamp
+
+    def apply_delta(self, bids, asks, timestamp=None):
+        for side, levels in ((BIDS, bids), (ASKS, asks)):
+            if len(levels) == 0:
+                continue
+            new_ticks, new_qty = self._to_arrays(levels)
+            ticks, qty = self._sides[side]
+            # levels in the delta replace existing levels of the same price, 0 quantities delete them
+            keep = ~np.isin(ticks, new_ticks)
+            add = new_qty > 0
+            self._set_side(side, np.concatenate((ticks[keep], new_ticks[add])), np.concatenate((qty[keep], new_qty[add])))
+            self._set_raw(side, levels, new_ticks, replace=False)
+        self.timestamp = timestamp
+
+    def levels(self, side, limit=None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        :return: (prices, quantities) of the best limit levels of side as float arrays, best first
+        """
+        ticks, qty = self._sides[side]
+        if limit is not None:
+            ticks, qty = ticks[:limit], qty[:limit]
+        return np.round(ticks * self._tick, self._decimals), qty
+
+    def depth(self, side):
+        return len(self._sides[side][0])
+
+    def best_bid(self) -> Optional[float]:
+        ticks = self._sides[BIDS][0]
+        return round(float(ticks[0] * self._tick), self._decimals) if len(ticks) else None
+
+    def best_ask(self) -> Optional[float]:
+        ticks = self._sides[ASKS][0]
+        return round(float(ticks[0] * self._tick), self._decimals) if len(ticks) else None
+
+    def best_bid_ticks(self) -> Optional[int]:
+        ticks = self._sides[BIDS][0]
+        return int(ticks[0]) if len(ticks) else None
+
+    def best_ask_ticks(self) -> Optional[int]:
+        ticks = self._sides[ASKS][0]
+        return int(ticks[0]) if len(ticks) else None
+
+    def is_crossed(self):
+        bid, ask = self.best_bid_ticks(), self.best_ask_ticks()
+        return bid is not None and ask is not None and bid >= ask
+
+    def fill(self, side, quantity=None, notional=None):
+        """
+        Walk side of the book (ASKS to buy, BIDS to sell) until quantity of the asset or notional (quantity * price)
+        is filled.
+        :return: (quantity filled, notional filled, price of the last level used). The book may not be deep enough to
+        fill everything, in which case the totals of the whole side are returned
+        """
+        if (quantity is None) == (notional is None):
+            raise Exception("OrderBook.fill needs one of quantity or notional")
+        prices, qty = self.levels(side)
+        if len(prices) == 0:
+            return 0.0, 0.0, None
+        values = prices * qty
+        cum = np.cumsum(qty if quantity is not None else values)
+        target = quantity if quantity is not None else notional
+        i = int(np.searchsorted(cum, target, side='left'))
+        if i >= len(cum):
+            return float(cum[-1] if quantity is not None else qty.sum()), float(values.sum()), float(prices[-1])
+        before_qty = float(qty[:i].sum())
+        before_value = float(values[:i].sum())
+        if quantity is not None:
+            remaining_qty = quantity - before_qty
+            return float(quantity), before_value + remaining_qty * float(prices[i]), float(prices[i])
+        remaining_value = notional - before_value
+        return before_qty + remaining_value / float(prices[i]), float(notional), float(prices[i])
+
+    def to_dict(self, limit=None):
+        """
+        :return: the legacy {"bids": [[str, str]], "asks": [[str, str]]} format of UniversalClient.futures_order_book
+        """
+        result = {}
+        for side in (BIDS, ASKS):
+            ticks, qty = self._sides[side]
+            if limit is not None:
+                ticks, qty = ticks[:limit], qty[:limit]
+            result[side] = [[format_float_in_standard_form(Decimal(int(t)) * self.tick_size), format_float_in_standard_form(q)]
+                            for t, q in zip(ticks.tolist(), qty.tolist())]
+        return result
+
+    def okx_checksum(self, depth=OKX_CHECKSUM_DEPTH):
+        """
+        CRC32 of the best depth bids and asks interleaved as "bidPx:bidSz:askPx:askSz:...", as a signed 32 bit integer.
+        See https://www.okx.com/docs-v5/en/#order-book-trading-market-data-ws-order-book-channel
+        """
+        bid_ticks, ask_ticks = self._sides[BIDS][0][:depth].tolist(), self._sides[ASKS][0][:depth].tolist()
+        parts = []
+        for i in range(max(len(bid_ticks), len(ask_ticks))):
+            if i < len(bid_ticks):
+                parts.extend(self._raw[BIDS][bid_ticks[i]])
+            if i < len(ask_ticks):
+                parts.extend(self._raw[ASKS][ask_ticks[i]])
+        checksum = zlib.crc32(':'.join(parts).encode())
+        return checksum - (1 << 32) if checksum >= (1 << 31) else checksum
+
+    def validate_okx_checksum(self, checksum):
+        return self.okx_checksum() == int(checksum)
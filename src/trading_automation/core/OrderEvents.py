@@ -0,0 +1,101 @@
+import threading
+import time
+import traceback
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from trading_automation.config.settings import get_settings
+from trading_automation.core.Logger import Logger
+from trading_automation.core.Utils import is_order_filled, is_order_filled_partial
+
+settings = get_settings()
+PRINT_CONSOLE = settings.print_console
+
+# events passed to OrderEventBus callbacks with the Binance style order, or position for POSITION_UPDATED
+ORDER_FILLED = "ORDER_FILLED"
+ORDER_PARTIALLY_FILLED = "ORDER_PARTIALLY_FILLED"
+ORDER_UPDATED = "ORDER_UPDATED"  # any other order status, e.g. NEW or CANCELED
+POSITION_UPDATED = "POSITION_UPDATED"
+
+
+def order_event(order) -> str:
+    """
+    :return: the event published for order, ORDER_FILLED, ORDER_PARTIALLY_FILLED or ORDER_UPDATED
+    """
+    if is_order_filled(order):
+        return ORDER_FILLED
+    if is_order_filled_partial(order):
+        return ORDER_PARTIALLY_FILLED
+    return ORDER_UPDATED
+
+
+class OrderEventBus:
+    """
+    Process wide order lifecycle events of every exchange account, fed by the websocket managers' private order and
+    position channels as soon as each message is parsed into the Binance style order or position. Strategies subscribe
+    a callback per (exchange, symbol) and learn of fills within milliseconds instead of polling the REST API.
+    A websocket manager calls register_publisher(exchange) once its private channels are subscribed, so strategies on
+    exchanges without a publisher know they still need to poll.
+    """
+
+    def __init__(self):
+        self.logger = Logger(None, print_console=PRINT_CONSOLE)
+        self._lock = threading.Lock()
+        self._callbacks: Dict[Tuple[str, str], List[Callable[[str, object], None]]] = {}
+        self._publishers: Set[str] = set()
+        # exchange: time.time() of the last event published
+        self._last_event_time: Dict[str, float] = {}
+
+    def register_publisher(self, exchange):
+        with self._lock:
+            self._publishers.add(exchange)
+
+    def is_streaming(self, exchange) -> bool:
+        """
+        :return: whether order events of exchange are published
+        """
+        return exchange in self._publishers
+
+    def last_event_time(self, exchange) -> Optional[float]:
+        return self._last_event_time.get(exchange)
+
+    def subscribe(self, exchange, symbol, callback: Callable[[str, object], None]):
+        """
+        :param callback: called with (event, order or position) from the publishing websocket's thread, must not block
+        """
+        with self._lock:
+            self._callbacks.setdefault((exchange, symbol), []).append(callback)
+
+    def unsubscribe(self, exchange, symbol, callback):
+        with self._lock:
+            callbacks = self._callbacks.get((exchange, symbol), [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+
+    def publish_order(self, exchange, symbol, order):
+        self._publish(exchange, symbol, order_event(order), order)
+
+    def publish_position(self, exchange, symbol, position):
+        self._publish(exchange, symbol, POSITION_UPDATED, position)
+
+    def _publish(self, exchange, symbol, event, payload):
+        with self._lock:
+            self._last_event_time[exchange] = time.time()
+            callbacks = list(self._callbacks.get((exchange, symbol), []))
+        for callback in callbacks:
+            try:
+                callback(event, payload)
+            except Exception as e:
+                self.logger.writeline(f"{exchange} {symbol} ERROR OrderEventBus callback {callback} {e} "
+                                      f"{traceback.format_exc()}")
+
+
+_bus: Optional[OrderEventBus] = None
+_bus_lock = threading.Lock()
+
+
+def get_order_event_bus() -> OrderEventBus:
+    global _bus
+    with _bus_lock:
+        if _bus is None:
+            _bus = OrderEventBus()
+        return _bus
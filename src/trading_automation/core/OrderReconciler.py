@@ -0,0 +1,313 @@
+import math
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from trading_automation.config.settings import get_settings
+from trading_automation.core.Metrics import metrics
+from trading_automation.core.Utils import format_float_in_standard_form
+
+settings = get_settings()
+DEFAULT_RECVWINDOW = settings.default_recvwindow
+
+
+@dataclass(frozen=True)
+class DesiredOrder:
+    """
+    An order a strategy wants open, price and stop already rounded to the symbol's tick and quantity to its lot size.
+    A stop loss (stop market order) has a stop and no price, a stop limit order has both.
+    """
+    side: str
+    quantity: Decimal
+    price: Optional[Decimal] = None
+    stop: Optional[Decimal] = None
+    reduce_only: bool = False
+    post_only: bool = False
+
+    @property
+    def key(self) -> Tuple[str, bool, bool]:
+        return self.side, self.reduce_only, self.stop is not None
+
+
+def _decimal(value) -> Decimal:
+    try:
+        return Decimal(str(value)) if value not in (None, '') else Decimal(0)
+    except ArithmeticError:
+        return Decimal(0)
+
+
+def live_order_key(order) -> Tuple[str, bool, bool]:
+    """
+    :return: (side, reduceOnly, is a stop order) of a Binance style open order, compared with DesiredOrder.key
+    """
+    reduce_only = order.get('reduceOnly')
+    return (str(order.get('side', '')).upper(),
+            reduce_only is True or str(reduce_only).lower() == 'true',
+            'STOP' in str(order.get('type') or '').upper())
+
+
+def remaining_quantity(order) -> Decimal:
+    return abs(_decimal(order.get('origQty'))) - abs(_decimal(order.get('executedQty')))
+
+
+def order_matches(desired: DesiredOrder, order) -> bool:
+    """
+    :return: whether the open order already is desired, so can be left as it is
+    """
+    if live_order_key(order) != desired.key or remaining_quantity(order) != desired.quantity:
+        return False
+    if desired.price is not None and _decimal(order.get('price')) != desired.price:
+        return False
+    return desired.stop is None or _decimal(order.get('stopPrice')) == desired.stop
+
+
+def split_order_matches(desired: DesiredOrder, orders: List[Dict]) -> List[Dict]:
+    """
+    Exchanges with a max order quantity (BYBIT) place a desired order above it as several orders at the same price
+    :return: the open orders making up desired together, empty if there are none
+    """
+    split = [order for order in orders if live_order_key(order) == desired.key and
+             (desired.price is None or _decimal(order.get('price')) == desired.price) and
+             (desired.stop is None or _decimal(order.get('stopPrice')) == desired.stop)]
+    if len(split) < 2 or sum(remaining_quantity(order) for order in split) != desired.quantity:
+        return []
+    return split
+
+
+def order_amendable(desired: DesiredOrder, order, max_quantity: Optional[Decimal] = None) -> bool:
+    """
+    :param max_quantity: the most one order of the symbol can be for, None if there is no max
+    :return: whether the open order can be amended to desired, only unfilled limit orders of the same side are
+    """
+    return live_order_key(order) == desired.key and desired.stop is None and desired.price is not None and \
+        _decimal(order.get('executedQty')) == 0 and (max_quantity is None or desired.quantity <= max_quantity)
+
+
+@dataclass
+class OrderPlan:
+    """
+    The requests bringing the open orders of a symbol in line with the desired orders. orders holds (desired order,
+    exchange order) of every desired order that is open, filled in as the plan is executed.
+    """
+    desired: List[DesiredOrder]
+    live: List[Dict]
+    keep: List[Tuple[DesiredOrder, Dict]] = field(default_factory=list)
+    amend: List[Tuple[DesiredOrder, Dict]] = field(default_factory=list)
+    cancel: List[Dict] = field(default_factory=list)
+    create: List[DesiredOrder] = field(default_factory=list)
+    orders: List[Tuple[DesiredOrder, Dict]] = field(default_factory=list)
+    # whether the orders were cancelled and placed again every bar before, even when unchanged
+    replaced_every_bar: bool = True
+    replace_all: bool = False
+    requests_sent: int = 0
+
+    @property
+    def cancel_all(self) -> bool:
+        """
+        Cancel with one futures_cancel_all_orders request rather than one request per order
+        """
+        return bool(self.cancel) and (self.replace_all or (len(self.cancel) > 1 and len(self.cancel) == len(self.live)))
+
+    @property
+    def unchanged(self) -> bool:
+        return not (self.amend or self.cancel or self.create)
+
+    @property
+    def requests(self) -> int:
+        return (1 if self.cancel_all else len(self.cancel)) + len(self.amend) + len(self.create)
+
+    @property
+    def baseline_requests(self) -> int:
+        """
+        Order requests of cancelling every order and placing all desired orders again
+        """
+        if self.unchanged and not self.replaced_every_bar:
+            return 0
+        return 1 + len(self.desired)
+
+
+def plan_orders(desired: List[DesiredOrder], live: List[Dict], amend=False, replace_all=False,
+                replaced_every_bar=True, max_quantity: Optional[Decimal] = None) -> OrderPlan:
+    """
+    Match each desired order with an open order: open orders that already are a desired order, or together make it
+    up when it was split over several orders, are kept, then if amend an unfilled open limit order of the same side is
+    amended, any other desired order is created and the rest of the open orders cancelled.
+    :param amend: whether the exchange supports UniversalClient.futures_amend_order
+    :param max_quantity: see order_amendable
+    :param replace_all: cancel every open order and create every desired order
+    :param replaced_every_bar: see OrderPlan.baseline_requests
+    """
+    plan = OrderPlan(desired=list(desired), live=list(live), replace_all=replace_all,
+                     replaced_every_bar=replaced_every_bar)
+    if replace_all:
+        plan.cancel = list(live)
+        plan.create = list(desired)
+        return plan
+    unmatched = list(live)
+    remaining = []
+    # exact matches first so an unchanged order is never amended or cancelled in place of another
+    for desired_order in desired:
+        match = next((order for order in unmatched if order_matches(desired_order, order)), None)
+        matches = [match] if match is not None else split_order_matches(desired_order, unmatched)
+        if not matches:
+            remaining.append(desired_order)
+            continue
+        for match in matches:
+            unmatched.remove(match)
+            plan.keep.append((desired_order, match))
+    for desired_order in remaining:
+        match = next((order for order in unmatched if order_amendable(desired_order, order, max_quantity)),
+                     None) if amend else None
+        if match is None:
+            plan.create.append(desired_order)
+            continue
+        unmatched.remove(match)
+        plan.amend.append((desired_order, match))
+    plan.cancel = unmatched
+    plan.orders = list(plan.keep)
+    return plan
+
+
+class OrderReconciler:
+    """
+    Places a strategy's orders at candle close with the fewest order requests: orders that are unchanged stay on the
+    book keeping their queue priority, orders whose price or quantity changed are amended on exchanges that support it
+    and only the rest are cancelled and created. Execute a plan with cancel_and_amend then create, the caller can check
+    whether a cancelled order filled in between.
+    """
+
+    def __init__(self, client, symbol, strategy=None):
+        self.client = client
+        self.symbol = symbol
+        self.strategy = str(strategy) if strategy is not None else symbol
+        self.logger = client.logger
+
+    def plan(self, desired: List[DesiredOrder], live: List[Dict], replace_all=False,
+             replaced_every_bar=True) -> OrderPlan:
+        return plan_orders(desired, live, amend=self.client.adapter.amend_orders, replace_all=replace_all,
+                           replaced_every_bar=replaced_every_bar,
+                           max_quantity=self.client.futures_max_order_quantity(self.symbol))
+
+    def cancel_and_amend(self, plan: OrderPlan) -> bool:
+        """
+        Send the cancels and amends of plan, an amend the exchange does not accept becomes a cancel and create
+        :return: whether any open order was cancelled or amended
+        """
+        if plan.cancel_all:
+            self.client.futures_cancel_all_orders(self.symbol)
+            plan.requests_sent += 1
+        elif len(plan.cancel) > 1:
+            # unlike _cancel errors are logged by futures_cancel_orders_batch
+            self.client.futures_cancel_orders_batch([{'symbol': self.symbol, 'orderId': order['orderId']}
+                                                     for order in plan.cancel])
+            batch_cancels = self.client.adapter.batch_cancels
+            plan.requests_sent += math.ceil(len(plan.cancel) / batch_cancels) if batch_cancels else len(plan.cancel)
+        else:
+            for order in plan.cancel:
+                self._cancel(plan, order)
+        for desired, order in list(plan.amend):
+            try:
+                amended = self.client.futures_amend_order(self.symbol, order['orderId'], desired.side, desired.price,
+                                                          desired.quantity)
+            except Exception as e:
+                self.logger.writeline(f"{self.symbol} unable to amend order {order.get('orderId')}, replacing it {e}")
+                amended = None
+            plan.requests_sent += 1
+            if amended:
+                plan.orders.append((desired, amended))
+            else:
+                plan.amend.remove((desired, order))
+                plan.cancel.append(order)
+                self._cancel(plan, order)
+                plan.create.append(desired)
+        return bool(plan.cancel or plan.amend)
+
+    def _cancel(self, plan: OrderPlan, order):
+        try:
+            self.client.futures_cancel_order(self.symbol, order['orderId'])
+        except Exception as e:
+            # usually filled or cancelled in the meantime, which the caller's position check picks up
+            self.logger.writeline(f"{self.symbol} unable to cancel order {order.get('orderId')} {e}")
+        plan.requests_sent += 1
+
+    def create(self, plan: OrderPlan) -> List[Tuple[DesiredOrder, Dict]]:
+        """
+        Place the orders of plan still to be created, several at once with UniversalClient.futures_create_orders_batch
+        :return: plan.orders
+        """
+        if len(plan.create) > 1:
+            return self._create_batch(plan)
+        for desired in plan.create:
+            if desired.price is None:
+                if desired.side == self.client.SIDE_SELL:
+                    order = self.client.futures_long_stop_loss(symbol=self.symbol, quantity=desired.quantity,
+                                                               stop=desired.stop)
+                else:
+                    order = self.client.futures_short_stop_loss(symbol=self.symbol, quantity=desired.quantity,
+                                                                stop=desired.stop)
+            else:
+                order = self.client.futures_create_limit_order(symbol=self.symbol, limit=desired.price,
+                                                               side=desired.side, stop=desired.stop,
+                                                               quantity=desired.quantity,
+                                                               reduceOnly=desired.reduce_only,
+                                                               postOnly=desired.post_only)
+            plan.requests_sent += 1
+            if order:
+                plan.orders.append((desired, order))
+        return plan.orders
+
+    def _create_batch(self, plan: OrderPlan) -> List[Tuple[DesiredOrder, Dict]]:
+        requests = [self._order_request(desired) for desired in plan.create]
+        results = self.client.futures_create_orders_batch(self.symbol, requests)
+        batchable = sum(1 for request in requests if self.client.batch_orderable(self.symbol, request))
+        if batchable < 2:
+            batchable = 0
+        plan.requests_sent += (math.ceil(batchable / self.client.adapter.batch_orders) if batchable else 0) + \
+            len(requests) - batchable
+        for desired, result in zip(plan.create, results):
+            order = result['order']
+            if not order:
+                continue
+            if desired.price is None:
+                self.logger.writeline(f"{self.symbol} {'Long' if desired.side == self.client.SIDE_SELL else 'Short'} "
+                                      f"stop loss @{desired.stop}. OrderId: {order.get('orderId')}")
+            else:
+                stop = f" Stop @{format_float_in_standard_form(float(desired.stop))}" if desired.stop is not None else ""
+                self.logger.writeline(f"{self.symbol} {desired.side} {'exit' if desired.reduce_only else 'entry'}{stop} "
+                                      f"limit @{format_float_in_standard_form(float(desired.price))} for "
+                                      f"{desired.quantity}. OrderId: {order.get('orderId')}")
+            plan.orders.append((desired, order))
+        return plan.orders
+
+    def _order_request(self, desired: DesiredOrder) -> Dict:
+        """
+        :return: the futures_create_order kwargs of desired, as futures_create_limit_order and the stop loss methods
+        send them
+        """
+        timestamp = str(datetime.now().timestamp())
+        if desired.price is None:
+            prefix = "LongStopLoss" if desired.side == self.client.SIDE_SELL else "ShortStopLoss"
+            return dict(side=desired.side, type=self.client.ORDER_TYPE_STOP_MARKET, quantity=desired.quantity,
+                        reduceOnly=True, stopPrice=desired.stop, timeInForce=self.client.TIME_IN_FORCE_GTC,
+                        recvWindow=DEFAULT_RECVWINDOW, newClientOrderId=prefix + self.symbol + timestamp)
+        if desired.stop is not None:
+            order_type, time_in_force = self.client.ORDER_TYPE_STOP, self.client.TIME_IN_FORCE_GTC
+        else:
+            order_type = self.client.ORDER_TYPE_LIMIT
+            time_in_force = self.client.TIME_IN_FORCE_GTX if desired.post_only else self.client.TIME_IN_FORCE_GTC
+        return dict(side=desired.side, type=order_type, price=desired.price, quantity=desired.quantity,
+                    reduceOnly=desired.reduce_only, timeInForce=time_in_force, recvWindow=DEFAULT_RECVWINDOW,
+                    stopPrice=desired.stop, newClientOrderId=desired.side + self.symbol + timestamp)
+
+    def report(self, plan: OrderPlan) -> str:
+        """
+        Record the order requests plan sent and saved compared with cancelling and placing every order again
+        :return: summary of plan for the log
+        """
+        saved = plan.baseline_requests - plan.requests_sent
+        metrics.inc('order_requests_total', plan.requests_sent, exchange=self.client.exchange, strategy=self.strategy)
+        metrics.inc('order_requests_saved_total', saved, exchange=self.client.exchange, strategy=self.strategy)
+        return f"{self.symbol} orders reconciled: kept {len(plan.keep)}, amended {len(plan.amend)}, " \
+               f"cancelled {len(plan.cancel)}, created {len(plan.create)} with {plan.requests_sent} order requests " \
+               f"({saved} saved)"
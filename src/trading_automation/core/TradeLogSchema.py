@@ -0,0 +1,160 @@
+import sqlite3
+
+from trading_automation.core.Utils import get_timestamp_ms_from_string
+
+# PRAGMA user_version of a trade log migrated to the latest schema
+SCHEMA_VERSION = 2
+
+# column order is kept between versions as Logger reads trades records by index
+TRADES_COLUMNS = [
+    ("symbol", "TEXT"),
+    ("setting", "TEXT"),
+    ("entry_time", "INTEGER"),
+    ("position_side", "TEXT"),
+    ("entry_order_amount", "REAL"),
+    ("position_size", "REAL"),
+    ("position_size_usdt", "REAL"),
+    ("average_entry_price", "REAL"),
+    ("exit_time", "INTEGER"),
+    ("exit_amount", "REAL"),
+    ("average_exit_price", "REAL"),
+    ("raw_pnl", "REAL"),
+    ("raw_pnl_percentage", "REAL"),
+    ("fee_BNB", "REAL"),
+    ("fee_USDT", "REAL"),
+    ("funding_fees", "REAL"),
+    ("pnl_percentage_with_fees", "REAL"),
+    ("pnl_with_fees", "REAL"),
+    ("at_bid_ask_post_only_entry", "INTEGER"),
+    ("if_market_open_avg_price", "REAL"),
+    ("if_market_open_slippage", "REAL"),
+    ("if_failed_entry_missed_gain_percentage", "REAL"),
+    ("at_bid_ask_post_only_exit_count", "INTEGER"),
+    ("at_bid_ask_post_only_exit_failed_count", "INTEGER"),
+    ("if_market_close_avg_price", "REAL"),
+    ("if_market_close_pnl", "REAL"),
+    ("if_market_close_pnl_percentage", "REAL"),
+    ("if_market_close_slippage", "REAL"),
+    ("if_market_close_fees", "REAL"),
+    ("max_unrealised_loss", "REAL"),
+    ("wallet_balance", "REAL"),
+]
+INTERNAL_WALLETS_COLUMNS = [
+    ("start_time", "INTEGER"),
+    ("setting", "TEXT"),
+    ("internal_wallet", "REAL"),
+    ("internal_wallet_max_drawdown", "REAL"),
+    ("last_trade_id", "INTEGER"),
+    ("last_update_time", "INTEGER"),
+]
+INDEXES = {
+    "trades_symbol_entry_time": "trades(symbol, entry_time)",
+    "internal_wallets_setting_last_update_time": "internal_wallets(setting, last_update_time)",
+    "internal_wallets_last_trade_id": "internal_wallets(last_trade_id)",
+}
+
+
+def _create_table_sql(table, columns):
+    definitions = ",\n    ".join(f"{name} {column_type}" for name, column_type in columns)
+    return f"CREATE TABLE IF NOT EXISTS {table}(\n    id INTEGER PRIMARY KEY AUTOINCREMENT,\n    {definitions}\n)"
+
+
+def to_timestamp_ms(value):
+    if value is None or isinstance(value, int):
+        return value
+    try:
+        return get_timestamp_ms_from_string(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def to_real(value):
+    try:
+        return None if value is None or value == "" else float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def to_integer(value):
+    if isinstance(value, str) and value.upper() in ("TRUE", "FALSE"):
+        return int(value.upper() == "TRUE")
+    real = to_real(value)
+    return None if real is None else int(real)
+
+
+_CONVERTERS = {"INTEGER": "to_integer", "REAL": "to_real", "TEXT": ""}
+_TIME_COLUMNS = {"entry_time", "exit_time", "start_time", "last_update_time"}
+
+
+def _migration_1(connection):
+    """
+    The all TEXT tables of the original config/SetUpSQLtables.py
+    """
+    connection.execute(_create_table_sql("trades", [(name, "INTEGER" if name.startswith("at_bid_ask_post_only_exit") else "TEXT")
+                                                    for name, _ in TRADES_COLUMNS]))
+    connection.execute(_create_table_sql("internal_wallets", [(name, "INTEGER" if name == "last_trade_id" else "TEXT")
+                                                              for name, _ in INTERNAL_WALLETS_COLUMNS]))
+
+
+def _migration_2(connection):
+    """
+    Typed columns, times as epoch milliseconds and the INDEXES. Each table is copied into a new typed table, values
+    that cannot be converted become NULL
+    """
+    connection.create_function("to_timestamp_ms", 1, to_timestamp_ms, deterministic=True)
+    connection.create_function("to_real", 1, to_real, deterministic=True)
+    connection.create_function("to_integer", 1, to_integer, deterministic=True)
+    for table, columns in (("trades", TRADES_COLUMNS), ("internal_wallets", INTERNAL_WALLETS_COLUMNS)):
+        connection.execute(f"ALTER TABLE {table} RENAME TO {table}_v1")
+        connection.execute(_create_table_sql(table, columns))
+        names = ", ".join(name for name, _ in columns)
+        converted = ", ".join(f"to_timestamp_ms({name})" if name in _TIME_COLUMNS else f"{_CONVERTERS[column_type]}({name})"
+                              for name, column_type in columns)
+        connection.execute(f"INSERT INTO {table} (id, {names}) SELECT id, {converted} FROM {table}_v1")
+        connection.execute(f"DROP TABLE {table}_v1")
+    for name, target in INDEXES.items():
+        connection.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+
+
+MIGRATIONS = [_migration_1, _migration_2]
+
+
+def get_schema_version(connection: sqlite3.Connection) -> int:
+    return connection.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate_trade_log(connection: sqlite3.Connection) -> int:
+    """
+    Bring the trade log database of connection up to SCHEMA_VERSION in place, creating the tables if they do not
+    exist. All pending migrations run in one transaction so a failed migration leaves the database as it was.
+    A database from before versioning (user_version 0 with the TEXT tables) is treated as version 1.
+    :return: the schema version before migrating, 0 if the tables did not exist
+    """
+    version = get_schema_version(connection)
+    if version >= SCHEMA_VERSION:
+        return version
+    if version == 0 and connection.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'trades'").fetchone():
+        version = 1
+    if connection.in_transaction:
+        connection.commit()
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        for migration in MIGRATIONS[version:]:
+            migration(connection)
+        connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        connection.execute("COMMIT")
+    except Exception:
+        connection.execute("ROLLBACK")
+        raise
+    return version
+
+
+def migrate_trade_log_file(path) -> int:
+    """
+    :return: the schema version of the database at path before migrating
+    """
+    connection = sqlite3.connect(path, isolation_level=None)
+    try:
+        return migrate_trade_log(connection)
+    finally:
+        connection.close()
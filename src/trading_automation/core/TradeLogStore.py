@@ -0,0 +1,139 @@
+import atexit
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from trading_automation.config.settings import get_settings
+from trading_automation.core.TradeLogSchema import migrate_trade_log
+from trading_automation.core.Utils import get_current_datetime_string
+
+TRADE_LOG_MAX_BATCH = get_settings().trade_log_max_batch
+BUSY_TIMEOUT_MS = 5000
+
+
+class TradeLogStore:
+    """
+    Owns the one write connection to a trade log SQLite database in this process. The database is put in WAL mode so
+    readers never block the writer and commits do not fsync (synchronous=NORMAL).
+    Writes are queued and run by a background writer thread, which commits everything waiting in the queue together
+    (up to max_batch writes per transaction) so strategy threads never wait on the database lock or on disk. Each
+    write runs in its own savepoint so one failing write does not undo the rest of its batch.
+    Statements are parameterised so sqlite3 reuses its prepared statements instead of parsing each one.
+    Reads use a read only connection per reading thread. The database is migrated to the latest TradeLogSchema when
+    the store is opened.
+    """
+
+    def __init__(self, path, max_batch=TRADE_LOG_MAX_BATCH):
+        self.path = path
+        self.max_batch = max_batch
+        self._queue: "queue.Queue" = queue.Queue()
+        self._local = threading.local()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None, cached_statements=256)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        migrate_trade_log(self._connection)
+        self._writer = threading.Thread(target=self._run_writer, name=f"TradeLogStore {path}", daemon=True)
+        self._writer.start()
+        atexit.register(self.flush)
+
+    def submit(self, func: Callable[[sqlite3.Connection], object]) -> Future:
+        """
+        Run func(connection) on the writer thread, e.g. for a read-modify-write that has to see the writes queued
+        before it. func must not make network calls as it holds up every other write.
+        :return: Future of func's return value, set once the write is committed
+        """
+        future = Future()
+        self._queue.put((func, future))
+        return future
+
+    def execute(self, sql, params=()) -> Future:
+        """
+        Queue one write statement
+        :return: Future of the statement's lastrowid, set once the write is committed
+        """
+        return self.submit(lambda connection: connection.execute(sql, params).lastrowid)
+
+    def flush(self):
+        """
+        Wait until every write queued so far is committed
+        """
+        if self._writer.is_alive():
+            self.submit(lambda connection: None).result()
+
+    def _read_connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(Path(self.path).resolve().as_uri() + "?mode=ro", uri=True, cached_statements=256)
+            connection.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+            self._local.connection = connection
+        return connection
+
+    def query(self, sql, params=(), wait_for_writes=False) -> List[tuple]:
+        """
+        :param wait_for_writes: wait for the writes queued so far to be committed first, so the result includes them
+        :return: all rows of sql, only committed writes are seen
+        """
+        if wait_for_writes:
+            self.flush()
+        return self._read_connection().execute(sql, params).fetchall()
+
+    def query_one(self, sql, params=(), wait_for_writes=False) -> Optional[tuple]:
+        rows = self.query(sql, params, wait_for_writes)
+        return rows[0] if rows else None
+
+    def _run_writer(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write_batch(batch)
+
+    def _write_batch(self, batch):
+        results = []
+        try:
+            self._connection.execute("BEGIN IMMEDIATE")
+            for func, future in batch:
+                self._connection.execute("SAVEPOINT trade_log_write")
+                try:
+                    results.append((future, func(self._connection), None))
+                    self._connection.execute("RELEASE trade_log_write")
+                except Exception as e:
+                    self._connection.execute("ROLLBACK TO trade_log_write")
+                    self._connection.execute("RELEASE trade_log_write")
+                    print(f"{get_current_datetime_string()} TradeLogStore error '{e}' occurred for write to {self.path}")
+                    results.append((future, None, e))
+            self._connection.execute("COMMIT")
+        except sqlite3.Error as e:
+            print(f"{get_current_datetime_string()} TradeLogStore error '{e}' occurred committing to {self.path}")
+            if self._connection.in_transaction:
+                self._connection.execute("ROLLBACK")
+            for func, future in batch:
+                future.set_exception(e)
+            return
+        for future, result, exception in results:
+            if exception is not None:
+                future.set_exception(exception)
+            else:
+                future.set_result(result)
+
+
+_stores: Dict[str, TradeLogStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_trade_log_store(path) -> TradeLogStore:
+    """
+    :return: the process wide TradeLogStore of the database at path
+    """
+    key = str(Path(path).resolve())
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = TradeLogStore(path)
+        return _stores[key]
@@ -1,16 +1,7 @@
 from trading_automation.clients.UniversalClient import *
 from trading_automation.clients.DiscordClient import DiscordNotificationService
 from typing import Optional
-from trading_automation.websockets.fwebsockets import WebSocketManager
-from okex.okexWebSocketManager import OkexWebSocketManager
-from trading_automation.websockets.FTXWebSocketManager import FtxWebSocketManager
-from trading_automation.websockets.GateWebSocketManager import GateWebSocketManager
-from trading_automation.websockets.MexcWebSocketManager import MexcWebSocketManager
-from trading_automation.websockets.BybitWebSocketManager import BybitWebSocketManager
-from trading_automation.websockets.IgWebSocketManager import IgWebSocketManager
-from trading_automation.websockets.CapitalWebSocketManager import CapitalWebSocketManager
-from trading_automation.websockets.PhemexWebSocketManager import PhemexWebSocketManager
-from trading_automation.websockets.BingxWebSocketManager import BingxSocketManager
+from trading_automation.websockets.MarketDataHub import MarketDataHub, HubWebSocketManager
 
 
 class UniversalClientWebsocket(UniversalClient):
@@ -28,53 +19,37 @@ class UniversalClientWebsocket(UniversalClient):
         discord_service: Optional[DiscordNotificationService] = None,
         phemex_input_q=None,
         phemex_output_q=None,
+        market_data_hub: Optional[MarketDataHub] = None,
     ):
         super().__init__(exchange, discord_service=discord_service)
-        if self.exchange == "BINANCE":
-            self.ws = WebSocketManager(symbol, interval, candles_limit=candles_limit, client=self)
-        elif "FTX" in self.exchange:
-            self.ws = FtxWebSocketManager(symbol, interval, candles_limit=candles_limit, client=self)
-        elif "OKEX" in self.exchange:
-            self.ws = OkexWebSocketManager(symbol, interval, candles_limit=candles_limit, client=self)
-        elif "GATE" in self.exchange:
-            self.ws = GateWebSocketManager(symbol, interval, candles_limit=candles_limit, client=self)
-        elif "MEXC" in self.exchange:
-            self.ws = MexcWebSocketManager(symbol, interval, candles_limit=candles_limit, client=self)
-        elif "BYBIT" in self.exchange:
-            self.ws = BybitWebSocketManager(symbol, interval, candles_limit=candles_limit, client=self)
-        elif "IG" in self.exchange:
-            self.ws = IgWebSocketManager(symbol, interval, candles_limit=candles_limit, client=self)
-        elif "CAPITAL" in self.exchange:
-            self.ws = CapitalWebSocketManager(symbol, interval, candles_limit=candles_limit, client=self)
-        elif "PHEMEX" in self.exchange:
-            self.ws = PhemexWebSocketManager(symbol, interval, candles_limit=candles_limit, client=self, phemex_ws_input_q=phemex_input_q, phemex_ws_output_q=phemex_output_q)
-        elif "BINGX" in self.exchange:
-            self.ws = BingxSocketManager(symbol, interval, candles_limit=candles_limit, client=self)
+        if market_data_hub is not None:
+            # share the exchange account's connection(s) with the other strategies in this process
+            self.ws = HubWebSocketManager(symbol, interval, client=self, hub=market_data_hub, candles_limit=candles_limit)
         else:
-            self.logger.writeline(f"ERROR no ws initiated self.exchange: {self.exchange}")
-            raise Exception(f"ERROR no ws initiated self.exchange: {self.exchange}")
+            self.ws = self.adapter.create_websocket(self, symbol, interval, candles_limit,
+                                                    phemex_input_q=phemex_input_q, phemex_output_q=phemex_output_q)
         self.symbol = symbol
         self.interval = interval
         self.candles_limit = candles_limit
         self.position = self.ws.position
-        if "BYBIT" in self.exchange and get_position_size(self.position) == 0 and not self.futures_get_open_orders(symbol=self.symbol):
+        if self.venue == "BYBIT" and get_position_size(self.position) == 0 and not self.futures_get_open_orders(symbol=self.symbol):
             # change leverage to always be max
             symbol_info = self.client_bybit.query_symbol(symbol=self.symbol)[0]
             max_leverage = symbol_info['leverageFilter']['maxLeverage']
             self.futures_change_leverage(symbol=symbol, leverage=max_leverage)
-        elif "OKEX" in self.exchange and get_position_size(self.position) == 0 and not self.futures_get_open_orders(symbol=self.symbol):
+        elif self.venue == "OKEX" and get_position_size(self.position) == 0 and not self.futures_get_open_orders(symbol=self.symbol):
             # change leverage on OKEX to always be 16
             self.futures_change_leverage(symbol=self.symbol, leverage=16)
-        elif "PHEMEX" in self.exchange and get_position_size(self.position) == 0 and not self.futures_get_open_orders(symbol=self.symbol):
+        elif self.venue == "PHEMEX" and get_position_size(self.position) == 0 and not self.futures_get_open_orders(symbol=self.symbol):
             self.futures_change_leverage(symbol=self.symbol, leverage=-0)  # -0 means max cross leverage (as opposed to isolated)
-        elif "BINGX" in self.exchange and get_position_size(self.position) == 0 and not self.futures_get_open_orders(symbol=self.symbol):
+        elif self.venue == "BINGX" and get_position_size(self.position) == 0 and not self.futures_get_open_orders(symbol=self.symbol):
             self.futures_change_leverage(symbol=self.symbol, leverage=20)
             self.client_bingx.switch_margin_mode(symbol, "Cross")
     # @UniversalClient.tries_wrapper
     # def futures_order_book(self, symbol, limit):
     #     # OKEX needs to use ws for orderbook as API is slow
     #     # 05/2022 UPDATE on above, orderbook no longer slow
-    #     if "OKEX" in self.exchange:
+    #     if self.venue == "OKEX":
     #         assert self.symbol == symbol
     #         orderbook = self.ws.get_orderbook(limit)
     #         if "USDT" in self.symbol:
@@ -96,7 +71,7 @@ class UniversalClientWebsocket(UniversalClient):
     #
     # @UniversalClient.tries_wrapper
     # def futures_orderbook_ticker(self, symbol):
-    #     if "OKEX" in self.exchange:
+    #     if self.venue == "OKEX":
     #         assert self.symbol == symbol
     #         orderbook = self.ws.get_orderbook(1)
     #         if 'USDT' in self.symbol:
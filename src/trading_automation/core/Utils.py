@@ -17,6 +17,17 @@ def get_datetime_from_string(string):
     return datetime.strptime(string, DATETIME_STRING_FORMAT)
 
 
+def get_current_timestamp_ms():
+    return round(time.time() * 1000)
+
+
+def get_timestamp_ms_from_string(string):
+    """
+    :param string: local time in DATETIME_STRING_FORMAT
+    """
+    return round(get_datetime_from_string(string).timestamp() * 1000)
+
+
 def calculate_pnl_percentage(entry_price, exit_price, side):
     """
     returns float. 1.0 = 100%
@@ -202,6 +213,8 @@ def binance_intervals_to_seconds(interval):
         return int(300)
     elif interval == "1m":
         return int(60)
+    elif interval == "2m":
+        return int(120)
     elif interval == "3m":
         return int(180)
     elif interval == "15m":
@@ -372,3 +385,12 @@ def make_cloned_zero_vol_candle(to_clone: list, interval):
     candle[6] = candle[0] + int(binance_intervals_to_seconds(interval)) * 1000 - 1
     candle[7] = '0'
     return candle
+
+
+def chunks(items: list, size: int):
+    """
+    splits items into consecutive lists of at most size items, e.g. the orders of each batch request
+    """
+    if size <= 0:
+        raise ValueError(f"chunks size must be positive, not {size}")
+    return [items[i:i + size] for i in range(0, len(items), size)]
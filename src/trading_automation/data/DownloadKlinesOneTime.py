@@ -5,7 +5,10 @@ from trading_automation.clients.UniversalClient import UniversalClient
 from datetime import datetime, timedelta, date
 from trading_automation.core.Logger import reverse_readline, readcsv
 from trading_automation.core.Utils import binance_intervals_to_seconds, DATETIME_STRING_FORMAT
+from trading_automation.data.KlineArchive import USE_KLINE_ARCHIVE, kline_archive, array_to_candles
+from trading_automation.data.KlineDownloader import KlineDownloader
 from decimal import Decimal
+import numpy as np
 import os
 import re
 from pathlib import Path
@@ -74,8 +77,21 @@ def get_symbols_list(client=CLIENT):
     return symbols
 
 
+def write_candles(client, symbol, interval, candles):
+    """
+    Appends candles to the symbol's klines, in the KlineArchive if USE_KLINE_ARCHIVE is set otherwise its csv file
+    """
+    if USE_KLINE_ARCHIVE:
+        kline_archive.append(client.exchange, symbol, interval, candles)
+    else:
+        client.logger.writecsvlines(lines=candles, path=f"klines/{client.exchange}/{symbol}/{symbol}_{interval}.csv")
+
+
 def run(exchange, chunking=False, print_process=False, intervals_list=None):
     client = UniversalClient(exchange, timeout=CLIENT_TIMEOUT, tries=CLIENT_TRIES)
+    if USE_KLINE_ARCHIVE:
+        # the archive is already partitioned by month so there are no week chunked files
+        chunking = False
     if "CAPITAL" in exchange:
         # change api for CAPITAL to use secondary dormant account for kline data to free up rate limit on active account
         client.client_capital = CapitalClient(api_key=CAPITALDOTCOM_API_KEY_SECOND, username=CAPITALDOTCOM_USERNAME_SECOND, password=CAPITALDOTCOM_PASSWORD_SECOND, timeout=CLIENT_TIMEOUT, second_account=True)
@@ -88,17 +104,21 @@ def run(exchange, chunking=False, print_process=False, intervals_list=None):
     current_time = datetime.now().timestamp() * 1000
     for symbol in symbols:
         for interval in intervals:
-            try:
-                latest_chunking_path = f"klines/{client.exchange}/{get_start_of_week_current().strftime('%Y%m%d')}/{symbol}/{symbol}_{interval}.csv"
-                previous_week_chunking_path = f"klines/{client.exchange}/{(get_start_of_week_current()-timedelta(days=7)).strftime('%Y%m%d')}/{symbol}/{symbol}_{interval}.csv"
-                if chunking and Path(latest_chunking_path).is_file():
-                    last_candle_on_file = next(reverse_readline(latest_chunking_path)).split(",")
-                elif chunking and Path(previous_week_chunking_path).is_file():
-                    last_candle_on_file = next(reverse_readline(previous_week_chunking_path)).split(",")
-                else:
-                    last_candle_on_file = next(reverse_readline(f"klines/{client.exchange}/{symbol}/{symbol}_{interval}.csv")).split(",")
-            except StopIteration:
-                last_candle_on_file = None
+            if USE_KLINE_ARCHIVE:
+                last_candles = array_to_candles(kline_archive.read_last(client.exchange, symbol, interval, 1))
+                last_candle_on_file = last_candles[-1] if last_candles else None
+            else:
+                try:
+                    latest_chunking_path = f"klines/{client.exchange}/{get_start_of_week_current().strftime('%Y%m%d')}/{symbol}/{symbol}_{interval}.csv"
+                    previous_week_chunking_path = f"klines/{client.exchange}/{(get_start_of_week_current()-timedelta(days=7)).strftime('%Y%m%d')}/{symbol}/{symbol}_{interval}.csv"
+                    if chunking and Path(latest_chunking_path).is_file():
+                        last_candle_on_file = next(reverse_readline(latest_chunking_path)).split(",")
+                    elif chunking and Path(previous_week_chunking_path).is_file():
+                        last_candle_on_file = next(reverse_readline(previous_week_chunking_path)).split(",")
+                    else:
+                        last_candle_on_file = next(reverse_readline(f"klines/{client.exchange}/{symbol}/{symbol}_{interval}.csv")).split(",")
+                except StopIteration:
+                    last_candle_on_file = None
             if last_candle_on_file:
                 startTime = int(last_candle_on_file[6]) + 1  # last_candle_on_file[6] is the previous candle's endTime, +1 to get new startTime
                 if client.exchange in EXCLUSIVE_START_TIME_EXCHANGES:
@@ -145,8 +165,7 @@ def run(exchange, chunking=False, print_process=False, intervals_list=None):
                                         print(
                                             f"WARNING: OKEX {symbol}_{interval} next candle does not fit sequentially! {startTime + 1} api start time: {candles[0][0]}")
                                         break
-                                    client.logger.writecsvlines(lines=candles,
-                                                                path=f"klines/{client.exchange}/{symbol_name}/{symbol_name}_{interval}.csv")
+                                    write_candles(client, symbol_name, interval, candles)
                                     startTime = last_candle_endTime + 1
                                     if client.exchange in EXCLUSIVE_START_TIME_EXCHANGES:  # exclusive start time exchanges go here
                                         startTime -= 1
@@ -199,8 +218,7 @@ def run(exchange, chunking=False, print_process=False, intervals_list=None):
                                                 f"WARNING: {symbol}_{interval} next candle start time is before or same as the last candle start time on file! last candle on file start time {int(last_candle_on_file[0])} api start time: {candles[0][0]}, trimming first candle from api")
                                         candles = candles[1:]
                                 if len(candles) > 1:
-                                    client.logger.writecsvlines(lines=candles,
-                                                                path=f"klines/{client.exchange}/{symbol}/{symbol}_{interval}.csv")
+                                    write_candles(client, symbol, interval, candles)
                                     last_candle_on_file = candles[-1]
                                 else:
                                     stopSignal = True
@@ -242,6 +260,12 @@ def check_candles_consistency(exchange):
     intervals = get_intervals(client.exchange)
     for symbol in symbols:
         for interval in intervals:
+            if USE_KLINE_ARCHIVE:
+                print(f"Checking {symbol} {interval}")
+                open_times = kline_archive.read(client.exchange, symbol, interval)['open_time']
+                for i in np.flatnonzero(np.diff(open_times) != binance_intervals_to_seconds(interval) * 1000):
+                    print(f"Inconsistency found for {symbol} {interval} at {open_times[i + 1]}")
+                continue
             print(f"Checking {symbol}_{interval}.csv")
             candles = readcsv(f"klines/{client.exchange}/{symbol}/{symbol}_{interval}.csv")
             if not candles:
@@ -359,10 +383,32 @@ def create_combined_ask_bid_candles(exchange="CAPITAL"):
             client.logger.writecsvlines(new_candles, path=combined_candles_path, write_mode="w")
 
 
+def run_concurrent(exchange, print_process=True, intervals_list=None, max_workers=None):
+    """
+    Same as run without chunking but downloads the symbols and intervals concurrently and resumes from the
+    KlineDownloader checkpoint manifest, see KlineDownloader
+    :return: dict of "<symbol>_<interval>": error of the series that failed
+    """
+    client = UniversalClient(exchange, timeout=CLIENT_TIMEOUT, tries=CLIENT_TRIES)
+    if "CAPITAL" in exchange:
+        # change api for CAPITAL to use secondary dormant account for kline data to free up rate limit on active account
+        client.client_capital = CapitalClient(api_key=CAPITALDOTCOM_API_KEY_SECOND, username=CAPITALDOTCOM_USERNAME_SECOND, password=CAPITALDOTCOM_PASSWORD_SECOND, timeout=CLIENT_TIMEOUT, second_account=True)
+    downloader = KlineDownloader(client,
+                                 intervals=get_intervals(client.exchange) if intervals_list is None else intervals_list,
+                                 max_candles=get_max_candles_request(client.exchange),
+                                 max_workers=max_workers,
+                                 exclusive_start_time=client.exchange in EXCLUSIVE_START_TIME_EXCHANGES,
+                                 recent_only=client.exchange in RECENT_ONLY_CANDLES_EXCHANGES,
+                                 print_process=print_process)
+    return downloader.run(get_symbols_list(client))
+
+
 def run_all(exchanges=EXCHANGES):
     for exchange in exchanges:
         print(f"{exchange} downloading klines")
-        run(exchange)
+        failed = run_concurrent(exchange)
+        if failed:
+            print(f"{exchange} failed to download {len(failed)} series, run again to resume: {sorted(failed)}")
     print("Complete")
 
 
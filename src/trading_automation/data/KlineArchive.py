@@ -0,0 +1,252 @@
+import csv
+import os
+import re
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+from trading_automation.config.settings import get_settings
+from trading_automation.core.Utils import format_float_in_standard_form
+
+settings = get_settings()
+USE_KLINE_ARCHIVE = settings.use_kline_archive
+KLINE_ARCHIVE_PATH = settings.kline_archive_path
+
+# one record per candle, in the column order of the legacy csv files / UniversalClient.futures_get_candlesticks
+KLINE_DTYPE = np.dtype([
+    ('open_time', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<f8'),
+    ('close_time', '<i8'),
+    ('quote_volume', '<f8'),
+])
+PARTITION_SUFFIX = ".klines"
+
+
+def candles_to_array(candles) -> np.ndarray:
+    """
+    :param candles: candles in the legacy list format, e.g. [[open_time, "open", "high", "low", "close", "volume",
+    close_time, "quote_volume"], ...], quote_volume is optional
+    """
+    array = np.zeros(len(candles), dtype=KLINE_DTYPE)
+    if len(candles) == 0:
+        return array
+    width = min(max(len(c) for c in candles), len(KLINE_DTYPE.names))
+    rows = [list(c[:width]) + [np.nan] * (width - len(c)) for c in candles]
+    for i, name in enumerate(KLINE_DTYPE.names[:width]):
+        array[name] = [row[i] for row in rows]
+    if width < len(KLINE_DTYPE.names):
+        array['quote_volume'] = np.nan
+    return array
+
+
+def _format_number(x):
+    s = format_float_in_standard_form(x)
+    return s[:-2] if s.endswith(".0") else s
+
+
+def array_to_candles(array: np.ndarray) -> List[List]:
+    """
+    :return: candles in the legacy list format with prices and volumes as strings, quote_volume is left out if missing
+    """
+    candles = []
+    for record in array.tolist():
+        candle = [record[0]] + [_format_number(x) for x in record[1:6]] + [record[6]]
+        if not np.isnan(record[7]):
+            candle.append(_format_number(record[7]))
+        candles.append(candle)
+    return candles
+
+
+def _month_keys(open_times: np.ndarray) -> np.ndarray:
+    """
+    :return: "YYYYMM" (UTC) of each open time in milliseconds
+    """
+    months = open_times.astype('datetime64[ms]').astype('datetime64[M]')
+    return np.char.replace(np.datetime_as_string(months, unit='M'), '-', '')
+
+
+class KlineArchive:
+    """
+    Typed columnar store of historical klines, replacing the klines/<EXCHANGE>/<SYMBOL>/<SYMBOL>_<interval>.csv files.
+    Each (exchange, symbol, interval) series is partitioned by the UTC month of the candles' open times into
+    <root>/<EXCHANGE>/<SYMBOL>/<interval>/<YYYYMM>.klines files of fixed size KLINE_DTYPE records sorted by open time.
+    Appending writes only the new records to the end of the latest partition and reads memory map the partitions, so
+    only the pages of the time range asked for are loaded from disk.
+    """
+
+    def __init__(self, root=KLINE_ARCHIVE_PATH):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def series_path(self, exchange, symbol, interval):
+        return os.path.join(self.root, exchange, symbol, interval)
+
+    def has_series(self, exchange, symbol, interval):
+        return len(self.partitions(exchange, symbol, interval)) > 0
+
+    def symbols(self, exchange) -> List[str]:
+        path = os.path.join(self.root, exchange)
+        if not os.path.isdir(path):
+            return []
+        return sorted(f.name for f in os.scandir(path) if f.is_dir())
+
+    def partitions(self, exchange, symbol, interval) -> List[str]:
+        """
+        :return: sorted "YYYYMM" of the partitions of the series
+        """
+        path = self.series_path(exchange, symbol, interval)
+        if not os.path.isdir(path):
+            return []
+        return sorted(f.name[:-len(PARTITION_SUFFIX)] for f in os.scandir(path) if f.name.endswith(PARTITION_SUFFIX))
+
+    def _partition_file(self, exchange, symbol, interval, month):
+        return os.path.join(self.series_path(exchange, symbol, interval), f"{month}{PARTITION_SUFFIX}")
+
+    def _load_partition(self, path) -> np.ndarray:
+        count = os.path.getsize(path) // KLINE_DTYPE.itemsize
+        if count == 0:
+            return np.zeros(0, dtype=KLINE_DTYPE)
+        return np.memmap(path, dtype=KLINE_DTYPE, mode='r', shape=(count,))
+
+    def last_candle(self, exchange, symbol, interval) -> Optional[np.void]:
+        """
+        :return: the last record of the series or None if it is empty, without reading the rest of the series
+        """
+        for month in reversed(self.partitions(exchange, symbol, interval)):
+            partition = self._load_partition(self._partition_file(exchange, symbol, interval, month))
+            if len(partition):
+                return partition[-1].copy()
+        return None
+
+    def last_open_time(self, exchange, symbol, interval) -> Optional[int]:
+        last = self.last_candle(exchange, symbol, interval)
+        return None if last is None else int(last['open_time'])
+
+    def append(self, exchange, symbol, interval, candles) -> int:
+        """
+        Add candles to the end of the series. Candles with an open time at or before the last one stored are dropped,
+        as are duplicates within candles, so overlapping pages from the exchange can be appended as they are.
+        :param candles: legacy candle lists or a KLINE_DTYPE array
+        :return: number of candles written
+        """
+        array = candles if isinstance(candles, np.ndarray) and candles.dtype == KLINE_DTYPE else candles_to_array(candles)
+        if len(array) == 0:
+            return 0
+        array = np.sort(array, order='open_time', kind='stable')
+        keep = np.ones(len(array), dtype=bool)
+        keep[1:] = array['open_time'][1:] != array['open_time'][:-1]
+        array = array[keep]
+        with self._lock:
+            last_open_time = self.last_open_time(exchange, symbol, interval)
+            if last_open_time is not None:
+                array = array[array['open_time'] > last_open_time]
+            if len(array) == 0:
+                return 0
+            os.makedirs(self.series_path(exchange, symbol, interval), exist_ok=True)
+            months = _month_keys(array['open_time'])
+            # months are sorted with the open times so each month is one contiguous run
+            starts = np.flatnonzero(np.r_[True, months[1:] != months[:-1]])
+            ends = np.r_[starts[1:], len(array)]
+            for start, end in zip(starts, ends):
+                path = self._partition_file(exchange, symbol, interval, months[start])
+                with open(path, 'ab') as f:
+                    # drop any partly written record left by an interrupted append
+                    f.truncate(f.tell() // KLINE_DTYPE.itemsize * KLINE_DTYPE.itemsize)
+                    f.write(array[start:end].tobytes())
+        return len(array)
+
+    def read(self, exchange, symbol, interval, start_time=None, end_time=None) -> np.ndarray:
+        """
+        :param start_time: only candles with an open time >= start_time (milliseconds)
+        :param end_time: only candles with an open time <= end_time (milliseconds)
+        :return: KLINE_DTYPE array of the candles in the time range sorted by open time. When the range is within one
+        partition it is a read only memory mapped view, otherwise a copy of the partitions it covers
+        """
+        months = self.partitions(exchange, symbol, interval)
+        if start_time is not None:
+            first = str(_month_keys(np.array([start_time], dtype=np.int64))[0])
+            months = [m for m in months if m >= first]
+        if end_time is not None:
+            last = str(_month_keys(np.array([end_time], dtype=np.int64))[0])
+            months = [m for m in months if m <= last]
+        parts = []
+        for month in months:
+            partition = self._load_partition(self._partition_file(exchange, symbol, interval, month))
+            open_times = partition['open_time']
+            lo = 0 if start_time is None else np.searchsorted(open_times, start_time, side='left')
+            hi = len(partition) if end_time is None else np.searchsorted(open_times, end_time, side='right')
+            if hi > lo:
+                parts.append(partition[lo:hi])
+        if not parts:
+            return np.zeros(0, dtype=KLINE_DTYPE)
+        if len(parts) == 1:
+            return parts[0]
+        return np.concatenate(parts)
+
+    def read_last(self, exchange, symbol, interval, limit) -> np.ndarray:
+        """
+        :return: the last limit candles of the series, reading only the latest partitions needed
+        """
+        parts = []
+        remaining = limit
+        for month in reversed(self.partitions(exchange, symbol, interval)):
+            if remaining <= 0:
+                break
+            partition = self._load_partition(self._partition_file(exchange, symbol, interval, month))
+            parts.append(partition[max(0, len(partition) - remaining):])
+            remaining -= len(parts[-1])
+        if not parts:
+            return np.zeros(0, dtype=KLINE_DTYPE)
+        return parts[0] if len(parts) == 1 else np.concatenate(list(reversed(parts)))
+
+
+kline_archive = KlineArchive()
+
+
+def read_candles(exchange, symbol, interval, csv_root="klines") -> List[List]:
+    """
+    Candles of a series in the legacy list format, from the KlineArchive if USE_KLINE_ARCHIVE is set otherwise from
+    the csv file
+    """
+    if USE_KLINE_ARCHIVE:
+        return array_to_candles(kline_archive.read(exchange, symbol, interval))
+    return _readcsv(os.path.join(csv_root, exchange, symbol, f"{symbol}_{interval}.csv"))
+
+
+def _readcsv(path):
+    try:
+        with open(path, 'r', newline='') as csvfile:
+            return list(csv.reader(csvfile))
+    except FileNotFoundError:
+        return []
+
+
+def migrate_csv_tree(csv_root="klines", archive: KlineArchive = kline_archive, exchanges=None, print_process=True):
+    """
+    One off copy of the klines/<EXCHANGE>/<SYMBOL>/<SYMBOL>_<interval>.csv files into archive. Week chunked folders
+    (klines/<EXCHANGE>/<YYYYMMDD>/...) are skipped, run DownloadKlinesOneTime.recombine_chunking first to merge them.
+    Can be run again, candles already in the archive are skipped.
+    :return: number of candles written
+    """
+    total = 0
+    if exchanges is None:
+        exchanges = sorted(f.name for f in os.scandir(csv_root) if f.is_dir())
+    for exchange in exchanges:
+        exchange_path = os.path.join(csv_root, exchange)
+        symbols = sorted(f.name for f in os.scandir(exchange_path) if f.is_dir() and not re.fullmatch(r"20\d{6}", f.name))
+        for symbol in symbols:
+            for f in sorted(os.scandir(os.path.join(exchange_path, symbol)), key=lambda x: x.name):
+                match = re.fullmatch(rf"{re.escape(symbol)}_(\w+)\.csv", f.name)
+                if not match:
+                    continue
+                interval = match.group(1)
+                written = archive.append(exchange, symbol, interval, [c for c in _readcsv(f.path) if c])
+                total += written
+                if print_process:
+                    print(f"{exchange} {symbol}_{interval}.csv: {written} candles archived")
+    return total
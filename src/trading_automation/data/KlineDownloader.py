@@ -0,0 +1,225 @@
+import json
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+from trading_automation.config.settings import get_settings
+from trading_automation.core.Logger import reverse_readline
+from trading_automation.core.Utils import binance_intervals_to_seconds
+from trading_automation.data.KlineArchive import USE_KLINE_ARCHIVE, KlineArchive, kline_archive
+
+settings = get_settings()
+KLINE_DOWNLOAD_MAX_WORKERS = settings.kline_download_max_workers
+KLINE_DOWNLOAD_JOB_TRIES = settings.kline_download_job_tries
+
+# concurrent series downloads per exchange, requests are also held to the exchange's market data budget by the
+# shared rate_limiter in UniversalClient.tries_wrapper
+DOWNLOAD_CONCURRENCY = {
+    "BYBIT": 4,
+    "BINANCE": 8,
+    "OKEX": 2,
+    "PHEMEX": 2,
+    "CAPITAL": 1,
+    "BINGX": 2,
+}
+DEFAULT_START_TIME = 1672531200000  # Sunday, January 1, 2023 0:00:00 UTC
+PROGRESS_REPORT_SECONDS = 30
+
+
+def get_download_concurrency(exchange):
+    for name, workers in DOWNLOAD_CONCURRENCY.items():
+        if name in exchange:
+            return min(workers, KLINE_DOWNLOAD_MAX_WORKERS)
+    return KLINE_DOWNLOAD_MAX_WORKERS
+
+
+class CheckpointManifest:
+    """
+    JSON file of the open and close time of the last candle stored for each (symbol, interval) of an exchange so a
+    download can resume without reading the stored klines. Saved atomically after every update.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path) as f:
+                self._data: Dict[str, Dict[str, List[int]]] = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self._data = {}
+
+    def get(self, symbol, interval) -> Optional[List[int]]:
+        """
+        :return: [open time, close time] of the last candle stored or None
+        """
+        with self._lock:
+            return self._data.get(symbol, {}).get(interval)
+
+    def set(self, symbol, interval, open_time, close_time):
+        with self._lock:
+            self._data.setdefault(symbol, {})[interval] = [int(open_time), int(close_time)]
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self._data, f)
+            os.replace(tmp_path, self.path)
+
+
+class KlineDownloader:
+    """
+    Downloads the klines of every (symbol, interval) series of an exchange up to the present time, running the series
+    as independent jobs on a worker pool. Each series resumes from its entry in the CheckpointManifest (falling back to
+    the last stored candle once) and a job that keeps failing is retried up to job_tries times on its own without
+    stopping the other jobs. Candles are written to the KlineArchive if USE_KLINE_ARCHIVE is set otherwise to the csv
+    files, as DownloadKlinesOneTime.run does.
+    client only needs exchange, futures_get_candlesticks() and logger so a fake exchange can be used in tests.
+    """
+
+    def __init__(self, client, intervals, max_candles, max_workers=None, exclusive_start_time=False, recent_only=False,
+                 start_time=DEFAULT_START_TIME, archive: Optional[KlineArchive] = None, csv_root="klines",
+                 manifest_path=None, job_tries=KLINE_DOWNLOAD_JOB_TRIES, print_process=True):
+        """
+        :param max_candles: candles per request
+        :param exclusive_start_time: the exchange leaves out the candle at startTime (e.g. OKEX, KUCOIN)
+        :param recent_only: the exchange only gives recent klines so new series start 1439 candles ago
+        :param start_time: open time in milliseconds new series start from
+        :param archive: KlineArchive to write to, defaults to kline_archive if USE_KLINE_ARCHIVE otherwise csv files
+        """
+        self.client = client
+        self.exchange = client.exchange
+        self.intervals = intervals
+        self.max_candles = max_candles
+        self.max_workers = max_workers if max_workers is not None else get_download_concurrency(self.exchange)
+        self.exclusive_start_time = exclusive_start_time
+        self.recent_only = recent_only
+        self.start_time = start_time
+        self.archive = archive if archive is not None else (kline_archive if USE_KLINE_ARCHIVE else None)
+        self.csv_root = csv_root
+        storage_root = self.archive.root if self.archive is not None else csv_root
+        self.manifest = CheckpointManifest(manifest_path or os.path.join(storage_root, self.exchange, "download_manifest.json"))
+        self.job_tries = job_tries
+        self.print_process = print_process
+        self._stats_lock = threading.Lock()
+        self.candles_written = 0
+        self.requests_made = 0
+        self.failed_jobs: Dict[str, str] = {}
+
+    def _csv_path(self, symbol, interval):
+        return os.path.join(self.csv_root, self.exchange, symbol, f"{symbol}_{interval}.csv")
+
+    def _last_stored(self, symbol, interval) -> Optional[List[int]]:
+        checkpoint = self.manifest.get(symbol, interval)
+        if checkpoint is not None:
+            return checkpoint
+        if self.archive is not None:
+            last = self.archive.last_candle(self.exchange, symbol, interval)
+            return None if last is None else [int(last['open_time']), int(last['close_time'])]
+        try:
+            last = next(reverse_readline(self._csv_path(symbol, interval))).split(",")
+            return [int(last[0]), int(last[6])]
+        except (StopIteration, IndexError, ValueError):
+            return None
+
+    def _write(self, symbol, interval, candles):
+        if self.archive is not None:
+            self.archive.append(self.exchange, symbol, interval, candles)
+        else:
+            self.client.logger.writecsvlines(lines=candles, path=self._csv_path(symbol, interval))
+        self.manifest.set(symbol, interval, candles[-1][0], candles[-1][6])
+        with self._stats_lock:
+            self.candles_written += len(candles)
+
+    def download_series(self, symbol, interval):
+        """
+        Download one series from its last stored candle up to the last closed candle
+        """
+        interval_ms = binance_intervals_to_seconds(interval) * 1000
+        current_time = round(time.time() * 1000)
+        last_stored = self._last_stored(symbol, interval)
+        if last_stored is not None:
+            start_time = last_stored[1] + 1
+            if self.exclusive_start_time:
+                start_time -= 1
+        elif self.recent_only:
+            start_time = round(current_time - interval_ms * 1439)
+        else:
+            start_time = self.start_time
+        last_open_time = last_stored[0] if last_stored is not None else None
+        while start_time < current_time:
+            end_time = min(start_time + interval_ms * self.max_candles - 1, current_time)
+            candles = self.client.futures_get_candlesticks(symbol, interval=interval, limit=self.max_candles,
+                                                           startTime=start_time, endTime=end_time)
+            with self._stats_lock:
+                self.requests_made += 1
+            if isinstance(candles, tuple):
+                # bid and ask klines (CAPITAL)
+                candles, ask_candles = candles
+                self._write_page(f"{symbol}_ASK", ask_candles, current_time, last_open_time, interval)
+            written = self._write_page(symbol, candles, current_time, last_open_time, interval)
+            if written:
+                last_open_time = written[-1][0]
+                start_time = written[-1][6] + 1
+                if self.exclusive_start_time:
+                    start_time -= 1
+                if candles[-1][6] > current_time:
+                    return
+            else:
+                start_time += interval_ms * self.max_candles
+
+    def _write_page(self, symbol, candles, current_time, last_open_time, interval):
+        """
+        :return: the closed candles of the page that were new and written
+        """
+        if not candles:
+            return []
+        candles = [c for c in candles if int(c[6]) <= current_time]
+        if last_open_time is not None:
+            candles = [c for c in candles if int(c[0]) > last_open_time]
+        if candles:
+            self._write(symbol, interval, candles)
+        return candles
+
+    def _run_job(self, symbol, interval):
+        for attempt in range(1, self.job_tries + 1):
+            try:
+                self.download_series(symbol, interval)
+                return True
+            except Exception as e:
+                if attempt == self.job_tries:
+                    with self._stats_lock:
+                        self.failed_jobs[f"{symbol}_{interval}"] = str(e)
+                    self.client.logger.writeline(f"{self.exchange} {symbol} {interval} kline download failed after "
+                                                 f"{attempt} tries: {e} {traceback.format_exc()}")
+                    return False
+                # resumes from the manifest so no candles are downloaded twice
+                time.sleep(min(2 ** attempt, 30))
+
+    def run(self, symbols):
+        """
+        Download every interval of every symbol
+        :return: dict of "<symbol>_<interval>": error of the jobs that failed
+        """
+        jobs = [(symbol, interval) for symbol in symbols for interval in self.intervals]
+        started = time.time()
+        last_report = started
+        finished = 0
+        self.client.logger.writeline(f"{self.exchange} downloading klines of {len(jobs)} series with "
+                                     f"{self.max_workers} workers")
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="KlineDownloader") as pool:
+            futures = [pool.submit(self._run_job, symbol, interval) for symbol, interval in jobs]
+            for _ in as_completed(futures):
+                finished += 1
+                if self.print_process and (time.time() - last_report >= PROGRESS_REPORT_SECONDS or finished == len(jobs)):
+                    last_report = time.time()
+                    print(self.progress_report(finished, len(jobs), last_report - started))
+        self.client.logger.writeline(self.progress_report(finished, len(jobs), time.time() - started))
+        return dict(self.failed_jobs)
+
+    def progress_report(self, finished, total, elapsed):
+        elapsed = max(elapsed, 1e-9)
+        return (f"{self.exchange} klines {finished}/{total} series done, {len(self.failed_jobs)} failed, "
+                f"{self.candles_written} candles in {self.requests_made} requests, {elapsed:.1f}s "
+                f"({self.candles_written / elapsed:.0f} candles/s, {self.requests_made / elapsed:.1f} requests/s)")
@@ -0,0 +1,151 @@
+import hmac
+import json
+import threading
+import time
+from typing import Dict, List, Tuple
+
+from .FTXWebSocket import Websocket
+from .MarketDataHub import MarketDataHub
+from trading_automation.core.Metrics import metrics
+from trading_automation.core.Utils import binance_intervals_to_bybit_intervals, format_float_in_standard_form
+from ..clients.UniversalClient import BYBIT_API_KEY, BYBIT_API_SECRET, BYBIT_API_KEY_SECOND, \
+    BYBIT_API_SECRET_SECOND, BYBIT_API_KEY_THIRD, BYBIT_API_SECRET_THIRD
+
+
+class _BybitHubSocket(Websocket):
+    """
+    A single Bybit v5 connection owned by a BybitMarketDataHub. Every message received is handed back to the hub.
+    """
+
+    def __init__(self, hub, url) -> None:
+        super().__init__()
+        self.hub = hub
+        self.url = url
+        self._subscriptions: List = []
+        self._subscriptions_lock = threading.Lock()
+        threading.Thread(target=self._keep_alive, daemon=True).start()
+
+    def _keep_alive(self):
+        while True:
+            self.send_json({"op": "ping"})
+            time.sleep(10)
+
+    def _get_url(self):
+        return self.url
+
+    @metrics.timed_handler
+    def _on_message(self, ws, raw_message):
+        self.hub.on_message(json.loads(raw_message))
+
+    def _subscribe(self, subscriptions: List):
+        with self._subscriptions_lock:
+            subscriptions = [s for s in subscriptions if s not in self._subscriptions]
+            if not subscriptions:
+                return
+            self._subscriptions += subscriptions
+        self.send_json({'op': 'subscribe', 'args': subscriptions})
+
+    def _unsubscribe(self, subscriptions: List):
+        self.send_json({'op': 'unsubscribe', 'args': subscriptions})
+        with self._subscriptions_lock:
+            self._subscriptions = [s for s in self._subscriptions if s not in subscriptions]
+
+    def _reconnect(self, ws):
+        super()._reconnect(ws)
+        self.hub.on_reconnect(self)
+
+
+class BybitMarketDataHub(MarketDataHub):
+    """
+    MarketDataHub for one Bybit account. Uses one public connection for the klines of every subscribed symbol and one
+    private connection for the position, wallet and order topics of the whole account (which Bybit sends for all
+    symbols regardless), instead of a public and private connection per strategy as with BybitWebSocketManager.
+    """
+    _ENDPOINT_PUBLIC = 'wss://stream.bybit.com/v5/public/linear'
+    _ENDPOINT_PRIVATE = 'wss://stream.bybit.com/v5/private'
+
+    def __init__(self, exchange, client=None) -> None:
+        super().__init__(exchange, client)
+        if "LowStakes" in self.exchange or "2" in self.exchange:
+            self._api_key, self._api_secret = BYBIT_API_KEY_SECOND, BYBIT_API_SECRET_SECOND
+        elif "3" in self.exchange:
+            self._api_key, self._api_secret = BYBIT_API_KEY_THIRD, BYBIT_API_SECRET_THIRD
+        else:
+            self._api_key, self._api_secret = BYBIT_API_KEY, BYBIT_API_SECRET
+        # topic -> (symbol, binance interval)
+        self._kline_topics: Dict[str, Tuple[str, str]] = {}
+        self.wallet_balance = self.client.futures_get_total_balance()
+        self.public_ws = _BybitHubSocket(self, self._ENDPOINT_PUBLIC)
+        self.private_ws = _BybitHubSocket(self, self._ENDPOINT_PRIVATE)
+        self._login()
+        self.private_ws._subscribe(['position', 'wallet', 'order'])
+        self.order_events.register_publisher(self.exchange)
+
+    def _login(self):
+        """
+        Authorize the private websocket connection.
+        """
+        expires = int((time.time() + 5) * 1000)
+        _val = f'GET/realtime{expires}'
+        signature = str(hmac.new(
+            bytes(self._api_secret, 'utf-8'),
+            bytes(_val, 'utf-8'), digestmod='sha256'
+        ).hexdigest())
+        self.private_ws.send_json({'op': 'auth', 'args': [self._api_key, expires, signature]})
+
+    def on_reconnect(self, socket: _BybitHubSocket):
+        # subscriptions are lost with the old connection
+        with socket._subscriptions_lock:
+            subscriptions = socket._subscriptions
+            socket._subscriptions = []
+        if socket is self.private_ws:
+            self._login()
+        socket._subscribe(subscriptions)
+
+    def _subscribe_klines(self, symbol, interval):
+        topic = f'kline.{binance_intervals_to_bybit_intervals(interval)}.{symbol}'
+        with self.lock:
+            self._kline_topics[topic] = (symbol, interval)
+        self.public_ws._subscribe([topic])
+
+    def on_message(self, message):
+        if message.get('op') == 'auth' and message.get('success') is False:
+            self.logger.writeline(f'{self.exchange} ERROR BYBIT MarketDataHub Authorization failed')
+        elif message.get('op') == 'subscribe' and message.get('success') is False:
+            self.logger.writeline(f'{self.exchange} ERROR BYBIT MarketDataHub Couldn\'t subscribe to topic.'
+                                  f' Error: {message.get("ret_msg")}.')
+
+        topic = message.get('topic')
+        if topic is None:
+            return
+        if topic.startswith('kline'):
+            symbol, interval = self._kline_topics.get(topic, (None, None))
+            if symbol is None:
+                return
+            for candle_data in message['data']:
+                candle = [candle_data['start'],
+                          format_float_in_standard_form(candle_data['open']),
+                          format_float_in_standard_form(candle_data['high']),
+                          format_float_in_standard_form(candle_data['low']),
+                          format_float_in_standard_form(candle_data['close']),
+                          candle_data['volume'],
+                          candle_data['end'],
+                          candle_data['turnover']]
+                self.update_candle(symbol, interval, candle)
+        elif topic == 'wallet':
+            # bybit websocket doesn't seem to give current equity balance (total wallet balance inc. unrealised pnl)
+            for wallet_data in message['data']:
+                self.update_wallet_balance(wallet_data.get('totalWalletBalance', wallet_data.get('walletBalance')))
+        elif topic == 'position':
+            for position_data in message['data']:
+                if position_data['symbol'] in self.positions:
+                    position = self.client.process_bybit_position_to_binance(position_data)
+                    # stored as futures_get_position returns it
+                    self.update_position(position_data['symbol'], [position])
+                    self.order_events.publish_position(self.exchange, position_data['symbol'], position)
+        elif topic == 'order':
+            for order_data in message['data']:
+                if order_data['symbol'] in self.positions:
+                    order = self.client.process_bybit_order_to_binance(order_data)
+                    self.update_order(order)
+                    self.order_events.publish_order(self.exchange, order_data['symbol'], order)
@@ -1,5 +1,7 @@
 import json
 from .FTXWebSocket import Websocket
+from trading_automation.core.Metrics import metrics
+from trading_automation.core.OrderEvents import get_order_event_bus
 from trading_automation.core.Utils import check_if_candles_are_latest, get_current_datetime_string, binance_intervals_to_bybit_intervals, format_float_in_standard_form
 from ..clients.UniversalClient import UniversalClient, BYBIT_API_SECRET, BYBIT_API_KEY, BYBIT_API_KEY_SECOND, BYBIT_API_SECRET_SECOND
 from trading_automation.core.Utils import binance_intervals_to_seconds
@@ -20,6 +22,7 @@ class BybitWebSocket(Websocket, WebsocketInterface):
         self.interval = interval
         self.client = client
         self.logger = self.client.logger
+        self.order_events = get_order_event_bus()
         self._subscriptions: List = []
         self.OLD_ORDERS_TIME_LIMIT = 300000  # time limit in milliseconds
         self._api_key = BYBIT_API_KEY if "2" not in self.client.exchange else BYBIT_API_KEY_SECOND
@@ -41,6 +44,7 @@ class BybitWebSocket(Websocket, WebsocketInterface):
                     order['updateTime'] = int(time.time() * 1000)
                     self.orders[order['orderId']] = order
             self._subscribe(['position', 'wallet', 'order'])
+            self.order_events.register_publisher(self.client.exchange)
 
         threading.Thread(target=self._keep_alive, daemon=True).start()
 
@@ -111,6 +115,7 @@ class BybitWebSocket(Websocket, WebsocketInterface):
             if position_data['symbol'] == self.symbol:
                 position = self.client.process_bybit_position_to_binance(position_data)
                 self.position = position
+                self.order_events.publish_position(self.client.exchange, self.symbol, position)
 
     def _handle_order_message(self, data):
         for order_data in data:
@@ -118,6 +123,7 @@ class BybitWebSocket(Websocket, WebsocketInterface):
                 order = self.client.process_bybit_order_to_binance(order_data)
                 order['updateTime'] = int(time.time() * 1000)
                 self.orders[order['orderId']] = order
+                self.order_events.publish_order(self.client.exchange, self.symbol, order)
 
                 # clean up old CANCELLED, FILLED and EXPIRED orders that are older than OLD_ORDERS_TIME_LIMIT
                 to_delete = []
@@ -136,6 +142,7 @@ class BybitWebSocket(Websocket, WebsocketInterface):
         for wallet_data in data:
             self.wallet_balance = wallet_data['walletBalance']
 
+    @metrics.timed_handler
     def _on_message(self, ws, raw_message):
         message = json.loads(raw_message)
         # print(message)
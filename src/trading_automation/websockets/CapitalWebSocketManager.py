@@ -1,5 +1,6 @@
 import json
 from .FTXWebSocket import Websocket
+from trading_automation.core.Metrics import metrics
 from ..clients.UniversalClient import UniversalClient
 from trading_automation.core.Utils import binance_intervals_to_seconds
 from trading_automation.websockets.WebsocketInterface import WebsocketInterface
@@ -98,6 +99,7 @@ class CapitalWebSocketManager(Websocket, WebsocketInterface):
 
         self._last_candle_update_time = int(time.time())
 
+    @metrics.timed_handler
     def _on_message(self, ws, raw_message):
         message = json.loads(raw_message)
         # print(message)
@@ -5,6 +5,7 @@ from collections import defaultdict, deque
 from itertools import zip_longest
 from typing import DefaultDict, Deque, List, Dict, Tuple, Optional
 from gevent.event import Event
+from trading_automation.core.Metrics import metrics
 from trading_automation.core.Utils import *
 from .FTXWebSocket import Websocket
 from trading_automation.websockets.WebsocketInterface import WebsocketInterface
@@ -309,6 +310,7 @@ class FtxWebSocketManager(Websocket, WebsocketInterface):
         for oid in to_delete:
             self.orders.pop(oid)
 
+    @metrics.timed_handler
     def _on_message(self, ws, raw_message: str) -> None:
         message = json.loads(raw_message)
         message_type = message['type']
@@ -1,5 +1,7 @@
 import json
 from .FTXWebSocket import Websocket
+from trading_automation.core.Metrics import metrics
+from trading_automation.core.OrderEvents import get_order_event_bus
 from trading_automation.core.Utils import check_if_candles_are_latest, get_current_datetime_string
 from ..clients.UniversalClient import UniversalClient, GATEIO_API_SECRET, GATEIO_API_KEY, GATEIO_USER_ID, GATEIO_API_SECRET_SECOND, GATEIO_API_KEY_SECOND, GATEIO_USER_ID_SECOND, GATEIO_API_SECRET_THIRD, GATEIO_API_KEY_THIRD, GATEIO_USER_ID_THIRD, GATEIO_API_SECRET_FOURTH, GATEIO_API_KEY_FOURTH, GATEIO_USER_ID_FOURTH
 from trading_automation.core.Utils import binance_intervals_to_seconds
@@ -27,6 +29,7 @@ class GateWebSocketManager(Websocket, WebsocketInterface):
         self.logger = self.client.logger
         self.position = self.client.futures_get_position(symbol=symbol)
         self.orders = {}
+        self.order_events = get_order_event_bus()
         self.KLINES_LIMIT = candles_limit
         self._subscriptions: List[Dict] = []
         self.candles = []
@@ -57,6 +60,7 @@ class GateWebSocketManager(Websocket, WebsocketInterface):
         self._subscribe("futures.orders", payload=[self.gateio_user_id, self.symbol], auth_required=True)
         self.position = self.get_position_api_first()
         self._subscribe("futures.positions", payload=[self.gateio_user_id, self.symbol], auth_required=True)
+        self.order_events.register_publisher(self.client.exchange)
         self._subscribe("futures.position_closes", payload=[self.gateio_user_id, self.symbol], auth_required=True)
         self.wallet_balance = self.client.futures_get_balance()
         self._subscribe("futures.balances", payload=[self.gateio_user_id], auth_required=True)
@@ -136,6 +140,7 @@ class GateWebSocketManager(Websocket, WebsocketInterface):
         order = self.client.process_gate_order_to_binance(FuturesOrder(text=o['text'], id=o['id'], contract=o['contract'], price=o['price'], size=o['size'], status=o['status'], finish_as=finish_as, is_reduce_only=o['is_reduce_only'], fill_price=o['fill_price'], left=o['left']))
         order['updateTime'] = int(time.time() * 1000)
         self.orders[order['orderId']] = order
+        self.order_events.publish_order(self.client.exchange, self.symbol, order)
 
         # clean up old CANCELLED, FILLED and EXPIRED orders that are older than OLD_ORDERS_TIME_LIMIT
         to_delete = []
@@ -154,10 +159,12 @@ class GateWebSocketManager(Websocket, WebsocketInterface):
                      "symbol": position['contract'],
                      "unRealizedProfit": 'unknown'}]
         self.position = position
+        self.order_events.publish_position(self.client.exchange, self.symbol, position)
 
     def _handle_wallet_message(self, message):
         self.wallet_balance = message['balance']
 
+    @metrics.timed_handler
     def _on_message(self, ws, raw_message):
         message = json.loads(raw_message)
         if 'channel' in message:
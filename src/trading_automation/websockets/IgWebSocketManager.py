@@ -1,5 +1,6 @@
 import json
 from .FTXWebSocket import Websocket
+from trading_automation.core.Metrics import metrics
 from ..clients.UniversalClient import UniversalClient
 from trading_automation.core.Utils import binance_intervals_to_seconds
 from trading_automation.websockets.WebsocketInterface import WebsocketInterface
@@ -127,6 +128,7 @@ class IgWebSocketManager(Websocket, WebsocketInterface):
             return
         self.position = self.client.process_mexc_position_to_binance(message['data'])
 
+    @metrics.timed_handler
     def _on_message(self, ws, raw_message):
         message = json.loads(raw_message)
         message_channel = message['channel']
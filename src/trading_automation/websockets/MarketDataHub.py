@@ -0,0 +1,235 @@
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from trading_automation.clients.UniversalClient import UniversalClient
+from trading_automation.core.CandleRingBuffer import CLOSE, CandleRingBuffer
+from trading_automation.core.OrderEvents import get_order_event_bus
+from trading_automation.core.Utils import binance_intervals_to_seconds
+from trading_automation.websockets.WebsocketInterface import WebsocketInterface
+
+# exchanges which have a MarketDataHub implementation, see get_market_data_hub()
+HUB_SUPPORTED_EXCHANGES = ["BYBIT"]
+
+
+class MarketDataHub:
+    """
+    Process wide store of market and account data for one exchange account (e.g. "BYBIT", "BYBIT2").
+    A hub holds the klines of every subscribed (symbol, interval) pair along with the orders, positions and wallet
+    balance of the account, so all strategy threads trading on the same account can read from the same
+    connection(s) instead of each opening their own. This generalises what PhemexWebSocketMaster does with its
+    input/output queues.
+    Subclasses implement _subscribe_klines() and feed messages in using update_candle(), update_order(),
+    update_position() and update_wallet_balance(), publishing order and position changes of the account's private
+    channels on the OrderEventBus.
+    """
+    OLD_ORDERS_TIME_LIMIT = 300000  # time limit in milliseconds 300000 = 5 minute
+
+    def __init__(self, exchange, client: Optional[UniversalClient] = None):
+        self.exchange = exchange
+        self.client = client if client is not None else UniversalClient(exchange)
+        self.logger = self.client.logger
+        self.lock = threading.RLock()
+        self.klines: Dict[Tuple[str, str], CandleRingBuffer] = {}
+        self.klines_limits: Dict[Tuple[str, str], int] = {}
+        self.orders: Dict = {}
+        self.positions: Dict[str, List] = {}
+        self.wallet_balance = None
+        self.order_events = get_order_event_bus()
+        self._last_candle_update_time: Dict[Tuple[str, str], int] = {}
+        # (symbol, interval) of the klines being fetched again, so a burst of out of sequence candles starts one reset
+        self._resets_pending: Set[Tuple[str, str]] = set()
+
+    def _subscribe_klines(self, symbol, interval):
+        raise NotImplementedError()
+
+    def subscribe(self, symbol, interval, candles_limit=50):
+        """
+        Start tracking symbol on this hub. Candles, position and open orders are seeded from the REST API once, after
+        which they are kept up to date from the hub's connection(s).
+        """
+        key = (symbol, interval)
+        with self.lock:
+            if key in self.klines and self.klines_limits[key] >= candles_limit:
+                return
+            self.klines_limits[key] = max(candles_limit, self.klines_limits.get(key, 0))
+        self.reset_candles(symbol, interval)
+        with self.lock:
+            if symbol not in self.positions:
+                self.positions[symbol] = self.client.futures_get_position(symbol=symbol)
+                for order in self.client.futures_get_open_orders(symbol) or []:
+                    self.update_order(order)
+        self._subscribe_klines(symbol, interval)
+
+    def reset_candles(self, symbol, interval):
+        key = (symbol, interval)
+        candles = self.client.futures_get_candlesticks(symbol=symbol, interval=interval, limit=self.klines_limits[key])
+        with self.lock:
+            self.klines[key] = CandleRingBuffer(self.klines_limits[key], candles)
+            self._last_candle_update_time[key] = int(time.time())
+
+    def _reset_candles_in_background(self, symbol, interval):
+        try:
+            self.reset_candles(symbol, interval)
+        except Exception as e:
+            self.logger.writeline(f"{symbol} ERROR {self.exchange} MarketDataHub unable to reset {interval} candles {e}")
+        finally:
+            with self.lock:
+                self._resets_pending.discard((symbol, interval))
+
+    def update_candle(self, symbol, interval, candle):
+        """
+        Update the stored klines of (symbol, interval) with candle. The live candle is replaced if it has the same open
+        time, a new candle is appended if it follows on sequentially otherwise the klines are fetched again from the API
+        """
+        key = (symbol, interval)
+        with self.lock:
+            candles = self.klines.get(key)
+            if candles is None:
+                return
+            last_open_time = candles.last_open_time()
+            if last_open_time is None:
+                candles.append(candle)
+            elif last_open_time == int(candle[0]):
+                candles.replace_last(candle)
+            elif last_open_time + binance_intervals_to_seconds(interval) * 1000 == int(candle[0]):
+                candles.append(candle)
+            elif last_open_time > int(candle[0]):
+                return
+            else:
+                # need to reset candles, unless a reset is already under way
+                if key not in self._resets_pending:
+                    self._resets_pending.add(key)
+                    threading.Thread(target=self._reset_candles_in_background, args=(symbol, interval),
+                                     daemon=True).start()
+                return
+            self._last_candle_update_time[key] = int(time.time())
+
+    def update_order(self, order):
+        with self.lock:
+            order['updateTime'] = int(time.time() * 1000)
+            self.orders[order['orderId']] = order
+
+            # clean up old CANCELLED, FILLED and EXPIRED orders that are older than OLD_ORDERS_TIME_LIMIT
+            current_time = int(time.time() * 1000)
+            to_delete = [orderId for orderId, o in self.orders.items() if o['status'] != "NEW" and (
+                o['updateTime'] < (current_time - self.OLD_ORDERS_TIME_LIMIT) or o['status'] == 'CANCELED')]
+            for oid in to_delete:
+                self.orders.pop(oid)
+
+    def update_position(self, symbol, position):
+        with self.lock:
+            self.positions[symbol] = position
+
+    def update_wallet_balance(self, wallet_balance):
+        with self.lock:
+            self.wallet_balance = wallet_balance
+
+    def get_candlesticks(self, symbol, interval, limit):
+        """
+        :return: the latest limit candles of (symbol, interval) or None if the stored candles are not current
+        """
+        with self.lock:
+            candles = self.klines.get((symbol, interval))
+            if candles is None or not candles.is_latest():
+                return None
+            return candles.to_list(limit)
+
+    def get_candlestick_columns(self, symbol, interval, limit) -> Optional[Dict[str, np.ndarray]]:
+        """
+        :return: read only arrays of each column of the latest limit candles of (symbol, interval), see
+        CandleRingBuffer.columns(), or None if the stored candles are not current
+        """
+        with self.lock:
+            candles = self.klines.get((symbol, interval))
+            if candles is None or not candles.is_latest():
+                return None
+            return candles.columns(limit)
+
+    def get_order(self, orderId):
+        with self.lock:
+            return self.orders.get(orderId)
+
+    def get_position(self, symbol):
+        with self.lock:
+            return self.positions.get(symbol)
+
+    def get_wallet_balance(self):
+        with self.lock:
+            return self.wallet_balance
+
+
+_hubs: Dict[str, MarketDataHub] = {}
+_hubs_lock = threading.Lock()
+
+
+def get_market_data_hub(exchange) -> Optional[MarketDataHub]:
+    """
+    Returns the process wide MarketDataHub for exchange (one per exchange account), starting it on first use.
+    Returns None if there is no hub implementation for the exchange.
+    """
+    if not [x for x in HUB_SUPPORTED_EXCHANGES if x in exchange]:
+        return None
+    with _hubs_lock:
+        if exchange not in _hubs:
+            if "BYBIT" in exchange:
+                from trading_automation.websockets.BybitMarketDataHub import BybitMarketDataHub
+                _hubs[exchange] = BybitMarketDataHub(exchange)
+        return _hubs[exchange]
+
+
+class HubWebSocketManager(WebsocketInterface):
+    """
+    Per strategy view of a MarketDataHub, used by UniversalClientWebsocket in place of a dedicated websocket manager.
+    Hub data is used first with the REST API as the fallback.
+    """
+
+    def __init__(self, symbol, interval, client: UniversalClient, hub: MarketDataHub, candles_limit=50) -> None:
+        super().__init__()
+        self.symbol = symbol
+        self.interval = interval
+        self.client = client
+        self.logger = self.client.logger
+        self.hub = hub
+        self.hub.subscribe(symbol, interval, candles_limit)
+        self.position = self.hub.get_position(symbol)
+
+    def get_order_api_first(self, orderId):
+        order = self.hub.get_order(orderId)
+        if order is None:
+            order = self.client.futures_get_order(self.symbol, orderId)
+        return order
+
+    def get_candlesticks_api_first(self, limit):
+        candles = self.hub.get_candlesticks(self.symbol, self.interval, limit)
+        if candles is None or len(candles) != limit:
+            candles = self.client.futures_get_candlesticks(symbol=self.symbol, limit=limit, interval=self.interval)
+        return candles
+
+    def get_position_api_first(self):
+        position = self.hub.get_position(self.symbol)
+        if position is None:
+            position = self.client.futures_get_position(self.symbol)
+        return position
+
+    def get_wallet_balance_api_first(self):
+        try:
+            return self.client.futures_get_balance()
+        except Exception:
+            balance = self.hub.get_wallet_balance()
+            self.logger.writeline(f"{self.symbol} {self.hub.exchange} MarketDataHub provided wallet_balance {balance}")
+            return balance
+
+    def get_candlestick_columns(self, limit):
+        """
+        :return: see MarketDataHub.get_candlestick_columns, None if the hub's candles are not current
+        """
+        return self.hub.get_candlestick_columns(self.symbol, self.interval, limit)
+
+    def get_latest_price_api_first(self):
+        columns = self.hub.get_candlestick_columns(self.symbol, self.interval, 1)
+        if columns is not None and len(columns[CLOSE]):
+            return float(columns[CLOSE][-1])
+        return self.client.futures_get_symbol_price(self.symbol)
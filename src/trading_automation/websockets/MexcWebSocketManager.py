@@ -1,5 +1,7 @@
 import json
 from .FTXWebSocket import Websocket
+from trading_automation.core.Metrics import metrics
+from trading_automation.core.OrderEvents import get_order_event_bus
 from trading_automation.core.Utils import check_if_candles_are_latest, get_current_datetime_string
 from ..clients.UniversalClient import UniversalClient, MEXC_API_KEY, MEXC_API_SECRET
 from trading_automation.core.Utils import binance_intervals_to_seconds
@@ -18,6 +20,7 @@ class MexcWebSocketManager(Websocket, WebsocketInterface):
         self.symbol = symbol
         self.interval = interval
         self.client = client
+        self.order_events = get_order_event_bus()
         self._api_key = MEXC_API_KEY
         self._api_secret = MEXC_API_SECRET
         self._login()
@@ -35,6 +38,7 @@ class MexcWebSocketManager(Websocket, WebsocketInterface):
                 self.orders[order['orderId']] = order
         self.OLD_ORDERS_TIME_LIMIT = 300000  # time limit in milliseconds
         self._subscriptions: List[Dict] = []
+        self.order_events.register_publisher(self.client.exchange)
         threading.Thread(target=self._keep_alive, daemon=True).start()
 
     def _keep_alive(self):
@@ -107,6 +111,7 @@ class MexcWebSocketManager(Websocket, WebsocketInterface):
         order = self.client.process_mexc_order_to_binance(message['data'])
         order['updateTime'] = int(time.time() * 1000)
         self.orders[order['orderId']] = order
+        self.order_events.publish_order(self.client.exchange, self.symbol, order)
 
         # clean up old CANCELLED, FILLED and EXPIRED orders that are older than OLD_ORDERS_TIME_LIMIT
         to_delete = []
@@ -128,7 +133,9 @@ class MexcWebSocketManager(Websocket, WebsocketInterface):
         if message['data']['symbol'] != self.symbol:
             return
         self.position = self.client.process_mexc_position_to_binance(message['data'])
+        self.order_events.publish_position(self.client.exchange, self.symbol, self.position)
 
+    @metrics.timed_handler
     def _on_message(self, ws, raw_message):
         message = json.loads(raw_message)
         message_channel = message['channel']
@@ -7,6 +7,7 @@ from threading import Thread, Event
 from queue import Queue
 from datetime import datetime
 from typing import List
+from trading_automation.core.Metrics import metrics
 from trading_automation.clients.UniversalClient import UniversalClient, binance_intervals_to_seconds, PHEMEX_API_ID, PHEMEX_API_SECRET, PHEMEX_USE_HIGH_RATE_API_ENDPOINT
 from trading_automation.websockets.FTXWebSocket import Websocket
 import json
@@ -14,6 +15,7 @@ import hmac
 from trading_automation.core.Utils import format_float_in_standard_form, check_if_candles_are_latest, get_current_datetime_string
 from decimal import Decimal
 import copy
+from trading_automation.core.CandleRingBuffer import CandleRingBuffer
 from trading_automation.websockets.PhemexWebSocketManager import PhemexWebSocketManager
 
 
@@ -80,26 +82,30 @@ class PhemexWebSocketMaster(Websocket, Thread):
 
             if message['type'] == 'snapshot':
                 if len(formatted_candles) >= self.candles_limit:
-                    self.klines_interval_dict[symbol]['klines'] = list(reversed(formatted_candles))
-                    # print(f"stored_candles = {self.klines_interval_dict[symbol]['klines']}")
+                    klines = self.klines_interval_dict[symbol]['klines']
+                    klines.clear()
+                    klines.extend(reversed(formatted_candles))
                     return
 
+        klines = self.klines_interval_dict[symbol]['klines']
         for formatted_candle in reversed(formatted_candles):
-            # if open_time of candle is the same as the last entry in self.candles - update, else append new candle
-            # print(f"stored_candles = {self.klines_interval_dict[symbol]['klines']} formatted_candle = {formatted_candle}")
-            if int(self.klines_interval_dict[symbol]['klines'][-1][0]) == int(formatted_candle[0]):
-                self.klines_interval_dict[symbol]['klines'][-1] = formatted_candle
+            # if open_time of candle is the same as the last entry in klines - update, else append new candle
+            last_open_time = klines.last_open_time()
+            if last_open_time is None:
+                klines.append(formatted_candle)
+            elif last_open_time == int(formatted_candle[0]):
+                klines.replace_last(formatted_candle)
             else:
                 # check if the next candle's open time fits in sequentially before adding
-                if int(self.klines_interval_dict[symbol]['klines'][-1][0]) + binance_intervals_to_seconds(interval) * 1000 == int(formatted_candle[0]):
-                    self.klines_interval_dict[symbol]['klines'].append(formatted_candle)
-                    self.klines_interval_dict[symbol]['klines'] = self.klines_interval_dict[symbol]['klines'][1:]
-                elif int(self.klines_interval_dict[symbol]['klines'][-1][0]) > int(formatted_candle[0]):
+                if last_open_time + binance_intervals_to_seconds(interval) * 1000 == int(formatted_candle[0]):
+                    klines.append(formatted_candle)
+                elif last_open_time > int(formatted_candle[0]):
                     continue
                 else:
                     # need to reset candles
                     print(f"{symbol} WARNING: PHEMEX WS new candle does not fit. Getting candles again...")
                     self._set_up_candlesticks(symbol, interval)
+                    break
 
             self._last_candle_update_time = int(time())
 
@@ -128,6 +134,7 @@ class PhemexWebSocketMaster(Websocket, Thread):
             if position['symbol'] in self.klines_interval_dict:
                 self.positions[position['symbol']] = [self.client.process_phemex_position_to_binance(position)]
 
+    @metrics.timed_handler
     def _on_message(self, ws, message):
         message = json.loads(message)
         if 'error' in message and message['error'] is not None:
@@ -152,7 +159,7 @@ class PhemexWebSocketMaster(Websocket, Thread):
         pass
 
     def _set_up_candlesticks(self, symbol, interval):
-        self.klines_interval_dict[symbol] = {'klines': [], 'interval': interval}
+        self.klines_interval_dict[symbol] = {'klines': CandleRingBuffer(self.candles_limit), 'interval': interval}
         self.send_json({'id': self.account_id, 'method': 'kline.subscribe', 'params': [symbol, binance_intervals_to_seconds(interval)]})
 
     def _set_up_orders(self):
@@ -170,7 +177,7 @@ class PhemexWebSocketMaster(Websocket, Thread):
                 if symbol not in self.klines_interval_dict:
                     self._set_up_candlesticks(symbol=symbol, interval=interval)
                     sleep(5)
-                output = self.klines_interval_dict[symbol]['klines']
+                output = self.klines_interval_dict[symbol]['klines'].to_list()
                 if not output:
                     self._set_up_candlesticks(symbol=symbol, interval=interval)
             elif request == 'orders':
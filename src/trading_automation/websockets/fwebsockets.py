@@ -1,6 +1,9 @@
 # from unicorn_binance_websocket_api.unicorn_binance_websocket_api_manager import BinanceWebSocketApiManager
 from ..clients.UniversalClient import *
+from trading_automation.core.Metrics import metrics
+from trading_automation.core.OrderEvents import get_order_event_bus
 from trading_automation.websockets.WebsocketInterface import WebsocketInterface
+from trading_automation.core.CandleRingBuffer import CandleRingBuffer
 import re
 
 DONT_USE_BINANCE_WS_FLAG = True
@@ -67,6 +70,7 @@ class WebSocketManager(WebsocketInterface):
         self.interval = interval
         self.client = client
         self.logger = self.client.logger
+        self.order_events = get_order_event_bus()
         # below four variables are used to help handle kline streams for non supported intervals from websockets
         self.upper_interval_time = None
         self.lower_interval_time = None
@@ -76,7 +80,7 @@ class WebSocketManager(WebsocketInterface):
         # ----
         self.KLINES_LIMIT = candles_limit
         self.OLD_ORDERS_TIME_LIMIT = 300000  # time limit in milliseconds 300000 = 5 minute
-        self.candles = self.client.futures_get_candlesticks(symbol=self.symbol, interval=self.interval, limit=self.KLINES_LIMIT)
+        self.candles = CandleRingBuffer(self.KLINES_LIMIT, self.client.futures_get_candlesticks(symbol=self.symbol, interval=self.interval, limit=self.KLINES_LIMIT))
         self.wallet_balance = 0
         self.multiMarginAssets = self.client.futures_get_multi_margin_assets()
         self.assetBalance = {}  # balances of the above multiMarginAssets that are used for collateral
@@ -99,6 +103,7 @@ class WebSocketManager(WebsocketInterface):
                                                                                                     api_key=BINANCE_API_KEY,
                                                                                                     api_secret=BINANCE_API_SECRET,
                                                                                                     output="dict")
+        self.order_events.register_publisher(self.client.exchange)
         if self.interval == "2m":  # special case for 2m intervals, as there is no data stream for 2m, we get 1m ones and convert manually
             self.binance_com_klines_data_stream_id = self.binance_com_websocket_api_manager.create_stream(
              [f'kline_1m'],
@@ -148,11 +153,9 @@ class WebSocketManager(WebsocketInterface):
 
         # if close_time of candle is the same as the last entry in self.candles - update, else append new candle
         if self.candles[-1][6] == candle[6]:
-            self.candles.pop()
-        self.candles.append(candle)
-
-        if len(self.candles) > self.KLINES_LIMIT:
-            self.candles = self.candles[1:]
+            self.candles.replace_last(candle)
+        else:
+            self.candles.append(candle)
 
         # if len(self.candles) > 1:
         #     api_candles = futures_get_candlesticks(symbol=self.symbol, limit=len(self.candles), interval=self.interval)[:-1]
@@ -192,6 +195,7 @@ class WebSocketManager(WebsocketInterface):
             order["activatePrice"] = data["AP"]
 
         self.orders[data["i"]] = order
+        self.order_events.publish_order(self.client.exchange, self.symbol, order)
 
         # clean up old CANCELLED, FILLED and EXPIRED orders that are older than OLD_ORDERS_TIME_LIMIT
         to_delete = []
@@ -213,33 +217,37 @@ class WebSocketManager(WebsocketInterface):
                 time.sleep(0.01)
             else:
                 # current_data = json.loads(oldest_stream_data_from_stream_buffer)
-                current_data = oldest_stream_data_from_stream_buffer
-                if "stream" in current_data:
-                    candle = klines_dict_to_array(current_data["data"])
-                    self.add_new_candle(candle)
-                    continue
-                # self.logger.writeline(oldest_stream_data_from_stream_buffer)
-                # print(oldest_stream_data_from_stream_buffer)
-                if "e" in current_data:
-                    if current_data["e"] == "ACCOUNT_UPDATE":
-                        data = current_data["a"]
-                        if "B" in data:  # Balances
-                            # update balances
-                            balances = data["B"]
-                            for balance in balances:
-                                if balance["a"] in self.multiMarginAssets:
-                                    self.assetBalance[balance["a"]] = Decimal(balance['wb'])
-                            self.wallet_balance = sum(self.assetBalance.values())
-
-                        if "P" in data and data["m"] == "ORDER":  # Position
-                            position_data = data["P"][0]
-                            if position_data["s"] == self.symbol:
-                                position = parse_position_data(position_data)
-                                self.position = position
-
-                    elif current_data["e"] == "ORDER_TRADE_UPDATE":
-                        order = current_data["o"]
-                        self.update_order_list(order)
+                self._handle_stream_data(oldest_stream_data_from_stream_buffer)
+
+    @metrics.timed_handler
+    def _handle_stream_data(self, current_data):
+        if "stream" in current_data:
+            candle = klines_dict_to_array(current_data["data"])
+            self.add_new_candle(candle)
+            return
+        # self.logger.writeline(oldest_stream_data_from_stream_buffer)
+        # print(oldest_stream_data_from_stream_buffer)
+        if "e" in current_data:
+            if current_data["e"] == "ACCOUNT_UPDATE":
+                data = current_data["a"]
+                if "B" in data:  # Balances
+                    # update balances
+                    balances = data["B"]
+                    for balance in balances:
+                        if balance["a"] in self.multiMarginAssets:
+                            self.assetBalance[balance["a"]] = Decimal(balance['wb'])
+                    self.wallet_balance = sum(self.assetBalance.values())
+
+                if "P" in data and data["m"] == "ORDER":  # Position
+                    position_data = data["P"][0]
+                    if position_data["s"] == self.symbol:
+                        position = parse_position_data(position_data)
+                        self.position = position
+                        self.order_events.publish_position(self.client.exchange, self.symbol, position)
+
+            elif current_data["e"] == "ORDER_TRADE_UPDATE":
+                order = current_data["o"]
+                self.update_order_list(order)
 
     def check_user_data_stream_status(self):
         account_stream_info = self.binance_com_websocket_api_manager.get_stream_info(
@@ -272,8 +280,8 @@ class WebSocketManager(WebsocketInterface):
             return order
 
     def get_candlesticks(self, limit):
-        if check_if_candles_are_latest(self.candles):
-            return self.candles[-limit:]
+        if self.candles.is_latest():
+            return self.candles.to_list(limit)
         else:
             self.logger.writeline(f"ERROR Binance Websockets get_candlesticks: {self.symbol} candles not current!")
             return None
@@ -321,7 +329,7 @@ class WebSocketManager(WebsocketInterface):
             return wallet_balance
 
     def get_latest_price(self):
-        if check_if_candles_are_latest(self.candles):
+        if self.candles.is_latest():
             return self.candles[-1][4]
         else:
             self.logger.writeline(f"ERROR Websockets get_latest_price: {self.symbol} candles not current!")
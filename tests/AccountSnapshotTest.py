@@ -0,0 +1,86 @@
+import threading
+import time
+
+import pytest
+
+from trading_automation.core.AccountSnapshot import AccountSnapshot, AccountSnapshotService
+
+POSITION = {"entryPrice": '100', "positionAmt": '-2', "symbol": "BTCUSDT", "unRealizedProfit": '1'}
+
+
+class FakeClient:
+    """Counts the account requests, optionally blocking them until released."""
+
+    def __init__(self, release=None):
+        self.requests = 0
+        self.release = release
+        self.positions = [POSITION]
+
+    def futures_get_position(self, symbol=None):
+        self.requests += 1
+        if self.release is not None:
+            self.release.wait(5)
+        return self.positions
+
+    def futures_get_balance(self):
+        return '1000'
+
+    def futures_get_total_balance(self):
+        return '1200'
+
+
+def test_snapshot_is_read_only_and_copies_positions():
+    snapshot = AccountSnapshot([POSITION], '1000', '1200')
+    assert snapshot.equity == 1000 and snapshot.wallet_balance == 1200
+    with pytest.raises(AttributeError):
+        snapshot.equity = 0
+    position = snapshot.position("BTCUSDT")
+    position[0]["positionAmt"] = '0'
+    assert snapshot.position("BTCUSDT") == [POSITION]
+    assert snapshot.position_sizes_sum() == 200
+
+
+def test_symbol_without_position_is_flat():
+    snapshot = AccountSnapshot([POSITION], '1000', '1200')
+    assert snapshot.position("ETHUSDT") == [{"entryPrice": '0', "positionAmt": '0', "symbol": "ETHUSDT",
+                                             "unRealizedProfit": '0'}]
+
+
+def test_snapshot_is_fetched_once_per_max_age():
+    client = FakeClient()
+    service = AccountSnapshotService("BYBIT", max_age=60)
+    snapshot = service.get(client)
+    assert service.get(client) is snapshot and service.latest() is snapshot
+    assert client.requests == 1
+    # a smaller max age than the snapshot's age fetches a new one
+    time.sleep(0.01)
+    assert service.get(client, max_age=0) is not snapshot
+    assert client.requests == 2
+    service.invalidate()
+    assert service.latest() is None
+    service.get(client)
+    assert client.requests == 3
+
+
+def test_concurrent_callers_share_one_fetch():
+    release = threading.Event()
+    client = FakeClient(release)
+    service = AccountSnapshotService("BYBIT", max_age=60)
+    snapshots = []
+    threads = [threading.Thread(target=lambda: snapshots.append(service.get(client))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert client.requests == 1
+    assert len(snapshots) == 5 and all(snapshot is snapshots[0] for snapshot in snapshots)
+
+
+def test_failed_fetch_raises():
+    client = FakeClient()
+    client.positions = None
+    service = AccountSnapshotService("BYBIT", max_age=60)
+    with pytest.raises(Exception):
+        service.get(client)
+    assert service.latest() is None
@@ -0,0 +1,97 @@
+import asyncio
+import time
+
+import pytest
+
+from trading_automation.clients.AsyncUniversalClient import AsyncUniversalClient, run_bulk
+
+
+class FakeClient:
+    """The UniversalClient methods the bulk helpers use, each request taking 50ms."""
+
+    def __init__(self, exchange="BYBIT"):
+        self.exchange = exchange
+        self.tries = 3
+        self.cancelled = []
+
+    def futures_get_position(self, symbol=None):
+        time.sleep(0.05)
+        if symbol == "BADUSDT":
+            raise Exception("unknown symbol")
+        return [{'symbol': symbol, 'positionAmt': '1.0' if symbol == "BTCUSDT" else '0.0'}]
+
+    def futures_cancel_all_open_orders(self, symbol):
+        time.sleep(0.05)
+        self.cancelled.append(symbol)
+
+    def futures_get_all_open_orders(self):
+        if self.exchange != "BINANCE":
+            return None
+        return [{'symbol': symbol, 'orderId': i} for i, symbol in enumerate(["BTCUSDT", "ETHUSDT", "ETHUSDT", "XRPUSDT"])]
+
+    def futures_cancel_orders_batch(self, orders):
+        self.cancelled.extend((order['symbol'], order['orderId']) for order in orders)
+
+    def get_symbol_quantity_precision(self, symbol):
+        return 3
+
+
+class FakeBinanceClient:
+    async def futures_position_information(self, symbol=None):
+        positions = [{'symbol': 'BTCUSDT', 'positionAmt': '0.5'}, {'symbol': 'ETHUSDT', 'positionAmt': '0.0'}]
+        return [x for x in positions if symbol is None or x['symbol'] == symbol]
+
+
+def test_positions_are_requested_concurrently():
+    symbols = [f"S{i}USDT" for i in range(10)]
+    start = time.monotonic()
+    positions = run_bulk(FakeClient(), lambda client: client.positions(symbols + ["BTCUSDT", "S0USDT"]))
+    assert time.monotonic() - start < 0.3
+    assert list(positions) == symbols + ["BTCUSDT"]
+    assert positions["BTCUSDT"][0]['positionAmt'] == '1.0'
+
+
+def test_run_bulk_from_a_running_event_loop():
+    async def main():
+        return run_bulk(FakeClient(), lambda client: client.positions(["BTCUSDT"]))
+    positions = asyncio.run(main())
+    assert positions["BTCUSDT"][0]['positionAmt'] == '1.0'
+
+
+def test_exceptions():
+    client = FakeClient()
+    with pytest.raises(Exception, match="unknown symbol"):
+        run_bulk(client, lambda c: c.positions(["BTCUSDT", "BADUSDT"]))
+    positions = run_bulk(client, lambda c: c.positions(["BTCUSDT", "BADUSDT"], return_exceptions=True))
+    assert isinstance(positions["BADUSDT"], Exception)
+    assert positions["BTCUSDT"][0]['symbol'] == "BTCUSDT"
+
+
+def test_other_methods_run_on_the_thread_pool():
+    client = FakeClient()
+    assert run_bulk(client, lambda c: c.get_symbol_quantity_precision("BTCUSDT")) == 3
+    run_bulk(client, lambda c: c.cancel_all(["BTCUSDT", "ETHUSDT"]))
+    assert sorted(client.cancelled) == ["BTCUSDT", "ETHUSDT"]
+
+
+def test_binance_requests_use_the_async_client(monkeypatch):
+    async def binance_client(self):
+        return FakeBinanceClient()
+    monkeypatch.setattr(AsyncUniversalClient, "_binance_client", binance_client)
+
+    async def main():
+        async with AsyncUniversalClient(client=FakeClient("BINANCE"), max_concurrency=4) as client:
+            return await client.futures_get_position(), await client.positions(["ETHUSDT"])
+    open_positions, positions = asyncio.run(main())
+    assert open_positions == [{'symbol': 'BTCUSDT', 'positionAmt': '0.5'}]
+    assert positions == {"ETHUSDT": [{'symbol': 'ETHUSDT', 'positionAmt': '0.0'}]}
+
+
+def test_cancel_open_orders_only_cancels_the_open_orders_of_the_symbols():
+    client = FakeClient("BINANCE")
+    run_bulk(client, lambda c: c.cancel_open_orders(["ETHUSDT", "XRPUSDT", "SOLUSDT"]))
+    assert client.cancelled == [("ETHUSDT", 1), ("ETHUSDT", 2), ("XRPUSDT", 3)]
+    # exchanges that cannot list every symbol's open orders at once cancel them symbol by symbol
+    client = FakeClient()
+    run_bulk(client, lambda c: c.cancel_open_orders(["ETHUSDT", "SOLUSDT"]))
+    assert sorted(client.cancelled) == ["ETHUSDT", "SOLUSDT"]
@@ -0,0 +1,113 @@
+import threading
+import time
+
+import pytest
+
+from trading_automation.core.CandleCloseDispatcher import CandleCloseDispatcher
+
+
+class FakeLogger:
+    def __init__(self):
+        self.lines = []
+
+    def writeline(self, line):
+        self.lines.append(line)
+
+
+class FakeStrategy:
+    def __init__(self, name, calls, priority=1, exchange="BYBIT", interval="1m"):
+        self.name = name
+        self.calls = calls
+        self.priority = priority
+        self.exchange = exchange
+        self.interval = interval
+        self.running = 0
+        self.overlapped = False
+
+    def __str__(self):
+        return self.name
+
+    def candle_close_priority(self):
+        return self.priority
+
+    def set_orders(self):
+        self.calls.append(self.name)
+
+    def regular_check(self):
+        pass
+
+    def slow_job(self, seconds):
+        self.running += 1
+        if self.running > 1:
+            self.overlapped = True
+        time.sleep(seconds)
+        self.running -= 1
+
+
+@pytest.fixture
+def make_dispatcher():
+    dispatchers = []
+
+    def make(max_workers=4):
+        dispatcher = CandleCloseDispatcher(max_workers=max_workers)
+        dispatcher.logger = FakeLogger()
+        dispatchers.append(dispatcher)
+        return dispatcher
+    yield make
+    for dispatcher in dispatchers:
+        dispatcher.scheduler.shutdown(wait=False)
+        dispatcher.pool.shutdown(wait=True)
+
+
+@pytest.fixture
+def dispatcher(make_dispatcher):
+    return make_dispatcher()
+
+
+def test_exits_are_dispatched_before_entries(make_dispatcher):
+    calls = []
+    # one worker so the submission order is the run order
+    dispatcher = make_dispatcher(max_workers=1)
+    strategies = [FakeStrategy("entry", calls, priority=1), FakeStrategy("exit", calls, priority=0),
+                  FakeStrategy("other", calls, exchange="PHEMEX")]
+    for strategy in strategies:
+        dispatcher.register(strategy)
+    dispatcher._dispatch_candle_close(("BYBIT", "1m"))
+    assert calls == ["exit", "entry"]
+    assert len(dispatcher.get_latencies(strategies[0])) == 1
+    assert dispatcher.get_latencies(strategies[2]) == []
+
+
+def test_jobs_of_a_strategy_do_not_overlap(dispatcher):
+    strategy, other = FakeStrategy("a", []), FakeStrategy("b", [])
+    dispatcher.register(strategy)
+    dispatcher.register(other)
+    futures = [dispatcher.submit(s, s.slow_job, args=(0.05,)) for s in (strategy, strategy, strategy, other, other)]
+    started = time.monotonic()
+    assert all(future.result(5) for future in futures)
+    assert not strategy.overlapped and not other.overlapped
+    # the two strategies ran alongside each other
+    assert time.monotonic() - started < 0.25
+
+
+def test_regular_check_is_skipped_while_a_job_runs(dispatcher):
+    strategy = FakeStrategy("a", [])
+    dispatcher.register(strategy)
+    release = threading.Event()
+    running = dispatcher.submit(strategy, release.wait, args=(5,))
+    time.sleep(0.05)
+    assert dispatcher.pool.submit(dispatcher._run, strategy, strategy.regular_check, (), False).result(5) is False
+    release.set()
+    assert running.result(5)
+
+
+def test_submit_after_unregister_does_not_run(dispatcher):
+    calls = []
+    strategy = FakeStrategy("a", calls)
+    dispatcher.register(strategy)
+    dispatcher.unregister(strategy)
+    assert dispatcher.groups[("BYBIT", "1m")] == []
+    assert id(strategy) not in dispatcher._strategy_locks
+    assert dispatcher.submit(strategy, strategy.set_orders).result(5) is False
+    dispatcher._dispatch_candle_close(("BYBIT", "1m"))
+    assert calls == []
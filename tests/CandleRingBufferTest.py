@@ -0,0 +1,59 @@
+import time
+
+import numpy as np
+import pytest
+
+from trading_automation.core.CandleRingBuffer import CLOSE, OPEN_TIME, QUOTE_VOLUME, CandleRingBuffer
+
+
+def make_candle(i, close="1.5"):
+    open_time = 1700000000000 + i * 60000
+    return [open_time, "1", "2", "0.5", close, "10", open_time + 59999, "15"]
+
+
+def test_keeps_latest_capacity_candles():
+    buffer = CandleRingBuffer(3, [make_candle(i) for i in range(5)])
+    assert len(buffer) == 3
+    assert buffer.to_list() == [make_candle(i) for i in range(2, 5)]
+    assert buffer.to_list(2) == [make_candle(3), make_candle(4)]
+    assert buffer[0] == make_candle(2) and buffer[-1] == make_candle(4)
+    assert buffer.column(OPEN_TIME).tolist() == [make_candle(i)[0] for i in range(2, 5)]
+    with pytest.raises(IndexError):
+        buffer[3]
+
+
+def test_replace_last_updates_views_in_place():
+    buffer = CandleRingBuffer(4, [make_candle(i) for i in range(3)])
+    closes = buffer.column(CLOSE, 2)
+    buffer.replace_last(make_candle(2, close="3.25"))
+    assert closes.tolist() == [1.5, 3.25]
+    assert buffer[-1][4] == "3.25"
+    assert buffer.last_open_time() == make_candle(2)[0]
+    with pytest.raises(ValueError):
+        closes[0] = 0
+
+
+def test_views_survive_capacity_appends():
+    buffer = CandleRingBuffer(3, [make_candle(i) for i in range(3)])
+    open_times = buffer.column(OPEN_TIME)
+    expected = open_times.tolist()
+    for i in range(3, 6):
+        buffer.append(make_candle(i))
+        assert open_times.tolist() == expected
+    assert buffer.column(OPEN_TIME).tolist() == [make_candle(i)[0] for i in range(3, 6)]
+
+
+def test_short_candles_and_empty_buffer():
+    buffer = CandleRingBuffer(2)
+    assert len(buffer) == 0 and buffer.to_list() == [] and buffer.last_open_time() is None
+    assert not buffer.is_latest()
+    buffer.append(make_candle(0)[:7])
+    assert np.isnan(buffer.column(QUOTE_VOLUME)[-1])
+
+
+def test_is_latest():
+    now = int(time.time() // 60 * 60 * 1000)
+    buffer = CandleRingBuffer(5, [[now - 60000, "1", "1", "1", "1", "1", now - 1], [now, "1", "1", "1", "1", "1", now + 59999]])
+    assert buffer.is_latest()
+    buffer = CandleRingBuffer(5, [make_candle(0), make_candle(1)])
+    assert not buffer.is_latest()
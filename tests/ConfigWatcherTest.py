@@ -0,0 +1,59 @@
+import os
+
+import pytest
+
+from trading_automation.core.ConfigWatcher import ConfigSnapshot, ConfigWatcher, parse_arglist, parse_env
+
+
+def write(path, text):
+    # bump the modification time so the change is seen however coarse the filesystem's timestamps are
+    mtime = os.stat(path).st_mtime_ns + 10 ** 9 if os.path.exists(path) else None
+    path.write_text(text)
+    if mtime is not None:
+        os.utime(path, ns=(mtime, mtime))
+
+
+def test_parse_arglist_and_env():
+    arglist = parse_arglist(["args_a.txt -x -n\n", "#args_b.txt\n", "@args_c.txt\n", "args_a.txt -f\n"])
+    assert arglist == {"args_a.txt": frozenset({"x", "n"}), "args_c.txt": frozenset()}
+    env = parse_env(["BTC_PRICE_LOWER_BOUND = 20000\n", "KEY='value'\n", "# COMMENTED = 1\n"])
+    assert env == {"BTC_PRICE_LOWER_BOUND": "20000", "KEY": "value"}
+
+
+def test_snapshot_is_read_only():
+    snapshot = ConfigSnapshot(1, {"args_a.txt": frozenset()}, {}, {"A": "1.5"})
+    assert snapshot.env_float("A") == 1.5 and snapshot.env_float("B", 2) == 2
+    with pytest.raises(AttributeError):
+        snapshot.version = 2
+    with pytest.raises(TypeError):
+        snapshot.env["A"] = "2"
+
+
+def test_changes_are_published_once(tmp_path):
+    arglist = tmp_path / "arglist.txt"
+    env = tmp_path / ".env"
+    args = tmp_path / "args_a.txt"
+    write(arglist, "args_a.txt\n")
+    write(env, "BTC_PRICE_UPPER_BOUND = 100000\n")
+    write(args, "BYBIT\n5m\nBTCUSDT\n")
+    watcher = ConfigWatcher(arglist_path=str(arglist), env_path=str(env), poll_interval=0)
+    snapshots = []
+    watcher.subscribe(snapshots.append)
+    assert watcher.snapshot.version == 1
+    assert watcher.snapshot.arg_lines("args_a.txt") == ("BYBIT", "5m", "BTCUSDT")
+    assert watcher.snapshot.env_float("BTC_PRICE_UPPER_BOUND") == 100000
+
+    assert not watcher.check() and not snapshots
+    write(arglist, "args_a.txt -x\n")
+    assert watcher.check()
+    assert not watcher.check()
+    assert [s.version for s in snapshots] == [2]
+    assert snapshots[0].arglist_flags("args_a.txt") == frozenset({"x"})
+
+    write(args, "BYBIT\n1m\nBTCUSDT\n")
+    assert watcher.check()
+    assert watcher.snapshot.version == 3 and watcher.snapshot.arg_lines("args_a.txt")[1] == "1m"
+    watcher.unsubscribe(snapshots.append)
+    write(env, "BTC_PRICE_UPPER_BOUND = 90000\n")
+    assert watcher.check() and len(snapshots) == 2
+    assert watcher.snapshot.env_float("BTC_PRICE_UPPER_BOUND") == 90000
@@ -0,0 +1,63 @@
+import math
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from trading_automation.core.DepthAnalytics import DepthAnalytics
+from trading_automation.core.OrderBook import ASKS, BIDS, OrderBook
+
+
+@pytest.fixture
+def analytics():
+    return DepthAnalytics(OrderBook.from_dict("BTCUSDT", "0.5", {
+        "bids": [["100", "1"], ["99.5", "2"], ["98", "4"]],
+        "asks": [["100.5", "1"], ["101", "3"], ["102", "5"]],
+    }))
+
+
+def test_vwap_batched(analytics):
+    vwap = analytics.vwap(ASKS, quantity=[0.5, 2, 100])
+    assert vwap[0] == 100.5
+    assert vwap[1] == pytest.approx((100.5 + 101) / 2)
+    assert math.isnan(vwap[2])
+    assert analytics.vwap(BIDS, notional=[100])[0] == 100.0
+
+
+def test_slippage_ticks(analytics):
+    assert analytics.slippage_ticks(ASKS, quantity=[1, 2, 5]).tolist() == [0, 1, 3]
+    assert analytics.slippage_ticks(BIDS, notional=[150]).tolist() == [1]
+
+
+def test_price_at_depth_is_strictly_over(analytics):
+    # first level whose cumulative notional is over the value, as the old futures_get_bid_min_value loop
+    assert analytics.price_at_depth(BIDS, [0, 99.99, 100, 298.99, 299]).tolist() == [100, 100, 99.5, 99.5, 98]
+    assert math.isnan(analytics.price_at_depth(ASKS, 10000)[0])
+
+
+def test_imbalance(analytics):
+    bids_total, asks_total, percentage = analytics.imbalance(2)
+    assert bids_total == 299 and asks_total == 403.5
+    assert percentage == pytest.approx((1 - 403.5 / 299) * 100)
+
+
+def test_market_open(analytics):
+    total_asset, avg_price, slippage = analytics.market_open("LONG", Decimal("201.5"))
+    assert total_asset == Decimal("2.0")
+    assert avg_price == Decimal("101.0")
+    assert slippage == Decimal("0.5")
+    assert analytics.market_open("SHORT", Decimal("1000000")) is None
+
+
+def test_market_close(analytics):
+    total, pnl, avg_price, slippage = analytics.market_close(-2, 100)
+    assert (total, pnl) == (201.5, -1.5)
+    assert avg_price == Decimal("101.0") and slippage == Decimal("0.5")
+    total, pnl, avg_price, slippage = analytics.market_close(0.5, 90)
+    assert (total, pnl, slippage) == (50.0, 5.0, Decimal("0.0"))
+
+
+def test_empty_side():
+    analytics = DepthAnalytics(OrderBook.from_dict("BTCUSDT", "0.5", {"bids": [["100", "1"]], "asks": []}))
+    assert np.isnan(analytics.price_at_depth(ASKS, 0)[0])
+    assert analytics.market_open("LONG", 10) is None
@@ -0,0 +1,82 @@
+from types import SimpleNamespace
+
+import pytest
+from binance.exceptions import BinanceAPIException
+from pybit.exceptions import FailedRequestError, InvalidRequestError
+
+from trading_automation.clients.PhemexClient import PhemexAPIException
+from trading_automation.clients.exchange_adapters import (
+    AUTH_EXPIRED,
+    DUPLICATE_ID,
+    IP_BLOCKED,
+    NOT_FOUND,
+    RATE_LIMIT,
+    RETRYABLE,
+    ExchangeAdapter,
+    ExchangeAdapterRegistry,
+    exchange_adapters,
+)
+
+
+class FakeResponse:
+    status_code = 400
+    text = '{"code": -2013, "msg": "Order does not exist."}'
+
+
+class FakePhemexResponse:
+    status_code = 429
+    headers = {}
+
+    def json(self):
+        return {"code": 0, "msg": ""}
+
+
+def test_account_names_resolve_to_their_exchange():
+    assert exchange_adapters.resolve("BINANCE").name == "BINANCE"
+    assert exchange_adapters.resolve("BINANCE_SPOT").name == "BINANCE_SPOT"
+    assert exchange_adapters.resolve("BYBIT2").name == "BYBIT"
+    assert exchange_adapters.resolve("OKEX_LowStakes").name == "OKEX"
+    assert exchange_adapters.resolve("CAPITAL_sub").name == "CAPITAL"
+    assert exchange_adapters.resolve("BYBIT2") is exchange_adapters.resolve("BYBIT3")
+    with pytest.raises(Exception):
+        exchange_adapters.resolve("UNKNOWN")
+
+
+def test_registering_an_exchange():
+    registry = ExchangeAdapterRegistry()
+    assert registry.get("NEWEX") is None
+
+    @registry.register
+    class NewExchangeAdapter(ExchangeAdapter):
+        name = "NEWEX"
+    assert isinstance(registry.resolve("NEWEX2"), NewExchangeAdapter)
+    assert registry.names() == ["NEWEX"]
+
+
+def test_classify_error():
+    binance = exchange_adapters.resolve("BINANCE")
+    assert binance.classify_error(BinanceAPIException(FakeResponse(), 400, FakeResponse.text)) == NOT_FOUND
+    assert binance.classify_error(Exception("anything")) is None
+    bybit = exchange_adapters.resolve("BYBIT")
+    assert bybit.classify_error(InvalidRequestError("", "Too many visits", 10018, 0, {})) == RATE_LIMIT
+    assert bybit.classify_error(InvalidRequestError("", "Duplicate", 30089, 0, {})) == DUPLICATE_ID
+    mexc = exchange_adapters.resolve("MEXC")
+    assert mexc.classify_error(Exception("MEXC 2008 Close order's vol must less")) == RETRYABLE
+    assert mexc.classify_error(Exception("MEXC 510 Request frequently too fast")) == RATE_LIMIT
+    assert exchange_adapters.resolve("FTX").classify_error(Exception("Do not send more than 2 orders per 200ms")) == RATE_LIMIT
+    assert not exchange_adapters.resolve("CAPITAL").client_order_ids
+
+
+def test_classify_venue_errors():
+    bybit = exchange_adapters.resolve("BYBIT2")
+    assert bybit.classify_error(FailedRequestError("", "403 Forbidden", 403, 0, {})) == IP_BLOCKED
+    assert bybit.classify_error(FailedRequestError("", "502 Bad Gateway", 502, 0, {})) is None
+    phemex = exchange_adapters.resolve("PHEMEX")
+    assert phemex.classify_error(PhemexAPIException(FakePhemexResponse())) == RATE_LIMIT
+    capital = exchange_adapters.resolve("CAPITAL")
+    assert capital.classify_error(Exception("CapitalClient ERROR error.security.token-invalid")) == AUTH_EXPIRED
+    assert capital.classify_error(Exception("CapitalClient ERROR error.invalid.session.token")) == AUTH_EXPIRED
+    refreshed = []
+    capital.refresh_auth(SimpleNamespace(client_capital=SimpleNamespace(
+        refresh_security_tokens=lambda: refreshed.append(True))))
+    assert refreshed == [True]
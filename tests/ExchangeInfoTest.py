@@ -0,0 +1,67 @@
+import time
+from decimal import Decimal
+
+from trading_automation.clients.exchange_info import ExchangeInfoRegistry
+
+
+class FakeClient:
+    def __init__(self, exchange="BYBIT", venue="BYBIT"):
+        self.exchange = exchange
+        self.venue = venue
+        self.calls = 0
+
+    def futures_exchange_info(self):
+        self.calls += 1
+        return [{"symbol": "BTCUSDT", "tickSize": "0.10", "stepSize": "0.001", "maxQty": "100"},
+                {"symbol": "ETHUSDT", "tickSize": "0.01", "stepSize": "0.01"}]
+
+
+def test_fetches_once_per_exchange(tmp_path):
+    registry = ExchangeInfoRegistry(ttl=3600, snapshot_dir=str(tmp_path))
+    first, second = FakeClient(), FakeClient()
+    info = registry.get(first)
+    assert registry.get(second) is info
+    assert first.calls == 1 and second.calls == 0
+    assert info.tick_sizes["BTCUSDT"] == Decimal("0.10")
+    assert info.step_sizes["ETHUSDT"] == Decimal("0.01")
+    assert info.max_quantities == {"BTCUSDT": Decimal("100")}
+
+
+def test_accounts_of_an_exchange_share_its_info(tmp_path):
+    registry = ExchangeInfoRegistry(ttl=3600, snapshot_dir=str(tmp_path))
+    first, second, other = FakeClient("BYBIT"), FakeClient("BYBIT2"), FakeClient("GATEIO3", venue="GATE")
+    info = registry.get(first)
+    assert registry.get(second) is info and registry.is_loaded("BYBIT")
+    assert registry.get(other) is not info
+    assert (first.calls, second.calls, other.calls) == (1, 0, 1)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["exchange_info_BYBIT.json", "exchange_info_GATE.json"]
+
+
+def test_loads_fresh_snapshot_without_fetching(tmp_path):
+    ExchangeInfoRegistry(ttl=3600, snapshot_dir=str(tmp_path)).get(FakeClient())
+    client = FakeClient()
+    info = ExchangeInfoRegistry(ttl=3600, snapshot_dir=str(tmp_path)).get(client)
+    assert client.calls == 0
+    assert info.step_sizes["BTCUSDT"] == Decimal("0.001")
+    assert info.max_quantities["BTCUSDT"] == Decimal("100")
+
+
+def test_stale_snapshot_is_refetched(tmp_path):
+    ExchangeInfoRegistry(ttl=3600, snapshot_dir=str(tmp_path)).get(FakeClient())
+    client = FakeClient()
+    info = ExchangeInfoRegistry(ttl=0, snapshot_dir=str(tmp_path)).get(client)
+    assert client.calls == 1
+    assert info.fetched_at <= time.time()
+
+
+def test_local_data_bybit_client_has_max_quantities(monkeypatch):
+    from trading_automation.clients.BybitClient import BybitClient
+    from trading_automation.clients.UniversalClient import UniversalClient
+    instruments = [{"symbol": "BTCUSDT", "contractType": "LinearPerpetual", "priceFilter": {"tickSize": "0.10"},
+                    "lotSizeFilter": {"qtyStep": "0.001", "maxOrderQty": "100"}},
+                   {"symbol": "BTCUSD", "contractType": "InversePerpetual", "priceFilter": {"tickSize": "0.5"},
+                    "lotSizeFilter": {"qtyStep": "1", "maxOrderQty": "1000000"}}]
+    monkeypatch.setattr(BybitClient, "query_symbol", lambda self, symbol=None: instruments)
+    client = UniversalClient("BYBIT", use_local_tick_and_step_data=True)
+    assert client.bybit_symbol_max_quantity == {"BTCUSDT": Decimal("100"), "BTCUSD": Decimal("1000000")}
+    assert client.batch_orderable("BTCUSDT", {"type": "LIMIT", "quantity": Decimal("150")}) is False
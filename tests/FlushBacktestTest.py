@@ -0,0 +1,126 @@
+import numpy as np
+
+from trading_automation.analysis import FlushBacktest as flush_backtest
+from trading_automation.analysis.FlushBacktest import (DAY_MS, EXIT_LIMIT, EXIT_SOFT_STOP_LOSS, EXIT_STOP_LOSS,
+                                                       FlushBacktest, FlushStrategyParams, daily_range, rolling_max,
+                                                       rolling_min)
+from trading_automation.data.KlineArchive import KLINE_DTYPE
+
+MINUTE = 60000
+
+
+def make_klines(rows):
+    """:param rows: (open, high, low, close) of consecutive 1m candles"""
+    klines = np.zeros(len(rows), dtype=KLINE_DTYPE)
+    klines['open_time'] = np.arange(len(rows)) * MINUTE
+    klines['close_time'] = klines['open_time'] + MINUTE - 1
+    for i, name in enumerate(('open', 'high', 'low', 'close')):
+        klines[name] = [row[i] for row in rows]
+    return klines
+
+
+def make_params(**kwargs):
+    params = dict(exchange="BINANCE", interval="1m", symbol="TESTUSDT", flushPercent=10, squeezePercent=10,
+                  numberOfFlushBars=3, exitLookbackBars=3, stopLossPercentageLong=5)
+    params.update(kwargs)
+    return FlushStrategyParams(**params)
+
+
+def run(rows, **kwargs):
+    return FlushBacktest(make_params(**kwargs), make_klines(rows), maker_fee=0, taker_fee=0, range_limit_days=0,
+                         volatility_limit=0).run()
+
+
+def test_rolling_max_min_match_naive():
+    values = np.random.default_rng(1).random(500)
+    for window in (1, 2, 3, 7, 16, 33):
+        naive_max = [values[max(0, i - window + 1):i + 1].max() for i in range(len(values))]
+        naive_min = [values[max(0, i - window + 1):i + 1].min() for i in range(len(values))]
+        assert np.array_equal(rolling_max(values, window), naive_max)
+        assert np.array_equal(rolling_min(values, window), naive_min)
+
+
+def random_walk(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.001, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.001, n)))
+    return make_klines(list(zip(open_, high, low, close)))
+
+
+def test_daily_range_matches_naive():
+    klines = random_walk(5000)
+    klines['open_time'] += 7 * DAY_MS - 300 * MINUTE
+    upper, lower = daily_range(klines['open_time'], klines['high'], klines['low'], 3)
+    day = klines['open_time'] // DAY_MS
+    for i in range(0, len(klines), 97):
+        window = (day >= day[i] - 2) & (np.arange(len(klines)) <= i)
+        assert upper[i] == klines['high'][window].max()
+        assert lower[i] == klines['low'][window].min()
+
+
+def test_exit_searches_agree(monkeypatch):
+    # exits found by range reductions, matrix scans and one by one chunk searches are the same
+    klines = random_walk(20000, seed=3)
+    params = make_params(flushPercent=0.4, squeezePercent=0.4, numberOfFlushBars=20, exitLookbackBars=40,
+                         stopLossPercentageLong=1, stopLossPercentageShort=1, softSLPercentage=0.3, softSLN=3,
+                         takeProfitPercentage=1.5, shorts=True, maxDrawdownPercentage=100)
+    results = []
+    for lookback_range, scan_bars in ((256, (16, 64)), (0, (16, 64)), (0, (1,)), (256, (1,))):
+        monkeypatch.setattr(flush_backtest, "LOOKBACK_RANGE", lookback_range)
+        monkeypatch.setattr(flush_backtest, "SCAN_BARS", scan_bars)
+        results.append(FlushBacktest(params, klines).run())
+    assert len(results[0].trades) > 100
+    assert set(results[0].trades['exit_reason'].tolist()) >= {0, 1, 2}
+    for result in results[1:]:
+        assert np.array_equal(result.trades, results[0].trades)
+        assert result.stats == results[0].stats
+
+
+def test_flush_entry_and_lookback_exit():
+    flat = [(100, 100, 100, 100)] * 60
+    # the highest high of the last 3 candles is 100, the buy limit at 90 fills in the dip and exits at the 3 candle high
+    rows = flat + [(100, 100, 88, 89), (89, 92, 89, 91), (91, 101, 91, 100)] + flat
+    result = run(rows)
+    trade = result.trades[0]
+    assert (trade['side'], trade['entry_price'], trade['exit_reason']) == (1, 90, EXIT_LIMIT)
+    assert trade['exit_price'] == 100
+    assert trade['entry_time'] == 60 * MINUTE
+    assert np.isclose(trade['pnl_percentage'], 100 / 90 - 1)
+    assert result.stats['trades'] == 1
+    assert np.isclose(result.stats['total_return'], 100 / 90 - 1)
+    # orders at each flat close from the first with the full volatility lookback (59) but not while in the position
+    assert result.stats['entry_fills'] == 1
+    assert result.stats['entry_orders'] == len(rows) - 1 - 59 - 2
+
+
+def test_stop_loss_is_taken_first_and_ends_run_with_termination():
+    flat = [(100, 100, 100, 100)] * 60
+    rows = flat + [(100, 100, 89, 89), (89, 101, 80, 81)] + flat
+    result = run(rows, stopLossTermination=True)
+    trade = result.trades[0]
+    assert trade['exit_reason'] == EXIT_STOP_LOSS
+    assert np.isclose(trade['exit_price'], 90 * 0.95)
+    assert result.stopped_reason == "stop loss termination"
+
+
+def test_soft_stop_loss_and_shorts():
+    flat = [(100, 100, 100, 100)] * 60
+    rows = flat + [(100, 111, 100, 110)] + [(110, 111, 108.9, 111)] * 3 + [(111, 111, 105, 106)] + flat
+    result = run(rows, shorts=True, flushPercent=50, softSLPercentage=0.5, softSLN=2, stopLossPercentageShort=50)
+    trade = result.trades[0]
+    assert trade['side'] == -1 and np.isclose(trade['entry_price'], 110)
+    assert trade['exit_reason'] == EXIT_SOFT_STOP_LOSS
+    assert trade['exit_price'] == 111
+    assert trade['pnl_percentage'] < 0
+
+
+def test_params_from_args_lines():
+    lines = ["BINANCE", "1m", "BTCUSDT", "1.8", "2.5", "30", "10", "3", "4", "0.5", "3", "2", "0", "100", "5", "10",
+             "20", "5", "1", "1", "-s", "-p", "-a"]
+    params = FlushStrategyParams.from_lines([f"{line}\n" for line in lines])
+    assert (params.flushPercent, params.numberOfFlushBars, params.softSLN) == (1.8, 30, 3)
+    assert params.shorts and params.postOnly and not params.avoidMarketEntries and not params.reverse_mode
+    assert params.to_lines(["-x", "-a"]) == lines[:22] + ["-x"]
+    assert FlushStrategyParams.from_lines(params.to_lines()) == params
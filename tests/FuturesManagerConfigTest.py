@@ -0,0 +1,107 @@
+from types import SimpleNamespace
+
+import pytest
+
+from trading_automation.apps.FuturesManager import FuturesFlushBuyManager
+from trading_automation.core.CandleCloseDispatcher import CandleCloseDispatcher
+from trading_automation.core.ConfigWatcher import ConfigSnapshot
+
+ARG_FILE = "args_btc.txt"
+ARGS = ["BYBIT", "5m", "BTCUSDT", "1.5", "0", "10", "5", "2", "0", "0", "0", "0.8", "0", "0", "10", "0", "0", "0",
+        "2", "1.0", "-r"]
+
+
+class FakeLogger:
+    def __init__(self):
+        self.lines = []
+
+    def writeline(self, line, discord_channel_id=None):
+        self.lines.append(line)
+
+
+@pytest.fixture
+def dispatcher():
+    # one worker so jobs run in the order they are submitted
+    dispatcher = CandleCloseDispatcher(max_workers=1)
+    dispatcher.logger = FakeLogger()
+    yield dispatcher
+    dispatcher.scheduler.shutdown(wait=False)
+    dispatcher.pool.shutdown(wait=True)
+
+
+def make_manager(dispatcher):
+    manager = FuturesFlushBuyManager.__new__(FuturesFlushBuyManager)
+    manager.__dict__.update(
+        argfilename=ARG_FILE, exchange="BYBIT", symbol="BTCUSDT", interval="5m", logger=FakeLogger(),
+        dispatcher=dispatcher, account_snapshots=SimpleNamespace(latest=lambda: None),
+        client=SimpleNamespace(venue="BYBIT"), btcpricelowerbound=0, btcpriceupperbound=0,
+        arglist_flags=frozenset(), arg_lines=None, close_position_only=False, ignore_abnormal_volume=False,
+        flushPercent=0.015, squeezePercent=0, numberOfFlushBars=10, exitLookbackBars=5,
+        stopLossPercentageLong=0.02, stopLossPercentageShort=0, softSLPercentage=0, softSLN=0,
+        takeProfitPercentage=0.008, quantity=None, fixedBalance=None, balancePercent=0.1, shorts=False,
+        recalcOnFill=True, postOnly=False, avoidMarketEntries=False)
+    manager.strategy_key = str(manager)
+    dispatcher.register(manager)
+    return manager
+
+
+def snapshot(version, args, flags=""):
+    return ConfigSnapshot(version, {ARG_FILE: frozenset(flags)}, {ARG_FILE: args}, {})
+
+
+def change_config(manager, snapshot):
+    manager.on_config_change(snapshot)
+    # wait for the changes the dispatcher applies
+    manager.dispatcher.submit(manager, lambda: None).result(5)
+
+
+def test_changed_arg_file_is_applied(dispatcher):
+    manager = make_manager(dispatcher)
+    change_config(manager, snapshot(1, ARGS))
+    assert manager.arg_lines == tuple(ARGS) and manager.flushPercent == 0.015
+
+    changed = list(ARGS)
+    changed[3] = "2.5"  # flushPercent
+    changed[4] = "3"  # squeezePercent
+    changed[5] = "20"  # numberOfFlushBars, only changes on restart
+    changed[14] = "0"  # balancePercent
+    changed[12] = "100"  # quantity
+    changed[20:] = ["-s", "-p", "-a"]
+    change_config(manager, snapshot(2, changed, flags="x"))
+    assert manager.flushPercent == 0.025 and manager.shorts and manager.squeezePercent == 0.03
+    assert manager.quantity == 100 and manager.balancePercent == 0
+    assert manager.postOnly and not manager.avoidMarketEntries and not manager.recalcOnFill
+    assert manager.numberOfFlushBars == 10
+    assert any("[5] only change on restart" in line for line in manager.logger.lines)
+    # arglist.txt flags are still applied
+    assert manager.close_position_only
+
+
+def test_invalid_arg_file_keeps_the_running_params(dispatcher):
+    manager = make_manager(dispatcher)
+    change_config(manager, snapshot(1, ARGS))
+    changed = list(ARGS)
+    changed[12] = "100"  # quantity as well as balancePercent
+    change_config(manager, snapshot(2, changed))
+    assert manager.quantity is None and manager.balancePercent == 0.1
+    assert manager.arg_lines == tuple(ARGS)
+    changed = list(ARGS)
+    changed[3] = "abc"
+    change_config(manager, snapshot(3, changed))
+    assert manager.flushPercent == 0.015
+
+
+def test_candle_close_after_a_changed_arg_file(dispatcher):
+    manager = make_manager(dispatcher)
+    strategy_key = manager.strategy_key
+    closes = []
+    manager.set_orders = lambda: closes.append(str(manager))
+    change_config(manager, snapshot(1, ARGS))
+    changed = list(ARGS)
+    changed[3] = "2.5"  # flushPercent, part of str(manager)
+    change_config(manager, snapshot(2, changed))
+    dispatcher._dispatch_candle_close(("BYBIT", "5m"))
+    assert closes == [str(manager)] and " 2.5 " in closes[0]
+    assert len(dispatcher.get_latencies(manager)) == 1
+    # the records of the running strategy stay under the key it started with
+    assert manager.strategy_key == strategy_key != str(manager)
@@ -0,0 +1,55 @@
+import threading
+
+from trading_automation.apps.FuturesManager import FuturesFlushBuyManager
+from trading_automation.core.AccountSnapshot import AccountSnapshotService
+from trading_automation.core.Utils import get_position_size
+
+POSITION = {"entryPrice": '100', "positionAmt": '2', "symbol": "BTCUSDT", "unRealizedProfit": '0'}
+
+
+class FakeClient:
+    """An exchange polled for fills, which publishes no position updates."""
+
+    def __init__(self):
+        self.positions = []
+
+    def futures_get_position(self, symbol=None):
+        return list(self.positions)
+
+    def futures_get_balance(self):
+        return '1000'
+
+    def futures_get_total_balance(self):
+        return '1000'
+
+
+def make_manager():
+    manager = FuturesFlushBuyManager.__new__(FuturesFlushBuyManager)
+    client = FakeClient()
+    manager.__dict__.update(symbol="BTCUSDT", client=client, recalcOnFill=True, _fill_check_pending=threading.Event(),
+                            account_snapshots=AccountSnapshotService("PHEMEX", max_age=60))
+    manager.position_sizes = []
+    manager.set_orders = lambda: manager.position_sizes.append(
+        get_position_size(manager.account_snapshots.get(client).position("BTCUSDT")))
+    return manager
+
+
+def test_set_orders_after_a_polled_fill_reads_the_new_position():
+    manager = make_manager()
+    manager.set_orders()
+
+    def check_filled(reconcile):
+        # the entry order filled since the last snapshot
+        manager.client.positions = [POSITION]
+        return True
+    manager._check_filled = check_filled
+    manager.fill_check()
+    assert manager.position_sizes == [0, 2]
+
+
+def test_no_fill_keeps_the_snapshot():
+    manager = make_manager()
+    snapshot = manager.account_snapshots.get(manager.client)
+    manager._check_filled = lambda reconcile: False
+    assert not manager.check_filled()
+    assert manager.account_snapshots.latest() is snapshot
@@ -0,0 +1,93 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from trading_automation.clients.http_transport import HttpTransport, host_of
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def _respond(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.seen_headers.append(dict(self.headers))
+        self.send_response(200)
+        self.send_header("Set-Cookie", "session=abc; Path=/")
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(b"{}")
+
+    do_GET = do_POST = do_HEAD = _respond
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.connections = 0
+    server.seen_headers = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_host_of():
+    assert host_of("https://api.phemex.com/orders?symbol=BTCUSD") == "https://api.phemex.com"
+    assert host_of("http://127.0.0.1:8080/x") == "http://127.0.0.1:8080"
+
+
+def test_warm_up_connections_are_reused(server):
+    server, url = server
+    transport = HttpTransport(pool_maxsize=4, warm_connections=2, keep_alive_interval=0)
+    transport.register(url + "/api")
+    seconds = transport.warm_up()
+    assert list(seconds) == [url] and seconds[url] >= 0
+    assert server.connections == 2
+    for _ in range(5):
+        assert transport.request("GET", url + "/api/ping", timeout=5).json() == {}
+    assert server.connections == 2
+
+    # a third party session keeps its own headers but uses the same pool
+    sdk_session = requests.Session()
+    sdk_session.headers["X-SDK-KEY"] = "key"
+    transport.mount(sdk_session, url)
+    sdk_session.get(url + "/sdk", timeout=5)
+    assert server.connections == 2
+    assert server.seen_headers[-1]["X-SDK-KEY"] == "key"
+
+
+def test_headers_and_cookies_do_not_leak_between_requests(server):
+    server, url = server
+    transport = HttpTransport(keep_alive_interval=0)
+    transport.request("POST", url + "/order", headers={"X-Signature": "signed"}, data=b"{}", timeout=5)
+    transport.request("GET", url + "/ticker", timeout=5)
+    first, second = server.seen_headers
+    assert first["X-Signature"] == "signed"
+    assert "X-Signature" not in second and "Cookie" not in second
+
+    prepared = requests.Request("GET", url + "/prepared", headers={"X-Key": "k"}).prepare()
+    assert transport.send(prepared, timeout=5).status_code == 200
+    assert server.seen_headers[-1]["X-Key"] == "k"
+
+
+def test_pool_size_follows_strategy_threads():
+    transport = HttpTransport(keep_alive_interval=0)
+    transport.set_strategy_threads(40)
+    assert transport.adapter("https://example.com")._pool_maxsize == 40
+    assert HttpTransport(pool_maxsize=6).pool_maxsize == 6
+    fixed = HttpTransport(pool_maxsize=6)
+    fixed.set_strategy_threads(40)
+    assert fixed.pool_maxsize == 6
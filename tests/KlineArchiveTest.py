@@ -0,0 +1,57 @@
+import os
+
+import numpy as np
+
+from trading_automation.data.KlineArchive import KLINE_DTYPE, KlineArchive, array_to_candles, migrate_csv_tree
+
+HOUR = 3600000
+JAN_31_22H = 1675202400000  # 2023-01-31 22:00 UTC
+
+
+def make_candles(start, n, interval=HOUR):
+    return [[start + i * interval, "1.5", "2", "1", str(1 + i), "10.25", start + (i + 1) * interval - 1, "15"]
+            for i in range(n)]
+
+
+def test_append_partitions_by_month_and_reads_by_time(tmp_path):
+    archive = KlineArchive(str(tmp_path))
+    candles = make_candles(JAN_31_22H, 4)
+    assert archive.append("BYBIT", "BTCUSDT", "1h", candles) == 4
+    assert archive.partitions("BYBIT", "BTCUSDT", "1h") == ["202301", "202302"]
+    assert array_to_candles(archive.read("BYBIT", "BTCUSDT", "1h")) == candles
+    window = archive.read("BYBIT", "BTCUSDT", "1h", start_time=JAN_31_22H + HOUR, end_time=JAN_31_22H + 2 * HOUR)
+    assert window['open_time'].tolist() == [JAN_31_22H + HOUR, JAN_31_22H + 2 * HOUR]
+    assert isinstance(archive.read("BYBIT", "BTCUSDT", "1h", start_time=JAN_31_22H + 2 * HOUR), np.memmap)
+    assert archive.read_last("BYBIT", "BTCUSDT", "1h", 3)['close'].tolist() == [2, 3, 4]
+
+
+def test_append_skips_stored_and_duplicate_candles(tmp_path):
+    archive = KlineArchive(str(tmp_path))
+    archive.append("BYBIT", "BTCUSDT", "1h", make_candles(JAN_31_22H, 2))
+    overlapping = make_candles(JAN_31_22H + HOUR, 3)
+    assert archive.append("BYBIT", "BTCUSDT", "1h", overlapping + overlapping[-1:]) == 2
+    assert archive.last_open_time("BYBIT", "BTCUSDT", "1h") == JAN_31_22H + 3 * HOUR
+    assert len(archive.read("BYBIT", "BTCUSDT", "1h")) == 4
+
+
+def test_interrupted_append_is_repaired(tmp_path):
+    archive = KlineArchive(str(tmp_path))
+    archive.append("BYBIT", "BTCUSDT", "1h", make_candles(JAN_31_22H, 1))
+    with open(os.path.join(archive.series_path("BYBIT", "BTCUSDT", "1h"), "202301.klines"), 'ab') as f:
+        f.write(b"\x00" * (KLINE_DTYPE.itemsize // 2))
+    assert len(archive.read("BYBIT", "BTCUSDT", "1h")) == 1
+    archive.append("BYBIT", "BTCUSDT", "1h", make_candles(JAN_31_22H + HOUR, 1))
+    assert archive.read("BYBIT", "BTCUSDT", "1h")['open_time'].tolist() == [JAN_31_22H, JAN_31_22H + HOUR]
+
+
+def test_migrate_csv_tree(tmp_path):
+    csv_path = tmp_path / "klines" / "GATE" / "ETH_USDT"
+    csv_path.mkdir(parents=True)
+    (tmp_path / "klines" / "GATE" / "20230101" / "ETH_USDT").mkdir(parents=True)
+    candles = make_candles(JAN_31_22H, 3)
+    (csv_path / "ETH_USDT_1h.csv").write_text("".join(",".join(str(x) for x in c[:7]) + "\r\n" for c in candles))
+    archive = KlineArchive(str(tmp_path / "archive"))
+    assert migrate_csv_tree(str(tmp_path / "klines"), archive, print_process=False) == 3
+    assert migrate_csv_tree(str(tmp_path / "klines"), archive, print_process=False) == 0
+    assert archive.symbols("GATE") == ["ETH_USDT"]
+    assert array_to_candles(archive.read("GATE", "ETH_USDT", "1h")) == [c[:7] for c in candles]
@@ -0,0 +1,103 @@
+import json
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from trading_automation.data import KlineDownloader as kline_downloader
+from trading_automation.data.KlineArchive import KlineArchive
+from trading_automation.data.KlineDownloader import KlineDownloader
+
+MINUTE = 60000
+NOW = int(time.time() * 1000) // MINUTE * MINUTE
+START = NOW - 1000 * MINUTE
+
+
+class FakeExchangeHandler(BaseHTTPRequestHandler):
+    """1m klines from START up to the current (incomplete) candle, "BAD" fails its first 2 requests"""
+    failures = {}
+
+    def do_GET(self):
+        query = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+        symbol = query['symbol']
+        if symbol == "BAD" and self.failures.get(symbol, 0) < 2:
+            self.failures[symbol] = self.failures.get(symbol, 0) + 1
+            self.send_response(500)
+            self.end_headers()
+            return
+        start, end, limit = int(query['startTime']), int(query['endTime']), int(query['limit'])
+        first = max(START, (start + MINUTE - 1) // MINUTE * MINUTE)
+        candles = [[t, "1", "2", "0.5", str(t // MINUTE % 100), "3", t + MINUTE - 1]
+                   for t in range(first, min(end, NOW) + 1, MINUTE)][:limit]
+        body = json.dumps(candles).encode()
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeLogger:
+    def writeline(self, line):
+        pass
+
+
+class FakeClient:
+    def __init__(self, url):
+        self.exchange = "FAKE"
+        self.url = url
+        self.logger = FakeLogger()
+
+    def futures_get_candlesticks(self, symbol, limit=500, interval="1m", startTime=None, endTime=None):
+        url = f"{self.url}/klines?symbol={symbol}&interval={interval}&limit={limit}&startTime={startTime}&endTime={endTime}"
+        with urllib.request.urlopen(url) as response:
+            return json.loads(response.read())
+
+
+@pytest.fixture
+def server():
+    FakeExchangeHandler.failures = {}
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), FakeExchangeHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+def make_downloader(server, tmp_path):
+    return KlineDownloader(FakeClient(server), ["1m"], max_candles=200, max_workers=3, start_time=START,
+                           archive=KlineArchive(str(tmp_path)), print_process=False)
+
+
+def test_downloads_concurrently_and_retries_jobs(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(kline_downloader.time, "sleep", lambda _: None)
+    monkeypatch.setattr(kline_downloader.time, "time", lambda: NOW / 1000 + 30)
+    downloader = make_downloader(server, tmp_path)
+    assert downloader.run(["AAA", "BBB", "BAD"]) == {}
+    for symbol in ["AAA", "BBB", "BAD"]:
+        open_times = downloader.archive.read("FAKE", symbol, "1m")['open_time']
+        # every closed candle, the current candle is left out
+        assert open_times.tolist() == list(range(START, NOW, MINUTE))
+        assert downloader.manifest.get(symbol, "1m") == [NOW - MINUTE, NOW - 1]
+    assert downloader.candles_written == 3 * 1000
+    assert "3/3 series done" in downloader.progress_report(3, 3, 1)
+
+
+def test_failed_jobs_are_reported_and_resume(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(kline_downloader.time, "sleep", lambda _: None)
+    monkeypatch.setattr(kline_downloader.time, "time", lambda: NOW / 1000 + 30)
+    downloader = make_downloader(server, tmp_path)
+    downloader.job_tries = 1
+    failed = downloader.run(["AAA", "BAD"])
+    assert list(failed) == ["BAD_1m"]
+    assert len(downloader.archive.read("FAKE", "AAA", "1m")) == 1000
+
+    downloader = make_downloader(server, tmp_path)
+    downloader.job_tries = 2
+    assert downloader.run(["AAA", "BAD"]) == {}
+    # AAA resumed from the manifest so made one request for the still incomplete candle
+    assert downloader.candles_written == 1000
+    assert downloader.requests_made == 1 + 1000 // 200 + 1
@@ -0,0 +1,52 @@
+import threading
+
+from trading_automation.core.LogSink import LogSink
+
+
+def read_lines(path):
+    with open(path) as f:
+        return f.read().splitlines()
+
+
+def test_lines_from_threads_are_written_in_order(tmp_path):
+    path = str(tmp_path / "log.txt")
+    sink = LogSink(path, max_queue=50, flush_interval=0.01)
+
+    def write(n):
+        for i in range(500):
+            sink.write(f"{n} {i}")
+
+    threads = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    sink.flush()
+    lines = read_lines(path)
+    assert len(lines) == 2000
+    for n in range(4):
+        assert [int(line.split()[1]) for line in lines if line.startswith(f"{n} ")] == list(range(500))
+    sink.close()
+
+
+def test_drop_overflow_counts_dropped_lines(tmp_path):
+    path = str(tmp_path / "log.txt")
+    sink = LogSink(path, max_queue=10, overflow="drop", flush_interval=60)
+    for i in range(15):
+        sink.write(str(i))
+    sink.flush()
+    assert read_lines(path) == [str(i) for i in range(10)] + ["LogSink dropped 5 lines as the queue of 10 was full"]
+    sink.close()
+
+
+def test_rotates_by_size_and_writes_directly_once_closed(tmp_path):
+    path = str(tmp_path / "log.txt")
+    sink = LogSink(path, max_bytes=20, backup_count=2, flush_interval=60)
+    for i in range(7):
+        sink.write(f"line {i} 0123456789abc")
+    sink.close()
+    assert read_lines(f"{path}.2") == ["line 5 0123456789abc"]
+    assert read_lines(f"{path}.1") == ["line 6 0123456789abc"]
+    assert read_lines(path) == []
+    sink.write("after close")
+    assert read_lines(path) == ["after close"]
@@ -0,0 +1,116 @@
+import threading
+import time
+
+from trading_automation.websockets.MarketDataHub import HubWebSocketManager, MarketDataHub
+
+INTERVAL_MS = 60000
+# open time of the live candle, fixed so the tests do not depend on a minute passing while they run
+LIVE_OPEN_TIME = int(time.time() * 1000) // INTERVAL_MS * INTERVAL_MS
+
+
+def make_candle(i, close="1.5"):
+    # candle 0 is the live candle, earlier ones are negative
+    open_time = LIVE_OPEN_TIME + i * INTERVAL_MS
+    return [open_time, "1", "2", "0.5", close, "10", open_time + INTERVAL_MS - 1, "15"]
+
+
+class FakeLogger:
+    def writeline(self, line):
+        pass
+
+
+class FakeClient:
+    """The UniversalClient methods MarketDataHub and HubWebSocketManager use, counting the REST requests."""
+
+    def __init__(self, reset_started=None, release_reset=None):
+        self.logger = FakeLogger()
+        self.candle_requests = 0
+        self.position_requests = 0
+        self.reset_started = reset_started
+        self.release_reset = release_reset
+
+    def futures_get_candlesticks(self, symbol, interval, limit):
+        self.candle_requests += 1
+        if self.candle_requests > 1 and self.release_reset is not None:
+            self.reset_started.set()
+            self.release_reset.wait(5)
+        return [make_candle(i) for i in range(-limit + 1, 1)]
+
+    def futures_get_position(self, symbol=None):
+        self.position_requests += 1
+        return [{"symbol": symbol, "positionAmt": "0", "entryPrice": "0", "unRealizedProfit": "0"}]
+
+    def futures_get_open_orders(self, symbol):
+        return [{"orderId": 1, "symbol": symbol, "status": "NEW"}]
+
+    def futures_get_order(self, symbol, orderId):
+        return {"orderId": orderId, "symbol": symbol, "status": "FILLED"}
+
+
+class FakeHub(MarketDataHub):
+    def __init__(self, exchange, client):
+        super().__init__(exchange, client)
+        self.subscribed = []
+
+    def _subscribe_klines(self, symbol, interval):
+        self.subscribed.append((symbol, interval))
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_candles_are_updated_in_sequence():
+    hub = FakeHub("BYBIT", FakeClient())
+    hub.subscribe("BTCUSDT", "1m", candles_limit=5)
+    hub.update_candle("BTCUSDT", "1m", make_candle(0, close="2"))
+    assert hub.get_candlesticks("BTCUSDT", "1m", 5)[-1][4] == "2"
+    hub.update_candle("BTCUSDT", "1m", make_candle(1, close="3"))
+    candles = hub.get_candlesticks("BTCUSDT", "1m", 5)
+    assert [candle[4] for candle in candles[-2:]] == ["2", "3"]
+    # an older candle is ignored
+    hub.update_candle("BTCUSDT", "1m", make_candle(-2, close="9"))
+    assert hub.get_candlesticks("BTCUSDT", "1m", 5) == candles
+    assert hub.client.candle_requests == 1
+
+
+def test_out_of_sequence_candles_start_one_reset():
+    reset_started, release_reset = threading.Event(), threading.Event()
+    client = FakeClient(reset_started, release_reset)
+    hub = FakeHub("BYBIT", client)
+    hub.subscribe("BTCUSDT", "1m", candles_limit=5)
+    for _ in range(10):
+        hub.update_candle("BTCUSDT", "1m", make_candle(3))
+    assert reset_started.wait(5)
+    assert client.candle_requests == 2
+    release_reset.set()
+    assert wait_for(lambda: not hub._resets_pending)
+    # the gap after the reset starts a new one
+    hub.update_candle("BTCUSDT", "1m", make_candle(3))
+    assert wait_for(lambda: client.candle_requests == 3)
+
+
+def test_strategies_share_the_hub():
+    client = FakeClient()
+    hub = FakeHub("BYBIT", client)
+    first = HubWebSocketManager("BTCUSDT", "1m", client, hub, candles_limit=5)
+    second = HubWebSocketManager("BTCUSDT", "1m", client, hub, candles_limit=3)
+    other = HubWebSocketManager("ETHUSDT", "1m", client, hub, candles_limit=3)
+    assert hub.subscribed == [("BTCUSDT", "1m"), ("ETHUSDT", "1m")]
+    assert client.candle_requests == 2 and client.position_requests == 2
+
+    hub.update_candle("BTCUSDT", "1m", make_candle(1, close="4"))
+    assert first.get_candlesticks_api_first(5)[-1][4] == "4"
+    assert second.get_candlesticks_api_first(3)[-1][4] == "4"
+    assert other.get_candlesticks_api_first(3)[-1][4] == "1.5"
+    assert client.candle_requests == 2
+
+    # a flat position and a known order are read from the hub
+    hub.update_position("BTCUSDT", [{"symbol": "BTCUSDT", "positionAmt": "0"}])
+    assert second.get_position_api_first() == [{"symbol": "BTCUSDT", "positionAmt": "0"}]
+    assert first.get_order_api_first(1)["status"] == "NEW"
+    assert client.position_requests == 2
+    assert first.get_order_api_first(2)["status"] == "FILLED"
@@ -0,0 +1,65 @@
+import socket
+import time
+import urllib.request
+
+from trading_automation.core.Metrics import Histogram, Metrics
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_disabled_metrics_record_nothing():
+    metrics = Metrics(enabled=False)
+    metrics.inc('requests_total', exchange="BYBIT")
+    metrics.observe('request_seconds', 0.1, exchange="BYBIT")
+    assert metrics.render() == "\n" and metrics.summary() == []
+    assert metrics.start_http_server(port=1) is None
+
+
+def test_histogram_buckets_and_quantile():
+    histogram = Histogram(buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 2):
+        histogram.observe(value)
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.quantile(0.5) == 0.1 and histogram.quantile(0.99) == 1
+
+
+def test_timed_handler_and_order_ack():
+    metrics = Metrics(enabled=True)
+
+    class Socket:
+        @metrics.timed_handler
+        def _on_message(self, ws, message):
+            return message
+
+    assert Socket()._on_message(None, "m") == "m"
+    assert metrics.counters['websocket_messages_total'] == {(('handler', 'Socket'),): 1}
+
+    metrics.order_acknowledged()
+    assert 'candle_close_to_order_ack_seconds' not in metrics.histograms
+    metrics.set_candle_close("BYBIT BTCUSDT 5m", time.time() - 1)
+    metrics.order_acknowledged()
+    metrics.clear_candle_close()
+    histogram = metrics.histograms['candle_close_to_order_ack_seconds'][(('strategy', 'BYBIT BTCUSDT 5m'),)]
+    assert histogram.count == 1 and 1 <= histogram.sum < 2
+
+
+def test_http_endpoint_serves_prometheus_text():
+    metrics = Metrics(enabled=True)
+    metrics.describe('exchange_request_seconds', 'Seconds per request')
+    metrics.observe('exchange_request_seconds', 0.02, exchange="BYBIT", endpoint="futures_create_order", outcome="ok")
+    metrics.inc('exchange_retries_total', exchange="BYBIT", endpoint="futures_create_order", reason="timeout")
+    server = metrics.start_http_server(port=free_port())
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        text = urllib.request.urlopen(url, timeout=5).read().decode()
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert '# TYPE exchange_request_seconds histogram' in text
+    assert 'exchange_request_seconds_bucket{endpoint="futures_create_order",exchange="BYBIT",outcome="ok",le="0.025"} 1' in text
+    assert 'exchange_request_seconds_count{endpoint="futures_create_order",exchange="BYBIT",outcome="ok"} 1' in text
+    assert 'exchange_retries_total{endpoint="futures_create_order",exchange="BYBIT",reason="timeout"} 1' in text
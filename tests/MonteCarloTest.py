@@ -0,0 +1,76 @@
+import numpy as np
+
+from trading_automation.analysis import MonteCarlo as monte_carlo
+from trading_automation.analysis.MonteCarlo import sample_trades, simulate_capital_risk, simulate_pnl
+
+PNL = [2.5, -1.0, 0.8, -3.0, 1.2, 0.4, -60.0, 5.0]
+
+
+def naive_paths(returns, ratio, compounding, starting_balance=1000):
+    """the loop sample_trades_from_pnl_list ran before, over the same drawn trades"""
+    end_balances, max_drawdowns = [], []
+    for path in returns:
+        balance, highest, max_drawdown = starting_balance, starting_balance, 0
+        for trade in path:
+            bet_size = balance if compounding else min(balance, starting_balance)
+            balance = max(0, balance + ratio * bet_size * trade)
+            highest = max(highest, balance)
+            max_drawdown = max(max_drawdown, (highest - balance) / highest)
+        end_balances.append(balance)
+        max_drawdowns.append(max_drawdown)
+    return end_balances, max_drawdowns
+
+
+def test_simulate_pnl_matches_naive_loop(monkeypatch):
+    # small chunks so paths are split across several seeds
+    monkeypatch.setattr(monte_carlo, "CHUNK_ELEMENTS", 50 * 40)
+    ratios = [0.1, 1, 2]
+    seeds = np.random.SeedSequence(7).spawn(3)
+    returns = np.array(PNL)[np.concatenate([sample_trades(len(PNL), 50, size, seed)
+                                            for size, seed in zip((40, 40, 20), seeds)])] * 0.01
+    for compounding in (True, False):
+        results = simulate_pnl(PNL, number_of_trades=50, paths=100, ratios=ratios, compounding=compounding, seed=7,
+                               max_workers=1)
+        for ratio in ratios:
+            end_balances, max_drawdowns = naive_paths(returns, ratio, compounding)
+            assert np.allclose(results[ratio].end_balances, end_balances, rtol=1e-9, atol=1e-9)
+            assert np.allclose(results[ratio].max_drawdowns, max_drawdowns, rtol=1e-9, atol=1e-12)
+    # a ratio of 2 loses everything on the -60% trade
+    assert results[2].end_balances.min() == 0 and results[2].max_drawdowns.max() == 1
+
+
+def test_seed_reproduces_across_workers(monkeypatch):
+    monkeypatch.setattr(monte_carlo, "CHUNK_ELEMENTS", 100 * 64)
+    in_process = simulate_pnl(PNL, number_of_trades=100, paths=256, ratios=[0.5], seed=3, max_workers=1)
+    pooled = simulate_pnl(PNL, number_of_trades=100, paths=256, ratios=[0.5], seed=3, max_workers=2)
+    assert np.array_equal(in_process[0.5].end_balances, pooled[0.5].end_balances)
+    assert "RATIO 0.5 MASTER RESULT MEDIAN" in pooled[0.5].summary()
+
+    # a single chunk of paths is split across the ratios
+    ratios = [0.1, 0.5, 1]
+    in_process = simulate_pnl(PNL, number_of_trades=20, paths=50, ratios=ratios, seed=4, max_workers=1)
+    pooled = simulate_pnl(PNL, number_of_trades=20, paths=50, ratios=ratios, seed=4, max_workers=2)
+    for ratio in ratios:
+        assert np.array_equal(in_process[ratio].end_balances, pooled[ratio].end_balances)
+        assert np.array_equal(in_process[ratio].max_drawdowns, pooled[ratio].max_drawdowns)
+
+    first = simulate_capital_risk(0.5, loops=20, runs=1000, seed=1, max_workers=1)
+    again = simulate_capital_risk(0.5, loops=20, runs=1000, seed=1, max_workers=1)
+    assert np.array_equal(first.end_capitals, again.end_capitals)
+
+
+def test_capital_risk_outcomes():
+    # never liquidated and always winning compounds the position gain each loop
+    result = simulate_capital_risk(0.5, loops=3, runs=10, liquidation_probability=-1, win_probability=1,
+                                   win_gains=0.1, starting_capital=100, max_position_size=1000, seed=0, max_workers=1)
+    assert np.allclose(result.end_capitals, 100 * 1.05 ** 3)
+    # always liquidated loses the position each loop, the position capped at max_position_size
+    result = simulate_capital_risk(1, loops=3, runs=10, liquidation_probability=1, starting_capital=150,
+                                   max_position_size=40, take_profit=0, seed=0, max_workers=1)
+    assert np.allclose(result.end_capitals, 150 - 3 * 40)
+    assert np.allclose(result.total_losses, 120)
+    # otherwise returns of whole percentages from -99% to win_gains
+    result = simulate_capital_risk(1, loops=1, runs=5000, liquidation_probability=-1, win_probability=-1,
+                                   win_gains=0.13, starting_capital=100, seed=0, max_workers=1)
+    changes = np.round(result.end_capitals - 100).astype(int)
+    assert changes.min() == -99 and changes.max() == 13
@@ -0,0 +1,54 @@
+import zlib
+
+import pytest
+
+from trading_automation.core.OrderBook import ASKS, BIDS, OrderBook
+
+
+@pytest.fixture
+def book():
+    return OrderBook.from_dict("BTCUSDT", "0.5", {
+        "bids": [["99.5", "2"], ["100", "1"], ["98", "4"]],
+        "asks": [["101", "3"], ["100.5", "1"], ["102", "5"]],
+    })
+
+
+def test_snapshot_is_sorted_best_first(book):
+    assert book.best_bid() == 100.0
+    assert book.best_ask() == 100.5
+    prices, qty = book.levels(BIDS)
+    assert prices.tolist() == [100.0, 99.5, 98.0]
+    assert qty.tolist() == [1.0, 2.0, 4.0]
+    assert not book.is_crossed()
+
+
+def test_delta_updates_inserts_and_deletes(book):
+    book.apply_delta(bids=[["100", "0"], ["99.5", "7"], ["100.0", "0"]], asks=[["100", "2"]])
+    assert book.levels(BIDS)[0].tolist() == [99.5, 98.0]
+    assert book.levels(BIDS)[1].tolist() == [7.0, 4.0]
+    assert book.best_ask() == 100.0
+    assert book.depth(ASKS) == 4
+
+
+def test_fill(book):
+    qty, notional, last_price = book.fill(ASKS, quantity=2)
+    assert (qty, notional, last_price) == (2.0, 100.5 + 101, 101.0)
+    qty, notional, last_price = book.fill(BIDS, notional=199)
+    assert notional == 199 and last_price == 99.5
+    assert qty == pytest.approx(1 + 99 / 99.5)
+    # not enough depth fills the whole side
+    assert book.fill(BIDS, quantity=100) == (7.0, 100 + 199 + 392, 98.0)
+
+
+def test_to_dict(book):
+    assert book.to_dict(limit=1) == {"bids": [["100.0", "1.0"]], "asks": [["100.5", "1.0"]]}
+
+
+def test_okx_checksum():
+    book = OrderBook("BTC-USDT-SWAP", "0.1")
+    book.apply_snapshot(bids=[["3366.1", "7", "0", "3"], ["3366", "6", "3", "4"]],
+                        asks=[["3366.8", "9", "10", "3"]])
+    expected = zlib.crc32(b"3366.1:7:3366.8:9:3366:6")
+    expected = expected - (1 << 32) if expected >= (1 << 31) else expected
+    assert book.okx_checksum() == expected
+    assert book.validate_okx_checksum(str(expected))
@@ -0,0 +1,44 @@
+from trading_automation.core.OrderEvents import ORDER_FILLED, ORDER_PARTIALLY_FILLED, ORDER_UPDATED, \
+    POSITION_UPDATED, OrderEventBus, order_event
+
+
+def test_order_event():
+    assert order_event({"status": "FILLED"}) == ORDER_FILLED
+    assert order_event({"status": "PARTIALLY_FILLED"}) == ORDER_PARTIALLY_FILLED
+    assert order_event({"status": "NEW"}) == ORDER_UPDATED
+    assert order_event({"status": "CANCELED"}) == ORDER_UPDATED
+
+
+def test_events_reach_subscribers_of_the_symbol_only():
+    bus = OrderEventBus()
+    events = []
+    callback = lambda event, payload: events.append((event, payload))
+    bus.subscribe("BYBIT", "BTCUSDT", callback)
+    order = {"orderId": "1", "status": "FILLED"}
+    bus.publish_order("BYBIT", "BTCUSDT", order)
+    bus.publish_order("BYBIT", "ETHUSDT", {"orderId": "2", "status": "FILLED"})
+    bus.publish_order("BYBIT2", "BTCUSDT", {"orderId": "3", "status": "FILLED"})
+    position = [{"symbol": "BTCUSDT", "positionAmt": "0.1"}]
+    bus.publish_position("BYBIT", "BTCUSDT", position)
+    assert events == [(ORDER_FILLED, order), (POSITION_UPDATED, position)]
+    assert bus.last_event_time("BYBIT2") is not None
+
+    bus.unsubscribe("BYBIT", "BTCUSDT", callback)
+    bus.publish_order("BYBIT", "BTCUSDT", order)
+    assert len(events) == 2
+
+
+def test_failing_callback_does_not_stop_the_others():
+    bus = OrderEventBus()
+    events = []
+
+    def failing(event, payload):
+        raise ValueError("callback failed")
+
+    bus.subscribe("GATE", "BTC_USDT", failing)
+    bus.subscribe("GATE", "BTC_USDT", lambda event, payload: events.append(event))
+    bus.publish_order("GATE", "BTC_USDT", {"orderId": "1", "status": "PARTIALLY_FILLED"})
+    assert events == [ORDER_PARTIALLY_FILLED]
+    assert not bus.is_streaming("GATE")
+    bus.register_publisher("GATE")
+    assert bus.is_streaming("GATE") and not bus.is_streaming("GATE2")
@@ -0,0 +1,148 @@
+from decimal import Decimal
+
+from trading_automation.core.OrderReconciler import DesiredOrder, OrderReconciler, plan_orders
+
+
+def live_order(order_id, side, price, qty, executed="0", reduce_only=False, type="LIMIT", stop="0"):
+    return {"orderId": order_id, "side": side, "price": price, "origQty": qty, "executedQty": executed,
+            "reduceOnly": reduce_only, "type": type, "stopPrice": stop}
+
+
+def test_unchanged_orders_are_kept():
+    desired = [DesiredOrder("BUY", Decimal("0.5"), Decimal("100.0")),
+               DesiredOrder("SELL", Decimal("0.5"), Decimal("110"))]
+    live = [live_order(2, "SELL", "110.00", "0.500"), live_order(1, "BUY", "100", "0.5")]
+    plan = plan_orders(desired, live, amend=True)
+    assert plan.unchanged and plan.requests == 0
+    assert [order["orderId"] for _, order in plan.orders] == [1, 2]
+    assert plan.baseline_requests == 3
+
+
+def test_changed_limit_is_amended_if_supported():
+    desired = [DesiredOrder("BUY", Decimal("0.5"), Decimal("99")),
+               DesiredOrder("SELL", Decimal("0.5"), Decimal("110"))]
+    live = [live_order(1, "BUY", "100", "0.5"), live_order(2, "SELL", "110", "0.5")]
+    plan = plan_orders(desired, live, amend=True)
+    assert [(d.price, order["orderId"]) for d, order in plan.amend] == [(Decimal("99"), 1)]
+    assert not plan.cancel and not plan.create and plan.requests == 1
+
+    plan = plan_orders(desired, live, amend=False)
+    assert [order["orderId"] for order in plan.cancel] == [1]
+    assert plan.create == [desired[0]]
+    assert not plan.cancel_all and plan.requests == 2
+
+
+def test_partially_filled_and_stop_orders_are_replaced_not_amended():
+    desired = [DesiredOrder("SELL", Decimal("1"), Decimal("110"), reduce_only=True),
+               DesiredOrder("SELL", Decimal("1"), stop=Decimal("90"), reduce_only=True)]
+    live = [live_order(1, "SELL", "111", "2", executed="1", reduce_only=True),
+            live_order(2, "SELL", "0", "1", reduce_only="true", type="STOP_MARKET", stop="91")]
+    plan = plan_orders(desired, live, amend=True)
+    assert not plan.amend and not plan.keep
+    assert plan.create == desired
+    assert plan.cancel_all and plan.requests == 3
+
+
+def test_exit_unchanged_saves_nothing_when_it_was_not_replaced_every_bar():
+    desired = [DesiredOrder("SELL", Decimal("1"), Decimal("110"), reduce_only=True),
+               DesiredOrder("SELL", Decimal("1"), stop=Decimal("90"), reduce_only=True)]
+    live = [live_order(1, "SELL", "110", "2", executed="1", reduce_only=True),
+            live_order(2, "SELL", "0", "1", reduce_only=True, type="STOP_MARKET", stop="90")]
+    plan = plan_orders(desired, live, amend=True, replaced_every_bar=False)
+    assert plan.unchanged and plan.baseline_requests == 0
+    plan = plan_orders(desired, live[:1], amend=True, replaced_every_bar=False)
+    assert plan.create == desired[1:] and plan.baseline_requests == 3
+
+
+def test_orders_split_over_the_max_quantity():
+    desired = [DesiredOrder("BUY", Decimal("250"), Decimal("100")),
+               DesiredOrder("SELL", Decimal("1"), stop=Decimal("90"), reduce_only=True)]
+    live = [live_order(1, "BUY", "100", "100"), live_order(2, "BUY", "100", "100"), live_order(3, "BUY", "100", "50"),
+            live_order(4, "SELL", "0", "1", reduce_only=True, type="STOP_MARKET", stop="90")]
+    plan = plan_orders(desired, live, amend=True, max_quantity=Decimal("100"))
+    assert plan.unchanged and [order["orderId"] for _, order in plan.orders] == [1, 2, 3, 4]
+
+    # a new price is not amended into one order above the max, the split orders are replaced
+    moved = [DesiredOrder("BUY", Decimal("250"), Decimal("99"))]
+    plan = plan_orders(moved, live[:3], amend=True, max_quantity=Decimal("100"))
+    assert not plan.amend and plan.create == moved
+    assert plan.cancel_all and plan.requests == 2
+    plan = plan_orders([DesiredOrder("BUY", Decimal("80"), Decimal("99"))], live[:3], amend=True,
+                       max_quantity=Decimal("100"))
+    assert [order["orderId"] for _, order in plan.amend] == [1]
+
+
+def test_replace_all_cancels_and_creates_everything():
+    desired = [DesiredOrder("BUY", Decimal("0.5"), Decimal("100"))]
+    live = [live_order(1, "BUY", "100", "0.5")]
+    plan = plan_orders(desired, live, amend=True, replace_all=True)
+    assert plan.cancel == live and plan.create == desired and plan.cancel_all
+    assert plan_orders([], [], replace_all=True).requests == 0
+
+
+class FakeLogger:
+    def __init__(self):
+        self.lines = []
+
+    def writeline(self, line):
+        self.lines.append(line)
+
+
+class FakeAdapter:
+    amend_orders = False
+    batch_orders = 5
+    batch_cancels = 10
+
+
+class FakeClient:
+    """The UniversalClient batch methods OrderReconciler uses, placing every limit order in one batch request."""
+    SIDE_BUY = "BUY"
+    SIDE_SELL = "SELL"
+    ORDER_TYPE_LIMIT = "LIMIT"
+    ORDER_TYPE_STOP = "STOP"
+    ORDER_TYPE_STOP_MARKET = "STOP_MARKET"
+    TIME_IN_FORCE_GTC = "GTC"
+    TIME_IN_FORCE_GTX = "GTX"
+    exchange = "BINANCE"
+    adapter = FakeAdapter()
+
+    def __init__(self):
+        self.logger = FakeLogger()
+        self.created = []
+        self.cancelled = []
+
+    def futures_max_order_quantity(self, symbol):
+        return None
+
+    def batch_orderable(self, symbol, order):
+        return order['type'] == self.ORDER_TYPE_LIMIT
+
+    def futures_create_orders_batch(self, symbol, orders):
+        self.created.extend(orders)
+        return [{'order': {'orderId': i, 'symbol': symbol}, 'error': None} if order.get('price') != Decimal("1") else
+                {'order': None, 'error': "rejected"} for i, order in enumerate(orders)]
+
+    def futures_cancel_orders_batch(self, orders):
+        self.cancelled.extend(orders)
+        return [{'order': order, 'error': None} for order in orders]
+
+
+def test_several_orders_are_created_and_cancelled_in_batches():
+    client = FakeClient()
+    reconciler = OrderReconciler(client, "BTCUSDT")
+    desired = [DesiredOrder("BUY", Decimal("0.5"), Decimal("100"), post_only=True),
+               DesiredOrder("SELL", Decimal("0.5"), Decimal("110")),
+               DesiredOrder("BUY", Decimal("0.5"), Decimal("1")),
+               DesiredOrder("SELL", Decimal("0.5"), stop=Decimal("90"), reduce_only=True)]
+    live = [live_order(1, "BUY", "101", "0.5"), live_order(2, "SELL", "111", "0.5"), live_order(3, "BUY", "100", "0.5")]
+    plan = reconciler.plan(desired, live)
+    assert plan.keep and not plan.cancel_all
+    reconciler.cancel_and_amend(plan)
+    assert [order['orderId'] for order in client.cancelled] == [1, 2]
+    reconciler.create(plan)
+    assert [order['type'] for order in client.created] == ["LIMIT", "LIMIT", "STOP_MARKET"]
+    assert client.created[0]['timeInForce'] == "GTC" and client.created[2]['stopPrice'] == Decimal("90")
+    # one batch cancel, one batch of the two limit orders and the stop loss on its own
+    assert plan.requests_sent == 3
+    assert [order['orderId'] for _, order in plan.orders] == [3, 0, 2]
+    assert client.created[2]['newClientOrderId'].startswith("LongStopLossBTCUSDT")
@@ -0,0 +1,86 @@
+import os
+import re
+
+import numpy as np
+import pytest
+
+from trading_automation.analysis.FlushBacktest import FlushStrategyParams
+from trading_automation.analysis.ParameterSweep import ParameterSweep, parse_range
+from trading_automation.core.Utils import ARG_FILE_REGEX
+from trading_automation.data.KlineArchive import KLINE_DTYPE, KlineArchive, array_to_candles
+
+MINUTE = 60000
+BASE_ARGS = ["BINANCE", "1m", "BTCUSDT", "1", "1", "20", "10", "2", "2", "0", "0", "0", "0", "100", "5", "10", "100",
+             "0", "1", "1", "-s", "-x"]
+
+
+def random_walk_candles(n, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.003, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    klines = np.zeros(n, dtype=KLINE_DTYPE)
+    klines['open_time'] = 1672531200000 + np.arange(n) * MINUTE
+    klines['close_time'] = klines['open_time'] + MINUTE - 1
+    klines['open'], klines['close'] = open_, close
+    klines['high'] = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.002, n)))
+    klines['low'] = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.002, n)))
+    return array_to_candles(klines)
+
+
+@pytest.fixture
+def spec(tmp_path):
+    archive = KlineArchive(str(tmp_path / "archive"))
+    for seed, symbol in enumerate(["AAAUSDT", "BBBUSDT"]):
+        archive.append("BINANCE", symbol, "1m", random_walk_candles(5000, seed))
+    base = tmp_path / "args_reference.txt"
+    base.write_text("\n".join(BASE_ARGS) + "\n")
+    return archive, {
+        "base": str(base),
+        "symbols": "all",
+        "ranges": {"flushPercent": "0.6:1.2:0.2", "exitLookbackBars": [5, 20], "shorts": "true,false"},
+        "backtest": {"volatility_limit": 0},
+        "min_trades": 1,
+        "top": 2,
+        "output": str(tmp_path / "out"),
+    }
+
+
+def test_parse_range():
+    assert parse_range("flushPercent", "1.5:2.5:0.5") == [1.5, 2.0, 2.5]
+    assert parse_range("flushPercent", "0.1:0.3:0.1") == [0.1, 0.2, 0.3]
+    assert parse_range("numberOfFlushBars", "30,60") == [30, 60]
+    assert parse_range("numberOfFlushBars", 45) == [45]
+    assert parse_range("shorts", [True, "false"]) == [True, False]
+    with pytest.raises(Exception):
+        parse_range("symbol", ["BTCUSDT"])
+
+
+def test_sweep_ranks_writes_arg_files_and_caches(spec, tmp_path):
+    archive, spec = spec
+    sweep = ParameterSweep(spec, path=str(tmp_path / "sweep"), max_workers=2, archive=archive, print_process=False)
+    ranked = sweep.run()
+    assert sorted(ranked) == ["AAAUSDT", "BBBUSDT"]
+    assert sweep.combinations_run == 2 * 4 * 2 * 2
+    for symbol, results in ranked.items():
+        scores = [r.score for r in results]
+        assert scores == sorted(scores, reverse=True)
+        assert all(r.params.symbol == symbol and r.stats['trades'] >= 1 for r in results)
+    # every worker memory mapped the same saved candles instead of reading the archive
+    assert len(os.listdir(tmp_path / "sweep" / "klines")) == 2
+
+    written = sweep.write_arg_files(ranked)
+    assert len(written) == 4
+    best = FlushStrategyParams.from_args_file(os.path.join(spec['output'], "args_AAAUSDT_1m_sweep1.txt"))
+    assert best == ranked["AAAUSDT"][0].params
+    with open(os.path.join(spec['output'], "args_AAAUSDT_1m_sweep1.txt")) as file:
+        assert "-x" in file.read().split()
+    with open(os.path.join(spec['output'], "arglist_sweep.txt")) as file:
+        listed = [re.search(ARG_FILE_REGEX, line.strip()) for line in file.readlines()]
+    assert [m.group(1) for m in listed if m] == ["args_AAAUSDT_1m_sweep1.txt", "args_BBBUSDT_1m_sweep1.txt"]
+
+    # a wider sweep only runs the new combinations, in process
+    spec['ranges']['exitLookbackBars'] = [5, 20, 40]
+    sweep = ParameterSweep(spec, path=str(tmp_path / "sweep"), max_workers=1, archive=archive, print_process=False)
+    again = sweep.run()
+    assert (sweep.combinations_cached, sweep.combinations_run) == (2 * 4 * 2 * 2, 2 * 4 * 2)
+    assert again["AAAUSDT"][0].score >= ranked["AAAUSDT"][0].score
@@ -0,0 +1,71 @@
+import asyncio
+import time
+
+from trading_automation.clients.rate_limiter import (
+    ACCOUNT,
+    MARKET_DATA,
+    ORDERS,
+    RateLimiter,
+    TokenBucket,
+    exchange_family,
+)
+
+
+def test_token_bucket_allows_burst_then_waits():
+    bucket = TokenBucket(rate=10, capacity=3)
+    assert [bucket.try_acquire() for _ in range(3)] == [0, 0, 0]
+    wait = bucket.try_acquire()
+    assert 0 < wait <= 0.1
+
+
+def test_token_bucket_block():
+    bucket = TokenBucket(rate=1000, capacity=10)
+    bucket.block(0.05)
+    assert bucket.try_acquire() > 0
+    time.sleep(0.06)
+    assert bucket.try_acquire() == 0
+
+
+def test_token_bucket_refills_from_the_end_of_a_block():
+    bucket = TokenBucket(rate=10, capacity=10)
+    bucket.block(0.05)
+    # rate limit headers received while blocked
+    bucket.set_remaining(-5)
+    assert bucket.tokens == 0
+    time.sleep(0.06)
+    # a token is 0.1s away from the end of the block, not from a negative balance
+    assert bucket.try_acquire() < 0.1
+
+
+def test_exchange_family():
+    assert exchange_family("BYBIT2") == "BYBIT"
+    assert exchange_family("OKEX_LowStakes") == "OKEX"
+    assert exchange_family("UNKNOWN") is None
+
+
+def test_market_data_bucket_is_shared_between_accounts():
+    limiter = RateLimiter()
+    assert limiter.bucket("BYBIT", MARKET_DATA) is limiter.bucket("BYBIT2", MARKET_DATA)
+    assert limiter.bucket("BYBIT", ORDERS) is not limiter.bucket("BYBIT2", ORDERS)
+    assert limiter.bucket("UNKNOWN", ORDERS) is None
+
+
+def test_phemex_headers():
+    limiter = RateLimiter()
+    limiter.update_from_phemex_headers("PHEMEX", {"X-RateLimit-Remaining-CONTRACT": "0"})
+    assert limiter.bucket("PHEMEX", ORDERS).try_acquire() > 0
+    assert limiter.bucket("PHEMEX", ACCOUNT).try_acquire() == 0
+    limiter.update_from_phemex_headers("PHEMEX", {"X-RateLimit-Retry-After-OTHER": "5"})
+    assert limiter.bucket("PHEMEX", MARKET_DATA).try_acquire() > 4
+
+
+def test_token_bucket_acquire_async_waits():
+    bucket = TokenBucket(rate=20, capacity=1)
+
+    async def acquire_three():
+        for _ in range(3):
+            await bucket.acquire_async()
+
+    start = time.monotonic()
+    asyncio.run(acquire_three())
+    assert time.monotonic() - start >= 0.09
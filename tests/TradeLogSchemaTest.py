@@ -0,0 +1,44 @@
+import sqlite3
+
+from trading_automation.core.TradeLogSchema import INDEXES, SCHEMA_VERSION, _migration_1, migrate_trade_log_file
+from trading_automation.core.Utils import get_timestamp_ms_from_string
+
+
+def make_legacy_database(path):
+    connection = sqlite3.connect(path)
+    _migration_1(connection)
+    connection.execute("""INSERT INTO trades (symbol, setting, entry_time, position_side, position_size, average_entry_price,
+        at_bid_ask_post_only_entry, if_market_open_slippage, at_bid_ask_post_only_exit_count)
+        VALUES ('BTCUSDT', 'MA 1m BTCUSDT', '01/02/2023 10:00:00', 'LONG', '-0.5', '20000.5', 'TRUE', 'None', 2)""")
+    connection.execute("""INSERT INTO internal_wallets (start_time, setting, internal_wallet, last_trade_id, last_update_time)
+        VALUES ('01/02/2023 09:00:00', 'MA 1m BTCUSDT', '100.12', 1, '02/02/2023 09:00:00')""")
+    connection.commit()
+    connection.close()
+
+
+def test_migrates_legacy_text_database_in_place(tmp_path):
+    path = str(tmp_path / "trades.sqlite")
+    make_legacy_database(path)
+    assert migrate_trade_log_file(path) == 1
+    assert migrate_trade_log_file(path) == SCHEMA_VERSION
+    connection = sqlite3.connect(path)
+    trade = connection.execute("SELECT id, entry_time, position_size, average_entry_price, at_bid_ask_post_only_entry, "
+                               "if_market_open_slippage, at_bid_ask_post_only_exit_count FROM trades").fetchone()
+    assert trade == (1, get_timestamp_ms_from_string('01/02/2023 10:00:00'), -0.5, 20000.5, 1, None, 2)
+    wallet = connection.execute("SELECT start_time, internal_wallet, last_trade_id, last_update_time FROM internal_wallets").fetchone()
+    assert wallet == (get_timestamp_ms_from_string('01/02/2023 09:00:00'), 100.12, 1,
+                      get_timestamp_ms_from_string('02/02/2023 09:00:00'))
+    assert connection.execute("INSERT INTO trades (symbol) VALUES ('ETHUSDT')").lastrowid == 2
+
+
+def test_lookups_use_indexes(tmp_path):
+    path = str(tmp_path / "trades.sqlite")
+    assert migrate_trade_log_file(path) == 0
+    connection = sqlite3.connect(path)
+    indexes = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert set(INDEXES) <= indexes
+    plan = connection.execute("EXPLAIN QUERY PLAN SELECT * FROM internal_wallets WHERE setting = ? "
+                              "ORDER BY last_update_time DESC LIMIT 1", ("S",)).fetchall()
+    assert "internal_wallets_setting_last_update_time" in str(plan)
+    plan = connection.execute("EXPLAIN QUERY PLAN SELECT * FROM trades WHERE symbol = ? AND entry_time >= ?", ("S", 0)).fetchall()
+    assert "trades_symbol_entry_time" in str(plan)
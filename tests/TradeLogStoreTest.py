@@ -0,0 +1,80 @@
+import sqlite3
+import threading
+
+import pytest
+
+from trading_automation.core.Logger import Logger
+from trading_automation.core.TradeLogStore import TradeLogStore
+from trading_automation.core.Utils import get_current_timestamp_ms
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "trades.sqlite")
+
+
+class FakeClient:
+    exchange = None
+
+
+def make_logger(db_path, tmp_path):
+    logger = Logger(FakeClient(), logpath=str(tmp_path / "log.txt"), print_console=False)
+    logger.tradelog_path = db_path
+    return logger
+
+
+def test_concurrent_writes_are_committed_in_order(db_path):
+    store = TradeLogStore(db_path)
+    assert store.query_one("PRAGMA journal_mode")[0] == "wal"
+
+    def write(n):
+        for i in range(200):
+            store.execute("INSERT INTO trades (symbol, exit_amount) VALUES (?, ?)", (f"T{n}", str(i)))
+
+    threads = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert store.query_one("SELECT COUNT(*) FROM trades", wait_for_writes=True)[0] == 800
+    for n in range(4):
+        amounts = [int(r[0]) for r in store.query("SELECT exit_amount FROM trades WHERE symbol = ? ORDER BY id", (f"T{n}",))]
+        assert amounts == list(range(200))
+
+
+def test_failed_write_does_not_undo_its_batch(db_path):
+    store = TradeLogStore(db_path)
+    first = store.execute("INSERT INTO trades (symbol) VALUES (?)", ("A",))
+    failed = store.execute("INSERT INTO no_table (symbol) VALUES (?)", ("B",))
+    last = store.execute("INSERT INTO trades (symbol) VALUES (?)", ("C",))
+    assert last.result() == first.result() + 1
+    with pytest.raises(sqlite3.OperationalError):
+        failed.result()
+    assert [r[0] for r in store.query("SELECT symbol FROM trades")] == ["A", "C"]
+
+
+def test_trade_log_round_trip(db_path, tmp_path):
+    logger = make_logger(db_path, tmp_path)
+    logger.log_internal_wallet("MA 1m BTCUSDT", 100.123, 80)
+    assert logger.get_internal_wallet_balance_and_drawdown_value_and_last_trade_id("MA 1m BTCUSDT") == (100.12, 80.0, None)
+    logger.log_internal_wallet("MA 1m BTCUSDT", 90, 80)
+    tid = logger.write_new_trade("MA 1m BTCUSDT", position={'symbol': "BTCUSDT", 'entryPrice': "20000", 'positionAmt': "-0.5"})
+    assert logger.get_internal_wallet_record("MA 1m BTCUSDT")[5] == tid
+    logger.increase_post_only_exit_failed_count(tid)
+    logger.increase_post_only_exit_failed_count(tid)
+    logger.update_last_trade_id(tid, None)
+    record = logger.trade_log.query_one("SELECT * FROM trades WHERE id = ?", (tid,), wait_for_writes=True)
+    assert record[1:9] == ("BTCUSDT", "MA 1m BTCUSDT", record[3], "SHORT", 0.5, -0.5, 10000.0, 20000.0)
+    assert abs(record[3] - get_current_timestamp_ms()) < 60000
+    assert record[24] == 2
+    assert logger.get_internal_wallet_record("MA 1m BTCUSDT")[3:6] == (90.0, 80.0, None)
+    assert len(logger.trade_log.query("SELECT * FROM internal_wallets")) == 1
+
+
+def test_internal_wallet_older_than_30_days_is_ignored(db_path, tmp_path):
+    logger = make_logger(db_path, tmp_path)
+    old = get_current_timestamp_ms() - 31 * 24 * 60 * 60 * 1000
+    logger.trade_log.execute("INSERT INTO internal_wallets (start_time, setting, internal_wallet, last_update_time) VALUES (?, ?, ?, ?)", (old, "S", 1, old))
+    assert logger.get_internal_wallet_record("S") is None
+    logger.log_internal_wallet("S", 5, 1)
+    assert logger.get_internal_wallet_record("S")[3] == 5.0
+    assert len(logger.trade_log.query("SELECT * FROM internal_wallets")) == 2
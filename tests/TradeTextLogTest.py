@@ -0,0 +1,56 @@
+import sqlite3
+
+from trading_automation.analysis import TradeTextLog as trade_text_log
+from trading_automation.analysis.TradeTextLog import TradeTextLog, parse_trades, split_lines
+
+
+def exit_line(date_time, symbol, side, gain, pnl):
+    return f"{date_time} bot: {symbol} {side} exit order 123 filled @10.5 ($100.0, gain: ${gain}, pnl%: {pnl})\n"
+
+
+LINES = [
+    "01/05/2023 10:00:00 bot: BTCUSDT placing Sell exit order\n",
+    exit_line("01/05/2023 10:01:00", "BTCUSDT", "Sell", "1.5", "1.2"),
+    "01/05/2023 10:02:00 bot: ETHUSDT Buy exit order 7 partial fill 1/2\n",
+    exit_line("02/05/2023 11:00:00", "ETHUSDT", "Buy", "-2.0", "-0.8"),
+    exit_line("03/05/2023 12:00:00", "ETHUSDT", "Sell", "0.0", "0.0"),
+    "03/05/2023 12:00:01 bot: nothing to see\n",
+]
+
+
+def test_parse_trades_and_split_lines():
+    data = "".join(LINES).encode()
+    trades = parse_trades(data)
+    assert [t[2:] for t in trades] == [(0, "BTCUSDT", "Sell", 100.0, 1.5, 1.2), (1, "ETHUSDT", "Buy", 100.0, -2.0, -0.8),
+                                       (2, "ETHUSDT", "Sell", 100.0, 0.0, 0.0)]
+    assert data[trades[1][0]:].startswith(b"02/05/2023")
+    # ranges start at lines and together parse the same trades
+    for parts in (1, 2, 3, 50):
+        ranges = split_lines(data, 0, len(data), parts)
+        assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+        assert all(data[a - 1:a] == b"\n" for a, _ in ranges[1:])
+        assert [t for a, b in ranges for t in parse_trades(data, a, b)] == trades
+
+
+def test_update_parses_only_new_lines(tmp_path, monkeypatch):
+    path = tmp_path / "discordlog.txt"
+    path.write_text("".join(LINES[:3]) + LINES[3][:20])
+    trade_log = TradeTextLog(str(path))
+    assert trade_log.update() == 1
+    # the unfinished line is parsed once it is complete
+    with open(path, "a") as file:
+        file.write(LINES[3][20:] + "".join(LINES[4:]))
+    assert trade_log.update() == 2
+    assert trade_log.update() == 0
+    assert trade_log.pnl_lists() == ([1.2], [-0.8], [1.5], [-2.0])
+    assert trade_log.pnl_lists("ETH") == ([], [-0.8], [], [-2.0])
+    assert trade_log.trades_by_weekday()[0] == [(1.2, 1.5)]
+
+    # a replaced log is parsed again from its start, across processes once it is big enough
+    path.write_text("".join(LINES[3:]) * 100)
+    monkeypatch.setattr(trade_log, "max_workers", 2)
+    monkeypatch.setattr(trade_text_log, "PARALLEL_MIN_BYTES", 0)
+    assert trade_log.update() == 200
+    trade_log.close()
+    with sqlite3.connect(f"{path}.trades.db") as connection:
+        assert connection.execute("SELECT count(*) FROM trades").fetchone() == (200,)
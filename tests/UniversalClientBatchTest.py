@@ -0,0 +1,118 @@
+from decimal import Decimal
+
+from okex.exceptions import OkexAPIException
+from pybit.exceptions import InvalidRequestError
+
+from trading_automation.clients.UniversalClient import UniversalClient
+from trading_automation.clients.exchange_adapters import exchange_adapters
+
+
+class FakeLogger:
+    def __init__(self):
+        self.lines = []
+
+    def writeline(self, line):
+        self.lines.append(line)
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, json):
+        self._json = json
+
+    def json(self):
+        return self._json
+
+
+class FakeOkexClient:
+    """OKEX rejecting the whole batch with the sCode of its first order, as OkexClient._request raises it."""
+
+    def __init__(self):
+        self.batches = []
+
+    def cancel_multiple_orders(self, orders):
+        self.batches.append(orders)
+        raise OkexAPIException(FakeResponse({"code": "1", "msg": "", "data": [
+            {"ordId": orders[0]["ordId"], "sCode": "51603", "sMsg": "Order does not exist"},
+            {"ordId": orders[1]["ordId"], "sCode": "0", "sMsg": ""}]}))
+
+    def place_multiple_orders(self, orders):
+        self.batches.append(orders)
+        raise OkexAPIException(FakeResponse({"code": "1", "msg": "", "data": [{"sCode": "51603", "sMsg": ""}]}))
+
+
+def make_client():
+    client = UniversalClient.__new__(UniversalClient)
+    client.exchange = client.venue = "OKEX"
+    client.adapter = exchange_adapters.resolve("OKEX")
+    client.logger = FakeLogger()
+    client.tries = 2
+    client.timeout = 1
+    client.okex_pos_mode = "long_short"
+    client.client_okex = FakeOkexClient()
+    client.precisionPriceDict = {"BTC-USDT-SWAP": Decimal("0.1")}
+    client.precisionQuantityDict = {"BTC-USDT-SWAP": Decimal("0.01")}
+    client.singles = []
+    return client
+
+
+def test_batch_cancel_rejected_as_not_found_falls_back_to_single_cancels():
+    client = make_client()
+
+    def futures_cancel_order(symbol, orderId):
+        client.singles.append(orderId)
+        if orderId == "1":
+            raise Exception("order filled")
+    client.futures_cancel_order = futures_cancel_order
+    results = client.futures_cancel_orders_batch([{"symbol": "BTC-USDT-SWAP", "orderId": "1"},
+                                                  {"symbol": "BTC-USDT-SWAP", "orderId": "2"}])
+    assert len(client.client_okex.batches) == 1
+    assert sorted(client.singles) == ["1", "2"]
+    assert results[0] == {"order": None, "error": "order filled"}
+    assert results[1]["error"] is None
+
+
+def test_batch_order_rejected_as_not_found_falls_back_to_single_orders():
+    client = make_client()
+
+    def futures_create_order(symbol, **order):
+        client.singles.append(order["price"])
+        return {"orderId": str(order["price"]), "symbol": symbol}
+    client.futures_create_order = futures_create_order
+    orders = [dict(side="BUY", type="LIMIT", price=Decimal(price), quantity=Decimal("1"), reduceOnly=False,
+                   timeInForce="GTC") for price in ("100", "99")]
+    results = client.futures_create_orders_batch("BTC-USDT-SWAP", orders)
+    assert len(client.client_okex.batches) == 1
+    assert [result["order"]["orderId"] for result in results] == ["100", "99"]
+
+
+class FakeBybitClient:
+    def __init__(self):
+        self.requests = 0
+
+    def cancel_all_active_orders(self, symbol=None):
+        self.requests += 1
+        if self.requests == 1:
+            raise InvalidRequestError("", "Too many visits", 10018, 0, {})
+        return {"list": []}
+
+
+def test_bybit_cancel_all_symbols_is_retried_when_rate_limited():
+    client = make_client()
+    client.exchange = client.venue = "BYBIT"
+    client.adapter = exchange_adapters.resolve("BYBIT")
+    client.client_bybit = FakeBybitClient()
+    client.cancel_all_orders_for_all_symbols()
+    assert client.client_bybit.requests == 2
+
+
+def test_exchange_without_batch_cancels_cancels_one_by_one():
+    client = make_client()
+    client.exchange = client.venue = "XT"
+    client.adapter = exchange_adapters.resolve("XT")
+    client.futures_cancel_order = lambda symbol, orderId: client.singles.append(orderId)
+    results = client.futures_cancel_orders_batch([{"symbol": "btc_usdt", "orderId": "1"},
+                                                  {"symbol": "btc_usdt", "orderId": "2"}])
+    assert sorted(client.singles) == ["1", "2"]
+    assert [result["error"] for result in results] == [None, None]
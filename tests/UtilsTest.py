@@ -16,6 +16,7 @@ from trading_automation.core.Utils import (
     round_interval_down,
     round_interval_up,
     round_interval_nearest,
+    chunks,
 )
 
 
@@ -114,4 +115,11 @@ def test_get_datetime_helpers_round_trip():
 )
 def test_arg_file_regex(filename, should_match):
     matched = re.fullmatch(ARG_FILE_REGEX, filename) is not None
-    assert matched is should_match
\ No newline at end of file
+    assert matched is should_match
+
+
+def test_chunks():
+    assert chunks(list(range(7)), 3) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert chunks([], 3) == []
+    with pytest.raises(ValueError):
+        chunks([1, 2], 0)